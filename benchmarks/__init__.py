@@ -0,0 +1,2 @@
+# 基准测试
+# 使用合成的Alpha Vantage数据测量数据解析和处理的耗时，与保存的基线比较
@@ -0,0 +1,103 @@
+# 基准测试用例
+# 每个用例接收数据规模（交易日数量），完成准备工作后返回被测量的无参函数
+
+import json
+from datetime import date
+from typing import Callable, Dict
+
+from src.api.alpha_vantage import AlphaVantageClient
+from src.data.backtest import Backtester, sweep_signals
+from src.data.processor import DataProcessor
+from src.devtools.synthetic import generate_daily_payload, generate_search_payload
+
+# 固定的最后交易日和股票代码，保证每次运行使用完全相同的数据
+END_DATE = date(2024, 12, 31)
+SYMBOL = "BENCH"
+
+# 只测量数据价格列的用例使用的列
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def _client_returning(payload: Dict) -> AlphaVantageClient:
+    """
+    创建一个直接返回给定响应的客户端（包括JSON解码，不发送HTTP请求）
+    """
+    body = json.dumps(payload)
+    client = AlphaVantageClient(api_key="bench")
+    client.get = lambda endpoint, params=None: json.loads(body)
+    return client
+
+
+def _daily_data(bars: int) -> Dict:
+    client = _client_returning(generate_daily_payload(SYMBOL, bars, END_DATE))
+    return client.get_daily_data(SYMBOL, "full")
+
+
+def parse_daily(bars: int) -> Callable[[], object]:
+    client = _client_returning(generate_daily_payload(SYMBOL, bars, END_DATE))
+    return lambda: client.get_daily_data(SYMBOL, "full")
+
+
+def process_daily_data(bars: int) -> Callable[[], object]:
+    processor = DataProcessor()
+    daily_data = _daily_data(bars)
+    return lambda: processor.process_daily_data(daily_data)
+
+
+def add_calculated_fields(bars: int) -> Callable[[], object]:
+    processor = DataProcessor()
+    df = processor.process_daily_data(_daily_data(bars))[OHLCV_COLUMNS]
+    return lambda: processor._add_calculated_fields(df.copy())
+
+
+def format_for_display(bars: int) -> Callable[[], object]:
+    processor = DataProcessor()
+    df = processor.process_daily_data(_daily_data(bars))
+    return lambda: processor.format_for_display(df)
+
+
+def get_summary_statistics(bars: int) -> Callable[[], object]:
+    processor = DataProcessor()
+    df = processor.process_daily_data(_daily_data(bars))
+    return lambda: processor.get_summary_statistics(df)
+
+
+def filter_by_date_range(bars: int) -> Callable[[], object]:
+    processor = DataProcessor()
+    df = processor.process_daily_data(_daily_data(bars))
+
+    # 取中间一半的日期范围
+    dates = df.index.sort_values()
+    start = dates[len(dates) // 4].strftime("%Y-%m-%d")
+    end = dates[len(dates) * 3 // 4].strftime("%Y-%m-%d")
+    return lambda: processor.filter_by_date_range(df, start, end)
+
+
+def process_symbol_search_results(bars: int) -> Callable[[], object]:
+    # 搜索结果的规模按交易日数量的1/10计算（Alpha Vantage实际最多返回10条）
+    processor = DataProcessor()
+    client = _client_returning(generate_search_payload("bench", max(bars // 10, 1)))
+    results = client.search_symbols("bench")
+    return lambda: processor.process_symbol_search_results(results)
+
+
+def backtest_sweep(bars: int) -> Callable[[], object]:
+    # 90 组均线交叉参数，覆盖常见的参数扫描规模
+    df = DataProcessor().process_daily_data(_daily_data(bars))[OHLCV_COLUMNS]
+    df = df.sort_index()
+    backtester = Backtester(lambda symbol: df, cost_bps=5)
+    signals = sweep_signals(range(5, 55, 5), range(20, 220, 20))
+    return lambda: backtester.run(df, signals)
+
+
+# 用例名称 -> 准备函数
+CASES: Dict[str, Callable[[int], Callable[[], object]]] = {
+    "get_daily_data": parse_daily,
+    "process_daily_data": process_daily_data,
+    "_add_calculated_fields": add_calculated_fields,
+    "format_for_display": format_for_display,
+    "get_summary_statistics": get_summary_statistics,
+    "filter_by_date_range": filter_by_date_range,
+    "process_symbol_search_results": process_symbol_search_results,
+    "backtest_sweep": backtest_sweep,
+}
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试入口
+
+用法:
+    python -m benchmarks.run                       # 运行并与基线比较
+    python -m benchmarks.run --save-baseline       # 运行并保存为新的基线
+    python -m benchmarks.run --sizes 100 1000 --cases process_daily_data
+    python -m benchmarks.run --threshold 1.3       # 比基线慢30%以上视为退化
+
+存在退化时以非零状态退出，可直接用于CI
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# 基准测试中的INFO日志会淹没输出并影响计时，需在导入应用模块之前设置
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("TRACING_ENABLED", "False")
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.cases import CASES  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+DEFAULT_SIZES = [100, 1000, 10000]
+
+
+def environment() -> Dict[str, str]:
+    """
+    记录影响结果可比性的运行环境信息
+    """
+    import numpy
+    import pandas
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+    }
+
+
+def measure(
+    func: Callable[[], object], repeat: int = 5, min_time: float = 0.2
+) -> Dict[str, float]:
+    """
+    测量函数的单次执行耗时
+
+    先校准每轮的调用次数，使每轮耗时不少于min_time，再重复repeat轮。
+    与timeit相同，计时期间关闭垃圾回收，避免回收时机不同带来的波动。
+
+    Args:
+        func: 被测量的无参函数
+        repeat: 轮数
+        min_time: 每轮的最短耗时（秒）
+
+    Returns:
+        Dict[str, float]: 单次调用耗时的最小值和中位数（秒）以及每轮调用次数
+    """
+    func()  # 预热
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _measure(func, repeat, min_time)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _measure(func: Callable[[], object], repeat: int, min_time: float) -> Dict:
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "number": number,
+    }
+
+
+def run(
+    cases: List[str], sizes: List[int], repeat: int, min_time: float
+) -> Dict[str, Dict[str, float]]:
+    """
+    运行指定的用例
+
+    Returns:
+        Dict[str, Dict[str, float]]: '用例[规模]' -> 测量结果
+    """
+    results = {}
+    for name in cases:
+        for size in sizes:
+            key = f"{name}[{size}]"
+            results[key] = measure(CASES[name](size), repeat, min_time)
+            print(f"  {key:<40} {format_time(results[key]['min']):>10}", flush=True)
+    return results
+
+
+def format_time(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds * 1e6:.1f}µs"
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Any],
+    threshold: float,
+) -> List[str]:
+    """
+    与基线比较并打印报告
+
+    以每个用例的最小耗时比较（受系统噪声影响最小）
+
+    Args:
+        results: 本次测量结果
+        baseline: 基线文件内容
+        threshold: 退化阈值（本次耗时 / 基线耗时）
+
+    Returns:
+        List[str]: 退化的用例
+    """
+    regressions = []
+    print()
+    print(f"{'case':<40} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for key, result in results.items():
+        base = baseline["results"].get(key)
+        if base is None:
+            print(f"{key:<40} {'-':>10} {format_time(result['min']):>10} {'new':>7}")
+            continue
+
+        ratio = result["min"] / base["min"]
+        status = ""
+        if ratio > threshold:
+            status = "  REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 / threshold:
+            status = "  faster"
+        print(
+            f"{key:<40} {format_time(base['min']):>10} "
+            f"{format_time(result['min']):>10} {ratio:>6.2f}x{status}"
+        )
+    return regressions
+
+
+def load_baseline(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, results: Dict[str, Dict[str, float]]) -> None:
+    baseline = {"environment": environment(), "results": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="iFinance 数据处理基准测试")
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        choices=sorted(CASES),
+        default=list(CASES),
+        help="要运行的用例（默认全部）",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=DEFAULT_SIZES,
+        help="数据规模，即交易日数量（默认 100 1000 10000）",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="每个用例的测量轮数")
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="每轮的最短耗时（秒）"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, default=DEFAULT_BASELINE, help="基线文件路径"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="把本次结果保存为基线"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="退化阈值：本次耗时超过基线的倍数（默认 1.2）",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    print(f"Running {len(args.cases)} cases at sizes {args.sizes}")
+    results = run(args.cases, args.sizes, args.repeat, args.min_time)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+
+    current = environment()
+    mismatched = [
+        key
+        for key, value in baseline["environment"].items()
+        if current.get(key) != value
+    ]
+    if mismatched:
+        print(
+            "\nWarning: baseline was recorded in a different environment "
+            f"({', '.join(mismatched)}); ratios may not be meaningful"
+        )
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.2f}x:")
+        for key in regressions:
+            print(f"  {key}")
+        return 1
+
+    print(f"\nNo regressions above {args.threshold:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
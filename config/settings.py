@@ -24,7 +24,7 @@ class Settings:
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
     
     # 缓存配置
-    CACHE_ENABLED: bool = os.getenv('CACHE_ENABLED', 'False').lower() == 'true'
+    CACHE_ENABLED: bool = os.getenv('CACHE_ENABLED', 'True').lower() == 'true'
     CACHE_TTL: int = int(os.getenv('CACHE_TTL', '300'))
     
     # Web服务器配置
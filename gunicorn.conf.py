@@ -0,0 +1,41 @@
+# Gunicorn 配置
+# 多进程 × 多线程部署：worker 之间通过磁盘缓存共享数据缓存和API频率限制计数
+
+import os
+
+# 监听地址（Render/Railway 通过 PORT 环境变量指定端口）
+bind = f"0.0.0.0:{os.environ.get('PORT', '8050')}"
+
+# N 个 worker 进程 × M 个线程；回调以网络IO为主，线程可以有效提高并发
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+
+# 在 master 中导入应用后再 fork，worker 共享只读的模块内存并缩短启动时间；
+# HTTP 会话和服务实例会在 worker 中首次使用时重新创建
+preload_app = True
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+
+
+def pre_fork(server, worker):
+    """
+    fork worker 之前在 master 中导入数据处理模块（pandas）
+
+    应用本身延迟导入 pandas 以加快启动；但后台回调任务进程是从 worker fork 出来的，
+    若 worker 中尚未导入 pandas，每个任务都要重新导入一次（约0.5s）。
+    在 master 中导入一次后，worker 和任务进程都通过写时复制共享已加载的模块。
+    """
+    import src.data.processor  # noqa: F401
+
+
+def post_fork(server, worker):
+    """
+    在每个 worker 中启动收盘后定时刷新线程（SCHEDULER_ENABLED 时）
+
+    线程不能在 master 中启动（fork 后不会继承）；各 worker 通过共享缓存认领刷新任务，
+    不会重复请求上游
+    """
+    from src.data.scheduler import start_scheduler
+
+    start_scheduler()
@@ -3,6 +3,8 @@
 
 from typing import Any, Dict, List, Optional
 
+import requests
+
 from ..utils.config import config
 from ..utils.exceptions import (
     APIAuthenticationError,
@@ -10,6 +12,8 @@ from ..utils.exceptions import (
     APIRateLimitError,
     ConfigurationError,
 )
+from ..utils.rate_limit import create_rate_limiter
+from ..utils.tracing import tracer
 from .base import BaseAPIClient
 
 
@@ -42,7 +46,8 @@ class AlphaVantageClient(BaseAPIClient):
             "ALPHA_VANTAGE_BASE_URL", "https://www.alphavantage.co/query"
         )
 
-        super().__init__(base_url)
+        # 频率限制计数保存在共享缓存中，所有worker共用免费版配额
+        super().__init__(base_url, rate_limiter=create_rate_limiter("alpha_vantage"))
         self.logger.info("Alpha Vantage client initialized successfully")
 
     def _check_api_errors(self, data: Dict[str, Any]) -> None:
@@ -74,6 +79,18 @@ class AlphaVantageClient(BaseAPIClient):
                 self.logger.warning(f"Alpha Vantage rate limit warning: {note}")
                 raise APIRateLimitError(f"Rate limit exceeded: {note}")
 
+    def _rate_limit_reason(self, response: requests.Response) -> str:
+        """
+        获取频率限制响应的原因标签（Alpha Vantage 以200状态码返回 "Note" 提示）
+
+        Args:
+            response: requests响应对象
+
+        Returns:
+            str: 'http_429' 或 'note'
+        """
+        return "http_429" if response.status_code == 429 else "note"
+
     def _add_api_key(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
         向请求参数中添加API密钥
@@ -88,6 +105,7 @@ class AlphaVantageClient(BaseAPIClient):
         params["apikey"] = self.api_key
         return params
 
+    @tracer.traced("alpha_vantage.search_symbols")
     def search_symbols(self, keywords: str) -> List[Dict[str, str]]:
         """
         搜索股票代码
@@ -108,7 +126,7 @@ class AlphaVantageClient(BaseAPIClient):
             {"function": "SYMBOL_SEARCH", "keywords": keywords.strip()}
         )
 
-        self.logger.info(f"Searching symbols for keywords: {keywords}")
+        self.logger.info("Searching symbols for keywords: %s", keywords)
 
         try:
             response = self.get("", params=params)
@@ -132,13 +150,17 @@ class AlphaVantageClient(BaseAPIClient):
                 }
                 results.append(result)
 
-            self.logger.info(f"Found {len(results)} symbol matches for '{keywords}'")
+            tracer.current_span().set_attributes(
+                keywords=keywords, results=len(results)
+            )
+            self.logger.info("Found %d symbol matches for '%s'", len(results), keywords)
             return results
 
         except Exception as e:
             self.logger.error(f"Failed to search symbols for '{keywords}': {str(e)}")
             raise
 
+    @tracer.traced("alpha_vantage.get_daily_data")
     def get_daily_data(
         self, symbol: str, output_size: str = "compact"
     ) -> Dict[str, Any]:
@@ -170,7 +192,7 @@ class AlphaVantageClient(BaseAPIClient):
         )
 
         self.logger.info(
-            f"Getting daily data for symbol: {symbol} (output_size: {output_size})"
+            "Getting daily data for symbol: %s (output_size: %s)", symbol, output_size
         )
 
         try:
@@ -198,6 +220,31 @@ class AlphaVantageClient(BaseAPIClient):
             }
 
             # 格式化时间序列数据
+            formatted_data = {}
+            for date, values in time_series.items():
+                formatted_data[date] = {
+                    "open": float(values.get("1. open", 0)),
+                    "high": float(values.get("2. high", 0)),
+                    "low": float(values.get("3. low", 0)),
+                    "close": float(values.get("4. close", 0)),
+                    "volume": int(values.get("5. volume", 0)),
+                }
+
+            result = {"meta_data": formatted_meta, "time_series": formatted_data}
+
+            tracer.current_span().set_attributes(
+                symbol=symbol, output_size=output_size, rows=len(formatted_data)
+            )
+            self.logger.info(
+                "Successfully retrieved %d days of data for '%s'",
+                len(formatted_data),
+                symbol,
+            )
+            return result
+
+        except Exception as e:
+            self.logger.error(f"Failed to get daily data for '{symbol}': {str(e)}")
+            raise
 
     def get_daily_adjusted_data(
         self, symbol: str, outputsize: str = "full"
@@ -230,7 +277,9 @@ class AlphaVantageClient(BaseAPIClient):
         )
 
         self.logger.info(
-            f"Getting daily adjusted data for symbol: {symbol} (outputsize: {outputsize})"
+            "Getting daily adjusted data for symbol: %s (outputsize: %s)",
+            symbol,
+            outputsize,
         )
 
         try:
@@ -260,6 +309,63 @@ class AlphaVantageClient(BaseAPIClient):
                 f"Failed to get daily adjusted data for '{symbol}': {str(e)}"
             )
             raise
+
+    @tracer.traced("alpha_vantage.get_fx_daily")
+    def get_fx_daily(
+        self, from_currency: str, to_currency: str, output_size: str = "compact"
+    ) -> Dict[str, Any]:
+        """
+        获取货币对的日线汇率（FX_DAILY）
+
+        Args:
+            from_currency: 基础货币代码（如 'EUR'）
+            to_currency: 报价货币代码（如 'USD'）
+            output_size: 'compact'（最近100个交易日）或'full'（完整历史数据）
+
+        Returns:
+            Dict[str, Any]: 与 get_daily_data 结构一致的字典（时间序列没有 volume），
+                可直接写入历史数据存储
+
+        Raises:
+            APIError: 当API调用失败时
+        """
+        if not from_currency or not to_currency:
+            raise ValueError("Currency codes cannot be empty")
+
+        if output_size not in ["compact", "full"]:
+            raise ValueError("output_size must be 'compact' or 'full'")
+
+        pair = f"{from_currency.strip().upper()}/{to_currency.strip().upper()}"
+        params = self._add_api_key(
+            {
+                "function": "FX_DAILY",
+                "from_symbol": from_currency.strip().upper(),
+                "to_symbol": to_currency.strip().upper(),
+                "outputsize": output_size,
+            }
+        )
+
+        self.logger.info(
+            "Getting FX daily rates for %s (output_size: %s)", pair, output_size
+        )
+
+        try:
+            response = self.get("", params=params)
+
+            if "Time Series FX (Daily)" not in response:
+                raise APIError(f"No FX daily data found for '{pair}'")
+
+            meta_data = response.get("Meta Data", {})
+            time_series = response.get("Time Series FX (Daily)", {})
+
+            formatted_meta = {
+                "information": meta_data.get("1. Information", ""),
+                "symbol": pair,
+                "last_refreshed": meta_data.get("5. Last Refreshed", ""),
+                "output_size": meta_data.get("4. Output Size", ""),
+                "time_zone": meta_data.get("6. Time Zone", ""),
+            }
+
             formatted_data = {}
             for date, values in time_series.items():
                 formatted_data[date] = {
@@ -267,19 +373,18 @@ class AlphaVantageClient(BaseAPIClient):
                     "high": float(values.get("2. high", 0)),
                     "low": float(values.get("3. low", 0)),
                     "close": float(values.get("4. close", 0)),
-                    "volume": int(values.get("5. volume", 0)),
                 }
 
-            result = {"meta_data": formatted_meta, "time_series": formatted_data}
-
+            tracer.current_span().set_attributes(pair=pair, rows=len(formatted_data))
             self.logger.info(
-                f"Successfully retrieved {len(formatted_data)} days of data "
-                f"for '{symbol}'"
+                "Successfully retrieved %d days of FX rates for %s",
+                len(formatted_data),
+                pair,
             )
-            return result
+            return {"meta_data": formatted_meta, "time_series": formatted_data}
 
         except Exception as e:
-            self.logger.error(f"Failed to get daily data for '{symbol}': {str(e)}")
+            self.logger.error(f"Failed to get FX daily rates for {pair}: {str(e)}")
             raise
 
     def get_quote(self, symbol: str) -> Dict[str, Any]:
@@ -302,7 +407,7 @@ class AlphaVantageClient(BaseAPIClient):
             {"function": "GLOBAL_QUOTE", "symbol": symbol.strip().upper()}
         )
 
-        self.logger.info(f"Getting quote for symbol: {symbol}")
+        self.logger.info("Getting quote for symbol: %s", symbol)
 
         try:
             response = self.get("", params=params)
@@ -327,7 +432,7 @@ class AlphaVantageClient(BaseAPIClient):
                 "change_percent": quote_data.get("10. change percent", "0%"),
             }
 
-            self.logger.info(f"Successfully retrieved quote for '{symbol}'")
+            self.logger.info("Successfully retrieved quote for '%s'", symbol)
             return formatted_quote
 
         except Exception as e:
@@ -2,8 +2,11 @@
 # 提供通用的API调用功能和错误处理
 
 
+import os
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -17,16 +20,51 @@ from ..utils.exceptions import (
     NetworkError,
 )
 from ..utils.logger import LoggerMixin
+from ..utils.metrics import metrics
+from ..utils.rate_limit import RateLimiter
+from ..utils.tracing import tracer
+
+# 上游请求指标
+REQUEST_LATENCY = metrics.histogram(
+    "ifinance_upstream_request_duration_seconds",
+    "Upstream API request latency in seconds, including retries",
+    ["client", "function", "outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+REQUEST_RETRIES = metrics.counter(
+    "ifinance_upstream_retries_total",
+    "Upstream API request retries performed by the HTTP adapter",
+    ["client", "function"],
+)
+RATE_LIMITED = metrics.counter(
+    "ifinance_upstream_rate_limited_total",
+    "Upstream API rate limit responses (HTTP 429 or rate limit notes)",
+    ["client", "function", "reason"],
+)
+RESPONSE_BYTES = metrics.counter(
+    "ifinance_upstream_response_bytes_total",
+    "Bytes downloaded from upstream APIs",
+    ["client", "function"],
+)
 
 
 class BaseAPIClient(LoggerMixin, ABC):
     """
     基础API客户端抽象类
 
-    提供通用的HTTP请求功能、错误处理和重试机制
+    提供通用的HTTP请求功能、错误处理和重试机制。
+
+    requests.Session 不能安全地在线程间共享，因此每个线程使用独立的会话；
+    进程fork后（如gunicorn --preload）子进程会丢弃继承的会话并重新创建。
     """
 
-    def __init__(self, base_url: str, timeout: int = None, max_retries: int = None):
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = None,
+        max_retries: int = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         """
         初始化API客户端
 
@@ -34,19 +72,46 @@ class BaseAPIClient(LoggerMixin, ABC):
             base_url: API基础URL
             timeout: 请求超时时间（秒）
             max_retries: 最大重试次数
+            rate_limiter: 请求频率限制器，None表示不限制
         """
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout or config.get_int("REQUEST_TIMEOUT", 30)
         self.max_retries = max_retries or config.get_int("MAX_RETRIES", 3)
         self.retry_delay = config.get_int("RETRY_DELAY", 1)
+        self.rate_limiter = rate_limiter
 
-        # 配置会话和重试策略
-        self.session = self._create_session()
+        # 每个线程独立的会话（首次使用时创建）
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+        self._pid = os.getpid()
 
         self.logger.info(
             f"Initialized {self.__class__.__name__} with base_url: {self.base_url}"
         )
 
+    @property
+    def session(self) -> requests.Session:
+        """
+        获取当前线程的会话，不存在时创建
+
+        Returns:
+            requests.Session: 当前线程专用的会话对象
+        """
+        if self._pid != os.getpid():
+            # fork后继承的连接池与父进程共享socket，丢弃后重新创建
+            self._local = threading.local()
+            self._sessions = []
+            self._sessions_lock = threading.Lock()
+            self._pid = os.getpid()
+
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._create_session()
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
     def _create_session(self) -> requests.Session:
         """
         创建配置好的requests会话
@@ -56,11 +121,12 @@ class BaseAPIClient(LoggerMixin, ABC):
         """
         session = requests.Session()
 
-        # 配置重试策略
+        # 配置重试策略：只重试服务端错误。429不在适配器中重试，
+        # 否则重试的请求绕过了频率限制器（由调用方经 rate_limiter 重新请求）
         retry_strategy = Retry(
             total=self.max_retries,
             backoff_factor=self.retry_delay,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 503, 504],
             allowed_methods=["HEAD", "GET", "OPTIONS"],
         )
 
@@ -79,6 +145,7 @@ class BaseAPIClient(LoggerMixin, ABC):
 
         return session
 
+    @tracer.traced("http.request")
     def _make_request(
         self,
         method: str,
@@ -107,13 +174,25 @@ class BaseAPIClient(LoggerMixin, ABC):
             APIAuthenticationError: API认证错误
         """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        labels = {
+            "client": self.__class__.__name__,
+            "function": self._request_name(endpoint, params),
+        }
+        tracer.current_span().set_attributes(method=method, **labels)
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
 
         request_headers = self.session.headers.copy()
         if headers:
             request_headers.update(headers)
 
-        self.logger.debug(f"Making {method} request to {url} with params: {params}")
+        self.logger.debug(
+            "Making %s request to %s with params: %s", method, url, params
+        )
 
+        start = time.perf_counter()
+        outcome = "error"
         try:
             response = self.session.request(
                 method=method,
@@ -123,8 +202,22 @@ class BaseAPIClient(LoggerMixin, ABC):
                 headers=request_headers,
                 timeout=self.timeout,
             )
+            self._record_response(response, labels)
 
-            return self._handle_response(response)
+            result = self._handle_response(response)
+            outcome = "ok"
+            return result
+
+        except APIRateLimitError:
+            outcome = "rate_limited"
+            RATE_LIMITED.inc(reason=self._rate_limit_reason(response), **labels)
+            raise
+
+        except requests.exceptions.RetryError as e:
+            # 重试次数耗尽（如持续返回5xx）
+            self.logger.error(f"Retries exhausted: {e}")
+            REQUEST_RETRIES.inc(self.max_retries, **labels)
+            raise NetworkError(f"Request failed after retries: {str(e)}", e)
 
         except requests.exceptions.Timeout as e:
             self.logger.error(f"Request timeout: {e}")
@@ -138,6 +231,58 @@ class BaseAPIClient(LoggerMixin, ABC):
             self.logger.error(f"Request error: {e}")
             raise NetworkError(f"Request failed: {str(e)}", e)
 
+        finally:
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start, outcome=outcome, **labels
+            )
+
+    def _request_name(self, endpoint: str, params: Optional[Dict[str, Any]]) -> str:
+        """
+        获取用于指标标签的请求名称
+
+        Args:
+            endpoint: API端点
+            params: URL参数
+
+        Returns:
+            str: 请求名称，默认为参数中的function，否则为端点
+        """
+        return (params or {}).get("function") or endpoint.strip("/") or "/"
+
+    def _rate_limit_reason(self, response: requests.Response) -> str:
+        """
+        获取频率限制响应的原因标签
+
+        Args:
+            response: requests响应对象
+
+        Returns:
+            str: 'http_429' 或 'api_message'（响应体中的限制提示）
+        """
+        return "http_429" if response.status_code == 429 else "api_message"
+
+    def _record_response(
+        self, response: requests.Response, labels: Dict[str, str]
+    ) -> None:
+        """
+        记录响应大小以及HTTP适配器执行的重试
+
+        Args:
+            response: requests响应对象
+            labels: 指标标签
+        """
+        size = len(response.content)
+        RESPONSE_BYTES.inc(size, **labels)
+
+        retries = getattr(response.raw, "retries", None)
+        history = getattr(retries, "history", ())
+        for _ in history:
+            REQUEST_RETRIES.inc(**labels)
+
+        tracer.current_span().set_attributes(
+            status=response.status_code, bytes=size, retries=len(history)
+        )
+
     def _handle_response(self, response: requests.Response) -> Dict[str, Any]:
         """
         处理API响应
@@ -153,7 +298,7 @@ class BaseAPIClient(LoggerMixin, ABC):
             APIRateLimitError: API频率限制错误
             APIAuthenticationError: API认证错误
         """
-        self.logger.debug(f"Response status: {response.status_code}")
+        self.logger.debug("Response status: %s", response.status_code)
 
         # 检查HTTP状态码
         if response.status_code == 401:
@@ -224,11 +369,18 @@ class BaseAPIClient(LoggerMixin, ABC):
 
     def close(self) -> None:
         """
-        关闭会话
+        关闭所有线程的会话
         """
-        if hasattr(self, "session"):
-            self.session.close()
-            self.logger.debug("API client session closed")
+        if self._pid != os.getpid():
+            # 继承自父进程的会话由父进程负责关闭
+            return
+
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+        self.logger.debug(f"API client closed {len(sessions)} session(s)")
 
     def __enter__(self):
         return self
@@ -2,9 +2,11 @@
 # 处理数据清洗、格式化、计算等核心业务逻辑
 
 from .processor import DataProcessor
+from .store import HistoryStore
 from .validator import DataValidator
 
 __all__ = [
     'DataProcessor',
+    'HistoryStore',
     'DataValidator'
 ]
@@ -0,0 +1,395 @@
+# 回测模块
+# 在日线历史上向量化地评估均线交叉等信号：同一股票的所有参数组合一次矩阵运算完成，多个股票并发处理
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..utils.logger import LoggerMixin
+from ..utils.tracing import tracer
+
+# 回测结果的指标列
+METRICS = [
+    "total_return",
+    "annual_return",
+    "volatility",
+    "sharpe",
+    "max_drawdown",
+    "turnover",
+    "trades",
+    "exposure",
+    "buy_hold_return",
+]
+
+# "ma5>ma20"、"ma5/ma20"、"5>20"、"5/20"
+_CROSSOVER = re.compile(r"^(?:ma)?(\d+)\s*[>/]\s*(?:ma)?(\d+)$", re.IGNORECASE)
+
+
+class MACrossover:
+    """
+    均线交叉信号：快线在慢线之上时持有（多头），否则空仓
+
+    信号在当日收盘时确定，从下一个交易日开始生效
+    """
+
+    def __init__(self, fast: int, slow: int):
+        """
+        初始化信号
+
+        Args:
+            fast: 快线窗口（交易日）
+            slow: 慢线窗口（交易日）
+
+        Raises:
+            ValueError: 窗口不是正整数或快线不短于慢线时
+        """
+        if fast <= 0 or slow <= 0:
+            raise ValueError("Moving average windows must be positive")
+        if fast >= slow:
+            raise ValueError("Fast window must be shorter than slow window")
+        self.fast = int(fast)
+        self.slow = int(slow)
+
+    @property
+    def name(self) -> str:
+        return f"ma{self.fast}>ma{self.slow}"
+
+    def __repr__(self) -> str:
+        return f"MACrossover({self.fast}, {self.slow})"
+
+
+def parse_signal(text: str) -> MACrossover:
+    """
+    解析信号定义，如 'ma5>ma20' 或 '5/20'
+
+    Args:
+        text: 信号定义
+
+    Returns:
+        MACrossover: 信号
+
+    Raises:
+        ValueError: 格式无效时
+    """
+    match = _CROSSOVER.match((text or "").strip())
+    if match is None:
+        raise ValueError(f"Invalid signal '{text}': expected e.g. 'ma5>ma20'")
+    return MACrossover(int(match[1]), int(match[2]))
+
+
+def sweep_signals(
+    fast_windows: Iterable[int], slow_windows: Iterable[int]
+) -> List[MACrossover]:
+    """
+    生成参数扫描的所有均线交叉组合（只保留快线短于慢线的组合）
+
+    Args:
+        fast_windows: 快线窗口
+        slow_windows: 慢线窗口
+
+    Returns:
+        List[MACrossover]: 信号列表
+    """
+    return [
+        MACrossover(fast, slow)
+        for fast in sorted(set(fast_windows))
+        for slow in sorted(set(slow_windows))
+        if 0 < fast < slow
+    ]
+
+
+def moving_averages(df: pd.DataFrame, windows: Iterable[int]) -> Dict[int, np.ndarray]:
+    """
+    计算收盘价的简单移动平均线
+
+    总是用累积和从收盘价计算（每个窗口 O(n)），不使用 DataProcessor 的 ma{n} 列：
+    那些列保留两位小数，低价股票的快慢线会因此频繁相等，产生平信号
+
+    Args:
+        df: 日期索引、按日期升序排列、包含 close 列的数据框
+        windows: 窗口
+
+    Returns:
+        Dict[int, np.ndarray]: 窗口 -> 移动平均线（前 window-1 个交易日为NaN）
+    """
+    close = df["close"].to_numpy(dtype=float)
+    cumsum = np.concatenate(([0.0], np.cumsum(close)))
+    result = {}
+    for window in set(windows):
+        ma = np.full(len(close), np.nan)
+        if len(close) >= window:
+            ma[window - 1 :] = (cumsum[window:] - cumsum[:-window]) / window
+        result[window] = ma
+    return result
+
+
+def signal_positions(df: pd.DataFrame, signals: Sequence[MACrossover]) -> np.ndarray:
+    """
+    计算每个信号每个交易日收盘后的持仓
+
+    Args:
+        df: 日期索引、按日期升序排列的数据框
+        signals: 信号
+
+    Returns:
+        np.ndarray: 信号 × 交易日 的持仓（布尔值，True 持有；慢线尚未形成时空仓）。
+            每个信号的序列在内存中连续，按交易日的累积运算更快
+    """
+    mas = moving_averages(df, [w for s in signals for w in (s.fast, s.slow)])
+    windows = sorted(mas)
+    matrix = np.stack([mas[w] for w in windows]) if windows else np.empty((0, len(df)))
+    row = {w: i for i, w in enumerate(windows)}
+    fast = matrix[[row[s.fast] for s in signals]]
+    slow = matrix[[row[s.slow] for s in signals]]
+    # 与NaN比较为False，慢线形成之前保持空仓
+    return fast > slow
+
+
+def evaluate_positions(
+    close: np.ndarray,
+    positions: np.ndarray,
+    cost: float = 0.0,
+    periods_per_year: int = 252,
+) -> Dict[str, np.ndarray]:
+    """
+    按持仓计算每个信号的收益、回撤和换手率（所有信号一次矩阵运算）
+
+    第 t 日收盘后的持仓获得第 t+1 日的收益；持仓变化时按变化量扣除交易成本
+
+    Args:
+        close: 收盘价（按日期升序）
+        positions: 信号 × 交易日 的持仓（布尔值或0/1）
+        cost: 单边交易成本（占成交金额的比例，如 0.0005 表示5个基点）
+        periods_per_year: 每年的交易日数量（用于年化）
+
+    Returns:
+        Dict[str, np.ndarray]: 指标名 -> 每个信号的指标（见 METRICS）
+    """
+    count, rows = positions.shape
+    if rows < 2:
+        return {name: np.full(count, np.nan) for name in METRICS}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        asset = np.diff(close) / close[:-1]
+    asset = np.nan_to_num(asset)
+
+    positions = positions.astype(bool, copy=False)
+    held = positions[:, :-1]
+    # 第 t 日的交易在第 t 日收盘执行，成本计入第 t+1 日的收益
+    changes = np.empty_like(held)
+    changes[:, 0] = held[:, 0]
+    np.not_equal(held[:, 1:], held[:, :-1], out=changes[:, 1:])
+    returns = np.where(held, asset, 0.0)
+    if cost:
+        returns -= cost * changes
+
+    equity = np.cumprod(1 + returns, axis=1)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=1)
+    drawdown = (equity / peak).min(axis=1) - 1
+
+    years = (rows - 1) / periods_per_year
+    total = equity[:, -1] - 1
+    volatility = returns.std(axis=1, ddof=1) * np.sqrt(periods_per_year)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annual = np.where(total > -1, (1 + total) ** (1 / years) - 1, -1.0)
+        sharpe = np.where(
+            volatility > 0, returns.mean(axis=1) * periods_per_year / volatility, np.nan
+        )
+
+    traded = changes.sum(axis=1)
+    return {
+        "total_return": total,
+        "annual_return": annual,
+        "volatility": volatility,
+        "sharpe": sharpe,
+        "max_drawdown": drawdown,
+        # 每年的换手（买入和卖出各计一次，全仓买入再卖出为2）
+        "turnover": traded / years,
+        "trades": traded,
+        "exposure": held.mean(axis=1),
+        "buy_hold_return": np.full(count, close[-1] / close[0] - 1),
+    }
+
+
+class Backtester(LoggerMixin):
+    """
+    向量化回测器
+
+    同一股票的所有信号共用移动平均线，持仓和收益都是 信号 × 交易日 的矩阵运算；
+    多个股票在线程池中并发处理（数组运算期间numpy释放GIL）
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], pd.DataFrame],
+        cost_bps: float = 0.0,
+        max_workers: int = 4,
+        periods_per_year: int = 252,
+    ):
+        """
+        初始化回测器
+
+        Args:
+            loader: 读取股票日线历史的函数（如 HistoryStore.load）
+            cost_bps: 单边交易成本（基点）
+            max_workers: 并发处理的股票数量
+            periods_per_year: 每年的交易日数量
+        """
+        self.loader = loader
+        self.cost = cost_bps / 10000
+        self.max_workers = max(max_workers, 1)
+        self.periods_per_year = periods_per_year
+
+    @staticmethod
+    def _prepare(
+        df: pd.DataFrame, start: Optional[str] = None, end: Optional[str] = None
+    ) -> pd.DataFrame:
+        # DataProcessor.process_daily_data 的结果按日期降序排列
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        if start or end:
+            df = df.loc[start:end]
+        return df.dropna(subset=["close"])
+
+    @tracer.traced("backtest.run")
+    def run(
+        self,
+        df: pd.DataFrame,
+        signals: Sequence[MACrossover],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        在一个股票的历史上回测多个信号
+
+        移动平均线在截取日期范围之前计算，回测期开始时的均线已经形成
+
+        Args:
+            df: 日期索引的日线数据框（升序或降序均可）
+            signals: 信号
+            start: 回测开始日期 (YYYY-MM-DD，含)
+            end: 回测结束日期 (YYYY-MM-DD，含)
+
+        Returns:
+            pd.DataFrame: 以信号名为索引的指标（列见 METRICS）
+        """
+        df = self._prepare(df)
+        positions = signal_positions(df, signals)
+        if start or end:
+            window = df.index.slice_indexer(start, end)
+            df, positions = df.iloc[window], positions[:, window]
+
+        metrics = evaluate_positions(
+            df["close"].to_numpy(dtype=float),
+            positions,
+            self.cost,
+            self.periods_per_year,
+        )
+        tracer.current_span().set_attributes(rows=len(df), signals=len(signals))
+        result = pd.DataFrame(metrics, index=[s.name for s in signals])
+        result.index.name = "signal"
+        return result
+
+    def run_many(
+        self,
+        symbols: Sequence[str],
+        signals: Sequence[MACrossover],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        在多个股票上回测多个信号（股票之间并发）
+
+        读取失败或没有数据的股票被跳过并记录警告
+
+        Args:
+            symbols: 股票代码
+            signals: 信号
+            start: 回测开始日期
+            end: 回测结束日期
+
+        Returns:
+            pd.DataFrame: 以 (symbol, signal) 为索引的指标
+        """
+
+        def run_symbol(symbol: str) -> Optional[pd.DataFrame]:
+            try:
+                df = self.loader(symbol)
+            except Exception as e:
+                self.logger.warning("Skipping %s: %s", symbol, e)
+                return None
+            if df is None or df.empty:
+                self.logger.warning("Skipping %s: no history", symbol)
+                return None
+            return self.run(df, signals, start, end)
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="backtest"
+        ) as executor:
+            results = dict(zip(symbols, executor.map(run_symbol, symbols)))
+
+        frames = {s: r for s, r in results.items() if r is not None}
+        if not frames:
+            return pd.DataFrame(
+                columns=METRICS,
+                index=pd.MultiIndex.from_arrays([[], []], names=["symbol", "signal"]),
+            )
+        return pd.concat(frames, names=["symbol", "signal"])
+
+    def equity_curve(
+        self,
+        df: pd.DataFrame,
+        signal: MACrossover,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        单个信号的逐日明细（用于图表或检查）
+
+        Args:
+            df: 日期索引的日线数据框
+            signal: 信号
+            start: 回测开始日期
+            end: 回测结束日期
+
+        Returns:
+            pd.DataFrame: 日期索引，包含 close、position、returns、equity、drawdown 列
+        """
+        df = self._prepare(df)
+        position = signal_positions(df, [signal])[0].astype(float)
+        result = pd.DataFrame({"close": df["close"], "position": position})
+        if start or end:
+            result = result.loc[start:end]
+
+        asset = result["close"].pct_change().fillna(0.0)
+        held = result["position"].shift(1, fill_value=0.0)
+        changes = result["position"].diff().abs()
+        changes.iloc[:1] = result["position"].iloc[:1]
+        result["returns"] = held * asset - self.cost * changes.shift(1, fill_value=0.0)
+        result["equity"] = (1 + result["returns"]).cumprod()
+        peak = result["equity"].cummax().clip(lower=1.0)
+        result["drawdown"] = result["equity"] / peak - 1
+        return result
+
+
+def summarize(results: pd.DataFrame, by: str = "signal") -> pd.DataFrame:
+    """
+    按信号（或股票）汇总多股票回测结果（各指标的中位数），按夏普比率降序排列
+
+    Args:
+        results: run_many 的结果
+        by: 'signal' 或 'symbol'
+
+    Returns:
+        pd.DataFrame: 汇总结果
+    """
+    if results.empty:
+        return results
+    return (
+        results.groupby(level=by)
+        .median()
+        .sort_values("sharpe", ascending=False, na_position="last")
+    )
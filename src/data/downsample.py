@@ -0,0 +1,131 @@
+# 降采样模块
+# 把长历史压缩为图表可显示的点数：K线按桶聚合OHLCV，折线使用LTTB算法选取收盘价的代表点
+
+import math
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def bucket_size(rows: int, max_points: int) -> int:
+    """
+    计算每个桶包含的行数
+
+    Args:
+        rows: 总行数
+        max_points: 最多输出的点数
+
+    Returns:
+        int: 每个桶的行数（不需要降采样时为1）
+    """
+    if max_points <= 0 or rows <= max_points:
+        return 1
+    return math.ceil(rows / max_points)
+
+
+def aggregate_ohlcv(
+    df: pd.DataFrame, max_points: int, offset: int = 0
+) -> Tuple[pd.DataFrame, int]:
+    """
+    把连续的交易日按桶聚合为K线（开盘取第一根、收盘取最后一根、最高/最低取极值、成交量求和）
+
+    桶边界按行在完整历史中的位置对齐（offset 为 df 第一行在完整历史中的位置），
+    因此平移或缩放时同一段历史总是落在同样的桶里，K线不会随视图抖动。
+    最高价和最低价按极值聚合，降采样后不会丢失价格尖峰。
+
+    Args:
+        df: 日期索引、按日期升序排列，包含 open/high/low/close/volume 列的数据框
+        max_points: 最多输出的K线数量
+        offset: df 第一行在完整历史中的行号
+
+    Returns:
+        Tuple[pd.DataFrame, int]: 聚合后的数据框（索引为每个桶第一个交易日）和每个桶的行数
+    """
+    rows = len(df)
+    size = bucket_size(rows, max_points)
+    if size == 1:
+        return df, 1
+
+    # 第一个完整桶之前可能有一个不完整的桶
+    first = (-offset) % size
+    starts = np.arange(first, rows, size)
+    if first:
+        starts = np.concatenate(([0], starts))
+    ends = np.append(starts[1:], rows) - 1
+
+    result = pd.DataFrame(
+        {
+            "open": df["open"].to_numpy()[starts],
+            "high": np.maximum.reduceat(df["high"].to_numpy(), starts),
+            "low": np.minimum.reduceat(df["low"].to_numpy(), starts),
+            "close": df["close"].to_numpy()[ends],
+        },
+        index=df.index[starts],
+    )
+    if "volume" in df:
+        result["volume"] = np.add.reduceat(df["volume"].to_numpy(), starts)
+    return result, size
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 降采样，返回保留的点的下标
+
+    保留首尾两点，中间每个桶选取与前一个保留点、下一个桶平均点构成的三角形面积最大的点，
+    折线形状（包括局部极值）基本保持不变。
+
+    Args:
+        x: 横坐标（数值，升序）
+        y: 纵坐标
+        max_points: 最多保留的点数（至少3）
+
+    Returns:
+        np.ndarray: 保留的点的下标（升序）
+    """
+    rows = len(x)
+    if max_points < 3 or rows <= max_points:
+        return np.arange(rows)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # 中间 rows - 2 个点分到 max_points - 2 个桶
+    edges = np.linspace(1, rows - 1, max_points - 1).astype(int)
+
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = rows - 1
+    previous = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        selected[i + 1] = previous
+    return selected
+
+
+def downsample_close(df: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """
+    用LTTB对收盘价降采样
+
+    Args:
+        df: 日期索引、包含 close 列的数据框
+        max_points: 最多保留的点数
+
+    Returns:
+        pd.DataFrame: 保留的行
+    """
+    if len(df) <= max_points:
+        return df
+    x = df.index.asi8 if isinstance(df.index, pd.DatetimeIndex) else np.arange(len(df))
+    return df.iloc[lttb(x, df["close"].to_numpy(), max_points)]
@@ -0,0 +1,321 @@
+# 汇率换算模块
+# 通过API获取日线汇率并保存在本地，按日期对齐后向量化地把整个OHLCV数据框换算为目标货币
+
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils.cache import BaseCache, get_shared_store, make_key
+from ..utils.config import config
+from ..utils.exceptions import APIError, DataProcessingError, NetworkError
+from ..utils.logger import LoggerMixin
+from ..utils.tracing import tracer
+from .market_config import MarketConfig
+from .store import HistoryStore
+
+if TYPE_CHECKING:
+    from ..api.alpha_vantage import AlphaVantageClient
+
+# 以辅币报价的货币 -> (主币, 换算系数)；伦敦、约翰内斯堡和特拉维夫的股票以辅币报价
+MINOR_UNITS = {
+    "GBX": ("GBP", 0.01),
+    "GBp": ("GBP", 0.01),
+    "ZAC": ("ZAR", 0.01),
+    "ZAc": ("ZAR", 0.01),
+    "ILA": ("ILS", 0.01),
+}
+
+# 按市场推断的报价货币与市场配置不同的情况（伦敦的股票默认以便士报价）
+_MARKET_QUOTE_CURRENCY = {"GB": "GBX"}
+
+# 需要换算的价格字段（成交量不换算）
+PRICE_COLUMNS = ["open", "high", "low", "close"]
+
+
+def normalize_currency(code: str) -> Tuple[str, float]:
+    """
+    把货币代码规范化为主币代码和换算系数
+
+    Args:
+        code: 货币代码（如 'USD'、'GBX'、'GBp'）
+
+    Returns:
+        Tuple[str, float]: (主币代码, 1单位该货币等于多少主币)，如 'GBX' -> ('GBP', 0.01)
+
+    Raises:
+        ValueError: 货币代码为空时
+    """
+    code = (code or "").strip()
+    if not code:
+        raise ValueError("Currency code cannot be empty")
+    # 'GBp' 与 'GBP' 只有大小写不同，先按原样匹配
+    if code in MINOR_UNITS:
+        return MINOR_UNITS[code]
+    code = code.upper()
+    return MINOR_UNITS.get(code, (code, 1.0))
+
+
+def symbol_currency(symbol: str) -> str:
+    """
+    根据股票代码后缀推断报价货币
+
+    搜索结果中的 currency 更准确（如伦敦上市的外币股票），有时应优先使用
+
+    Args:
+        symbol: 股票代码（如 'AAPL'、'TSCO.LON'）
+
+    Returns:
+        str: 货币代码，伦敦的股票为 'GBX'
+    """
+    market = MarketConfig.get_market_code_for_symbol(symbol)
+    if market in _MARKET_QUOTE_CURRENCY:
+        return _MARKET_QUOTE_CURRENCY[market]
+    return MarketConfig.MARKET_CONFIGS.get(market, {}).get("currency", "USD")
+
+
+def align_rates(rates: pd.Series, index: pd.DatetimeIndex) -> np.ndarray:
+    """
+    为每个日期取当天或之前最近一个交易日的汇率（二分查找，不逐行处理）
+
+    Args:
+        rates: 日期索引、按日期升序排列的汇率
+        index: 需要汇率的日期
+
+    Returns:
+        np.ndarray: 与 index 等长的汇率，早于第一条汇率的日期为NaN
+    """
+    if rates.empty:
+        return np.full(len(index), np.nan)
+    positions = rates.index.searchsorted(index, side="right") - 1
+    values = rates.to_numpy(dtype=float)[np.maximum(positions, 0)]
+    return np.where(positions >= 0, values, np.nan)
+
+
+class FXConverter(LoggerMixin):
+    """
+    汇率换算器
+
+    汇率按货币对保存在单独的历史数据存储中（与股票历史同样的格式和进程内缓存）；
+    数据文件超过 max_age 未更新时在下次使用前刷新一次（首次获取完整历史，之后只追加近期数据），
+    刷新失败时继续使用已保存的汇率，并在 retry_after 秒内（所有进程）不再尝试刷新
+    """
+
+    def __init__(
+        self,
+        client: "AlphaVantageClient",
+        store: HistoryStore,
+        max_age: int = 43200,
+        shared: Optional[BaseCache] = None,
+        retry_after: int = 900,
+    ):
+        """
+        初始化汇率换算器
+
+        Args:
+            client: API客户端
+            store: 保存汇率的历史数据存储
+            max_age: 汇率的最长使用时间（秒）
+            shared: 跨进程记录刷新失败的共享缓存，None表示不记录
+            retry_after: 刷新失败后再次尝试前的等待时间（秒）
+        """
+        self.client = client
+        self.store = store
+        self.max_age = max_age
+        self.shared = shared
+        self.retry_after = retry_after
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    @staticmethod
+    def pair_symbol(from_currency: str, to_currency: str) -> str:
+        """
+        货币对在存储中的名称，如 EURUSD
+        """
+        return f"{from_currency}{to_currency}".upper()
+
+    def _lock(self, pair: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(pair, threading.Lock())
+
+    def _is_fresh(self, pair: str) -> bool:
+        try:
+            mtime = os.path.getmtime(self.store.data_path(pair))
+        except OSError:
+            return False
+        if time.time() - mtime < self.max_age:
+            return True
+        # 最近刷新失败过：在等待时间内继续使用已保存的汇率，不让每次换算都请求（并等待）上游
+        return (
+            self.shared is not None
+            and self.shared.get(self._backoff_key(pair)) is not None
+        )
+
+    @staticmethod
+    def _backoff_key(pair: str) -> str:
+        return make_key("fx", "refresh_failed", pair)
+
+    def refresh(self, from_currency: str, to_currency: str) -> None:
+        """
+        汇率过期时从API更新（同一货币对同时只有一个线程请求）
+
+        Args:
+            from_currency: 主币代码
+            to_currency: 主币代码
+
+        Raises:
+            APIError: 本地没有汇率且请求失败时
+        """
+        pair = self.pair_symbol(from_currency, to_currency)
+        if self._is_fresh(pair):
+            return
+
+        with self._lock(pair):
+            if self._is_fresh(pair):
+                return
+            info = self.store.info(pair)
+            output_size = (
+                "compact" if info and info.get("output_size") == "full" else "full"
+            )
+            try:
+                self.store.write(
+                    pair,
+                    self.client.get_fx_daily(from_currency, to_currency, output_size),
+                )
+            except (APIError, DataProcessingError, NetworkError) as e:
+                if info is None:
+                    raise
+                if self.shared is not None:
+                    self.shared.set(
+                        self._backoff_key(pair), time.time(), ttl=self.retry_after
+                    )
+                self.logger.warning(
+                    "Failed to refresh FX rates for %s, using stored rates for %ds: %s",
+                    pair,
+                    self.retry_after,
+                    e,
+                )
+
+    @tracer.traced("fx.rates")
+    def rates(self, from_currency: str, to_currency: str) -> pd.Series:
+        """
+        获取货币对的日线收盘汇率
+
+        Args:
+            from_currency: 货币代码
+            to_currency: 货币代码
+
+        Returns:
+            pd.Series: 日期索引、按日期升序排列的汇率（1单位 from_currency 等于多少 to_currency，
+                已包含辅币换算）
+
+        Raises:
+            APIError: 本地没有汇率且请求失败时
+        """
+        source, source_factor = normalize_currency(from_currency)
+        target, target_factor = normalize_currency(to_currency)
+        factor = source_factor / target_factor
+        tracer.current_span().set_attribute("pair", f"{source}/{target}")
+
+        if source == target:
+            return pd.Series(
+                [factor], index=pd.DatetimeIndex(["1970-01-01"], name="date")
+            )
+
+        self.refresh(source, target)
+        close = self.store.load(self.pair_symbol(source, target))["close"]
+        return close * factor if factor != 1.0 else close
+
+    def version(self, from_currency: str, to_currency: str) -> str:
+        """
+        货币对汇率的版本（用于缓存校验，相同货币时为空字符串）
+        """
+        source, _ = normalize_currency(from_currency)
+        target, _ = normalize_currency(to_currency)
+        if source == target:
+            return ""
+        info = self.store.info(self.pair_symbol(source, target)) or {}
+        return f"{info.get('version', '')}:{info.get('rows', 0)}"
+
+    @tracer.traced("fx.convert")
+    def convert(
+        self,
+        df: pd.DataFrame,
+        from_currency: str,
+        to_currency: str,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        把日期索引的数据框中的价格换算为目标货币
+
+        每个日期只查找一次汇率（当天没有汇率时使用之前最近的交易日），然后整列相乘；
+        相同主币（如 GBX -> GBP）只做比例换算，不请求汇率
+
+        Args:
+            df: 日期索引的数据框（如历史数据存储读取的日线数据）
+            from_currency: 数据的报价货币（如 'GBX'）
+            to_currency: 目标货币（如 'USD'）
+            columns: 需要换算的列，默认为存在的价格列
+
+        Returns:
+            pd.DataFrame: 换算后的新数据框（其他列不变），早于第一条汇率的日期为NaN
+
+        Raises:
+            APIError: 本地没有汇率且请求失败时
+        """
+        columns = [c for c in (columns or PRICE_COLUMNS) if c in df.columns]
+        result = df.copy()
+        if not columns or df.empty:
+            return result
+
+        source, source_factor = normalize_currency(from_currency)
+        target, target_factor = normalize_currency(to_currency)
+        if source == target:
+            multiplier = np.full(len(df), source_factor / target_factor)
+        else:
+            multiplier = align_rates(self.rates(from_currency, to_currency), df.index)
+            missing = int(np.isnan(multiplier).sum())
+            if missing:
+                self.logger.warning(
+                    "No %s/%s rate for %d of %d dates",
+                    from_currency,
+                    to_currency,
+                    missing,
+                    len(df),
+                )
+
+        result[columns] = df[columns].to_numpy(dtype=float) * multiplier[:, None]
+        tracer.current_span().set_attributes(rows=len(df), columns=len(columns))
+        return result
+
+
+def create_fx_converter(client: "AlphaVantageClient") -> FXConverter:
+    """
+    根据配置创建汇率换算器
+
+    配置项:
+        FX_STORE_DIR: 汇率存储目录（默认 data/fx）
+        FX_RATE_MAX_AGE: 汇率的最长使用时间（秒，默认43200），超过后下次使用时刷新
+        FX_REFRESH_RETRY_AFTER: 刷新失败后再次尝试前的等待时间（秒，默认900）
+
+    Args:
+        client: API客户端
+
+    Returns:
+        FXConverter: 汇率换算器
+    """
+    store = HistoryStore(
+        config.get("FX_STORE_DIR", "data/fx"),
+        config.get("HISTORY_STORE_FORMAT", "auto").lower(),
+        config.get_int("HISTORY_FRAME_CACHE_SIZE", 16),
+    )
+    return FXConverter(
+        client,
+        store,
+        config.get_int("FX_RATE_MAX_AGE", 43200),
+        shared=get_shared_store(),
+        retry_after=config.get_int("FX_REFRESH_RETRY_AFTER", 900),
+    )
@@ -0,0 +1,421 @@
+# 批量导入模块
+# 通过API客户端批量下载日线历史写入本地历史数据存储，支持并发、频率限制和断点续传；
+# 页面请求的未存储股票由后台导入队列导入
+
+import json
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from ..utils.cache import BaseCache, make_key
+from ..utils.exceptions import APIRateLimitError
+from ..utils.logger import LoggerMixin
+from ..utils.metrics import metrics
+from .store import HistoryStore
+
+# 后台导入结果
+HISTORY_IMPORTS = metrics.counter(
+    "ifinance_history_imports_total",
+    "Background imports of unstored symbols by outcome",
+    ["outcome"],
+)
+
+
+def read_symbols(path: str) -> List[str]:
+    """
+    读取股票代码列表文件
+
+    每行一个或多个股票代码（逗号或空白分隔），# 之后为注释，重复的代码只保留第一次出现
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        List[str]: 大写的股票代码列表
+    """
+    symbols: List[str] = []
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            for symbol in re.split(r"[,\s]+", line.split("#", 1)[0]):
+                symbol = symbol.strip().upper()
+                if symbol and symbol not in seen:
+                    seen.add(symbol)
+                    symbols.append(symbol)
+    return symbols
+
+
+class Checkpoint(LoggerMixin):
+    """
+    导入进度检查点
+
+    每完成一个股票代码就原子地重写一次JSON文件，进程被杀死后最多丢失正在下载的代码
+    """
+
+    def __init__(self, path: str, output_size: str, resume: bool = True):
+        """
+        初始化检查点
+
+        Args:
+            path: 检查点文件路径
+            output_size: 本次导入的输出大小；与已有检查点不一致时重新开始
+            resume: 是否从已有检查点继续
+        """
+        self.path = Path(path)
+        self.output_size = output_size
+        self.done: Dict[str, Dict[str, Any]] = {}
+        self.failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        if resume and self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("output_size") == output_size:
+                self.done = data.get("done", {})
+                self.failed = data.get("failed", {})
+            else:
+                self.logger.warning(
+                    "Checkpoint %s was written for output_size=%s, starting over",
+                    self.path,
+                    data.get("output_size"),
+                )
+
+    def mark_done(self, symbol: str, rows: int) -> None:
+        with self._lock:
+            self.done[symbol] = {
+                "rows": rows,
+                "at": datetime.now().isoformat(timespec="seconds"),
+            }
+            self.failed.pop(symbol, None)
+            self._save()
+
+    def mark_failed(self, symbol: str, error: str) -> None:
+        with self._lock:
+            self.failed[symbol] = error
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "output_size": self.output_size,
+                        "done": self.done,
+                        "failed": self.failed,
+                    },
+                    f,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+            os.replace(tmp, self.path)
+        except BaseException:
+            # 写入失败时保留之前的检查点
+            os.unlink(tmp)
+            raise
+
+
+class Ingestor(LoggerMixin):
+    """
+    批量导入器
+
+    多个线程共用同一个API客户端，请求经过客户端的频率限制器（多进程共享计数），
+    因此提高并发只会在配额允许的范围内提高吞吐量。当日配额用尽时停止，
+    已完成的代码记录在检查点中，之后重新运行即可从中断处继续。
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        store: HistoryStore,
+        checkpoint: Checkpoint,
+        output_size: str = "compact",
+        concurrency: int = 1,
+        out: Optional[TextIO] = None,
+    ):
+        """
+        初始化批量导入器
+
+        Args:
+            client: Alpha Vantage客户端
+            store: 历史数据存储
+            checkpoint: 导入进度检查点
+            output_size: 'compact'（最近100个交易日）或'full'（完整历史数据）
+            concurrency: 并发下载线程数
+            out: 进度输出流，None表示不输出
+        """
+        self.client = client
+        self.store = store
+        self.checkpoint = checkpoint
+        self.output_size = output_size
+        self.concurrency = max(concurrency, 1)
+        self.out = out
+
+        self._stop = threading.Event()
+        self._stop_reason = ""
+        self._rows = 0
+        self._stored_bytes = 0
+        self._lock = threading.Lock()
+
+    def run(self, symbols: List[str]) -> Dict[str, Any]:
+        """
+        导入股票代码列表中尚未完成的代码
+
+        Args:
+            symbols: 股票代码列表
+
+        Returns:
+            Dict[str, Any]: 统计信息（total、skipped、done、failed、remaining、rows、
+            stored_bytes、elapsed、symbols_per_min、rows_per_sec、stopped）；
+            stored_bytes 是导入后这些股票的数据文件大小（含之前已存储的数据），不是下载的字节数
+        """
+        pending = [s for s in symbols if s not in self.checkpoint.done]
+        skipped = len(symbols) - len(pending)
+        self._print(
+            f"Ingesting {len(pending)} symbol(s) ({self.output_size}), "
+            f"{skipped} already done, concurrency {self.concurrency}"
+        )
+
+        done = failed = 0
+        start = time.perf_counter()
+        executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="ingest"
+        )
+        try:
+            futures = {executor.submit(self._ingest, s): s for s in pending}
+            for future in as_completed(futures):
+                status, detail = future.result()
+                if status == "stopped":
+                    continue
+                if status == "done":
+                    done += 1
+                else:
+                    failed += 1
+                self._print(
+                    f"[{done + failed}/{len(pending)}] {futures[future]}: {detail}"
+                )
+        except KeyboardInterrupt:
+            self._halt("interrupted")
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        elapsed = time.perf_counter() - start
+        stats = {
+            "total": len(symbols),
+            "skipped": skipped,
+            "done": done,
+            "failed": failed,
+            "remaining": len(pending) - done - failed,
+            "rows": self._rows,
+            "stored_bytes": self._stored_bytes,
+            "elapsed": elapsed,
+            "symbols_per_min": done / elapsed * 60 if elapsed else 0.0,
+            "rows_per_sec": self._rows / elapsed if elapsed else 0.0,
+            "stopped": self._stop_reason,
+        }
+        self._print(format_stats(stats))
+        return stats
+
+    def _ingest(self, symbol: str) -> Tuple[str, str]:
+        if self._stop.is_set():
+            return "stopped", ""
+
+        start = time.perf_counter()
+        try:
+            daily_data = self.client.get_daily_data(symbol, self.output_size)
+            meta = self.store.write(symbol, daily_data)
+        except APIRateLimitError as e:
+            # 配额用尽时后续请求都会失败，停止并保留进度；该代码不记为失败
+            self._halt(str(e))
+            return "stopped", ""
+        except Exception as e:
+            self.checkpoint.mark_failed(symbol, str(e))
+            return "failed", f"FAILED ({e})"
+
+        rows = len(daily_data["time_series"])
+        self.checkpoint.mark_done(symbol, rows)
+        with self._lock:
+            self._rows += rows
+            self._stored_bytes += self.store.data_path(symbol).stat().st_size
+        return "done", (
+            f"{rows} rows ({meta['start']} .. {meta['end']}, {meta['rows']} stored) "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
+    def _halt(self, reason: str) -> None:
+        with self._lock:
+            if not self._stop.is_set():
+                self._stop_reason = reason
+                self._stop.set()
+                self.logger.warning("Stopping ingest: %s", reason)
+
+    def _print(self, message: str) -> None:
+        if self.out is not None:
+            print(message, file=self.out, flush=True)
+
+
+class ImportQueue(LoggerMixin):
+    """
+    后台导入队列
+
+    页面需要的股票在本地历史数据存储中没有数据时加入队列，由后台线程导入完整历史，
+    页面请求本身不等待上游。所有进程通过共享缓存认领：同一股票在 retry_interval 秒内
+    只请求一次上游，导入失败时也是如此，反复打开页面不会反复消耗配额
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        store: HistoryStore,
+        shared: BaseCache,
+        output_size: str = "full",
+        retry_interval: int = 600,
+        max_pending: int = 20,
+    ):
+        """
+        初始化后台导入队列
+
+        Args:
+            client: Alpha Vantage客户端
+            store: 历史数据存储
+            shared: 跨进程协调用的共享缓存
+            output_size: 导入的数据范围
+            retry_interval: 同一股票两次导入之间的最短间隔（秒）
+            max_pending: 本进程队列中最多的股票数量
+        """
+        self.client = client
+        self.store = store
+        self.shared = shared
+        self.output_size = output_size
+        self.retry_interval = retry_interval
+
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=max(max_pending, 1))
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def request(self, symbol: str) -> bool:
+        """
+        把股票加入队列（首次调用时启动后台线程）
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            bool: 股票是否在队列中（队列已满时为False）
+        """
+        symbol = symbol.strip().upper()
+        with self._lock:
+            if symbol not in self._queued:
+                try:
+                    self._queue.put_nowait(symbol)
+                except queue.Full:
+                    HISTORY_IMPORTS.inc(outcome="dropped")
+                    return False
+                self._queued.add(symbol)
+
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="history-import", daemon=True
+                )
+                self._thread.start()
+        return True
+
+    def error(self, symbol: str) -> Optional[str]:
+        """
+        获取股票最近一次导入失败的原因（任何进程，retry_interval 秒内有效）
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            Optional[str]: 失败原因，没有失败记录时为None
+        """
+        return self.shared.get(make_key("import", "error", symbol.strip().upper()))
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                symbol = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            try:
+                self._import(symbol)
+            finally:
+                with self._lock:
+                    self._queued.discard(symbol)
+
+    def _import(self, symbol: str) -> None:
+        if self.store.exists(symbol):
+            return
+        # 其他进程正在导入，或者不久前导入失败
+        claim_key = make_key("import", "claim", symbol)
+        if self.shared.incr(claim_key, ttl=self.retry_interval) > 1:
+            HISTORY_IMPORTS.inc(outcome="claimed")
+            return
+
+        error_key = make_key("import", "error", symbol)
+        try:
+            meta = self.store.write(
+                symbol, self.client.get_daily_data(symbol, self.output_size)
+            )
+        except Exception as e:
+            outcome = "throttled" if isinstance(e, APIRateLimitError) else "failed"
+            HISTORY_IMPORTS.inc(outcome=outcome)
+            self.shared.set(error_key, str(e), ttl=self.retry_interval)
+            self.logger.warning("Background import of %s failed: %s", symbol, e)
+            return
+
+        self.shared.delete(error_key)
+        HISTORY_IMPORTS.inc(outcome="ok")
+        self.logger.info(
+            "Imported %s in the background (%d rows, %s .. %s)",
+            symbol,
+            meta["rows"],
+            meta["start"],
+            meta["end"],
+        )
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    """
+    格式化导入统计信息
+
+    Args:
+        stats: Ingestor.run 返回的统计信息
+
+    Returns:
+        str: 多行文本
+    """
+    lines = [
+        "",
+        f"Symbols:    {stats['done']} done, {stats['failed']} failed, "
+        f"{stats['skipped']} skipped, {stats['remaining']} remaining "
+        f"(of {stats['total']})",
+        f"Rows:       {stats['rows']} downloaded",
+        f"Stored:     {stats['stored_bytes'] / 1024:.0f} KiB in the imported symbols' "
+        "data files",
+        f"Elapsed:    {stats['elapsed']:.1f}s",
+        f"Throughput: {stats['symbols_per_min']:.1f} symbols/min, "
+        f"{stats['rows_per_sec']:.0f} rows/s",
+    ]
+    if stats["stopped"]:
+        lines.append(f"Stopped:    {stats['stopped']}")
+        lines.append("Run the same command again to resume from the checkpoint.")
+    return "\n".join(lines)
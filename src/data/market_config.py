@@ -1,7 +1,7 @@
 # 市场配置模块
 # 管理不同股票市场的时区、交易时间等信息
 
-from datetime import time
+from datetime import date, datetime, time, timedelta
 from typing import Any, Dict, Optional
 
 import pytz
@@ -108,6 +108,19 @@ class MarketConfig:
         },
     }
 
+    # Alpha Vantage 股票代码后缀到市场代码的映射（无后缀为美国市场）
+    SYMBOL_SUFFIXES = {
+        "LON": "GB",
+        "SHH": "CN",
+        "SHZ": "CN",
+        "TRT": "CA",
+        "TRV": "CA",
+        "DEX": "DE",
+        "FRK": "DE",
+        "BSE": "IN",
+        "NSE": "IN",
+    }
+
     @classmethod
     def get_market_config(cls, region: str) -> Optional[Dict[str, Any]]:
         """
@@ -292,6 +305,72 @@ class MarketConfig:
             # 默认返回UTC
             return pytz.UTC
 
+    @classmethod
+    def get_market_code_for_symbol(cls, symbol: str) -> str:
+        """
+        根据股票代码后缀推断所属市场
+
+        Args:
+            symbol: 股票代码（如 'AAPL', 'TSCO.LON', '600104.SHH'）
+
+        Returns:
+            str: 市场代码，未知后缀按美国市场处理
+        """
+        _, _, suffix = symbol.strip().upper().rpartition(".")
+        if not _:
+            return "US"
+        return cls.SYMBOL_SUFFIXES.get(suffix, "US")
+
+    @classmethod
+    def _session_close(cls, market: Dict[str, Any], day: date) -> datetime:
+        tz = pytz.timezone(market["timezone"])
+        return tz.localize(datetime.combine(day, market["market_close"]))
+
+    @classmethod
+    def last_session_date(cls, market_code: str, now: datetime) -> date:
+        """
+        获取指定时刻之前最近一个已收盘交易日
+
+        只跳过周末，不考虑节假日：节假日由定时刷新在多次重试后上游仍没有该日数据时推断，
+        并记录在历史数据存储的元数据中（HistoryStore.mark_checked）
+
+        Args:
+            market_code: 市场代码
+            now: 当前时刻（带时区）
+
+        Returns:
+            date: 市场当地的交易日日期
+        """
+        market = cls.MARKET_CONFIGS[market_code]
+        day = now.astimezone(pytz.timezone(market["timezone"])).date()
+        while (
+            day.weekday() in market["weekend_days"]
+            or cls._session_close(market, day) > now
+        ):
+            day -= timedelta(days=1)
+        return day
+
+    @classmethod
+    def next_session_close(cls, market_code: str, now: datetime) -> datetime:
+        """
+        获取指定时刻之后的下一个收盘时间（只跳过周末，节假日的“收盘”之后刷新不到新数据）
+
+        Args:
+            market_code: 市场代码
+            now: 当前时刻（带时区）
+
+        Returns:
+            datetime: 收盘时间（UTC）
+        """
+        market = cls.MARKET_CONFIGS[market_code]
+        day = now.astimezone(pytz.timezone(market["timezone"])).date()
+        while (
+            day.weekday() in market["weekend_days"]
+            or cls._session_close(market, day) <= now
+        ):
+            day += timedelta(days=1)
+        return cls._session_close(market, day).astimezone(pytz.UTC)
+
     @classmethod
     def get_all_markets(cls) -> Dict[str, Dict[str, Any]]:
         """
@@ -0,0 +1,197 @@
+# 分页查询模块
+# 在服务器端对日线历史做过滤、排序和分页，只取出当前页的行交给格式化
+
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# DataTable 过滤表达式中的一个条件，如 "{close} >= 100"、"{date} datestartswith 2020"
+_CONDITION = re.compile(
+    r"^\{(?P<column>[^}]+)\}\s+"
+    r"(?P<operator>[si]?(?:eq|ne|lt|le|gt|ge|contains|datestartswith|!=|<=|>=|=|<|>))"
+    r"\s+(?P<value>.+)$"
+)
+
+_OPERATORS = {
+    "=": "eq",
+    "!=": "ne",
+    "<": "lt",
+    "<=": "le",
+    ">": "gt",
+    ">=": "ge",
+}
+
+# (列名, 运算符, 值)
+Condition = Tuple[str, str, str]
+
+
+def parse_filter(filter_query: Optional[str]) -> List[Condition]:
+    """
+    解析 DataTable 的 filter_query（以 && 连接的条件）
+
+    支持 eq/ne/lt/le/gt/ge（及对应符号）、contains 和 datestartswith，
+    忽略大小写前缀（s/i）；无法解析的条件被忽略
+
+    Args:
+        filter_query: 过滤表达式
+
+    Returns:
+        List[Condition]: 条件列表
+    """
+    conditions = []
+    for part in (filter_query or "").split(" && "):
+        match = _CONDITION.match(part.strip())
+        if match is None:
+            if part.strip():
+                logger.debug("Ignoring unsupported filter condition: %s", part)
+            continue
+
+        operator = match["operator"]
+        if operator[0] in "si" and operator[1:] in (
+            *_OPERATORS,
+            *_OPERATORS.values(),
+            "contains",
+            "datestartswith",
+        ):
+            operator = operator[1:]
+        operator = _OPERATORS.get(operator, operator)
+
+        value = match["value"].strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'`":
+            value = value[1:-1]
+        conditions.append((match["column"], operator, value))
+    return conditions
+
+
+def _column_values(df: pd.DataFrame, column: str) -> Optional[np.ndarray]:
+    if column == "date":
+        return df.index.to_numpy()
+    if column in df.columns:
+        return df[column].to_numpy()
+    return None
+
+
+def filter_mask(df: pd.DataFrame, conditions: List[Condition]) -> np.ndarray:
+    """
+    计算满足所有条件的行（向量化比较，不逐行处理）
+
+    Args:
+        df: 日期索引的数据框
+        conditions: parse_filter 返回的条件
+
+    Returns:
+        np.ndarray: 布尔数组
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for column, operator, value in conditions:
+        values = _column_values(df, column)
+        if values is None:
+            continue
+
+        if operator == "datestartswith" and column == "date":
+            # "2020"、"2020-03"、"2020-03-05" 转换为日期范围
+            try:
+                period = pd.Period(value)
+            except ValueError:
+                mask[:] = False
+                continue
+            mask &= (df.index >= period.start_time) & (df.index <= period.end_time)
+            continue
+
+        if operator in ("contains", "datestartswith"):
+            if column == "date":
+                text = df.index.strftime("%Y-%m-%d")
+            else:
+                text = df[column].astype(str)
+            text = pd.Series(text)
+            if operator == "contains":
+                matched = text.str.contains(value, regex=False)
+            else:
+                matched = text.str.startswith(value)
+            mask &= matched.to_numpy()
+            continue
+
+        try:
+            target = pd.Timestamp(value) if column == "date" else float(value)
+        except ValueError:
+            mask[:] = False
+            continue
+
+        if operator == "eq":
+            mask &= values == target
+        elif operator == "ne":
+            mask &= values != target
+        elif operator == "lt":
+            mask &= values < target
+        elif operator == "le":
+            mask &= values <= target
+        elif operator == "gt":
+            mask &= values > target
+        elif operator == "ge":
+            mask &= values >= target
+    return mask
+
+
+def query_page(
+    df: pd.DataFrame,
+    page: int,
+    page_size: int,
+    sort_by: Optional[List[Dict[str, Any]]] = None,
+    filter_query: Optional[str] = None,
+) -> Tuple[pd.DataFrame, int, int]:
+    """
+    过滤、排序并取出一页
+
+    只计算行号，最后用 iloc 取出当前页的行；默认（按日期排序且无过滤）时直接按行号计算页的位置，
+    不排序也不复制数据
+
+    Args:
+        df: 日期索引、按日期升序排列的数据框
+        page: 页码（从0开始，超出范围时取最后一页）
+        page_size: 每页行数
+        sort_by: DataTable 的 sort_by（[{"column_id": ..., "direction": "asc"/"desc"}]），
+            默认按日期降序
+        filter_query: DataTable 的 filter_query
+
+    Returns:
+        Tuple[pd.DataFrame, int, int]: 当前页的数据框、满足条件的总行数和实际页码
+    """
+    sort = (sort_by or [{"column_id": "date", "direction": "desc"}])[0]
+    column = sort.get("column_id", "date")
+    descending = sort.get("direction") == "desc"
+
+    conditions = parse_filter(filter_query)
+    positions = np.flatnonzero(filter_mask(df, conditions)) if conditions else None
+    total = len(df) if positions is None else len(positions)
+
+    page_size = max(page_size, 1)
+    pages = max(math.ceil(total / page_size), 1)
+    page = min(max(page or 0, 0), pages - 1)
+    start, stop = page * page_size, min((page + 1) * page_size, total)
+
+    values = _column_values(df, column)
+    if column == "date" or values is None:
+        # 数据已按日期升序排列
+        if positions is None:
+            window = (
+                np.arange(total - 1 - start, total - 1 - stop, -1)
+                if descending
+                else np.arange(start, stop)
+            )
+            return df.iloc[window], total, page
+        order = positions[::-1] if descending else positions
+    else:
+        if positions is not None:
+            values = values[positions]
+        order = np.argsort(-values if descending else values, kind="stable")
+        if positions is not None:
+            order = positions[order]
+
+    return df.iloc[order[start:stop]], total, page
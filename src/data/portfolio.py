@@ -0,0 +1,526 @@
+# 投资组合估值模块
+# 把持仓与按日期对齐的收盘价矩阵（日期 × 股票）相乘，向量化地计算市值、盈亏、权重和日收益率
+
+import copy
+import re
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils.exceptions import DataValidationError
+from ..utils.logger import LoggerMixin
+from ..utils.tracing import tracer
+from .fx import align_rates, normalize_currency, symbol_currency
+
+if TYPE_CHECKING:
+    from .fx import FXConverter
+
+
+class Holding:
+    """
+    一个持仓：数量、单位成本和报价货币
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        quantity: float,
+        cost: float,
+        currency: Optional[str] = None,
+    ):
+        """
+        初始化持仓
+
+        Args:
+            symbol: 股票代码
+            quantity: 持有数量
+            cost: 单位成本（报价货币）
+            currency: 报价货币，默认按股票代码后缀推断（伦敦的股票为 GBX）
+        """
+        self.symbol = symbol.strip().upper()
+        self.quantity = float(quantity)
+        self.cost = float(cost)
+        self.currency = currency or symbol_currency(self.symbol)
+
+    def key(self) -> Tuple[str, float, float, str]:
+        return (self.symbol, self.quantity, self.cost, self.currency)
+
+    def __repr__(self) -> str:
+        return (
+            f"Holding({self.symbol!r}, {self.quantity}, {self.cost}, "
+            f"{self.currency!r})"
+        )
+
+
+def parse_holdings(text: Optional[str], limit: int = 100) -> List[Holding]:
+    """
+    解析持仓文本：每行（或以分号分隔）一个持仓，格式为 "代码 数量 单位成本 [货币]"，
+    字段以空白或逗号分隔，# 之后为注释；同一股票的多行合并（成本按数量加权平均）
+
+    Args:
+        text: 持仓文本
+        limit: 最多的持仓数量
+
+    Returns:
+        List[Holding]: 持仓列表（按首次出现的顺序）
+
+    Raises:
+        DataValidationError: 某一行格式无效或超过数量限制时
+    """
+    holdings: Dict[str, Holding] = {}
+    for number, line in enumerate(re.split(r"[\n;]", text or ""), start=1):
+        fields = [f for f in re.split(r"[,\s]+", line.split("#")[0]) if f]
+        if not fields:
+            continue
+        if len(fields) not in (3, 4):
+            raise DataValidationError(
+                f"Invalid holding on line {number}: expected 'SYMBOL QUANTITY COST "
+                f"[CURRENCY]'",
+                field="holdings",
+                value=line.strip(),
+            )
+        try:
+            holding = Holding(*fields[:3], *fields[3:])
+        except ValueError:
+            raise DataValidationError(
+                f"Invalid quantity or cost on line {number}",
+                field="holdings",
+                value=line.strip(),
+            )
+
+        existing = holdings.get(holding.symbol)
+        if existing is None:
+            holdings[holding.symbol] = holding
+        elif existing.currency != holding.currency:
+            raise DataValidationError(
+                f"Holding {holding.symbol} is listed in both {existing.currency} "
+                f"and {holding.currency}",
+                field="holdings",
+                value=line.strip(),
+            )
+        else:
+            quantity = existing.quantity + holding.quantity
+            cost = (
+                (existing.quantity * existing.cost + holding.quantity * holding.cost)
+                / quantity
+                if quantity
+                else 0.0
+            )
+            holdings[holding.symbol] = Holding(
+                holding.symbol, quantity, cost, holding.currency
+            )
+
+    if len(holdings) > limit:
+        raise DataValidationError(
+            f"Too many holdings ({len(holdings)}); at most {limit} are allowed",
+            field="holdings",
+        )
+    return list(holdings.values())
+
+
+def close_matrix(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    把多个股票的日线历史对齐为收盘价矩阵
+
+    日期取所有股票交易日的并集；某个市场休市的日期沿用该股票之前最近的收盘价，
+    上市（或有数据）之前为NaN
+
+    Args:
+        frames: 股票代码 -> 日期索引的日线数据框
+
+    Returns:
+        pd.DataFrame: 日期 × 股票的收盘价（列顺序与 frames 一致）
+    """
+    if not frames:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="date"))
+    closes = pd.concat(
+        {symbol: df["close"] for symbol, df in frames.items()}, axis=1
+    ).sort_index()
+    closes.index.name = "date"
+    return closes.ffill()
+
+
+def _portfolio_returns(values: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    # 只计入前后两天都有价格的持仓，新上市的股票不会被当作收益
+    valid = ~np.isnan(values) & ~np.isnan(previous)
+    current = np.where(valid, values, 0.0).sum(axis=-1)
+    base = np.where(valid, previous, 0.0).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(base > 0, current / base - 1, np.nan)
+
+
+class PortfolioValuation:
+    """
+    投资组合在每个交易日的估值（所有金额均为基准货币）
+
+    创建后不再修改（增量更新由 with_last 生成新的估值），页面回调可以不加锁地读取缓存中的估值
+
+    Attributes:
+        holdings: 持仓
+        base_currency: 基准货币
+        prices: 日期 × 股票的收盘价
+        fx_last: 每个股票报价货币到基准货币的最新换算系数（用于成本和实时报价）
+        values: 日期 × 股票的市值
+        totals: 每日总市值
+        weights: 日期 × 股票的权重
+        returns: 每日收益率
+        built_at: 完整计算的时间（增量更新不改变）
+        revision: 增量更新的次数
+        missing: 本地没有历史数据、未计入估值的持仓的股票代码
+    """
+
+    def __init__(
+        self,
+        holdings: List[Holding],
+        base_currency: str,
+        prices: pd.DataFrame,
+        fx_last: pd.Series,
+        missing: Optional[List[str]] = None,
+    ):
+        self.holdings = holdings
+        self.base_currency = base_currency
+        self.prices = prices
+        self.fx_last = fx_last
+        self.missing = missing or []
+        self.quantities = pd.Series({h.symbol: h.quantity for h in holdings})
+        # 成本按最新汇率换算（即报价货币下的盈亏按当前汇率折算）
+        self.costs = (
+            pd.Series({h.symbol: h.quantity * h.cost for h in holdings}) * fx_last
+        )
+        self.built_at = time.time()
+        self.revision = 0
+
+        quantities = self.quantities.to_numpy()
+        values = prices.to_numpy() * quantities
+        self.values = pd.DataFrame(values, index=prices.index, columns=prices.columns)
+        self.totals = self.values.sum(axis=1, min_count=1)
+        self.weights = self.values.div(self.totals, axis=0)
+        returns = np.full(len(values), np.nan)
+        if len(values) > 1:
+            returns[1:] = _portfolio_returns(values[1:], values[:-1])
+        self.returns = pd.Series(returns, index=prices.index)
+
+    @property
+    def last_date(self) -> Optional[pd.Timestamp]:
+        return self.prices.index[-1] if len(self.prices) else None
+
+    def with_last(
+        self, prices: pd.Series, day: pd.Timestamp
+    ) -> Optional["PortfolioValuation"]:
+        """
+        用最新价格增量更新估值：只重新计算最后一行，结果为新的估值对象
+
+        day 与最后一个日期相同时修改最后一行，晚于最后一个日期时追加一行（其他股票沿用之前的价格），
+        早于最后一个日期时忽略。估值创建后不再修改，其他线程可以不加锁地读取
+
+        Args:
+            prices: 股票代码 -> 基准货币的价格
+            day: 价格所属的交易日
+
+        Returns:
+            Optional[PortfolioValuation]: 更新后的估值，没有变化时为None
+        """
+        prices = prices.reindex(self.prices.columns).dropna()
+        last = self.last_date
+        if prices.empty or last is None or day < last:
+            return None
+
+        if day == last:
+            current = self.prices.iloc[-1][prices.index]
+            if np.array_equal(current.to_numpy(), prices.to_numpy()):
+                return None
+
+        # 持仓、成本和汇率不变，共享；逐日数据复制后修改
+        updated = copy.copy(self)
+        for name in ("prices", "values", "weights", "totals", "returns"):
+            setattr(updated, name, getattr(self, name).copy())
+        if day != last:
+            for frame in (updated.prices, updated.values, updated.weights):
+                frame.loc[day] = frame.iloc[-1]
+            updated.totals.loc[day] = np.nan
+            updated.returns.loc[day] = np.nan
+
+        updated.prices.loc[day, prices.index] = prices
+        row = updated.prices.iloc[-1].to_numpy() * updated.quantities.to_numpy()
+        total = np.nansum(row) if not np.isnan(row).all() else np.nan
+        updated.values.iloc[-1] = row
+        updated.totals.iloc[-1] = total
+        updated.weights.iloc[-1] = row / total
+        if len(row) and len(updated.values) > 1:
+            updated.returns.iloc[-1] = _portfolio_returns(
+                row, updated.values.iloc[-2].to_numpy()
+            )
+        updated.revision = self.revision + 1
+        return updated
+
+    def positions(self) -> pd.DataFrame:
+        """
+        最后一个交易日的持仓明细
+
+        Returns:
+            pd.DataFrame: 以股票代码为索引，包含 currency、quantity、price、value、cost、pnl、
+                pnl_percent、weight、day_change 列
+        """
+        if self.last_date is None:
+            return pd.DataFrame(
+                columns=[
+                    "currency",
+                    "quantity",
+                    "price",
+                    "value",
+                    "cost",
+                    "pnl",
+                    "pnl_percent",
+                    "weight",
+                    "day_change",
+                ]
+            )
+
+        value = self.values.iloc[-1]
+        previous = self.values.iloc[-2] if len(self.values) > 1 else value
+        result = pd.DataFrame(
+            {
+                "currency": [h.currency for h in self.holdings],
+                "quantity": self.quantities,
+                "price": self.prices.iloc[-1],
+                "value": value,
+                "cost": self.costs,
+                "pnl": value - self.costs,
+                "pnl_percent": (value / self.costs - 1) * 100,
+                "weight": self.weights.iloc[-1] * 100,
+                "day_change": value - previous,
+            }
+        )
+        result.index.name = "symbol"
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        组合汇总：总市值、总成本、盈亏和最近一日的变化
+
+        Returns:
+            Dict[str, Any]: 汇总数据
+        """
+        if self.last_date is None:
+            return {"date": None, "value": 0.0, "cost": 0.0, "pnl": 0.0}
+
+        value = float(self.totals.iloc[-1])
+        cost = float(self.costs.sum())
+        day_return = self.returns.iloc[-1]
+        return {
+            "date": self.last_date.strftime("%Y-%m-%d"),
+            "currency": self.base_currency,
+            "value": value,
+            "cost": cost,
+            "pnl": value - cost,
+            "pnl_percent": (value / cost - 1) * 100 if cost else None,
+            "day_return": None if np.isnan(day_return) else float(day_return) * 100,
+        }
+
+
+def _version(data: Optional[Any]) -> Tuple:
+    if data is None or len(data) == 0:
+        return ()
+    last = data.iloc[-1]
+    return (len(data), data.index[-1], tuple(np.atleast_1d(last)))
+
+
+def _cache_key(holdings: List[Holding], base_currency: str) -> Tuple:
+    return (tuple(h.key() for h in holdings), base_currency)
+
+
+class PortfolioValuer(LoggerMixin):
+    """
+    投资组合估值器
+
+    价格来自本地历史数据（通过 loader 读取，历史数据存储的进程内缓存使反复估值不再读取文件），
+    实时价格来自报价中心的缓存，都不会为每个持仓单独请求API；
+    本地没有历史数据的持仓记为缺失，不计入估值（由调用方安排导入）；
+    每个（持仓，基准货币）缓存最近一次估值，历史数据和汇率的最后一个交易日都没有变化时直接复用
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], pd.DataFrame],
+        fx: Optional["FXConverter"] = None,
+        cache_size: int = 16,
+    ):
+        """
+        初始化估值器
+
+        Args:
+            loader: 读取股票完整日线历史的函数，本地没有数据时返回None（不请求上游）
+            fx: 汇率换算器，None时只支持同一主币的持仓
+            cache_size: 缓存的估值数量
+        """
+        self.loader = loader
+        self.fx = fx
+        self.cache_size = cache_size
+        self._cache: Dict[Tuple, Tuple[Tuple, PortfolioValuation]] = {}
+        self._lock = threading.RLock()
+
+    def _fx_rates(
+        self, currency: str, base_currency: str
+    ) -> Tuple[Optional[pd.Series], float]:
+        """
+        获取报价货币到基准货币的汇率
+
+        Returns:
+            Tuple[Optional[pd.Series], float]: 汇率序列（同一主币时为None）和辅币换算系数
+        """
+        source, source_factor = normalize_currency(currency)
+        target, target_factor = normalize_currency(base_currency)
+        factor = source_factor / target_factor
+        if source == target:
+            return None, factor
+        if self.fx is None:
+            raise DataValidationError(
+                f"Cannot convert {currency} to {base_currency} without FX rates",
+                field="currency",
+                value=currency,
+            )
+        return self.fx.rates(currency, base_currency), 1.0
+
+    @tracer.traced("portfolio.value")
+    def value(self, holdings: List[Holding], base_currency: str) -> PortfolioValuation:
+        """
+        计算投资组合的估值（历史数据和汇率都没有变化时返回缓存的估值，包括之前的增量更新）
+
+        本地没有历史数据的持仓不计入估值，记录在估值的 missing 中
+
+        Args:
+            holdings: 持仓
+            base_currency: 基准货币
+
+        Returns:
+            PortfolioValuation: 估值
+
+        Raises:
+            APIError: 本地没有汇率且请求失败时
+            DataValidationError: 无法换算货币时
+        """
+        span = tracer.current_span()
+        loaded = {h.symbol: self.loader(h.symbol) for h in holdings}
+        frames = {s: df for s, df in loaded.items() if df is not None}
+        missing = [s for s, df in loaded.items() if df is None]
+        valued = [h for h in holdings if h.symbol in frames]
+        rates = {h.currency: self._fx_rates(h.currency, base_currency) for h in valued}
+        # 数据的行数和最后一行：导入、追加或修改最后一个交易日都会改变
+        versions = tuple(_version(df) for df in loaded.values()) + tuple(
+            _version(r) for r, _ in rates.values()
+        )
+        key = _cache_key(holdings, base_currency)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == versions:
+                span.set_attributes(holdings=len(holdings), cached=True)
+                return cached[1]
+
+        prices = close_matrix(frames)
+        multipliers = {}
+        for h in valued:
+            series, factor = rates[h.currency]
+            if series is None:
+                multipliers[h.symbol] = np.full(len(prices), factor)
+            else:
+                # 每种货币每个日期查找一次汇率
+                if h.currency not in multipliers:
+                    multipliers[h.currency] = align_rates(series, prices.index)
+                multipliers[h.symbol] = multipliers[h.currency]
+        columns = [h.symbol for h in valued]
+        matrix = np.column_stack([multipliers[s] for s in columns]) if columns else None
+        if matrix is not None:
+            prices = prices * matrix
+        fx_last = pd.Series(
+            {s: float(multipliers[s][-1]) if len(prices) else np.nan for s in columns},
+            dtype=float,
+        )
+
+        valuation = PortfolioValuation(
+            valued, base_currency, prices, fx_last, missing=missing
+        )
+        span.set_attributes(
+            holdings=len(holdings),
+            missing=len(missing),
+            cached=False,
+            rows=len(prices),
+        )
+        with self._lock:
+            self._cache[key] = (versions, valuation)
+            while len(self._cache) > max(self.cache_size, 1):
+                self._cache.pop(next(iter(self._cache)))
+        return valuation
+
+    def cached(
+        self, holdings: List[Holding], base_currency: str
+    ) -> Optional[PortfolioValuation]:
+        """
+        获取最近一次计算的估值（不读取历史数据，用于定时刷新）
+
+        Args:
+            holdings: 持仓
+            base_currency: 基准货币
+
+        Returns:
+            Optional[PortfolioValuation]: 估值，尚未计算时为None
+        """
+        with self._lock:
+            cached = self._cache.get(_cache_key(holdings, base_currency))
+        return cached[1] if cached is not None else None
+
+    @tracer.traced("portfolio.apply_quotes")
+    def apply_quotes(
+        self,
+        holdings: List[Holding],
+        base_currency: str,
+        entries: Dict[str, Dict[str, Any]],
+    ) -> Optional[PortfolioValuation]:
+        """
+        用报价中心的最新报价增量更新缓存的估值（只修改或追加最后一行）
+
+        更新生成新的估值对象并原子地替换缓存中的估值，之前返回的估值保持不变
+
+        Args:
+            holdings: 持仓
+            base_currency: 基准货币
+            entries: 报价中心 latest() 返回的报价记录
+
+        Returns:
+            Optional[PortfolioValuation]: 最新的估值，尚未计算时为None
+        """
+        key = _cache_key(holdings, base_currency)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is None:
+                return None
+            versions, valuation = cached
+
+            by_day: Dict[pd.Timestamp, Dict[str, float]] = {}
+            for symbol, entry in entries.items():
+                quote = entry.get("quote") or {}
+                price = quote.get("price")
+                day = quote.get("latest_trading_day")
+                if not price or not day or symbol not in valuation.fx_last:
+                    continue
+                try:
+                    day = pd.Timestamp(datetime.strptime(day, "%Y-%m-%d"))
+                except ValueError:
+                    continue
+                by_day.setdefault(day, {})[symbol] = price * valuation.fx_last[symbol]
+
+            # 不同市场的最新交易日可能不同，按日期顺序更新
+            updated = valuation
+            for day in sorted(by_day):
+                updated = updated.with_last(pd.Series(by_day[day]), day) or updated
+            if updated is not valuation:
+                self._cache[key] = (versions, updated)
+
+        tracer.current_span().set_attributes(
+            quotes=len(entries), changed=updated is not valuation
+        )
+        return updated
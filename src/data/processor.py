@@ -7,6 +7,7 @@ import pandas as pd
 
 from ..utils.exceptions import DataProcessingError
 from ..utils.logger import get_logger
+from ..utils.tracing import tracer
 
 
 class DataProcessor:
@@ -83,7 +84,7 @@ class DataProcessor:
             processed_results.sort(key=lambda x: x["match_score"], reverse=True)
 
             self.logger.info(
-                f"Processed {len(processed_results)} symbol search results"
+                "Processed %d symbol search results", len(processed_results)
             )
             return processed_results
 
@@ -295,6 +296,7 @@ class DataProcessor:
             self.logger.error(f"计算市场状态时出错: {str(e)}")
             return {"status": "unknown", "status_text": "状态未知", "next_event": ""}
 
+    @tracer.traced("processor.process_daily_data")
     def process_daily_data(
         self, daily_data: Dict[str, Any], days_limit: Optional[int] = None
     ) -> pd.DataFrame:
@@ -319,15 +321,16 @@ class DataProcessor:
             if not time_series:
                 raise DataProcessingError("Empty time series data")
 
-            # 转换为DataFrame
-            df = pd.DataFrame.from_dict(time_series, orient="index")
+            with tracer.span("processor.build_frame", input_rows=len(time_series)):
+                # 转换为DataFrame
+                df = pd.DataFrame.from_dict(time_series, orient="index")
 
-            # 确保索引为日期类型
-            df.index = pd.to_datetime(df.index)
-            df.index.name = "date"
+                # 确保索引为日期类型
+                df.index = pd.to_datetime(df.index)
+                df.index.name = "date"
 
-            # 按日期排序（最新的在前）
-            df = df.sort_index(ascending=False)
+                # 按日期排序（最新的在前）
+                df = df.sort_index(ascending=False)
 
             # 限制天数
             if days_limit and days_limit > 0:
@@ -347,13 +350,33 @@ class DataProcessor:
             # 添加计算字段
             df = self._add_calculated_fields(df)
 
-            self.logger.info(f"Processed daily data: {len(df)} records")
+            tracer.current_span().set_attributes(days_limit=days_limit, rows=len(df))
+            self.logger.info("Processed daily data: %d records", len(df))
             return df
 
         except Exception as e:
             self.logger.error(f"Failed to process daily data: {str(e)}")
             raise DataProcessingError(f"Failed to process daily data: {str(e)}")
 
+    def add_change_fields(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        为按日期升序排列的数据框添加日变化字段（change、change_percent）
+
+        与 _add_calculated_fields 不同，不重新排序也不计算移动平均线，用于完整历史的浏览
+
+        Args:
+            df: 按日期升序排列的数据框
+
+        Returns:
+            pd.DataFrame: 添加了计算字段的新数据框
+        """
+        previous = df["close"].shift(1)
+        return df.assign(
+            change=(df["close"] - previous).round(2),
+            change_percent=((df["close"] - previous) / previous * 100).round(2),
+        )
+
+    @tracer.traced("processor.add_calculated_fields")
     def _add_calculated_fields(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         添加计算字段
@@ -398,6 +421,7 @@ class DataProcessor:
             self.logger.warning(f"Failed to add calculated fields: {str(e)}")
             return df
 
+    @tracer.traced("processor.format_for_display")
     def format_for_display(
         self, df: pd.DataFrame, format_numbers: bool = True
     ) -> List[Dict[str, Any]]:
@@ -445,13 +469,46 @@ class DataProcessor:
             # 转换为字典列表
             result = display_df.to_dict("records")
 
-            self.logger.info(f"Formatted {len(result)} records for display")
+            tracer.current_span().set_attribute("rows", len(result))
+            self.logger.info("Formatted %d records for display", len(result))
             return result
 
         except Exception as e:
             self.logger.error(f"Failed to format data for display: {str(e)}")
             raise DataProcessingError(f"Failed to format data: {str(e)}")
 
+    @tracer.traced("processor.to_columnar")
+    def to_columnar(
+        self, df: pd.DataFrame, columns: Optional[List[str]] = None
+    ) -> Dict[str, List[Any]]:
+        """
+        将数据框转换为列式结构（每列一个数组），用于向浏览器传输
+
+        与 format_for_display 的逐行字典相比，列式结构不重复字段名，体积更小
+
+        Args:
+            df: 数据框（日期索引）
+            columns: 需要输出的列，None表示输出全部列
+
+        Returns:
+            Dict[str, List[Any]]: 包含 'dates' 和各列数组的字典，顺序与数据框一致
+        """
+        try:
+            if columns is None:
+                columns = list(df.columns)
+
+            result = {"dates": df.index.strftime("%Y-%m-%d").tolist()}
+            for col in columns:
+                if col in df.columns:
+                    result[col] = df[col].tolist()
+
+            self.logger.debug("Converted %d records to columnar format", len(df))
+            return result
+
+        except Exception as e:
+            self.logger.error(f"Failed to convert data to columnar format: {str(e)}")
+            raise DataProcessingError(f"Failed to convert data: {str(e)}")
+
     def get_summary_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
         计算数据的汇总统计信息
@@ -547,7 +604,7 @@ class DataProcessor:
                 filtered_df = filtered_df[filtered_df.index <= end_dt]
 
             self.logger.info(
-                f"Filtered data from {len(df)} to {len(filtered_df)} records"
+                "Filtered data from %d to %d records", len(df), len(filtered_df)
             )
             return filtered_df
 
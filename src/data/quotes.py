@@ -0,0 +1,334 @@
+# 实时报价模块
+# 按统一的节奏轮询订阅股票的报价，只把变化的字段推送给所有订阅者
+
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from ..utils.cache import BaseCache, make_key
+from ..utils.exceptions import APIRateLimitError
+from ..utils.logger import LoggerMixin
+from ..utils.metrics import metrics
+from ..utils.rate_limit import RateLimiter
+
+# 报价轮询结果：fetched（本进程请求上游）、shared（其他进程已请求）、
+# throttled（报价配额用尽，稍后再试）、error
+QUOTE_POLLS = metrics.counter(
+    "ifinance_quote_polls_total",
+    "Quote poll slots by outcome",
+    ["outcome"],
+)
+QUOTE_EVENTS = metrics.counter(
+    "ifinance_quote_events_total",
+    "Quote change events delivered to subscribers",
+)
+
+# 比较变化时忽略的字段
+_IGNORED_FIELDS = {"symbol"}
+
+
+class Subscription:
+    """
+    报价订阅
+
+    事件放在有界队列中；消费太慢导致队列满时订阅被标记为溢出，
+    由推送方结束连接（客户端重连后会重新收到完整快照）
+    """
+
+    def __init__(self, symbols: Iterable[str], max_queue: int = 1000):
+        self.symbols: Set[str] = {s.strip().upper() for s in symbols if s.strip()}
+        self.queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(max_queue)
+        self.overflowed = False
+
+    def push(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        等待下一个事件
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            Optional[Dict[str, Any]]: 事件，超时为None
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class QuoteHub(LoggerMixin):
+    """
+    报价中心
+
+    每个进程一个轮询线程，只在有订阅者时运行。每个股票每 interval 秒只请求一次上游：
+    时间槽通过共享缓存认领，认领到的进程请求上游并把报价写入共享缓存，其他进程直接读取，
+    因此上游请求量只取决于订阅的股票数量，与订阅者数量和worker数量无关。
+
+    除推送订阅外，定时读取报价的页面通过 watch() 租用股票：租约到期前这些股票同样被轮询，
+    页面关闭后租约自然过期。
+
+    轮询只使用自己的配额（limiter，所有进程共享）：配额用尽时不等待，跳过到下一个分钟窗口，
+    最久没有更新的股票优先，因此股票多于配额时按轮转依次更新，不会占用查询需要的配额。
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        shared: BaseCache,
+        interval: int = 60,
+        tick: float = 1.0,
+        max_subscribers: int = 100,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        """
+        初始化报价中心
+
+        Args:
+            client: Alpha Vantage客户端
+            shared: 跨进程共享报价的缓存
+            interval: 每个股票的轮询间隔（秒）
+            tick: 检查共享缓存中新报价的间隔（秒）
+            max_subscribers: 本进程最多订阅者数量
+            limiter: 报价轮询的配额（max_wait应为0），None表示不限制
+        """
+        self.client = client
+        self.shared = shared
+        self.interval = interval
+        self.tick = tick
+        self.max_subscribers = max_subscribers
+        self.limiter = limiter
+        # 报价配额用尽时，到此时间之前不再认领时间槽
+        self._throttled_until = 0.0
+
+        self._subscriptions: Set[Subscription] = set()
+        self._symbols: Counter = Counter()
+        # 定时读取方租用的股票 -> 租约到期时间
+        self._leases: Dict[str, float] = {}
+        # 每个股票已处理的时间槽、已看到的报价时间和最近推送的报价
+        self._polled: Dict[str, int] = {}
+        self._seen: Dict[str, float] = {}
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, symbols: Iterable[str]) -> Optional[Subscription]:
+        """
+        订阅股票报价，需要时启动轮询线程
+
+        Args:
+            symbols: 股票代码
+
+        Returns:
+            Optional[Subscription]: 订阅，订阅者已满时为None
+        """
+        subscription = Subscription(symbols)
+        with self._lock:
+            if len(self._subscriptions) >= self.max_subscribers:
+                return None
+            self._subscriptions.add(subscription)
+            self._symbols.update(subscription.symbols)
+            self._ensure_running()
+        return subscription
+
+    def watch(self, symbols: Iterable[str], ttl: float) -> None:
+        """
+        租用股票报价（供定时读取报价的页面使用），租约内这些股票和订阅的股票一样被轮询
+
+        Args:
+            symbols: 股票代码
+            ttl: 租约时长（秒），读取方应在到期前再次调用续租
+        """
+        expires_at = time.time() + ttl
+        with self._lock:
+            for symbol in symbols:
+                self._leases[symbol.strip().upper()] = expires_at
+            self._ensure_running()
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.discard(subscription)
+                self._symbols.subtract(subscription.symbols)
+                for symbol in subscription.symbols:
+                    if self._symbols[symbol] <= 0:
+                        del self._symbols[symbol]
+                        if symbol not in self._leases:
+                            self._forget(symbol)
+
+    def snapshot(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        获取股票最近的报价（不请求上游）
+
+        Args:
+            symbols: 股票代码
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 股票代码 -> 报价，尚无报价的股票不包含在内
+        """
+        return {
+            symbol: entry["quote"] for symbol, entry in self.latest(symbols).items()
+        }
+
+    def latest(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        从共享缓存批量读取股票最近的报价记录（不请求上游）
+
+        Args:
+            symbols: 股票代码
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 股票代码 -> {quote, fetched_at, changed_at}，
+                changed_at 为报价最近一次发生变化的时间；尚无报价的股票不包含在内
+        """
+        keys = {
+            make_key("quote", "latest", symbol): symbol
+            for symbol in (s.strip().upper() for s in symbols)
+            if symbol
+        }
+        return {keys[key]: entry for key, entry in self.shared.get_many(keys).items()}
+
+    def _ensure_running(self) -> None:
+        # 调用方持有 self._lock
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="quote-hub", daemon=True
+            )
+            self._thread.start()
+
+    def _forget(self, symbol: str) -> None:
+        self._polled.pop(symbol, None)
+        self._seen.pop(symbol, None)
+        self._last.pop(symbol, None)
+
+    def _active_symbols(self) -> List[str]:
+        # 调用方持有 self._lock；顺便清理过期的租约
+        now = time.time()
+        for symbol, expires_at in list(self._leases.items()):
+            if expires_at < now:
+                del self._leases[symbol]
+                if symbol not in self._symbols:
+                    self._forget(symbol)
+        return list(dict.fromkeys([*self._symbols, *self._leases]))
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                symbols = self._active_symbols()
+                if not symbols:
+                    # 没有订阅者和租约时退出，下次订阅时重新启动
+                    self._thread = None
+                    return
+                # 最久没有更新的股票优先使用配额
+                symbols.sort(key=lambda symbol: self._seen.get(symbol, 0.0))
+
+            for symbol in symbols:
+                try:
+                    self._poll(symbol)
+                except Exception as e:
+                    self.logger.error(f"Failed to poll quote for {symbol}: {e}")
+            time.sleep(self.tick)
+
+    def _poll(self, symbol: str) -> None:
+        # 订阅和租约可能在轮询期间被其他线程取消（_forget），每个股票的状态都在锁内读写
+        now = time.time()
+        slot = int(now // self.interval)
+        with self._lock:
+            due = self._polled.get(symbol) != slot and now >= self._throttled_until
+            if due:
+                self._polled[symbol] = slot
+
+        if due:
+            claim_key = make_key("quote", "poll", symbol, slot)
+            claimed = self.shared.incr(claim_key, ttl=self.interval * 2)
+            if claimed > 1:
+                QUOTE_POLLS.inc(outcome="shared")
+            elif self._take_quota():
+                self._fetch(symbol)
+            else:
+                # 撤回认领：下一个配额窗口由本进程或其他进程再试
+                self.shared.incr(claim_key, -1, ttl=self.interval * 2)
+                with self._lock:
+                    if self._polled.get(symbol) == slot:
+                        del self._polled[symbol]
+                QUOTE_POLLS.inc(outcome="throttled")
+
+        entry = self.shared.get(make_key("quote", "latest", symbol))
+        if entry is None:
+            return
+
+        with self._lock:
+            if symbol not in self._symbols and symbol not in self._leases:
+                # 已取消订阅：不要为已清理的股票重新记录状态
+                return
+            if entry["fetched_at"] == self._seen.get(symbol):
+                return
+            self._seen[symbol] = entry["fetched_at"]
+            quote = entry["quote"]
+            previous = self._last.get(symbol, {})
+            changes = {
+                key: value
+                for key, value in _fields(quote).items()
+                if previous.get(key) != value
+            }
+            self._last[symbol] = quote
+        if changes:
+            self._publish(symbol, changes)
+
+    def _take_quota(self) -> bool:
+        if self.limiter is None:
+            return True
+        try:
+            self.limiter.acquire()
+        except APIRateLimitError:
+            self._throttled_until = (int(time.time() // 60) + 1) * 60
+            return False
+        return True
+
+    def _fetch(self, symbol: str) -> None:
+        try:
+            quote = self.client.get_quote(symbol)
+        except Exception as e:
+            QUOTE_POLLS.inc(outcome="error")
+            self.logger.warning(f"Quote poll for {symbol} failed: {e}")
+            return
+
+        QUOTE_POLLS.inc(outcome="fetched")
+        key = make_key("quote", "latest", symbol)
+        now = time.time()
+        previous = self.shared.get(key)
+        changed_at = now
+        if previous is not None and _fields(previous["quote"]) == _fields(quote):
+            changed_at = previous.get("changed_at", previous["fetched_at"])
+        self.shared.set(
+            key,
+            {"quote": quote, "fetched_at": now, "changed_at": changed_at},
+            ttl=self.interval * 10,
+        )
+
+    def _publish(self, symbol: str, changes: Dict[str, Any]) -> None:
+        event = dict(changes, symbol=symbol)
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if symbol in s.symbols]
+        for subscription in subscriptions:
+            subscription.push(event)
+        QUOTE_EVENTS.inc(len(subscriptions))
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return sorted(self._active_symbols())
+
+
+def _fields(quote: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in quote.items() if k not in _IGNORED_FIELDS}
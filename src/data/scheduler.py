@@ -0,0 +1,358 @@
+# 定时刷新模块
+# 在关注的股票所属市场收盘后自动刷新近期日线数据，把上游请求移出用户请求路径
+
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, List, Optional, Tuple
+
+import pytz
+
+from ..utils.cache import BaseCache, make_key
+from ..utils.config import config
+from ..utils.logger import LoggerMixin, get_logger
+from ..utils.metrics import metrics
+from .market_config import MarketConfig
+from .store import HistoryStore, covered_through
+
+logger = get_logger(__name__)
+
+# 定时刷新结果
+SCHEDULER_REFRESHES = metrics.counter(
+    "ifinance_scheduler_refreshes_total",
+    "Scheduled compact refreshes by outcome",
+    ["outcome"],
+)
+
+# (计划时间戳, 股票代码, 第几次重试)
+QueueEntry = Tuple[float, str, int]
+
+
+class RefreshScheduler(LoggerMixin):
+    """
+    收盘后定时刷新器
+
+    每个关注的股票在其市场收盘 delay 秒后以 compact 方式刷新一次，结果写入本地历史数据存储
+    并预热共享缓存，用户查询时直接命中本地数据。
+
+    所有worker进程都运行各自的刷新线程，通过共享缓存协调：
+    - 每个 (股票代码, 交易日) 只由一个进程认领刷新
+    - 刷新只占用 quota_share 比例的频率配额，并按配额把请求均匀分布在一天之中
+      （相邻两次刷新至少间隔 86400 / 每日预算 秒），不会在收盘后集中消耗掉用户查询需要的配额
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        store: HistoryStore,
+        cache: BaseCache,
+        shared: BaseCache,
+        symbols: Callable[[], List[str]],
+        delay: int = 1800,
+        per_minute: int = 0,
+        per_day: int = 0,
+        quota_share: float = 0.5,
+        retry_delay: int = 900,
+        max_attempts: int = 3,
+    ):
+        """
+        初始化定时刷新器
+
+        Args:
+            client: Alpha Vantage客户端
+            store: 历史数据存储
+            cache: 应用数据缓存（刷新后写入，供回调直接命中）
+            shared: 跨进程协调用的共享缓存
+            symbols: 返回关注的股票代码列表的函数（每次排期时调用）
+            delay: 收盘后等待上游发布当日数据的时间（秒）
+            per_minute: 上游每分钟配额，0表示不限制
+            per_day: 上游每日配额，0表示不限制
+            quota_share: 定时刷新最多占用的配额比例
+            retry_delay: 刷新失败或数据尚未更新时的重试间隔（秒）
+            max_attempts: 每个交易日最多尝试次数
+        """
+        self.client = client
+        self.store = store
+        self.cache = cache
+        self.shared = shared
+        self.symbols = symbols
+        self.delay = delay
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+
+        self.daily_budget = int(per_day * quota_share) if per_day else 0
+        spacing = []
+        if self.daily_budget:
+            spacing.append(86400 / max(self.daily_budget, 1))
+        if per_minute:
+            spacing.append(60 / max(per_minute * quota_share, 1e-9))
+        self.spacing = max(spacing, default=0.0)
+
+        self._queue: List[QueueEntry] = []
+        self._queued = set()
+        # 认领的有效期：足够本进程完成所有重试，持有者停止后其他进程在到期后接手
+        self.claim_ttl = int(retry_delay * max_attempts + self.spacing) + 60
+        # 本进程已认领的 (股票代码, 交易日)
+        self._claimed = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        排期所有关注的股票并启动后台线程（重复调用无效）
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self.reschedule()
+        self._thread = threading.Thread(
+            target=self._run, name="refresh-scheduler", daemon=True
+        )
+        self._thread.start()
+        self.logger.info(
+            "Refresh scheduler started for %d symbols (budget %s/day, spacing %.0fs)",
+            len(self._queue),
+            self.daily_budget or "unlimited",
+            self.spacing,
+        )
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def reschedule(self) -> None:
+        """
+        把关注列表中尚未排期的股票加入队列
+
+        本地数据缺少最近一个交易日的股票立即刷新，其余在下次收盘后刷新
+        """
+        now = time.time()
+        with self._lock:
+            for symbol in self.symbols():
+                symbol = symbol.strip().upper()
+                if symbol and symbol not in self._queued:
+                    self._queued.add(symbol)
+                    heapq.heappush(self._queue, (now, symbol, 0))
+
+    def pending(self) -> List[Tuple[str, str]]:
+        """
+        获取排期中的股票
+
+        Returns:
+            List[Tuple[str, str]]: (股票代码, 计划时间 ISO格式 UTC) 列表，按时间排序
+        """
+        with self._lock:
+            entries = sorted(self._queue)
+        return [
+            (symbol, datetime.fromtimestamp(due, pytz.UTC).isoformat())
+            for due, symbol, _ in entries
+        ]
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._lock:
+                head = self._queue[0] if self._queue else None
+            wait = 60.0 if head is None else head[0] - time.time()
+            if wait > 0:
+                self._stop.wait(min(wait, 60.0))
+                continue
+
+            with self._lock:
+                _, symbol, attempt = heapq.heappop(self._queue)
+            try:
+                due, attempt = self._process(symbol, attempt)
+            except Exception as e:
+                self.logger.error(f"Scheduled refresh of {symbol} failed: {e}")
+                due, attempt = self._retry_or_next(symbol, attempt)
+            with self._lock:
+                heapq.heappush(self._queue, (due, symbol, attempt))
+
+    def _process(self, symbol: str, attempt: int) -> Tuple[float, int]:
+        """
+        处理一个到期的股票，返回下一次计划时间和重试次数
+        """
+        market = MarketConfig.get_market_code_for_symbol(symbol)
+        session = MarketConfig.last_session_date(market, datetime.now(pytz.UTC))
+
+        if self._has_session(symbol, session):
+            self._claimed.discard((symbol, session.isoformat()))
+            SCHEDULER_REFRESHES.inc(outcome="current")
+            return self._next_close(market), 0
+
+        # 认领该交易日的刷新。其他进程已认领时在认领到期后再检查：
+        # 那时它已经完成刷新，或者已经停止，由本进程接手
+        claim = (symbol, session.isoformat())
+        claim_key = make_key("scheduler", "claim", *claim)
+        if claim not in self._claimed:
+            if self.shared.incr(claim_key, ttl=self.claim_ttl) > 1:
+                SCHEDULER_REFRESHES.inc(outcome="claimed")
+                return time.time() + self.claim_ttl, 0
+            self._claimed.add(claim)
+
+        if not self._acquire_slot():
+            # 正在停止
+            return time.time(), attempt
+        # 等待时间槽可能很久，请求前续期认领
+        self.shared.set(claim_key, 1, ttl=self.claim_ttl)
+
+        if not self._take_budget():
+            SCHEDULER_REFRESHES.inc(outcome="deferred")
+            tomorrow = (int(time.time() // 86400) + 1) * 86400
+            self.logger.info(
+                "Daily refresh budget used up, deferring %s to the next day", symbol
+            )
+            return float(tomorrow), attempt
+
+        daily_data = self.client.get_daily_data(symbol, "compact")
+        meta = self.store.write(symbol, daily_data)
+        self.cache.set(make_key("daily", symbol, "compact"), daily_data)
+        self.cache.set(
+            make_key("version", symbol, "compact"),
+            daily_data["meta_data"].get("last_refreshed", ""),
+        )
+
+        if meta["end"] < session.isoformat():
+            if attempt + 1 >= self.max_attempts:
+                # 多次重试后上游仍没有该交易日的数据，按节假日处理：
+                # 记为已是最新，查询不再因此请求上游
+                self.store.mark_checked(symbol, session.isoformat())
+                self._claimed.discard(claim)
+                SCHEDULER_REFRESHES.inc(outcome="no_session")
+                self.logger.info(
+                    "%s has no data for %s after %d attempts, treating it as a holiday",
+                    symbol,
+                    session,
+                    attempt + 1,
+                )
+                return self._next_close(market), 0
+
+            # 上游尚未发布当日数据
+            SCHEDULER_REFRESHES.inc(outcome="stale")
+            self.logger.info(
+                "%s has no data for %s yet (latest %s)", symbol, session, meta["end"]
+            )
+            return self._retry_or_next(symbol, attempt)
+
+        self._claimed.discard(claim)
+        SCHEDULER_REFRESHES.inc(outcome="ok")
+        self.logger.info("Refreshed %s through %s", symbol, meta["end"])
+        return self._next_close(market), 0
+
+    def _has_session(self, symbol: str, session: Any) -> bool:
+        info = self.store.info(symbol)
+        return info is not None and covered_through(info) >= session.isoformat()
+
+    def _next_close(self, market: str) -> float:
+        close = MarketConfig.next_session_close(market, datetime.now(pytz.UTC))
+        return (close + timedelta(seconds=self.delay)).timestamp()
+
+    def _retry_or_next(self, symbol: str, attempt: int) -> Tuple[float, int]:
+        if attempt + 1 < self.max_attempts:
+            return time.time() + self.retry_delay, attempt + 1
+        SCHEDULER_REFRESHES.inc(outcome="gave_up")
+        market = MarketConfig.get_market_code_for_symbol(symbol)
+        return self._next_close(market), 0
+
+    def _acquire_slot(self) -> bool:
+        """
+        等待下一个空闲的刷新时间槽（所有进程共享）
+
+        Returns:
+            bool: 是否取得时间槽（停止时返回False）
+        """
+        if not self.spacing:
+            return True
+
+        while not self._stop.is_set():
+            slot = int(time.time() // self.spacing)
+            used = self.shared.incr(
+                make_key("scheduler", "slot", slot), ttl=int(self.spacing * 2) + 60
+            )
+            if used == 1:
+                return True
+            self._stop.wait((slot + 1) * self.spacing - time.time())
+        return False
+
+    def _take_budget(self) -> bool:
+        if not self.daily_budget:
+            return True
+        day = int(time.time() // 86400)
+        used = self.shared.incr(make_key("scheduler", "budget", day), ttl=86400)
+        return used <= self.daily_budget
+
+
+def watched_symbols() -> List[str]:
+    """
+    获取需要定时刷新的股票代码
+
+    配置项:
+        WATCHLIST: 逗号分隔的股票代码
+        SCHEDULER_INCLUDE_STORED: 是否同时刷新本地历史数据存储中的所有股票（默认否）
+
+    Returns:
+        List[str]: 股票代码列表
+    """
+    from ..services import get_history_store
+
+    symbols = [s.strip().upper() for s in config.get("WATCHLIST", "").split(",")]
+    if config.get_bool("SCHEDULER_INCLUDE_STORED", False):
+        symbols.extend(get_history_store().symbols())
+    return list(dict.fromkeys(s for s in symbols if s))
+
+
+def create_refresh_scheduler() -> RefreshScheduler:
+    """
+    根据配置创建定时刷新器
+
+    配置项:
+        SCHEDULER_CLOSE_DELAY: 收盘后等待的时间（秒，默认1800）
+        SCHEDULER_QUOTA_SHARE: 定时刷新最多占用的配额比例（默认0.5）
+        SCHEDULER_RETRY_DELAY: 重试间隔（秒，默认900）
+        SCHEDULER_MAX_ATTEMPTS: 每个交易日最多尝试次数（默认3）
+        ALPHA_VANTAGE_RATE_LIMIT_PER_MINUTE / _PER_DAY: 上游配额
+
+    Returns:
+        RefreshScheduler: 定时刷新器
+    """
+    from ..services import get_api_client, get_history_store
+    from ..utils.cache import get_cache, get_shared_store
+
+    return RefreshScheduler(
+        get_api_client(),
+        get_history_store(),
+        get_cache(),
+        get_shared_store(),
+        watched_symbols,
+        delay=config.get_int("SCHEDULER_CLOSE_DELAY", 1800),
+        per_minute=config.get_int("ALPHA_VANTAGE_RATE_LIMIT_PER_MINUTE", 5),
+        per_day=config.get_int("ALPHA_VANTAGE_RATE_LIMIT_PER_DAY", 25),
+        quota_share=float(config.get("SCHEDULER_QUOTA_SHARE", "0.5")),
+        retry_delay=config.get_int("SCHEDULER_RETRY_DELAY", 900),
+        max_attempts=config.get_int("SCHEDULER_MAX_ATTEMPTS", 3),
+    )
+
+
+def start_scheduler() -> Optional[RefreshScheduler]:
+    """
+    启用了定时刷新（SCHEDULER_ENABLED）且关注列表非空时启动刷新线程
+
+    在每个服务进程中调用一次（gunicorn 的 post_fork 或开发服务器启动时）
+
+    Returns:
+        Optional[RefreshScheduler]: 已启动的刷新器，未启用时为None
+    """
+    from ..services import get_refresh_scheduler
+
+    if not config.get_bool("SCHEDULER_ENABLED", False):
+        return None
+    if not watched_symbols():
+        logger.warning("SCHEDULER_ENABLED is set but WATCHLIST is empty")
+        return None
+
+    scheduler = get_refresh_scheduler()
+    scheduler.start()
+    return scheduler
@@ -0,0 +1,489 @@
+# 本地历史数据存储模块
+# 把日线OHLCV历史按股票代码保存在本地磁盘，供批量导入、定时刷新和数据接口读取
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pytz
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+from ..utils.config import config
+from ..utils.exceptions import DataProcessingError
+from ..utils.logger import LoggerMixin
+from .market_config import MarketConfig
+
+# 存储的列（日期为索引）
+COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# compact 输出的交易日数量（与Alpha Vantage一致）
+COMPACT_ROWS = 100
+
+# 股票代码中允许直接用作文件名的字符
+_SAFE_SYMBOL = re.compile(r"[^A-Z0-9._-]")
+
+
+class HistoryStore(LoggerMixin):
+    """
+    本地日线历史存储
+
+    每个股票代码一个数据文件（安装了pyarrow时为Parquet，否则为CSV，按日期升序）
+    和一个元数据文件（数据版本、行数、日期范围）。写入时与已有数据合并，
+    先写临时文件再原子替换，读取方不会看到写了一半的文件。
+    """
+
+    def __init__(
+        self, directory: str, file_format: str = "auto", frame_cache_size: int = 16
+    ):
+        """
+        初始化历史数据存储
+
+        Args:
+            directory: 存储目录
+            file_format: 'parquet'、'csv' 或 'auto'（安装了pyarrow时使用parquet）
+            frame_cache_size: load() 在进程内缓存的股票数量，0表示不缓存
+
+        Raises:
+            DataProcessingError: 指定parquet格式但未安装pyarrow时
+        """
+        if file_format == "auto":
+            file_format = "parquet" if HAS_PYARROW else "csv"
+        if file_format == "parquet" and not HAS_PYARROW:
+            raise DataProcessingError(
+                "pyarrow is not installed, cannot use parquet history store"
+            )
+        if file_format not in ("parquet", "csv"):
+            raise DataProcessingError(f"Unsupported history format: {file_format}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.file_format = file_format
+        self._remove_stale_temp_files()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        # 股票代码 -> (数据文件签名, 完整历史)
+        self.frame_cache_size = frame_cache_size
+        self._frames: "OrderedDict[str, Tuple[Tuple[int, int], pd.DataFrame]]" = (
+            OrderedDict()
+        )
+        self._frames_lock = threading.Lock()
+
+    def _remove_stale_temp_files(self, max_age: int = 3600) -> None:
+        # 写入过程中被杀死的进程留下的临时文件
+        cutoff = time.time() - max_age
+        for path in self.directory.glob("*.tmp"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def _lock(self, symbol: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    @contextmanager
+    def _write_lock(self, symbol: str) -> Iterator[None]:
+        """
+        股票的写锁：进程内的线程锁加上跨进程的文件锁
+
+        gunicorn worker、定时刷新、汇率刷新和批量导入命令可能同时写入同一股票，
+        读取-合并-替换必须在所有进程间串行，否则后写入的一方会覆盖另一方合并的数据。
+        没有fcntl的平台（Windows）只有进程内的锁
+        """
+        with self._lock(symbol):
+            if fcntl is None:
+                yield
+                return
+            with open(self.directory / f"{self._name(symbol)}.lock", "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _name(self, symbol: str) -> str:
+        return _SAFE_SYMBOL.sub("_", symbol.strip().upper())
+
+    def data_path(self, symbol: str) -> Path:
+        """
+        获取股票数据文件路径
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            Path: 数据文件路径
+        """
+        return self.directory / f"{self._name(symbol)}.{self.file_format}"
+
+    def _meta_path(self, symbol: str) -> Path:
+        return self.directory / f"{self._name(symbol)}.meta.json"
+
+    def exists(self, symbol: str) -> bool:
+        return self.data_path(symbol).exists()
+
+    def symbols(self) -> List[str]:
+        """
+        获取已存储的股票代码
+
+        Returns:
+            List[str]: 股票代码列表（按字母排序）
+        """
+        symbols = []
+        for path in self.directory.glob("*.meta.json"):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    symbols.append(json.load(f)["symbol"])
+            except FileNotFoundError:
+                # 列出目录之后被删除
+                continue
+        return sorted(symbols)
+
+    def info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        获取股票的存储元数据
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            Optional[Dict[str, Any]]: 元数据（symbol、version、output_size、rows、
+            start、end、updated_at，上游确认过的节假日为 checked_through），
+            未存储时为None
+        """
+        try:
+            with open(self._meta_path(symbol), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write(self, symbol: str, daily_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        写入日线数据并与已有数据合并（同一日期以新数据为准）
+
+        Args:
+            symbol: 股票代码
+            daily_data: AlphaVantageClient.get_daily_data 返回的数据
+
+        Returns:
+            Dict[str, Any]: 写入后的元数据
+
+        Raises:
+            DataProcessingError: 数据为空或格式无效时
+        """
+        time_series = (daily_data or {}).get("time_series")
+        if not time_series:
+            raise DataProcessingError(f"No time series data to store for '{symbol}'")
+
+        symbol = symbol.strip().upper()
+        new = pd.DataFrame.from_dict(time_series, orient="index")
+        new.index = pd.to_datetime(new.index)
+        new.index.name = "date"
+        new = new.reindex(columns=COLUMNS)
+
+        meta_data = daily_data.get("meta_data", {})
+        with self._write_lock(symbol):
+            existing = self.read(symbol) if self.exists(symbol) else None
+            if existing is not None and not existing.empty:
+                df = pd.concat([existing[~existing.index.isin(new.index)], new])
+            else:
+                df = new
+            df = df.sort_index()
+
+            previous = self.info(symbol) or {}
+            output_size = meta_data.get("output_size", "")
+            meta = {
+                "symbol": symbol,
+                "version": meta_data.get("last_refreshed", ""),
+                "time_zone": meta_data.get("time_zone")
+                or previous.get("time_zone", ""),
+                # 曾经导入过完整历史的股票保持 full，后续的compact刷新只追加近期数据
+                "output_size": (
+                    "full"
+                    if previous.get("output_size") == "full"
+                    or "full" in output_size.lower()
+                    else "compact"
+                ),
+                "rows": len(df),
+                "start": df.index[0].strftime("%Y-%m-%d"),
+                "end": df.index[-1].strftime("%Y-%m-%d"),
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+                "format": self.file_format,
+            }
+            if previous.get("checked_through", "") > meta["end"]:
+                meta["checked_through"] = previous["checked_through"]
+
+            self._write_frame(self.data_path(symbol), df)
+            self._write_json(self._meta_path(symbol), meta)
+
+        self.logger.debug("Stored %d rows for %s", len(df), symbol)
+        return meta
+
+    def mark_checked(self, symbol: str, session: str) -> None:
+        """
+        记录上游确认没有晚于已存储数据的交易日（如节假日），直到 session 为止都视为最新
+
+        Args:
+            symbol: 股票代码
+            session: 交易日 (YYYY-MM-DD)
+        """
+        symbol = symbol.strip().upper()
+        with self._write_lock(symbol):
+            meta = self.info(symbol)
+            if meta is None or covered_through(meta) >= session:
+                return
+            meta["checked_through"] = session
+            self._write_json(self._meta_path(symbol), meta)
+
+    def read(
+        self,
+        symbol: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        读取股票的日线历史
+
+        Args:
+            symbol: 股票代码
+            start: 开始日期 (YYYY-MM-DD，含)
+            end: 结束日期 (YYYY-MM-DD，含)
+            columns: 需要的列，None表示全部列
+
+        Returns:
+            pd.DataFrame: 日期索引、按日期升序排列的数据框；未存储时为空数据框
+        """
+        path = self.data_path(symbol)
+        columns = [c for c in (columns or COLUMNS) if c in COLUMNS]
+        if not path.exists():
+            return pd.DataFrame(
+                columns=columns, index=pd.DatetimeIndex([], name="date")
+            )
+
+        if self.file_format == "parquet":
+            df = pd.read_parquet(path, columns=columns)
+        else:
+            df = pd.read_csv(
+                path, usecols=["date"] + columns, index_col="date", parse_dates=True
+            )
+
+        if start or end:
+            df = df.loc[start:end]
+        return df
+
+    def iter_chunks(
+        self,
+        symbol: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        chunk_rows: int = 5000,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        分块读取股票的日线历史，内存占用只取决于块的大小（用于导出）
+
+        Args:
+            symbol: 股票代码
+            start: 开始日期 (YYYY-MM-DD，含)
+            end: 结束日期 (YYYY-MM-DD，含)
+            columns: 需要的列，None表示全部列
+            chunk_rows: 每块读取的行数
+
+        Yields:
+            pd.DataFrame: 日期索引、按日期升序排列的数据块（已按日期范围过滤，不为空）
+        """
+        path = self.data_path(symbol)
+        columns = [c for c in (columns or COLUMNS) if c in COLUMNS]
+        if not path.exists():
+            return
+
+        if self.file_format == "parquet":
+            import pyarrow.parquet as pq
+
+            batches = pq.ParquetFile(path).iter_batches(
+                batch_size=chunk_rows, columns=["date"] + columns
+            )
+            chunks = (batch.to_pandas().set_index("date")[columns] for batch in batches)
+        else:
+            chunks = pd.read_csv(
+                path,
+                usecols=["date"] + columns,
+                index_col="date",
+                parse_dates=True,
+                chunksize=chunk_rows,
+            )
+
+        end_ts = pd.Timestamp(end) if end else None
+        for chunk in chunks:
+            last = chunk.index[-1] if len(chunk) else None
+            if start or end:
+                chunk = chunk.loc[start:end]
+            if not chunk.empty:
+                yield chunk
+            # 数据按日期升序排列，读到结束日期后不再读取剩余部分
+            if end_ts is not None and last is not None and last >= end_ts:
+                break
+
+    def load(self, symbol: str) -> pd.DataFrame:
+        """
+        读取股票的完整日线历史（进程内LRU缓存，数据文件更新后自动重新读取）
+
+        供需要反复读取同一股票的视图（图表缩放、分页浏览等）使用，返回的数据框不应被修改
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            pd.DataFrame: 日期索引、按日期升序排列的数据框；未存储时为空数据框
+        """
+        symbol = symbol.strip().upper()
+        try:
+            stat = self.data_path(symbol).stat()
+        except FileNotFoundError:
+            return self.read(symbol)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._frames_lock:
+            cached = self._frames.get(symbol)
+            if cached is not None and cached[0] == signature:
+                self._frames.move_to_end(symbol)
+                return cached[1]
+
+        df = self.read(symbol)
+        if self.frame_cache_size > 0:
+            with self._frames_lock:
+                self._frames[symbol] = (signature, df)
+                self._frames.move_to_end(symbol)
+                while len(self._frames) > self.frame_cache_size:
+                    self._frames.popitem(last=False)
+        return df
+
+    def to_daily_data(
+        self, symbol: str, output_size: str = "full"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        以 AlphaVantageClient.get_daily_data 的返回格式读取股票数据
+
+        Args:
+            symbol: 股票代码
+            output_size: 'full' 返回全部数据，'compact' 只返回最近100个交易日
+
+        Returns:
+            Optional[Dict[str, Any]]: 包含 meta_data 和 time_series 的字典，未存储时为None
+        """
+        meta = self.info(symbol)
+        if meta is None:
+            return None
+
+        df = self.read(symbol)
+        if output_size == "compact":
+            df = df.iloc[-COMPACT_ROWS:]
+        df.index = df.index.strftime("%Y-%m-%d")
+        return {
+            "meta_data": {
+                "symbol": meta["symbol"],
+                "last_refreshed": meta["version"],
+                "output_size": meta["output_size"],
+                "time_zone": meta.get("time_zone", ""),
+            },
+            "time_series": df.to_dict(orient="index"),
+        }
+
+    def get_current(
+        self, symbol: str, output_size: str, now: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        本地数据已包含所属市场最近一个已收盘交易日时返回该数据
+
+        Args:
+            symbol: 股票代码
+            output_size: 'compact' 或 'full'（只导入过近期数据的股票不能满足full）
+            now: 当前时刻（带时区），默认为现在
+
+        Returns:
+            Optional[Dict[str, Any]]: get_daily_data 格式的数据，本地数据缺失或过期时为None
+        """
+        meta = self.info(symbol)
+        if meta is None or (output_size == "full" and meta["output_size"] != "full"):
+            return None
+
+        market = MarketConfig.get_market_code_for_symbol(symbol)
+        session = MarketConfig.last_session_date(market, now or datetime.now(pytz.UTC))
+        if covered_through(meta) < session.isoformat():
+            return None
+        return self.to_daily_data(symbol, output_size)
+
+    def _write_frame(self, path: Path, df: pd.DataFrame) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            if self.file_format == "parquet":
+                df.to_parquet(tmp)
+            else:
+                df.to_csv(tmp, date_format="%Y-%m-%d")
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _write_json(self, path: Path, data: Dict[str, Any]) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+
+def covered_through(meta: Dict[str, Any]) -> str:
+    """
+    获取存储的数据已是最新的最后一个交易日
+
+    通常就是最后一条数据的日期；节假日等上游确认没有新数据的交易日由 mark_checked 记录
+
+    Args:
+        meta: HistoryStore.info 返回的元数据
+
+    Returns:
+        str: 日期 (YYYY-MM-DD)
+    """
+    return max(meta["end"], meta.get("checked_through", ""))
+
+
+def create_history_store() -> HistoryStore:
+    """
+    根据配置创建历史数据存储
+
+    配置项:
+        HISTORY_STORE_DIR: 存储目录（默认 data/history）
+        HISTORY_STORE_FORMAT: 'auto'（默认）、'parquet' 或 'csv'
+        HISTORY_FRAME_CACHE_SIZE: 进程内缓存完整历史的股票数量（默认16）
+
+    Returns:
+        HistoryStore: 历史数据存储
+    """
+    return HistoryStore(
+        config.get("HISTORY_STORE_DIR", "data/history"),
+        config.get("HISTORY_STORE_FORMAT", "auto").lower(),
+        config.get_int("HISTORY_FRAME_CACHE_SIZE", 16),
+    )
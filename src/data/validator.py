@@ -92,7 +92,7 @@ class DataValidator:
             )
 
         self.logger.debug(
-            f"Validated date range: {validated_start} to {validated_end}"
+            "Validated date range: %s to %s", validated_start, validated_end
         )
         return validated_start, validated_end
 
@@ -139,7 +139,7 @@ class DataValidator:
                 value=cleaned_symbol,
             )
 
-        self.logger.debug(f"Validated stock symbol: {cleaned_symbol}")
+        self.logger.debug("Validated stock symbol: %s", cleaned_symbol)
         return cleaned_symbol
 
     def validate_numeric_value(
@@ -317,7 +317,7 @@ class DataValidator:
                 value=cleaned_keywords,
             )
 
-        self.logger.debug(f"Validated search keywords: {cleaned_keywords}")
+        self.logger.debug("Validated search keywords: %s", cleaned_keywords)
         return cleaned_keywords
 
     def validate_api_response(
@@ -0,0 +1,16 @@
+# 开发工具模块
+# 基准测试、本地模拟服务器和压测共用的工具（不在生产环境中使用）
+
+from .synthetic import (
+    generate_daily_payload,
+    generate_fx_daily_payload,
+    generate_quote_payload,
+    generate_search_payload,
+)
+
+__all__ = [
+    "generate_daily_payload",
+    "generate_fx_daily_payload",
+    "generate_quote_payload",
+    "generate_search_payload",
+]
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dash回调压测工具
+
+模拟用户会话（搜索 → 选择股票 → 按若干日期查询OHLCV数据）并发请求
+/_dash-update-component，按回调统计延迟分位数、吞吐量和错误率。
+后台回调会按浏览器的方式轮询任务结果，延迟包含排队和轮询时间。
+
+用法:
+    python -m src.devtools.mock_server --port 8081 --latency-ms 150 &
+    ALPHA_VANTAGE_BASE_URL=http://127.0.0.1:8081/query \\
+        gunicorn --config gunicorn.conf.py src.main:server &
+    python -m src.devtools.loadtest --url http://127.0.0.1:8050 --concurrency 20 \\
+        --duration 60 --mock-url http://127.0.0.1:8081
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+# 被压测的回调：名称 -> 用于识别回调的输出
+CALLBACKS = {
+    "update_stock_dropdown": "stock-dropdown.options",
+    "update_stock_data": "history-store.data",
+}
+
+# 默认的搜索关键词
+DEFAULT_KEYWORDS = ["apple", "microsoft", "tesla", "nvidia", "amazon", "tencent"]
+
+# 服务端渲染的错误卡片中的文字（见 src/ui/app.py 的 create_error_card）
+ERROR_CARD_MARKER = "获取数据时发生错误"
+
+# 按会话总数压测时保护剩余会话计数
+_sessions_lock = threading.Lock()
+
+
+class DashCallback:
+    """
+    按 /_dash-dependencies 中的定义构造回调请求
+    """
+
+    def __init__(self, name: str, dependency: Dict[str, Any]):
+        self.name = name
+        self.output = dependency["output"]
+        self.outputs = [
+            {"id": target.rsplit(".", 1)[0], "property": target.rsplit(".", 1)[1]}
+            for target in self.output.strip(".").split("...")
+        ]
+        self.inputs = dependency["inputs"]
+        self.state = dependency["state"]
+
+    def payload(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        构造回调请求体
+
+        Args:
+            values: '组件ID.属性' -> 值；第一个输入视为触发回调的属性
+
+        Returns:
+            Dict[str, Any]: 请求体
+        """
+
+        def fill(deps: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+            return [
+                {
+                    "id": dep["id"],
+                    "property": dep["property"],
+                    "value": values.get(f"{dep['id']}.{dep['property']}"),
+                }
+                for dep in deps
+            ]
+
+        outputs = self.outputs if len(self.outputs) > 1 else self.outputs[0]
+        return {
+            "output": self.output,
+            "outputs": outputs,
+            "inputs": fill(self.inputs),
+            "state": fill(self.state),
+            "changedPropIds": [f"{self.inputs[0]['id']}.{self.inputs[0]['property']}"],
+        }
+
+
+class LoadStats:
+    """
+    线程安全的压测结果统计
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.events: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, latency: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.latencies[name].append(latency)
+            if error:
+                self.errors[name][error] += 1
+
+    def count(self, event: str) -> None:
+        with self._lock:
+            self.events[event] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        """
+        汇总统计结果
+
+        Args:
+            elapsed: 压测总耗时（秒）
+
+        Returns:
+            Dict[str, Any]: 每个回调的请求数、吞吐量、错误率和延迟分位数（毫秒）
+        """
+        callbacks = {}
+        for name, latencies in sorted(self.latencies.items()):
+            ordered = sorted(latencies)
+            errors = sum(self.errors[name].values())
+            callbacks[name] = {
+                "requests": len(ordered),
+                "throughput": round(len(ordered) / elapsed, 2),
+                "error_rate": round(errors / len(ordered), 4),
+                "errors": dict(self.errors[name]),
+                "mean_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+                "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+        return {
+            "elapsed": round(elapsed, 2),
+            "events": dict(self.events),
+            "callbacks": callbacks,
+        }
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """
+    最近秩法计算分位数
+
+    Args:
+        ordered: 升序排列的样本
+        pct: 百分位（0-100）
+
+    Returns:
+        float: 分位数
+    """
+    if not ordered:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class VirtualUser(threading.Thread):
+    """
+    模拟一个浏览器会话的压测线程
+
+    浏览器端的历史序列缓存（history-store）按 assets/clientside.js 的规则模拟：
+    缓存能覆盖所选日期时不发请求，只计入 client_resolved。
+    """
+
+    def __init__(
+        self,
+        index: int,
+        options: argparse.Namespace,
+        callbacks: Dict[str, DashCallback],
+        stats: LoadStats,
+        deadline: float,
+        sessions: Optional[List[int]],
+    ):
+        super().__init__(name=f"user-{index}", daemon=True)
+        self.options = options
+        self.callbacks = callbacks
+        self.stats = stats
+        self.deadline = deadline
+        self.sessions = sessions
+        self.rng = random.Random(options.seed + index)
+        self.http = requests.Session()
+        self.url = options.url.rstrip("/") + "/_dash-update-component"
+        self.history: Optional[Dict[str, Any]] = None
+        self.history_fetched_at = 0.0
+
+    def run(self) -> None:
+        while time.monotonic() < self.deadline and self._take_session():
+            try:
+                self._session()
+            except Exception as e:
+                self.stats.count(f"session_error:{type(e).__name__}")
+
+    def _take_session(self) -> bool:
+        # 按会话总数压测时，各线程从共享计数中领取会话
+        if self.sessions is None:
+            return True
+        with _sessions_lock:
+            if self.sessions[0] <= 0:
+                return False
+            self.sessions[0] -= 1
+            return True
+
+    def _session(self) -> None:
+        self.stats.count("sessions")
+        keyword = self.rng.choice(self.options.keywords)
+        body, error = self._call(
+            "update_stock_dropdown",
+            {
+                "search-button.n_clicks": 1,
+                "stock-search-input.value": keyword,
+            },
+        )
+        if error or body is None:
+            return
+
+        response = body.get("response", {})
+        options = response.get("stock-dropdown", {}).get("options") or []
+        stock_info = response.get("selected-stock-info", {}).get("data") or {}
+        if not options:
+            self.stats.count("empty_search")
+            return
+
+        symbol = self.rng.choice(options)["value"]
+        for _ in range(self.options.dates_per_session):
+            if time.monotonic() >= self.deadline:
+                return
+            self._fetch(symbol, self._pick_date(), stock_info)
+            if self.options.think_time:
+                time.sleep(self.rng.uniform(0, self.options.think_time))
+
+    def _pick_date(self) -> Optional[str]:
+        # 最新数据、近期（compact）和较早（full）的日期各占一部分
+        roll = self.rng.random()
+        if roll < 0.3:
+            return None
+        if roll < 0.8:
+            days = self.rng.randint(1, 80)
+        else:
+            days = self.rng.randint(81, 3650)
+        return (date.today() - timedelta(days=days)).isoformat()
+
+    def _fetch(
+        self, symbol: str, selected_date: Optional[str], stock_info: Dict
+    ) -> None:
+        if self.options.client_cache and self._history_covers(symbol, selected_date):
+            self.stats.count("client_resolved")
+            return
+
+        cached = None
+        if self.options.client_cache and self.history:
+            cached = {
+                key: self.history.get(key)
+                for key in ("symbol", "output_size", "version")
+            }
+
+        body, error = self._call(
+            "update_stock_data",
+            {
+                "fetch-request.data": {
+                    "symbol": symbol,
+                    "date": selected_date,
+                    "cached": cached,
+                    "requested_at": int(time.time() * 1000),
+                },
+                "selected-stock-info.data": stock_info,
+            },
+        )
+        if error or body is None:
+            return
+
+        history = body.get("response", {}).get("history-store", {}).get("data")
+        if history:
+            self.history = history
+            self.history_fetched_at = time.monotonic()
+
+    def _history_covers(self, symbol: str, selected_date: Optional[str]) -> bool:
+        history = self.history
+        if not history or history.get("symbol") != symbol:
+            return False
+        if time.monotonic() - self.history_fetched_at > history.get("max_age", 0):
+            return False
+        dates = history.get("series", {}).get("dates") or []
+        if not dates:
+            return False
+        return not selected_date or dates[-1] <= selected_date <= dates[0]
+
+    def _call(
+        self, name: str, values: Dict[str, Any]
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        调用回调并记录延迟（后台回调轮询到结果为止）
+
+        Returns:
+            Tuple: (响应体, 错误类型)
+        """
+        payload = self.callbacks[name].payload(values)
+        start = time.perf_counter()
+        error = None
+        body = None
+        try:
+            body = self._post(self.url, payload)
+            if body is not None and "cacheKey" in body:
+                body = self._poll(payload, body)
+            if body is not None and ERROR_CARD_MARKER in json.dumps(
+                body, ensure_ascii=False
+            ):
+                error = "app_error"
+            elif name == "update_stock_dropdown" and (body or {}).get(
+                "response", {}
+            ).get("notification-container", {}).get("children"):
+                error = "app_error"
+        except requests.Timeout:
+            error = "timeout"
+        except requests.HTTPError as e:
+            error = f"http_{e.response.status_code}"
+        except requests.RequestException as e:
+            error = type(e).__name__
+
+        self.stats.record(name, time.perf_counter() - start, error)
+        return body, error
+
+    def _post(self, url: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = self.http.post(url, json=payload, timeout=self.options.timeout)
+        response.raise_for_status()
+        if response.status_code == 204:
+            return None
+        return response.json()
+
+    def _poll(
+        self, payload: Dict[str, Any], job: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        url = f"{self.url}?cacheKey={job['cacheKey']}&job={job['job']}"
+        deadline = time.monotonic() + self.options.timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.options.poll_interval)
+            body = self._post(url, payload)
+            if body is None or "response" in body:
+                return body
+        raise requests.Timeout(f"Background job {job['job']} did not finish")
+
+
+def load_callbacks(url: str, timeout: float) -> Dict[str, DashCallback]:
+    """
+    从应用获取回调定义
+
+    Args:
+        url: 应用地址
+        timeout: 请求超时（秒）
+
+    Returns:
+        Dict[str, DashCallback]: 回调名称 -> 回调
+    """
+    response = requests.get(url.rstrip("/") + "/_dash-dependencies", timeout=timeout)
+    response.raise_for_status()
+
+    callbacks = {}
+    for dependency in response.json():
+        if dependency.get("clientside_function"):
+            continue
+        for name, output in CALLBACKS.items():
+            if output in dependency["output"]:
+                callbacks[name] = DashCallback(name, dependency)
+
+    missing = set(CALLBACKS) - set(callbacks)
+    if missing:
+        raise RuntimeError(f"Callbacks not found in the app: {', '.join(missing)}")
+    return callbacks
+
+
+def run_load(options: argparse.Namespace) -> Dict[str, Any]:
+    """
+    执行压测
+
+    Args:
+        options: 命令行参数
+
+    Returns:
+        Dict[str, Any]: 统计结果
+    """
+    callbacks = load_callbacks(options.url, options.timeout)
+    if options.mock_url:
+        requests.post(options.mock_url.rstrip("/") + "/stats/reset", timeout=5)
+
+    stats = LoadStats()
+    sessions = [options.sessions] if options.sessions else None
+    duration = options.duration if not options.sessions else float("inf")
+    start = time.monotonic()
+    users = [
+        VirtualUser(i, options, callbacks, stats, start + duration, sessions)
+        for i in range(options.concurrency)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+
+    result = stats.summary(time.monotonic() - start)
+    result["config"] = {
+        "url": options.url,
+        "concurrency": options.concurrency,
+        "client_cache": options.client_cache,
+    }
+    if options.mock_url:
+        result["upstream"] = requests.get(
+            options.mock_url.rstrip("/") + "/stats", timeout=5
+        ).json()
+    return result
+
+
+def format_report(result: Dict[str, Any]) -> str:
+    """
+    把统计结果格式化为文本表格
+
+    Args:
+        result: run_load 返回的统计结果
+
+    Returns:
+        str: 报告文本
+    """
+    lines = [
+        f"elapsed {result['elapsed']}s  concurrency {result['config']['concurrency']}"
+        f"  client_cache {result['config']['client_cache']}",
+        "events: " + ", ".join(f"{k}={v}" for k, v in sorted(result["events"].items())),
+        "",
+        f"{'callback':<24} {'reqs':>6} {'req/s':>7} {'err%':>6} {'p50':>8} "
+        f"{'p95':>8} {'p99':>8} {'max':>8}",
+    ]
+    for name, c in result["callbacks"].items():
+        lines.append(
+            f"{name:<24} {c['requests']:>6} {c['throughput']:>7.2f} "
+            f"{c['error_rate'] * 100:>5.1f}% {c['p50_ms']:>6.0f}ms "
+            f"{c['p95_ms']:>6.0f}ms {c['p99_ms']:>6.0f}ms {c['max_ms']:>6.0f}ms"
+        )
+        if c["errors"]:
+            errors = ", ".join(f"{k}={v}" for k, v in sorted(c["errors"].items()))
+            lines.append(f"{'':<24} errors: {errors}")
+
+    if "upstream" in result:
+        lines.append("")
+        lines.append("upstream calls:")
+        for function, outcomes in sorted(result["upstream"].items()):
+            counts = ", ".join(f"{k}={v}" for k, v in sorted(outcomes.items()))
+            lines.append(f"  {function:<28} {counts}")
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="iFinance Dash回调压测工具")
+    parser.add_argument("--url", default="http://127.0.0.1:8050", help="应用地址")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发用户数")
+    parser.add_argument("--duration", type=float, default=30, help="压测时长（秒）")
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=0,
+        help="会话总数（指定后忽略 --duration，运行到全部会话完成）",
+    )
+    parser.add_argument(
+        "--dates-per-session", type=int, default=3, help="每个会话查询的日期数"
+    )
+    parser.add_argument(
+        "--keywords", nargs="+", default=DEFAULT_KEYWORDS, help="搜索关键词"
+    )
+    parser.add_argument(
+        "--think-time", type=float, default=0, help="两次查询之间的最长停顿（秒）"
+    )
+    parser.add_argument(
+        "--no-client-cache",
+        dest="client_cache",
+        action="store_false",
+        help="不模拟浏览器端历史缓存，每个日期都请求服务器",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.5,
+        help="后台回调的轮询间隔（秒，与应用中的 interval 一致）",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60, help="单个回调的超时（秒）"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument(
+        "--mock-url",
+        default=None,
+        help="模拟服务器地址，压测前清零并在报告中附带上游请求数",
+    )
+    parser.add_argument(
+        "--json", dest="json_path", default=None, help="结果JSON输出路径"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    options = parse_args(argv)
+    result = run_load(options)
+    print(format_report(result))
+
+    if options.json_path:
+        with open(options.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    failed = sum(sum(c["errors"].values()) for c in result["callbacks"].values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
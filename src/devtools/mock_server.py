@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地Alpha Vantage模拟服务器
+
+返回合成的确定性数据，用于在不消耗真实配额的情况下进行压测和延迟测试。
+
+用法:
+    python -m src.devtools.mock_server --port 8081 --latency-ms 150 --per-minute 75
+    ALPHA_VANTAGE_BASE_URL=http://127.0.0.1:8081/query python -m src.main
+
+支持的function: SYMBOL_SEARCH, TIME_SERIES_DAILY, TIME_SERIES_DAILY_ADJUSTED,
+GLOBAL_QUOTE, FX_DAILY。另有 GET /stats（各function的请求数）和 POST /stats/reset。
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Flask, Response, jsonify, request
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.devtools.synthetic import (  # noqa: E402
+    generate_daily_payload,
+    generate_fx_daily_payload,
+    generate_quote_payload,
+    generate_search_payload,
+)
+from src.utils.logger import LoggerMixin  # noqa: E402
+
+# compact 输出的交易日数量（与Alpha Vantage一致）
+COMPACT_BARS = 100
+
+# 超出频率限制时返回的提示（与Alpha Vantage免费版的措辞一致）
+NOTE_MESSAGE = (
+    "Thank you for using Alpha Vantage! Our standard API call frequency is "
+    "5 calls per minute and 25 calls per day. Please visit "
+    "https://www.alphavantage.co/premium/ if you would like to target a higher "
+    "API call frequency."
+)
+
+# 返回 "Error Message" 的股票代码前缀，用于测试错误处理
+INVALID_PREFIX = "INVALID"
+
+
+class MockAlphaVantage(LoggerMixin):
+    """
+    Alpha Vantage模拟服务
+
+    同一参数总是返回相同的数据；响应体按参数缓存，服务端生成数据的耗时不会计入压测结果
+    """
+
+    def __init__(
+        self,
+        latency_ms: int = 0,
+        jitter_ms: int = 0,
+        full_bars: int = 5000,
+        search_matches: int = 10,
+        per_minute: int = 0,
+        limit_mode: str = "note",
+        end_date: Optional[date] = None,
+    ):
+        """
+        初始化模拟服务
+
+        Args:
+            latency_ms: 每个请求的固定延迟（毫秒）
+            jitter_ms: 在固定延迟上增加的随机延迟上限（毫秒）
+            full_bars: outputsize=full 时返回的交易日数量
+            search_matches: 每次搜索返回的结果数量
+            per_minute: 每分钟允许的请求数，0表示不限制
+            limit_mode: 超出限制时的行为：'note'（200 + Note，与免费版一致）或 '429'
+            end_date: 数据的最后一个交易日，默认为当天
+        """
+        if limit_mode not in ("note", "429"):
+            raise ValueError("limit_mode must be 'note' or '429'")
+
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.full_bars = full_bars
+        self.search_matches = search_matches
+        self.per_minute = per_minute
+        self.limit_mode = limit_mode
+        self.end_date = end_date
+
+        self._calls: deque = deque()
+        self._stats: Counter = Counter()
+        self._lock = threading.Lock()
+
+        self._handlers = {
+            "SYMBOL_SEARCH": self._search,
+            "TIME_SERIES_DAILY": self._daily,
+            "TIME_SERIES_DAILY_ADJUSTED": self._daily_adjusted,
+            "GLOBAL_QUOTE": self._quote,
+            "FX_DAILY": self._fx_daily,
+        }
+
+    def create_app(self) -> Flask:
+        """
+        创建模拟服务的Flask应用
+
+        Returns:
+            Flask: 提供 /query 和 /stats 接口的应用
+        """
+        app = Flask(__name__)
+        # 客户端请求的是 base_url + "/"，两种写法都接受
+        app.add_url_rule(
+            "/query/", "query", self.query, methods=["GET"], strict_slashes=False
+        )
+        app.add_url_rule("/stats", "stats", self.stats, methods=["GET"])
+        app.add_url_rule(
+            "/stats/reset", "reset_stats", self.reset_stats, methods=["POST"]
+        )
+        return app
+
+    def query(self) -> Response:
+        function = request.args.get("function", "")
+        self._delay()
+
+        if not request.args.get("apikey"):
+            return self._respond(function, "error", self._error("the parameter apikey"))
+
+        if self._rate_limited():
+            response = self._respond(function, "rate_limited", {"Note": NOTE_MESSAGE})
+            if self.limit_mode == "429":
+                response.status_code = 429
+            return response
+
+        handler = self._handlers.get(function)
+        if handler is None:
+            return self._respond(function, "error", self._error("function"))
+
+        body = handler(request.args)
+        if body is None:
+            return self._respond(function, "error", self._error("symbol"))
+        return self._respond(function, "ok", body)
+
+    def stats(self) -> Response:
+        with self._lock:
+            counts: Dict[str, Dict[str, int]] = {}
+            for (function, outcome), count in self._stats.items():
+                counts.setdefault(function, {})[outcome] = count
+        return jsonify(counts)
+
+    def reset_stats(self) -> Response:
+        with self._lock:
+            self._stats.clear()
+            self._calls.clear()
+        return jsonify({"status": "ok"})
+
+    def _delay(self) -> None:
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _rate_limited(self) -> bool:
+        # 最近60秒内的请求数（滑动窗口）
+        if not self.per_minute:
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            while self._calls and now - self._calls[0] >= 60:
+                self._calls.popleft()
+            if len(self._calls) >= self.per_minute:
+                return True
+            self._calls.append(now)
+            return False
+
+    def _respond(self, function: str, outcome: str, body: Any) -> Response:
+        with self._lock:
+            self._stats[(function or "-", outcome)] += 1
+        if not isinstance(body, str):
+            body = json.dumps(body)
+        return Response(body, content_type="application/json")
+
+    def _error(self, parameter: str) -> Dict[str, str]:
+        return {
+            "Error Message": (
+                f"Invalid API call. Please retry or visit the documentation "
+                f"(https://www.alphavantage.co/documentation/) for {parameter}."
+            )
+        }
+
+    def _end_date(self) -> date:
+        return self.end_date or date.today()
+
+    def _bars(self, args: Any) -> int:
+        return self.full_bars if args.get("outputsize") == "full" else COMPACT_BARS
+
+    def _symbol(self, args: Any) -> Optional[str]:
+        symbol = args.get("symbol", "").strip().upper()
+        if not symbol or symbol.startswith(INVALID_PREFIX):
+            return None
+        return symbol
+
+    def _search(self, args: Any) -> Optional[str]:
+        keywords = args.get("keywords", "").strip()
+        if not keywords:
+            return None
+        return _cached_body("search", (keywords, self.search_matches))
+
+    def _daily(self, args: Any) -> Optional[str]:
+        symbol = self._symbol(args)
+        if symbol is None:
+            return None
+        return _cached_body(
+            "daily", (symbol, self._bars(args), self._end_date(), False)
+        )
+
+    def _daily_adjusted(self, args: Any) -> Optional[str]:
+        symbol = self._symbol(args)
+        if symbol is None:
+            return None
+        return _cached_body("daily", (symbol, self._bars(args), self._end_date(), True))
+
+    def _quote(self, args: Any) -> Optional[str]:
+        symbol = self._symbol(args)
+        if symbol is None:
+            return None
+        return _cached_body("quote", (symbol, self._end_date()))
+
+    def _fx_daily(self, args: Any) -> Optional[str]:
+        from_symbol = args.get("from_symbol", "").strip()
+        to_symbol = args.get("to_symbol", "").strip()
+        if not from_symbol or not to_symbol:
+            return None
+        return _cached_body(
+            "fx_daily", (from_symbol, to_symbol, self._bars(args), self._end_date())
+        )
+
+
+@lru_cache(maxsize=256)
+def _cached_body(kind: str, args: Tuple) -> str:
+    # 同样的参数总是生成同样的数据，缓存序列化后的响应体
+    generators = {
+        "search": generate_search_payload,
+        "daily": generate_daily_payload,
+        "quote": generate_quote_payload,
+        "fx_daily": generate_fx_daily_payload,
+    }
+    return json.dumps(generators[kind](*args))
+
+
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="本地Alpha Vantage模拟服务器")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8081, help="监听端口")
+    parser.add_argument(
+        "--latency-ms", type=int, default=0, help="每个请求的固定延迟（毫秒）"
+    )
+    parser.add_argument(
+        "--jitter-ms", type=int, default=0, help="随机附加延迟的上限（毫秒）"
+    )
+    parser.add_argument(
+        "--full-bars",
+        type=int,
+        default=5000,
+        help="outputsize=full 返回的交易日数量（控制响应体大小）",
+    )
+    parser.add_argument(
+        "--search-matches", type=int, default=10, help="每次搜索返回的结果数量"
+    )
+    parser.add_argument(
+        "--per-minute", type=int, default=0, help="每分钟允许的请求数（0表示不限制）"
+    )
+    parser.add_argument(
+        "--limit-mode",
+        choices=["note", "429"],
+        default="note",
+        help="超出限制时返回 200 + Note（默认）或 HTTP 429",
+    )
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=None,
+        help="数据的最后一个交易日（YYYY-MM-DD，默认为当天）",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> None:
+    args = parse_args(argv)
+    mock = MockAlphaVantage(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        full_bars=args.full_bars,
+        search_matches=args.search_matches,
+        per_minute=args.per_minute,
+        limit_mode=args.limit_mode,
+        end_date=args.end_date,
+    )
+    mock.logger.info(
+        "Mock Alpha Vantage listening on http://%s:%d/query", args.host, args.port
+    )
+    mock.create_app().run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# 合成数据生成
+# 生成与Alpha Vantage响应结构一致的确定性数据，用于基准测试、本地模拟服务器和压测
+
+import random
+import zlib
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+# 合成搜索结果使用的交易所信息: (后缀, 地区, 开盘, 收盘, 时区, 货币)
+MARKETS = [
+    ("", "United States", "09:30", "16:00", "UTC-04", "USD"),
+    (".LON", "United Kingdom", "08:00", "16:30", "UTC+01", "GBX"),
+    (".SHH", "Shanghai", "09:30", "15:00", "UTC+08", "CNY"),
+    (".TRT", "Toronto", "09:30", "16:00", "UTC-05", "CAD"),
+    (".DEX", "XETRA", "08:00", "20:00", "UTC+02", "EUR"),
+]
+
+
+def _rng(*parts: Any) -> random.Random:
+    """
+    根据参数生成确定性的随机数生成器（同样的参数总是生成同样的数据）
+    """
+    seed = zlib.crc32(":".join(str(part) for part in parts).encode("utf-8"))
+    return random.Random(seed)
+
+
+def trading_days(bars: int, end: Optional[date] = None) -> List[date]:
+    """
+    生成截至end（含）的最近bars个工作日，按时间倒序
+
+    Args:
+        bars: 天数
+        end: 最后一个交易日，默认为今天
+
+    Returns:
+        List[date]: 交易日列表（最新在前）
+    """
+    day = end or date.today()
+    days = []
+    while len(days) < bars:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return days
+
+
+def generate_bars(
+    symbol: str, bars: int, end: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """
+    生成随机游走的日线OHLCV数据
+
+    Args:
+        symbol: 股票代码（决定随机种子和起始价格）
+        bars: 交易日数量
+        end: 最后一个交易日
+
+    Returns:
+        List[Dict[str, Any]]: 每个交易日的数据（最新在前），包含date/open/high/low/close/volume
+    """
+    rng = _rng("bars", symbol.upper())
+    days = trading_days(bars, end)
+
+    # 从最早的交易日开始游走，保证同一股票不同长度的序列在重叠部分一致
+    price = 20 + rng.random() * 300
+    result = []
+    for day in reversed(days):
+        day_rng = _rng("bar", symbol.upper(), day.isoformat())
+        open_price = price * (1 + day_rng.gauss(0, 0.01))
+        close = open_price * (1 + day_rng.gauss(0, 0.015))
+        high = max(open_price, close) * (1 + abs(day_rng.gauss(0, 0.005)))
+        low = min(open_price, close) * (1 - abs(day_rng.gauss(0, 0.005)))
+        result.append(
+            {
+                "date": day.isoformat(),
+                "open": round(open_price, 4),
+                "high": round(high, 4),
+                "low": round(low, 4),
+                "close": round(close, 4),
+                "volume": int(day_rng.uniform(1e5, 5e7)),
+            }
+        )
+        price = close
+    result.reverse()
+    return result
+
+
+def generate_daily_payload(
+    symbol: str,
+    bars: int = 100,
+    end: Optional[date] = None,
+    adjusted: bool = False,
+) -> Dict[str, Any]:
+    """
+    生成 TIME_SERIES_DAILY(_ADJUSTED) 响应
+
+    Args:
+        symbol: 股票代码
+        bars: 交易日数量（compact为100）
+        end: 最后一个交易日
+        adjusted: 是否生成复权数据的字段
+
+    Returns:
+        Dict[str, Any]: 与Alpha Vantage原始响应结构一致的字典
+    """
+    series = {}
+    for bar in generate_bars(symbol, bars, end):
+        values = {
+            "1. open": f"{bar['open']:.4f}",
+            "2. high": f"{bar['high']:.4f}",
+            "3. low": f"{bar['low']:.4f}",
+            "4. close": f"{bar['close']:.4f}",
+        }
+        if adjusted:
+            values["5. adjusted close"] = f"{bar['close']:.4f}"
+            values["6. volume"] = str(bar["volume"])
+            values["7. dividend amount"] = "0.0000"
+            values["8. split coefficient"] = "1.0"
+        else:
+            values["5. volume"] = str(bar["volume"])
+        series[bar["date"]] = values
+
+    information = (
+        "Daily Time Series with Splits and Dividend Events"
+        if adjusted
+        else "Daily Prices (open, high, low, close) and Volumes"
+    )
+    return {
+        "Meta Data": {
+            "1. Information": information,
+            "2. Symbol": symbol.upper(),
+            "3. Last Refreshed": max(series) if series else "",
+            "4. Output Size": "Compact" if bars <= 100 else "Full size",
+            "5. Time Zone": "US/Eastern",
+        },
+        "Time Series (Daily)": series,
+    }
+
+
+def generate_search_payload(keywords: str, matches: int = 10) -> Dict[str, Any]:
+    """
+    生成 SYMBOL_SEARCH 响应
+
+    Args:
+        keywords: 搜索关键词
+        matches: 结果数量
+
+    Returns:
+        Dict[str, Any]: 包含 bestMatches 的字典
+    """
+    rng = _rng("search", keywords.upper())
+    base = "".join(ch for ch in keywords.upper() if ch.isalnum())[:4] or "SYM"
+
+    best_matches = []
+    for index in range(matches):
+        suffix, region, market_open, market_close, timezone, currency = MARKETS[
+            index % len(MARKETS)
+        ]
+        symbol = base if index == 0 else f"{base}{index}"
+        score = max(1.0 - index * 0.05 - rng.random() * 0.01, 0)
+        best_matches.append(
+            {
+                "1. symbol": f"{symbol}{suffix}",
+                "2. name": f"{keywords.title()} Holdings {index}",
+                "3. type": "Equity",
+                "4. region": region,
+                "5. marketOpen": market_open,
+                "6. marketClose": market_close,
+                "7. timezone": timezone,
+                "8. currency": currency,
+                "9. matchScore": f"{score:.4f}",
+            }
+        )
+    return {"bestMatches": best_matches}
+
+
+def generate_quote_payload(symbol: str, end: Optional[date] = None) -> Dict[str, Any]:
+    """
+    生成 GLOBAL_QUOTE 响应（与日线数据最后两个交易日一致）
+
+    Args:
+        symbol: 股票代码
+        end: 最新交易日
+
+    Returns:
+        Dict[str, Any]: 包含 Global Quote 的字典
+    """
+    latest, previous = generate_bars(symbol, 2, end)
+    change = latest["close"] - previous["close"]
+    return {
+        "Global Quote": {
+            "01. symbol": symbol.upper(),
+            "02. open": f"{latest['open']:.4f}",
+            "03. high": f"{latest['high']:.4f}",
+            "04. low": f"{latest['low']:.4f}",
+            "05. price": f"{latest['close']:.4f}",
+            "06. volume": str(latest["volume"]),
+            "07. latest trading day": latest["date"],
+            "08. previous close": f"{previous['close']:.4f}",
+            "09. change": f"{change:.4f}",
+            "10. change percent": f"{change / previous['close'] * 100:.4f}%",
+        }
+    }
+
+
+def generate_fx_daily_payload(
+    from_symbol: str, to_symbol: str, bars: int = 100, end: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    生成 FX_DAILY 响应
+
+    Args:
+        from_symbol: 基础货币（如 'EUR'）
+        to_symbol: 报价货币（如 'USD'）
+        bars: 交易日数量
+        end: 最后一个交易日
+
+    Returns:
+        Dict[str, Any]: 与Alpha Vantage原始响应结构一致的字典
+    """
+    pair = f"{from_symbol.upper()}{to_symbol.upper()}"
+    rng = _rng("fx", pair)
+    scale = 0.5 + rng.random() * 1.5
+
+    series = {}
+    for bar in generate_bars(f"FX:{pair}", bars, end):
+        # 把股票价格区间缩放到汇率量级
+        factor = scale / bar["open"] if bar["open"] else scale
+        series[bar["date"]] = {
+            "1. open": f"{bar['open'] * factor:.5f}",
+            "2. high": f"{bar['high'] * factor:.5f}",
+            "3. low": f"{bar['low'] * factor:.5f}",
+            "4. close": f"{bar['close'] * factor:.5f}",
+        }
+
+    return {
+        "Meta Data": {
+            "1. Information": "Forex Daily Prices (open, high, low, close)",
+            "2. From Symbol": from_symbol.upper(),
+            "3. To Symbol": to_symbol.upper(),
+            "4. Output Size": "Compact" if bars <= 100 else "Full size",
+            "5. Last Refreshed": max(series) if series else "",
+            "6. Time Zone": "UTC",
+        },
+        "Time Series FX (Daily)": series,
+    }
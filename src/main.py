@@ -10,6 +10,7 @@ import argparse
 import logging
 import os
 import sys
+import time
 import traceback
 from pathlib import Path
 
@@ -17,7 +18,15 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.ui.app import create_app  # noqa: E402
+from src.utils.startup import (  # noqa: E402
+    format_startup_report,
+    profile_imports,
+    startup_timer,
+)
+
+with startup_timer.phase("import src.ui.app"):
+    from src.ui.app import create_app  # noqa: E402
+
 from src.utils.config import config  # noqa: E402
 from src.utils.exceptions import ConfigurationError  # noqa: E402
 from src.utils.logger import get_logger  # noqa: E402
@@ -63,12 +72,17 @@ def setup_application() -> object:
 
     try:
         # 验证环境
-        validate_environment()
+        with startup_timer.phase("validate_environment"):
+            validate_environment()
 
         # 创建应用实例
-        app = create_app()
+        with startup_timer.phase("create_app"):
+            app = create_app()
 
-        logger.info("Application setup completed successfully")
+        logger.info(
+            f"Application setup completed successfully "
+            f"({startup_timer.total * 1000:.0f}ms)"
+        )
         return app
 
     except Exception as e:
@@ -106,6 +120,11 @@ def run_application(
     logger.info(f"Debug mode: {'enabled' if debug else 'disabled'}")
     logger.info(f"Environment: {os.environ.get('ENVIRONMENT', 'development')}")
 
+    # 收盘后定时刷新（SCHEDULER_ENABLED）
+    from src.data.scheduler import start_scheduler
+
+    start_scheduler()
+
     try:
         # 启动服务器
         app.run(
@@ -122,6 +141,113 @@ def run_application(
         raise
 
 
+def run_ingest(args: argparse.Namespace) -> int:
+    """
+    批量导入股票日线历史到本地历史数据存储
+
+    Args:
+        args: ingest 子命令的参数
+
+    Returns:
+        int: 退出状态（有失败或被中止时为1）
+    """
+    from src.data.ingest import Checkpoint, Ingestor, read_symbols
+    from src.services import get_api_client, get_history_store
+
+    symbols = read_symbols(args.symbols_file)
+    checkpoint_path = args.checkpoint or f"{args.symbols_file}.checkpoint.json"
+    store = get_history_store()
+    logger.info(
+        f"Ingesting {len(symbols)} symbols into {store.directory} "
+        f"({store.file_format}), checkpoint: {checkpoint_path}"
+    )
+
+    ingestor = Ingestor(
+        get_api_client(),
+        store,
+        Checkpoint(checkpoint_path, args.output_size, resume=not args.restart),
+        output_size=args.output_size,
+        concurrency=args.concurrency,
+        out=sys.stdout,
+    )
+    try:
+        stats = ingestor.run(symbols)
+    except KeyboardInterrupt:
+        print("\nInterrupted; run the same command again to resume.")
+        return 1
+
+    return 1 if stats["failed"] or stats["stopped"] else 0
+
+
+def run_backtest(args: argparse.Namespace) -> int:
+    """
+    在本地历史数据存储中的股票上回测均线交叉信号，输出按夏普比率排序的结果
+
+    Args:
+        args: backtest 子命令的参数
+
+    Returns:
+        int: 退出状态（没有可回测的股票或参数无效时为1）
+    """
+    import pandas as pd
+
+    from src.data.backtest import Backtester, parse_signal, summarize, sweep_signals
+    from src.data.ingest import read_symbols
+    from src.services import get_history_store
+
+    store = get_history_store()
+    if args.symbols_file:
+        symbols = read_symbols(args.symbols_file)
+    elif args.symbols:
+        symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    else:
+        symbols = store.symbols()
+
+    try:
+        if args.signals:
+            signals = [parse_signal(s) for s in args.signals.split(",") if s.strip()]
+        else:
+            signals = sweep_signals(
+                [int(w) for w in args.fast.split(",")],
+                [int(w) for w in args.slow.split(",")],
+            )
+    except ValueError as e:
+        print(f"Invalid signal: {e}")
+        return 1
+    if not symbols or not signals:
+        print("Nothing to backtest: no symbols or no valid signals")
+        return 1
+
+    backtester = Backtester(
+        store.load, cost_bps=args.cost_bps, max_workers=args.concurrency
+    )
+    start = time.perf_counter()
+    results = backtester.run_many(symbols, signals, args.start, args.end)
+    elapsed = time.perf_counter() - start
+    if results.empty:
+        print("No stored history for the requested symbols")
+        return 1
+
+    symbol_count = results.index.get_level_values("symbol").nunique()
+    print(
+        f"Backtested {len(signals)} signal(s) on {symbol_count} symbol(s) "
+        f"({len(results)} runs) in {elapsed:.2f}s"
+    )
+    with pd.option_context("display.width", 160, "display.max_columns", None):
+        if symbol_count > 1:
+            print("\nMedian across symbols:")
+            print(summarize(results).head(args.top).round(4).to_string())
+        else:
+            ranked = results.droplevel("symbol").sort_values(
+                "sharpe", ascending=False, na_position="last"
+            )
+            print(ranked.head(args.top).round(4).to_string())
+    if args.output:
+        results.to_csv(args.output)
+        print(f"\nAll results written to {args.output}")
+    return 0
+
+
 def main() -> None:
     """
     主函数 - 应用程序入口点
@@ -136,6 +262,11 @@ def main() -> None:
   python -m src.main --debug            # 启用调试模式
   python -m src.main --host 0.0.0.0     # 监听所有网络接口
   python -m src.main --port 8080        # 使用自定义端口
+  python -m src.main --profile-startup  # 输出启动耗时分析报告后退出
+  python -m src.main ingest --symbols-file symbols.txt --output-size full
+                                        # 批量导入日线历史（可中断后继续）
+  python -m src.main backtest --symbols AAPL,MSFT --fast 5,10,20 --slow 50,100,200
+                                        # 在本地历史上回测均线交叉参数组合
         """,
     )
 
@@ -147,8 +278,84 @@ def main() -> None:
 
     parser.add_argument("--port", type=int, help="服务器端口（默认: 8050）")
 
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="分析启动各阶段及模块导入耗时，输出报告后退出（不启动服务器）",
+    )
+
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=20,
+        help="启动分析报告中显示的模块数量（默认: 20）",
+    )
+
     parser.add_argument("--version", action="version", version="iFinance 1.0.0")
 
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    ingest = subparsers.add_parser(
+        "ingest",
+        help="批量下载日线历史到本地历史数据存储（不启动服务器）",
+        description="批量下载日线历史到本地历史数据存储。请求受 "
+        "ALPHA_VANTAGE_RATE_LIMIT_* 限制；每完成一个代码记录一次检查点，"
+        "中断后重新运行同一命令即可继续。",
+    )
+    ingest.add_argument(
+        "--symbols-file",
+        required=True,
+        help="股票代码列表文件（每行一个，支持逗号分隔和 # 注释）",
+    )
+    ingest.add_argument(
+        "--output-size",
+        choices=["compact", "full"],
+        default="compact",
+        help="compact（最近100个交易日，默认）或 full（完整历史）",
+    )
+    ingest.add_argument(
+        "--concurrency", type=int, default=1, help="并发下载线程数（默认: 1）"
+    )
+    ingest.add_argument(
+        "--checkpoint",
+        help="检查点文件路径（默认: <symbols-file>.checkpoint.json）",
+    )
+    ingest.add_argument(
+        "--restart", action="store_true", help="忽略已有检查点，重新导入所有代码"
+    )
+
+    backtest = subparsers.add_parser(
+        "backtest",
+        help="在本地历史数据存储上回测均线交叉信号（不启动服务器、不请求API）",
+        description="在本地历史数据存储上回测均线交叉信号：快线在慢线之上时持有，"
+        "信号在收盘时确定、下一个交易日生效。默认扫描 --fast 与 --slow 的所有组合。",
+    )
+    backtest.add_argument(
+        "--symbols", help="逗号分隔的股票代码（默认: 本地存储的全部股票）"
+    )
+    backtest.add_argument("--symbols-file", help="股票代码列表文件（同 ingest）")
+    backtest.add_argument(
+        "--signals",
+        help="逗号分隔的信号，如 ma5>ma20,ma10>ma50（指定时忽略 --fast/--slow）",
+    )
+    backtest.add_argument(
+        "--fast", default="5,10,20", help="快线窗口，逗号分隔（默认: 5,10,20）"
+    )
+    backtest.add_argument(
+        "--slow", default="50,100,200", help="慢线窗口，逗号分隔（默认: 50,100,200）"
+    )
+    backtest.add_argument("--start", help="回测开始日期 (YYYY-MM-DD)")
+    backtest.add_argument("--end", help="回测结束日期 (YYYY-MM-DD)")
+    backtest.add_argument(
+        "--cost-bps", type=float, default=0.0, help="单边交易成本（基点，默认: 0）"
+    )
+    backtest.add_argument(
+        "--concurrency", type=int, default=4, help="并发回测的股票数量（默认: 4）"
+    )
+    backtest.add_argument(
+        "--top", type=int, default=20, help="显示的结果数量（默认: 20）"
+    )
+    backtest.add_argument("--output", help="把全部结果写入CSV文件")
+
     args = parser.parse_args()
 
     # 设置日志级别
@@ -163,9 +370,22 @@ def main() -> None:
         logger.info("版本: 1.0.0")
         logger.info("=" * 50)
 
+        if args.command == "ingest":
+            validate_environment()
+            sys.exit(run_ingest(args))
+
+        if args.command == "backtest":
+            sys.exit(run_backtest(args))
+
         # 设置应用
         app = setup_application()
 
+        if args.profile_startup:
+            # 在独立进程中按gunicorn的加载方式导入，分析模块导入耗时
+            imports = profile_imports("src.main")
+            print(format_startup_report(startup_timer, imports, args.profile_top))
+            return
+
         # 运行应用
         run_application(app, debug=args.debug, host=args.host, port=args.port)
 
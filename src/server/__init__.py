@@ -0,0 +1,6 @@
+# 服务端路由模块
+# 在Dash底层的Flask服务器上注册非Dash页面的HTTP接口
+
+from .routes import register_routes
+
+__all__ = ["register_routes"]
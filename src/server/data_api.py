@@ -0,0 +1,557 @@
+# 数据接口
+# 以JSON/CSV/Arrow格式提供和导出本地历史数据存储中的日线数据，不消耗Alpha Vantage配额
+
+import hashlib
+import hmac
+import json
+from datetime import date, datetime, timezone
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+from flask import Flask, Response, jsonify, request, stream_with_context
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from ..services import get_fx_converter, get_history_store, get_quote_hub
+from ..utils.config import config
+from ..utils.exceptions import iFinanceError
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from .export import (
+    EXPORT_FORMATS,
+    EXPORT_STREAMS,
+    ChunkSink,
+    export_available,
+    export_filename,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from ..data.quotes import QuoteHub, Subscription
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 接口路径前缀
+API_PREFIX = "/api/v1"
+
+# 可选字段（date 总是返回）
+FIELDS = ["open", "high", "low", "close", "volume"]
+
+# 各格式的Content-Type
+CONTENT_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# 流式输出时每块的行数
+CHUNK_ROWS = 1000
+
+# 数据接口响应（含304）
+DATA_API_RESPONSES = metrics.counter(
+    "ifinance_data_api_responses_total",
+    "Data API responses by endpoint and status",
+    ["endpoint", "status"],
+)
+
+
+class BadRequest(Exception):
+    """
+    请求参数无效（返回400）
+    """
+
+    pass
+
+
+def register_data_api(server: Flask) -> None:
+    """
+    注册数据接口
+
+    配置项:
+        DATA_API_ENABLED: 是否启用数据接口（默认启用）
+        DATA_API_TOKEN: 访问令牌，设置后请求需携带 X-Api-Token 请求头或 token 参数
+
+    接口:
+        GET /api/v1/symbols                 本地已存储的股票及其日期范围（JSON）
+        GET /api/v1/ohlcv/<symbol>          日线数据
+            start, end: 日期范围（YYYY-MM-DD，含两端，可省略）
+            fields: 逗号分隔的字段（open,high,low,close,volume，默认全部）
+            format: json（默认）、csv 或 arrow（需要pyarrow）；也可以通过 Accept 请求头指定
+            currency: 把价格换算为该货币（如 USD、GBP），默认不换算
+            source_currency: 数据的报价货币，默认按股票代码后缀推断（伦敦的股票为 GBX）
+        GET /api/v1/export?symbols=A,B      导出多个股票的日线数据（下载文件，流式输出）
+            start, end, fields: 同上
+            format: csv（默认）、parquet（需要pyarrow）或 xlsx（需要XlsxWriter）
+        GET /api/v1/quotes?symbols=A,B      最近的报价（JSON，不请求上游）
+        GET /api/v1/quotes/stream?symbols=A,B
+            报价事件流（text/event-stream）：先发送 snapshot 事件（完整报价），
+            之后报价变化时发送 quote 事件（只包含变化的字段）
+
+    响应带有强ETag（由股票代码、数据版本和规范化后的查询参数计算）和Last-Modified（数据文件的
+    修改时间）；请求携带匹配的 If-None-Match / If-Modified-Since 时只读取元数据并返回304
+
+    Args:
+        server: Flask服务器
+    """
+    if not config.get_bool("DATA_API_ENABLED", True):
+        logger.info("Data API disabled")
+        return
+
+    token = config.get("DATA_API_TOKEN", "")
+
+    def require_token(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            supplied = request.headers.get("X-Api-Token") or request.args.get("token")
+            # 常数时间比较，响应时间不泄露令牌的前缀
+            if token and not hmac.compare_digest(
+                (supplied or "").encode(), token.encode()
+            ):
+                return error_response(403, "Invalid or missing API token")
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    @server.route(f"{API_PREFIX}/symbols")
+    @require_token
+    def list_symbols():
+        store = get_history_store()
+        infos = []
+        mtimes = []
+        for symbol in store.symbols():
+            # 列出目录之后被删除（或正在替换）的股票跳过
+            info = store.info(symbol)
+            try:
+                mtime = store.data_path(symbol).stat().st_mtime
+            except OSError:
+                continue
+            if info is not None:
+                infos.append(info)
+                mtimes.append(mtime)
+        etag = make_etag("symbols", json.dumps(infos, sort_keys=True))
+        last_modified = max(mtimes, default=None)
+        not_modified = conditional_response(etag, last_modified)
+        if not_modified is not None:
+            DATA_API_RESPONSES.inc(endpoint="symbols", status=304)
+            return not_modified
+
+        DATA_API_RESPONSES.inc(endpoint="symbols", status=200)
+        return with_validators(jsonify(infos), etag, last_modified)
+
+    @server.route(f"{API_PREFIX}/ohlcv/<symbol>")
+    @require_token
+    def ohlcv(symbol: str):
+        from ..data.fx import symbol_currency
+
+        try:
+            start = parse_date(request.args.get("start"), "start")
+            end = parse_date(request.args.get("end"), "end")
+            if start and end and start > end:
+                raise BadRequest("start must not be after end")
+            fields = parse_fields(request.args.get("fields"))
+            fmt = negotiate_format(request.args.get("format"))
+            currency = parse_currency(request.args.get("currency"), "currency")
+            source_currency = parse_currency(
+                request.args.get("source_currency"), "source_currency"
+            ) or symbol_currency(symbol)
+        except BadRequest as e:
+            return error_response(400, str(e))
+
+        if fmt == "arrow" and pa is None:
+            return error_response(406, "Arrow format requires pyarrow on the server")
+
+        store = get_history_store()
+        info = store.info(symbol)
+        if info is None or not store.exists(symbol):
+            DATA_API_RESPONSES.inc(endpoint="ohlcv", status=404)
+            return error_response(404, f"No local history for '{symbol.upper()}'")
+
+        fx_version = ""
+        if currency:
+            # 汇率过期时先刷新，ETag 才能反映换算使用的汇率版本
+            converter = get_fx_converter()
+            try:
+                converter.rates(source_currency, currency)
+            except iFinanceError as e:
+                logger.error(
+                    f"Failed to get FX rates {source_currency}/{currency}: {e}"
+                )
+                DATA_API_RESPONSES.inc(endpoint="ohlcv", status=502)
+                return error_response(
+                    502, f"FX rates {source_currency}/{currency} unavailable"
+                )
+            fx_version = converter.version(source_currency, currency)
+
+        try:
+            stat = store.data_path(symbol).stat()
+        except FileNotFoundError:
+            DATA_API_RESPONSES.inc(endpoint="ohlcv", status=404)
+            return error_response(404, f"No local history for '{symbol.upper()}'")
+
+        # 数据版本：last_refreshed、行数和起始日期，加上数据文件的修改时间和大小
+        # （同一天内导入完整历史或修正最后一个交易日的数据也会改变版本）
+        etag = make_etag(
+            info["symbol"],
+            info["version"],
+            info["rows"],
+            info["start"],
+            stat.st_mtime_ns,
+            stat.st_size,
+            start or "",
+            end or "",
+            ",".join(fields),
+            fmt,
+            f"{source_currency}>{currency}:{fx_version}" if currency else "",
+        )
+        last_modified = stat.st_mtime
+        not_modified = conditional_response(etag, last_modified)
+        if not_modified is not None:
+            DATA_API_RESPONSES.inc(endpoint="ohlcv", status=304)
+            return not_modified
+
+        # 逐块读取、换算和序列化，内存占用只取决于块的大小
+        chunks = store.iter_chunks(symbol, start, end, fields, CHUNK_ROWS)
+        if currency:
+            converter = get_fx_converter()
+            chunks = (
+                converter.convert(chunk, source_currency, currency) for chunk in chunks
+            )
+        streams = {"json": stream_json, "csv": stream_csv, "arrow": stream_arrow}
+        DATA_API_RESPONSES.inc(endpoint="ohlcv", status=200)
+        response = Response(
+            stream_with_context(streams[fmt](info["symbol"], fields, chunks)),
+            content_type=CONTENT_TYPES[fmt],
+        )
+        return with_validators(response, etag, last_modified)
+
+    @server.route(f"{API_PREFIX}/export")
+    @require_token
+    def export():
+        try:
+            symbols = parse_symbols(
+                request.args.get("symbols"), config.get_int("EXPORT_MAX_SYMBOLS", 500)
+            )
+            start = parse_date(request.args.get("start"), "start")
+            end = parse_date(request.args.get("end"), "end")
+            if start and end and start > end:
+                raise BadRequest("start must not be after end")
+            fields = parse_fields(request.args.get("fields"))
+            fmt = (request.args.get("format") or "csv").lower()
+            if fmt not in EXPORT_FORMATS:
+                raise BadRequest(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+        except BadRequest as e:
+            return error_response(400, str(e))
+
+        if not export_available(fmt):
+            return error_response(
+                406, f"{fmt} export requires an optional package on the server"
+            )
+
+        store = get_history_store()
+        missing = [symbol for symbol in symbols if not store.exists(symbol)]
+        if missing:
+            DATA_API_RESPONSES.inc(endpoint="export", status=404)
+            return error_response(404, f"No local history for: {', '.join(missing)}")
+
+        DATA_API_RESPONSES.inc(endpoint="export", status=200)
+        response = Response(
+            stream_with_context(
+                EXPORT_STREAMS[fmt](store, symbols, start, end, fields)
+            ),
+            content_type=EXPORT_FORMATS[fmt][0],
+        )
+        response.headers["Content-Disposition"] = (
+            f'attachment; filename="{export_filename(symbols, start, end, fmt)}"'
+        )
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
+    @server.route(f"{API_PREFIX}/quotes")
+    @require_token
+    def quotes():
+        try:
+            symbols = parse_symbols(
+                request.args.get("symbols"),
+                config.get_int("QUOTE_STREAM_MAX_SYMBOLS", 50),
+            )
+        except BadRequest as e:
+            return error_response(400, str(e))
+        return jsonify(get_quote_hub().snapshot(symbols))
+
+    @server.route(f"{API_PREFIX}/quotes/stream")
+    @require_token
+    def quote_stream():
+        # Flask 为GET路由自动接受HEAD；HEAD响应不会读取事件流，订阅无法在断开时释放
+        if request.method == "HEAD":
+            response = error_response(405, "Use GET for the quote stream")
+            response.headers["Allow"] = "GET"
+            return response
+
+        try:
+            symbols = parse_symbols(
+                request.args.get("symbols"),
+                config.get_int("QUOTE_STREAM_MAX_SYMBOLS", 50),
+            )
+        except BadRequest as e:
+            return error_response(400, str(e))
+
+        hub = get_quote_hub()
+        subscription = hub.subscribe(symbols)
+        if subscription is None:
+            # 事件流占用的请求线程已达上限；客户端可改用 /quotes 轮询或稍后重连
+            response = error_response(503, "Too many quote stream subscribers")
+            response.headers["Retry-After"] = str(
+                config.get_int("QUOTE_STREAM_KEEPALIVE", 15)
+            )
+            return response
+
+        response = Response(
+            stream_quotes(hub, subscription), content_type="text/event-stream"
+        )
+        # 生成器从未开始（如客户端在响应头之前断开）时不会执行其 finally，
+        # 响应关闭时总是取消订阅（unsubscribe 可重复调用）
+        response.call_on_close(lambda: hub.unsubscribe(subscription))
+        response.headers["Cache-Control"] = "no-cache"
+        # 关闭反向代理（nginx）的响应缓冲，事件才能立即送达
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
+    logger.info(f"Data API registered at {API_PREFIX}")
+
+
+def error_response(status: int, message: str) -> Response:
+    response = jsonify({"error": message})
+    response.status_code = status
+    return response
+
+
+def parse_symbols(value: Optional[str], limit: int) -> List[str]:
+    """
+    解析逗号分隔的股票代码
+
+    Raises:
+        BadRequest: 没有股票代码或数量超过 limit 时
+    """
+    symbols = list(
+        dict.fromkeys(s.strip().upper() for s in (value or "").split(",") if s.strip())
+    )
+    if not symbols:
+        raise BadRequest("symbols is required (comma-separated)")
+    if len(symbols) > limit:
+        raise BadRequest(f"At most {limit} symbols per request")
+    return symbols
+
+
+def stream_quotes(hub: "QuoteHub", subscription: "Subscription") -> Iterator[str]:
+    """
+    以Server-Sent Events输出报价
+
+    连接建立时发送已有报价的快照，之后转发订阅收到的变化；空闲时定期发送注释行保持连接。
+    客户端断开（生成器被关闭）或消费太慢导致队列溢出时取消订阅
+    """
+    keepalive = config.get_int("QUOTE_STREAM_KEEPALIVE", 15)
+    try:
+        yield "retry: 5000\n\n"
+        for quote in hub.snapshot(subscription.symbols).values():
+            yield format_event("snapshot", quote)
+
+        while not subscription.overflowed:
+            event = subscription.get(timeout=keepalive)
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield format_event("quote", event)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+def format_event(name: str, data: Dict[str, Any]) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def make_etag(*parts: object) -> str:
+    """
+    根据数据版本和查询参数计算强ETag（不含引号）
+    """
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode())
+    return digest.hexdigest()
+
+
+def conditional_response(
+    etag: str, last_modified: Optional[float]
+) -> Optional[Response]:
+    """
+    请求的缓存验证器与当前数据一致时返回304响应
+
+    If-None-Match 优先；没有 If-None-Match 时才比较 If-Modified-Since（精确到秒）
+
+    Args:
+        etag: 当前数据的ETag
+        last_modified: 数据文件的修改时间（时间戳）
+
+    Returns:
+        Optional[Response]: 304响应，需要返回完整数据时为None
+    """
+    if request.if_none_match:
+        if not request.if_none_match.contains(etag):
+            return None
+    elif request.if_modified_since is None or last_modified is None:
+        return None
+    elif int(last_modified) > request.if_modified_since.timestamp():
+        return None
+
+    return with_validators(Response(status=304), etag, last_modified)
+
+
+def with_validators(
+    response: Response, etag: str, last_modified: Optional[float]
+) -> Response:
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = datetime.fromtimestamp(
+            int(last_modified), timezone.utc
+        )
+    # 允许缓存，但每次使用前都要向服务器验证
+    response.cache_control.no_cache = True
+    return response
+
+
+def parse_date(value: Optional[str], name: str) -> Optional[str]:
+    """
+    校验日期参数
+
+    Raises:
+        BadRequest: 日期格式无效时
+    """
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise BadRequest(f"{name} must be a date in YYYY-MM-DD format")
+
+
+def parse_fields(value: Optional[str]) -> List[str]:
+    """
+    解析字段参数，保持请求中的顺序
+
+    Raises:
+        BadRequest: 包含未知字段时
+    """
+    if not value:
+        return list(FIELDS)
+    fields = list(dict.fromkeys(f.strip().lower() for f in value.split(",") if f))
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        raise BadRequest(
+            f"Unknown field(s): {', '.join(unknown)}; choose from {', '.join(FIELDS)}"
+        )
+    return fields
+
+
+def parse_currency(value: Optional[str], name: str) -> Optional[str]:
+    """
+    解析货币代码参数（三个字母，保留 GBp 等辅币代码的大小写）
+
+    Raises:
+        BadRequest: 格式无效时
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if len(value) != 3 or not value.isalpha():
+        raise BadRequest(f"{name} must be a 3-letter currency code")
+
+    from ..data.fx import MINOR_UNITS
+
+    return value if value in MINOR_UNITS else value.upper()
+
+
+def negotiate_format(value: Optional[str]) -> str:
+    """
+    确定响应格式：format 参数优先，其次是 Accept 请求头，默认JSON
+
+    Raises:
+        BadRequest: format 参数无效时
+    """
+    if value:
+        value = value.lower()
+        if value not in CONTENT_TYPES:
+            raise BadRequest(f"format must be one of {', '.join(CONTENT_TYPES)}")
+        return value
+
+    best = request.accept_mimetypes.best_match(
+        [content_type.split(";")[0] for content_type in CONTENT_TYPES.values()]
+    )
+    for fmt, content_type in CONTENT_TYPES.items():
+        if best and content_type.startswith(best):
+            return fmt
+    return "json"
+
+
+def stream_json(
+    symbol: str, fields: List[str], chunks: Iterator["pd.DataFrame"]
+) -> Iterator[str]:
+    """
+    以JSON流式输出：{"symbol": ..., "fields": [...], "data": [{date, ...}, ...], "rows": N}
+
+    行数在读完所有数据块之后才知道，因此放在最后
+    """
+    header = {"symbol": symbol, "fields": fields}
+    yield json.dumps(header)[:-1] + ', "data": ['
+
+    rows = 0
+    for chunk in chunks:
+        chunk = chunk.reset_index()
+        chunk = chunk.assign(date=chunk["date"].dt.strftime("%Y-%m-%d"))
+        records = chunk.to_json(orient="records", double_precision=6)
+        yield ("," if rows else "") + records[1:-1]
+        rows += len(chunk)
+    yield f'], "rows": {rows}}}'
+
+
+def stream_csv(
+    symbol: str, fields: List[str], chunks: Iterator["pd.DataFrame"]
+) -> Iterator[str]:
+    """
+    以CSV流式输出，第一行为表头（date 加请求的字段）
+    """
+    yield ",".join(["date"] + fields) + "\n"
+    for chunk in chunks:
+        yield chunk.to_csv(header=False, date_format="%Y-%m-%d")
+
+
+def stream_arrow(
+    symbol: str, fields: List[str], chunks: Iterator["pd.DataFrame"]
+) -> Iterator[bytes]:
+    """
+    以Arrow IPC流格式输出，每块一个record batch（结构取自第一块）
+    """
+    sink = ChunkSink()
+    writer = schema = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(
+            chunk.reset_index(), schema=schema, preserve_index=False
+        )
+        if writer is None:
+            schema = table.schema.with_metadata({"symbol": symbol})
+            writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+        for batch in table.to_batches(max_chunksize=CHUNK_ROWS):
+            writer.write_batch(batch)
+        yield sink.drain()
+
+    if writer is None:
+        # 没有数据：只输出结构
+        schema = pa.schema(
+            [("date", pa.timestamp("ns"))]
+            + [(f, pa.int64() if f == "volume" else pa.float64()) for f in fields],
+            metadata={"symbol": symbol},
+        )
+        writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+    writer.close()
+    yield sink.drain()
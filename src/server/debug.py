@@ -0,0 +1,129 @@
+# 调试接口
+# 查看回调性能分析结果和请求追踪（默认关闭，可通过令牌限制访问）
+
+import hmac
+from functools import wraps
+from typing import Callable
+
+from flask import Flask, Response, abort, current_app, jsonify, request
+
+from ..utils.config import config
+from ..utils.logger import get_logger
+from ..utils.profiling import format_collapsed, profiler
+from ..utils.tracing import format_trace, tracer
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+
+def register_debug_routes(server: Flask) -> None:
+    """
+    注册调试接口
+
+    配置项:
+        DEBUG_ROUTES_ENABLED: 是否启用调试接口（默认关闭）
+        DEBUG_TOKEN: 访问令牌，请求需携带 X-Debug-Token 请求头或 token 参数；
+            未设置时调试接口只在开发模式（python -m src.main --debug）下可用，否则返回404
+
+    接口:
+        GET /debug/profiles                      最近的分析结果概要（JSON）
+        GET /debug/profiles/collapsed            合并后的折叠栈，可按 callback 参数过滤
+        GET /debug/profiles/<id>                 cProfile 统计（文本）
+        GET /debug/profiles/<id>/collapsed       单次分析的折叠栈
+        GET /debug/traces                        最近的追踪概要（JSON），limit 参数控制数量
+        GET /debug/traces/<trace_id>             单次追踪的瀑布图文本，format=json 时返回JSON
+
+    Args:
+        server: Flask服务器
+    """
+    if not config.get_bool("DEBUG_ROUTES_ENABLED", False):
+        return
+
+    token = config.get("DEBUG_TOKEN", "")
+
+    def require_token(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not token:
+                # 未配置令牌时只在开发模式下开放，生产环境中如同接口不存在
+                if not current_app.debug:
+                    abort(404)
+                return func(*args, **kwargs)
+
+            supplied = request.headers.get("X-Debug-Token") or request.args.get("token")
+            # 常数时间比较，响应时间不泄露令牌的前缀
+            if not hmac.compare_digest((supplied or "").encode(), token.encode()):
+                abort(403)
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    @server.route("/debug/profiles")
+    @require_token
+    def list_profiles():
+        return jsonify(
+            [
+                {
+                    key: value
+                    for key, value in record.items()
+                    if key not in ("stats", "stacks")
+                }
+                for record in profiler.list_profiles()
+            ]
+        )
+
+    @server.route("/debug/profiles/collapsed")
+    @require_token
+    def merged_collapsed_stacks():
+        callback = request.args.get("callback")
+        stacks = {}
+        for record in profiler.list_profiles():
+            if callback and record["callback"] != callback:
+                continue
+            for stack, count in record["stacks"].items():
+                stacks[stack] = stacks.get(stack, 0) + count
+        return Response(format_collapsed(stacks), content_type="text/plain")
+
+    @server.route("/debug/profiles/<profile_id>")
+    @require_token
+    def profile_stats(profile_id: str):
+        record = profiler.get_profile(profile_id)
+        if record is None:
+            abort(404)
+        return Response(record["stats"], content_type="text/plain")
+
+    @server.route("/debug/profiles/<profile_id>/collapsed")
+    @require_token
+    def profile_collapsed_stacks(profile_id: str):
+        record = profiler.get_profile(profile_id)
+        if record is None:
+            abort(404)
+        return Response(format_collapsed(record["stacks"]), content_type="text/plain")
+
+    @server.route("/debug/traces")
+    @require_token
+    def list_traces():
+        limit = request.args.get("limit", 50, type=int)
+        return jsonify(
+            [
+                {key: value for key, value in trace.items() if key != "spans"}
+                for trace in tracer.recent(limit)
+            ]
+        )
+
+    @server.route("/debug/traces/<trace_id>")
+    @require_token
+    def show_trace(trace_id: str):
+        trace = tracer.get_trace(trace_id)
+        if trace is None:
+            abort(404)
+        if request.args.get("format") == "json":
+            return jsonify(trace)
+        return Response(format_trace(trace), content_type="text/plain")
+
+    if not token:
+        logger.warning(
+            "Debug routes enabled without DEBUG_TOKEN, "
+            "they are only served in development mode (--debug)"
+        )
+    logger.info("Debug routes registered at /debug/profiles and /debug/traces")
@@ -0,0 +1,227 @@
+# 数据导出模块
+# 把本地历史数据存储中的多个股票、任意日期范围的日线数据逐块序列化并流式输出
+
+import os
+import re
+import tempfile
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+from ..utils.config import config
+from ..utils.logger import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from ..data.store import HistoryStore
+
+logger = get_logger(__name__)
+
+# 导出格式 -> (Content-Type, 文件扩展名)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "xlsx": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "xlsx",
+    ),
+}
+
+# 读取临时文件时每次发送的字节数
+_FILE_BLOCK = 64 * 1024
+
+
+def export_available(fmt: str) -> bool:
+    """
+    检查导出格式所需的可选依赖是否已安装
+
+    Args:
+        fmt: 导出格式
+
+    Returns:
+        bool: 是否可用
+    """
+    if fmt == "parquet":
+        return pq is not None
+    if fmt == "xlsx":
+        return xlsxwriter is not None
+    return fmt in EXPORT_FORMATS
+
+
+def export_filename(
+    symbols: List[str], start: Optional[str], end: Optional[str], fmt: str
+) -> str:
+    """
+    生成下载文件名，如 ohlcv_AAPL_MSFT_2020-01-01_2024-12-31.csv
+    """
+    name = "_".join(symbols) if len(symbols) <= 3 else f"{len(symbols)}_symbols"
+    parts = ["ohlcv", re.sub(r"[^A-Za-z0-9._-]", "-", name)]
+    if start or end:
+        parts.append(f"{start or 'begin'}_{end or 'latest'}")
+    return "_".join(parts) + "." + EXPORT_FORMATS[fmt][1]
+
+
+def _chunk_rows() -> int:
+    return config.get_int("EXPORT_CHUNK_ROWS", 5000)
+
+
+def stream_export_csv(
+    store: "HistoryStore",
+    symbols: List[str],
+    start: Optional[str],
+    end: Optional[str],
+    fields: List[str],
+) -> Iterator[str]:
+    """
+    以CSV流式导出（长表：symbol, date, 字段...），每读取一块立即序列化发送
+
+    Yields:
+        str: CSV文本块，第一块为表头
+    """
+    yield ",".join(["symbol", "date"] + fields) + "\n"
+    for symbol in symbols:
+        for chunk in store.iter_chunks(symbol, start, end, fields, _chunk_rows()):
+            chunk = chunk.reset_index()
+            chunk.insert(0, "symbol", symbol)
+            yield chunk.to_csv(header=False, index=False, date_format="%Y-%m-%d")
+
+
+class ChunkSink:
+    """
+    收集Arrow/Parquet写入的字节，每写完一个record batch或row group取出一次
+    """
+
+    closed = False
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _parquet_table(
+    symbol: str, chunk: "pd.DataFrame", schema: "pa.Schema"
+) -> "pa.Table":
+    """
+    按导出的schema逐列转换一个数据块
+
+    不依赖数据块的dtype：缺失值（NaN）转为null，成交量即使因缺失值被读为float64也取整后写为int64
+    """
+    chunk = chunk.reset_index()
+    arrays = [
+        pa.array([symbol] * len(chunk), pa.string()),
+        pa.array(chunk["date"].dt.date, pa.date32()),
+    ]
+    for field in schema.names[2:]:
+        values = chunk[field].astype("float64")
+        if pa.types.is_integer(schema.field(field).type):
+            values = values.round()
+        arrays.append(pa.Array.from_pandas(values).cast(schema.field(field).type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def stream_export_parquet(
+    store: "HistoryStore",
+    symbols: List[str],
+    start: Optional[str],
+    end: Optional[str],
+    fields: List[str],
+) -> Iterator[bytes]:
+    """
+    以Parquet流式导出，每个数据块写为一个row group，写完立即发送（文件尾部的元数据最后发送）
+
+    schema 固定（价格为float64、成交量为int64），每个数据块按它转换，不随第一块的dtype变化
+
+    Yields:
+        bytes: Parquet文件的字节块
+    """
+    schema = pa.schema(
+        [("symbol", pa.string()), ("date", pa.date32())]
+        + [(f, pa.int64() if f == "volume" else pa.float64()) for f in fields]
+    )
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        for symbol in symbols:
+            for chunk in store.iter_chunks(symbol, start, end, fields, _chunk_rows()):
+                writer.write_table(_parquet_table(symbol, chunk, schema))
+                yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_export_xlsx(
+    store: "HistoryStore",
+    symbols: List[str],
+    start: Optional[str],
+    end: Optional[str],
+    fields: List[str],
+) -> Iterator[bytes]:
+    """
+    导出为XLSX（每个股票一个工作表）
+
+    XLSX是zip格式，目录位于文件末尾，无法边写边发送：先以 constant_memory 模式
+    （逐行写入临时文件，内存有界）写入临时文件，完成后再分块发送
+
+    Yields:
+        bytes: XLSX文件的字节块
+    """
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        date_format = workbook.add_format({"num_format": "yyyy-mm-dd"})
+        for symbol in symbols:
+            # 工作表名最长31个字符，不能包含 []:*?/\
+            sheet = workbook.add_worksheet(re.sub(r"[\[\]:*?/\\]", "_", symbol)[:31])
+            sheet.write_row(0, 0, ["date"] + fields)
+            row = 1
+            for chunk in store.iter_chunks(symbol, start, end, fields, _chunk_rows()):
+                dates = chunk.index.to_pydatetime()
+                values = chunk.to_numpy().tolist()
+                for day, record in zip(dates, values):
+                    sheet.write_datetime(row, 0, day, date_format)
+                    for column, value in enumerate(record, start=1):
+                        # 缺失值（None、NaN）留空；写入NaN时Excel显示为错误值
+                        if value is not None and value == value:
+                            sheet.write_number(row, column, value)
+                    row += 1
+        workbook.close()
+
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(_FILE_BLOCK)
+                if not block:
+                    break
+                yield block
+    finally:
+        os.unlink(path)
+
+
+EXPORT_STREAMS = {
+    "csv": stream_export_csv,
+    "parquet": stream_export_parquet,
+    "xlsx": stream_export_xlsx,
+}
@@ -0,0 +1,64 @@
+# 指标导出接口
+# 以Prometheus文本格式导出运行指标，无需额外的监控组件
+
+import hmac
+
+from flask import Flask, Response, abort, current_app, request
+
+from ..utils.config import config
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# Prometheus文本格式的Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def register_metrics_route(server: Flask) -> None:
+    """
+    注册指标导出接口
+
+    配置项:
+        METRICS_ENABLED: 是否启用指标接口（默认关闭）
+        METRICS_PATH: 接口路径（默认 /metrics）
+        METRICS_TOKEN: 访问令牌，请求需携带 Authorization: Bearer 请求头、
+            X-Metrics-Token 请求头或 token 参数；
+            未设置时指标接口只在开发模式（python -m src.main --debug）下可用，否则返回404
+
+    Args:
+        server: Flask服务器
+    """
+    if not config.get_bool("METRICS_ENABLED", False):
+        logger.info("Metrics endpoint disabled")
+        return
+
+    path = config.get("METRICS_PATH", "/metrics")
+    token = config.get("METRICS_TOKEN", "")
+
+    def metrics_endpoint() -> Response:
+        if not token:
+            # 未配置令牌时只在开发模式下开放，生产环境中如同接口不存在
+            if not current_app.debug:
+                abort(404)
+        else:
+            # Prometheus 的 authorization 配置发送 Authorization: Bearer <token>
+            bearer = request.headers.get("Authorization", "")
+            supplied = (
+                request.headers.get("X-Metrics-Token")
+                or request.args.get("token")
+                or (bearer[len("Bearer ") :] if bearer.startswith("Bearer ") else "")
+            )
+            # 常数时间比较，响应时间不泄露令牌的前缀
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                abort(403)
+        return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+    server.add_url_rule(path, "metrics", metrics_endpoint, methods=["GET"])
+    if not token:
+        logger.warning(
+            "Metrics endpoint enabled without METRICS_TOKEN, "
+            "it is only served in development mode (--debug)"
+        )
+    logger.info(f"Metrics endpoint registered at {path}")
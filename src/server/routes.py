@@ -0,0 +1,25 @@
+# 路由注册
+# 汇总各服务端接口，在创建Dash应用时注册到其Flask服务器上
+
+from flask import Flask
+
+from ..utils.logger import get_logger
+from .data_api import register_data_api
+from .debug import register_debug_routes
+from .metrics import register_metrics_route
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+
+def register_routes(server: Flask) -> None:
+    """
+    在Flask服务器上注册所有服务端接口
+
+    Args:
+        server: Dash应用底层的Flask服务器（app.server）
+    """
+    register_metrics_route(server)
+    register_debug_routes(server)
+    register_data_api(server)
+    logger.info("Server routes registered successfully")
@@ -0,0 +1,253 @@
+# 服务注册模块
+# 延迟创建API客户端和数据处理器，避免在导入和应用启动阶段加载重量级依赖
+
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict
+
+from .utils.tracing import tracer
+
+if TYPE_CHECKING:
+    from .api.alpha_vantage import AlphaVantageClient
+    from .data.fx import FXConverter
+    from .data.ingest import ImportQueue
+    from .data.processor import DataProcessor
+    from .data.quotes import QuoteHub
+    from .data.scheduler import RefreshScheduler
+    from .data.store import HistoryStore
+    from .data.validator import DataValidator
+
+_instances: Dict[str, Any] = {}
+# 可重入：服务的工厂函数可以获取其他服务（如定时刷新器需要API客户端）
+_lock = threading.RLock()
+
+
+def _reset_after_fork() -> None:
+    """
+    fork后在子进程中丢弃继承的服务实例（如gunicorn --preload），不关闭父进程的会话
+    """
+    global _lock
+
+    _lock = threading.RLock()
+    _instances.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _get_or_create(name: str, factory: Callable[[], Any]) -> Any:
+    """
+    获取指定名称的服务实例，首次访问时创建
+
+    Args:
+        name: 服务名称
+        factory: 创建服务实例的函数
+
+    Returns:
+        Any: 服务实例
+    """
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                with tracer.span("services.create", service=name):
+                    instance = _instances[name] = factory()
+    return instance
+
+
+def get_api_client() -> "AlphaVantageClient":
+    """
+    获取共享的Alpha Vantage客户端（首次调用时创建）
+
+    Returns:
+        AlphaVantageClient: API客户端实例
+    """
+
+    def factory():
+        from .api.alpha_vantage import AlphaVantageClient
+
+        return AlphaVantageClient()
+
+    return _get_or_create("api_client", factory)
+
+
+def get_data_processor() -> "DataProcessor":
+    """
+    获取共享的数据处理器（首次调用时创建，同时导入pandas）
+
+    Returns:
+        DataProcessor: 数据处理器实例
+    """
+
+    def factory():
+        from .data.processor import DataProcessor
+
+        return DataProcessor()
+
+    return _get_or_create("data_processor", factory)
+
+
+def get_data_validator() -> "DataValidator":
+    """
+    获取共享的数据验证器（首次调用时创建）
+
+    Returns:
+        DataValidator: 数据验证器实例
+    """
+
+    def factory():
+        from .data.validator import DataValidator
+
+        return DataValidator()
+
+    return _get_or_create("data_validator", factory)
+
+
+def get_history_store() -> "HistoryStore":
+    """
+    获取共享的本地历史数据存储（首次调用时创建）
+
+    Returns:
+        HistoryStore: 历史数据存储实例
+    """
+
+    def factory():
+        from .data.store import create_history_store
+
+        return create_history_store()
+
+    return _get_or_create("history_store", factory)
+
+
+def get_fx_converter() -> "FXConverter":
+    """
+    获取共享的汇率换算器（首次调用时创建）
+
+    Returns:
+        FXConverter: 汇率换算器实例
+    """
+
+    def factory():
+        from .data.fx import create_fx_converter
+
+        return create_fx_converter(get_api_client())
+
+    return _get_or_create("fx_converter", factory)
+
+
+def get_import_queue() -> "ImportQueue":
+    """
+    获取本进程的后台导入队列（首次调用时创建，首次加入股票时启动线程）
+
+    配置项:
+        HISTORY_IMPORT_RETRY: 同一股票两次后台导入之间的最短间隔（秒，默认600）
+        HISTORY_IMPORT_MAX_PENDING: 每个进程排队等待导入的最多股票数量（默认20）
+
+    Returns:
+        ImportQueue: 后台导入队列
+    """
+
+    def factory():
+        from .data.ingest import ImportQueue
+        from .utils.cache import get_shared_store
+        from .utils.config import config
+
+        return ImportQueue(
+            get_api_client(),
+            get_history_store(),
+            get_shared_store(),
+            retry_interval=config.get_int("HISTORY_IMPORT_RETRY", 600),
+            max_pending=config.get_int("HISTORY_IMPORT_MAX_PENDING", 20),
+        )
+
+    return _get_or_create("import_queue", factory)
+
+
+def get_refresh_scheduler() -> "RefreshScheduler":
+    """
+    获取本进程的收盘后定时刷新器（首次调用时创建，不自动启动）
+
+    Returns:
+        RefreshScheduler: 定时刷新器实例
+    """
+
+    def factory():
+        from .data.scheduler import create_refresh_scheduler
+
+        return create_refresh_scheduler()
+
+    return _get_or_create("refresh_scheduler", factory)
+
+
+def get_quote_hub() -> "QuoteHub":
+    """
+    获取本进程的报价中心（首次调用时创建）
+
+    配置项:
+        QUOTE_POLL_INTERVAL: 每个股票的报价轮询间隔（秒，默认60）
+        QUOTE_STREAM_MAX_SUBSCRIBERS: 每个进程最多的报价订阅者数量（默认为 GUNICORN_THREADS 的四分之一，
+            至少1个；不超过 GUNICORN_THREADS - 1）
+        QUOTE_QUOTA_SHARE: 报价轮询最多占用的 ALPHA_VANTAGE_RATE_LIMIT_* 配额比例（默认0.25）
+
+    Returns:
+        QuoteHub: 报价中心实例
+    """
+
+    def factory():
+        from .data.quotes import QuoteHub
+        from .utils.cache import get_shared_store
+        from .utils.config import config
+        from .utils.logger import get_logger
+        from .utils.rate_limit import RateLimiter
+
+        share = float(config.get("QUOTE_QUOTA_SHARE", "0.25"))
+        per_minute = config.get_int("ALPHA_VANTAGE_RATE_LIMIT_PER_MINUTE", 5)
+        per_day = config.get_int("ALPHA_VANTAGE_RATE_LIMIT_PER_DAY", 25)
+        limiter = None
+        if per_minute or per_day:
+            # 配额用尽时不等待，轮询线程直接跳到下一个窗口
+            limiter = RateLimiter(
+                "alpha_vantage_quotes",
+                per_minute=max(int(per_minute * share), 1) if per_minute else 0,
+                per_day=max(int(per_day * share), 1) if per_day else 0,
+                max_wait=0,
+            )
+
+        # gthread worker 中每个事件流连接占用一个请求线程直到断开，
+        # 订阅者只能占用少数线程，其余线程留给Dash回调和其他接口
+        threads = config.get_int("GUNICORN_THREADS", 4)
+        max_subscribers = config.get_int(
+            "QUOTE_STREAM_MAX_SUBSCRIBERS", max(threads // 4, 1)
+        )
+        if max_subscribers >= threads:
+            max_subscribers = max(threads - 1, 1)
+            get_logger(__name__).warning(
+                "QUOTE_STREAM_MAX_SUBSCRIBERS must be below GUNICORN_THREADS (%d), "
+                "using %d",
+                threads,
+                max_subscribers,
+            )
+
+        return QuoteHub(
+            get_api_client(),
+            get_shared_store(),
+            interval=config.get_int("QUOTE_POLL_INTERVAL", 60),
+            max_subscribers=max_subscribers,
+            limiter=limiter,
+        )
+
+    return _get_or_create("quote_hub", factory)
+
+
+def reset_services() -> None:
+    """
+    丢弃所有已创建的服务实例，下次访问时重新创建
+    """
+    with _lock:
+        for instance in _instances.values():
+            close = getattr(instance, "close", None)
+            if close is not None:
+                close()
+        _instances.clear()
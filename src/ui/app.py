@@ -1,22 +1,57 @@
 # Dash应用核心文件
 # 创建和配置Dash应用实例
 
+import time
 from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 import dash
-import dash_iconify
+
+# 组件库需要在提供首页之前导入，以便Dash注册其前端资源
 import dash_mantine_components as dmc
-import pandas as pd
-from dash import Input, Output, State, dcc, html
+from dash import ALL, ClientsideFunction, Input, Output, Patch, State, dcc, html
 
-from ..api.alpha_vantage import AlphaVantageClient
-from ..data.processor import DataProcessor
-from ..data.validator import DataValidator
+from ..server import register_routes
+from ..services import (
+    get_api_client,
+    get_data_processor,
+    get_data_validator,
+    get_history_store,
+)
+from ..utils.cache import get_cache, make_key, memoize
+from ..utils.config import config
 from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from ..utils.profiling import profiler
+from ..utils.startup import startup_timer
+from ..utils.tracing import tracer
+from .background import create_background_manager
+from .chart import CHART_PATH, create_chart_page, register_chart_callbacks
+from .history_table import (
+    HISTORY_TABLE_PATH,
+    create_history_table_page,
+    register_history_table_callbacks,
+)
+from .portfolio import (
+    PORTFOLIO_PATH,
+    create_portfolio_page,
+    register_portfolio_callbacks,
+)
+from .watchlist import (
+    WATCHLIST_PATH,
+    create_watchlist_page,
+    register_watchlist_callbacks,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # 获取日志记录器
 logger = get_logger(__name__)
 
+# 发送到浏览器端历史缓存的列
+HISTORY_COLUMNS = ["open", "high", "low", "close", "volume"]
+
 
 def create_app() -> dash.Dash:
     """
@@ -27,19 +62,30 @@ def create_app() -> dash.Dash:
     """
     logger.info("Creating Dash application...")
 
+    # 后台回调管理器（耗时的数据查询在独立进程中执行）
+    with startup_timer.phase("create_background_manager"):
+        background_manager = create_background_manager()
+
     # 创建Dash应用
     app = dash.Dash(
         __name__,
         title="iFinance - 智能金融数据查询系统",
         update_title="加载中...",
         suppress_callback_exceptions=True,
+        background_callback_manager=background_manager,
     )
 
     # 设置应用布局
-    app.layout = create_layout()
+    with startup_timer.phase("create_layout"):
+        app.layout = create_layout()
 
     # 注册回调函数
-    register_callbacks(app)
+    with startup_timer.phase("register_callbacks"):
+        register_callbacks(app, background_manager)
+
+    # 注册服务端接口（指标等）
+    with startup_timer.phase("register_routes"):
+        register_routes(app.server)
 
     logger.info("Dash application created successfully")
     return app
@@ -54,10 +100,18 @@ def create_layout() -> html.Div:
     """
     return dmc.MantineProvider(
         [
+            # 当前页面地址（决定显示哪个页面）
+            dcc.Location(id="url"),
             # 用于显示通知
             html.Div(id="notification-container"),
             # 存储选中股票的详细信息
             dcc.Store(id="selected-stock-info", data={}),
+            # 后台查询任务状态与取消信号
+            dcc.Store(id="fetch-running", data=False),
+            dcc.Store(id="fetch-cancel"),
+            # 浏览器端缓存的历史序列（列式结构）及服务器查询请求
+            dcc.Store(id="history-store"),
+            dcc.Store(id="fetch-request"),
             html.Div(
                 [
                     # 页面标题和头部
@@ -73,6 +127,7 @@ def create_layout() -> html.Div:
                                     "fontFamily": "Arial, sans-serif",
                                 },
                             ),
+                            create_navigation(),
                         ],
                         style={"padding": "20px"},
                     ),
@@ -210,6 +265,14 @@ def create_layout() -> html.Div:
                                             "margin": "0 auto",
                                         },
                                     ),
+                                    # 查询进度（后台任务执行期间显示）
+                                    html.Div(
+                                        id="fetch-progress",
+                                        style={
+                                            "maxWidth": "500px",
+                                            "margin": "15px auto 0 auto",
+                                        },
+                                    ),
                                     # 数据展示区域
                                     dcc.Loading(
                                         id="loading",
@@ -228,8 +291,17 @@ def create_layout() -> html.Div:
                                 ]
                             )
                         ],
+                        id={"type": "page", "path": "/"},
                         style={"padding": "0 20px"},
                     ),
+                    # 关注列表页面
+                    create_watchlist_page(),
+                    # K线图页面
+                    create_chart_page(),
+                    # 历史数据表格页面
+                    create_history_table_page(),
+                    # 投资组合页面
+                    create_portfolio_page(),
                     # 页脚
                     html.Div(
                         [
@@ -256,19 +328,82 @@ def create_layout() -> html.Div:
     )
 
 
-def register_callbacks(app: dash.Dash) -> None:
+def create_navigation() -> html.Div:
+    """
+    创建页面导航链接
+
+    Returns:
+        html.Div: 导航组件
+    """
+    link_style = {
+        "margin": "0 15px",
+        "color": "#3498db",
+        "textDecoration": "none",
+        "fontSize": "16px",
+    }
+    return html.Div(
+        [
+            dcc.Link("数据查询", href="/", style=link_style),
+            dcc.Link("关注列表", href=WATCHLIST_PATH, style=link_style),
+            dcc.Link("K线图", href=CHART_PATH, style=link_style),
+            dcc.Link("历史数据", href=HISTORY_TABLE_PATH, style=link_style),
+            dcc.Link("投资组合", href=PORTFOLIO_PATH, style=link_style),
+        ],
+        style={"textAlign": "center"},
+    )
+
+
+def register_callbacks(app: dash.Dash, background_manager: Any = None) -> None:
     """
     注册应用的回调函数
 
     Args:
         app: Dash应用实例
+        background_manager: 后台回调管理器，None表示所有回调同步执行
     """
     logger.info("Registering application callbacks...")
 
-    # 初始化组件
-    api_client = AlphaVantageClient()
-    data_processor = DataProcessor()
-    data_validator = DataValidator()
+    # API客户端和数据处理器在首次使用时才创建（见 src/services.py），
+    # 避免在worker启动阶段建立会话和导入pandas
+
+    # 共享缓存（多worker时为磁盘缓存）
+    cache = get_cache()
+    view_cache_ttl = config.get_int("VIEW_CACHE_TTL", 86400)
+    # 浏览器端序列缓存的有效期（秒），过期后重新向服务器确认数据版本
+    history_max_age = config.get_int(
+        "CLIENT_HISTORY_MAX_AGE", config.get_int("CACHE_TTL", 300)
+    )
+
+    @memoize("search", ttl=config.get_int("SEARCH_CACHE_TTL", 86400))
+    def search_symbols(keywords: str) -> List[Dict[str, str]]:
+        """
+        搜索股票代码（结果按关键词缓存）
+        """
+        return get_api_client().search_symbols(keywords)
+
+    @tracer.traced("get_daily_data")
+    def get_daily_data(symbol: str, output_size: str) -> Dict[str, Any]:
+        """
+        获取日线数据（带缓存），同时记录该数据的版本（last_refreshed）
+
+        缓存未命中时先查本地历史数据存储（定时刷新或批量导入写入），
+        本地数据已包含最近一个已收盘交易日时不再请求上游
+        """
+        data_key = make_key("daily", symbol, output_size)
+        daily_data = cache.get(data_key)
+        span = tracer.current_span()
+        span.set_attribute("cached", daily_data is not None)
+        if daily_data is None:
+            daily_data = get_history_store().get_current(symbol, output_size)
+            span.set_attribute("stored", daily_data is not None)
+            if daily_data is None:
+                daily_data = get_api_client().get_daily_data(symbol, output_size)
+            cache.set(data_key, daily_data)
+            cache.set(
+                make_key("version", symbol, output_size),
+                daily_data["meta_data"].get("last_refreshed", ""),
+            )
+        return daily_data
 
     @app.callback(
         [
@@ -281,6 +416,9 @@ def register_callbacks(app: dash.Dash) -> None:
         [State("stock-search-input", "value")],
         prevent_initial_call=True,
     )
+    @metrics.track("update_stock_dropdown")
+    @profiler.profile("update_stock_dropdown")
+    @tracer.traced("update_stock_dropdown")
     def update_stock_dropdown(n_clicks, search_value):
         """
         更新股票下拉选择框并存储搜索结果
@@ -289,9 +427,12 @@ def register_callbacks(app: dash.Dash) -> None:
             return [], None, {}, None
 
         try:
-            validated_keywords = data_validator.validate_search_keywords(search_value)
-            search_results = api_client.search_symbols(validated_keywords)
-            processed_results = data_processor.process_symbol_search_results(
+            validated_keywords = get_data_validator().validate_search_keywords(
+                search_value
+            )
+            # 只缓存原始搜索结果：市场状态依赖当前时间，每次重新计算
+            search_results = search_symbols(validated_keywords)
+            processed_results = get_data_processor().process_symbol_search_results(
                 search_results
             )
 
@@ -307,6 +448,8 @@ def register_callbacks(app: dash.Dash) -> None:
             return options, default_value, stock_info_map, None
 
         except Exception as e:
+            import dash_iconify
+
             logger.error(f"股票搜索失败: {e}", exc_info=True)
             error_message = f"搜索时发生错误: {e}"
             notification = dmc.Notification(
@@ -319,80 +462,68 @@ def register_callbacks(app: dash.Dash) -> None:
             )
             return [], None, {}, notification
 
-    @app.callback(
-        Output("fetch-data-button", "disabled"), [Input("stock-dropdown", "value")]
+    # 页面切换只修改各页面的显示状态，在客户端执行
+    app.clientside_callback(
+        ClientsideFunction(namespace="ifinance", function_name="showPage"),
+        Output({"type": "page", "path": ALL}, "style"),
+        [Input("url", "pathname")],
+        [
+            State({"type": "page", "path": ALL}, "id"),
+            State({"type": "page", "path": ALL}, "style"),
+        ],
     )
-    def toggle_fetch_button(selected_stock):
-        """
-        控制获取数据按钮的启用状态
-        """
-        return selected_stock is None
 
-    @app.callback(
+    register_watchlist_callbacks(app)
+    register_chart_callbacks(app)
+    register_history_table_callbacks(app)
+    register_portfolio_callbacks(app)
+
+    # 以下两个回调只读取浏览器端已有的数据，在客户端执行（见 assets/clientside.js），
+    # 切换下拉框不再产生服务器请求
+    app.clientside_callback(
+        ClientsideFunction(namespace="ifinance", function_name="toggleFetchButton"),
+        Output("fetch-data-button", "disabled"),
+        [Input("stock-dropdown", "value")],
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="ifinance", function_name="renderStockInfo"),
         Output("stock-info-card", "children"),
         [Input("stock-dropdown", "value")],
         [State("selected-stock-info", "data")],
     )
-    def update_stock_info_display(selected_stock, stock_info_data):
-        """
-        更新股票信息卡片显示
-        """
-        if not selected_stock or not stock_info_data:
-            return html.Div()
-
-        stock_info = stock_info_data.get(selected_stock, {})
-        if not stock_info:
-            return html.Div()
 
-        return create_stock_info_card(stock_info)
-
-    @app.callback(
-        Output("data-display", "children"),
-        [Input("fetch-data-button", "n_clicks")],
-        [
-            State("stock-dropdown", "value"),
-            State("date-picker", "value"),
-            State("selected-stock-info", "data"),
-        ],
+    # 仅在后台查询进行中切换股票时才发出取消信号，空闲时切换不产生服务器请求
+    app.clientside_callback(
+        ClientsideFunction(namespace="ifinance", function_name="requestFetchCancel"),
+        Output("fetch-cancel", "data"),
+        [Input("stock-dropdown", "value")],
+        [State("fetch-running", "data")],
+        prevent_initial_call=True,
     )
-    def update_stock_data(n_clicks, selected_stock, selected_date, stock_info_data):
-        """
-        更新股票OHLCV数据显示
+
+    # 后台回调在短生命周期的子进程中执行，结束时立即合并指标
+    @metrics.track("update_stock_data", flush=background_manager is not None)
+    @profiler.profile("update_stock_data")
+    @tracer.traced("update_stock_data")
+    def update_stock_data(set_progress, fetch_request, stock_info_data):
         """
-        if n_clicks == 0 or not selected_stock:
-            return None
+        更新股票OHLCV数据显示，并把处理后的序列以列式结构发送到浏览器缓存
 
-        try:
-            # 智能选择输出大小：根据选择的日期决定使用compact还是full
-            from datetime import datetime
-
-            # 计算选择日期距今的天数
-            if selected_date:
-                target_date = pd.to_datetime(selected_date)
-                days_diff = (datetime.now() - target_date).days
-
-                # 如果选择的日期超过80天前，使用full模式获取完整历史数据
-                if days_diff > 80:
-                    output_size = "full"
-                    logger.info(
-                        f"选择日期距今{days_diff}天，使用full模式获取完整历史数据"
-                    )
-                else:
-                    output_size = "compact"
-                    logger.info(
-                        f"选择日期距今{days_diff}天，使用compact模式获取近期数据"
-                    )
-            else:
-                # 未选择日期时，默认使用compact模式
-                output_size = "compact"
-                logger.info("未选择日期，使用compact模式获取近期数据")
+        只有浏览器缓存无法覆盖所选日期时才会触发（见 assets/clientside.js 中的
+        resolveDate）。渲染结果按 (股票代码, 日期, 货币, 数据版本) 缓存，数据版本
+        取自 meta_data.last_refreshed，上游数据更新后旧的缓存条目自然失效
+        """
+        if not fetch_request or not fetch_request.get("symbol"):
+            return None, dash.no_update
 
-            # 获取日线数据
-            daily_data = api_client.get_daily_data(selected_stock, output_size)
+        selected_stock = fetch_request["symbol"]
+        selected_date = fetch_request.get("date")
+        client_history = fetch_request.get("cached") or {}
 
-            # 处理数据：当使用full模式时不限制天数，compact模式时限制100天
-            days_limit = None if output_size == "full" else 100
-            df = data_processor.process_daily_data(daily_data, days_limit=days_limit)
+        try:
+            data_processor = get_data_processor()
+            output_size = choose_output_size(selected_date)
 
             # 获取货币符号
             currency_symbol = "$"  # 默认美元符号
@@ -402,99 +533,327 @@ def register_callbacks(app: dash.Dash) -> None:
                     stock_info.get("currency", "USD")
                 )
 
-            # 检查是否选择了日期
-            if selected_date is not None:
-                # 查找指定日期的数据
-                target_date = pd.to_datetime(selected_date).strftime("%Y-%m-%d")
-
-                if target_date in df.index.strftime("%Y-%m-%d"):
-                    # 找到指定日期的数据
-                    day_data = df[df.index.strftime("%Y-%m-%d") == target_date].iloc[0]
+            date_key = normalize_date(selected_date) or "latest"
+            span = tracer.current_span()
+            span.set_attributes(
+                symbol=selected_stock, date=date_key, output_size=output_size
+            )
 
-                    return create_ohlcv_display(
-                        selected_stock, target_date, day_data, currency_symbol
+            # 已知数据版本时直接尝试返回缓存的渲染结果
+            version = cache.get(make_key("version", selected_stock, output_size))
+            view = history = None
+            if version is not None:
+                view = cache.get(
+                    make_key("view", selected_stock, date_key, currency_symbol, version)
+                )
+                history = cache.get(
+                    make_key(
+                        "history", selected_stock, output_size, currency_symbol, version
                     )
-                else:
-                    # 没有找到指定日期的数据，显示最近的数据
-                    latest_data = df.iloc[0]
-                    latest_date = df.index[0].strftime("%Y-%m-%d")
+                )
 
-                    return html.Div(
-                        [
-                            html.Div(
-                                [
-                                    html.H4(
-                                        "提示",
-                                        style={
-                                            "color": "#f39c12",
-                                            "marginBottom": "15px",
-                                        },
-                                    ),
-                                    html.P(
-                                        (
-                                            f"未找到 {target_date} 的数据，"
-                                            f"显示最近交易日 {latest_date} 的数据："
-                                        )
-                                    ),
-                                ],
-                                style={
-                                    "backgroundColor": "#fef9e7",
-                                    "padding": "15px",
-                                    "borderRadius": "8px",
-                                    "border": "1px solid #f1c40f",
-                                    "marginBottom": "20px",
-                                },
-                            ),
-                            create_ohlcv_display(
-                                selected_stock,
-                                latest_date,
-                                latest_data,
-                                currency_symbol,
-                            ),
-                        ]
-                    )
+            span.set_attribute("view_cached", view is not None and history is not None)
+            if view is not None and history is not None:
+                logger.debug(
+                    "View cache hit for %s on %s (version %s)",
+                    selected_stock,
+                    date_key,
+                    version,
+                )
             else:
-                # 没有选择日期，显示最近的数据
-                latest_data = df.iloc[0]
-                latest_date = df.index[0].strftime("%Y-%m-%d")
+                # 获取日线数据
+                set_progress(
+                    (
+                        create_progress_display(
+                            1, 3, f"正在获取 {selected_stock} 的日线数据..."
+                        ),
+                    )
+                )
+                daily_data = get_daily_data(selected_stock, output_size)
+                version = daily_data["meta_data"].get("last_refreshed", "")
+
+                # 处理数据：当使用full模式时不限制天数，compact模式时限制100天
+                set_progress((create_progress_display(2, 3, "正在处理数据..."),))
+                days_limit = None if output_size == "full" else 100
+                df = data_processor.process_daily_data(
+                    daily_data, days_limit=days_limit
+                )
+
+                set_progress((create_progress_display(3, 3, "正在生成展示内容..."),))
+                view = create_stock_data_view(
+                    selected_stock, selected_date, df, currency_symbol
+                )
+                history = {
+                    "symbol": selected_stock,
+                    "output_size": output_size,
+                    "version": version,
+                    "currency_symbol": currency_symbol,
+                    "series": data_processor.to_columnar(df, HISTORY_COLUMNS),
+                }
+
+                cache.set(
+                    make_key(
+                        "view", selected_stock, date_key, currency_symbol, version
+                    ),
+                    view,
+                    view_cache_ttl,
+                )
+                cache.set(
+                    make_key(
+                        "history", selected_stock, output_size, currency_symbol, version
+                    ),
+                    history,
+                    view_cache_ttl,
+                )
+
+            fetched_at = int(time.time() * 1000)
+
+            # 浏览器已缓存同一版本（或更完整）的序列时不再重复发送，只刷新获取时间，
+            # 否则序列超过 max_age 后浏览器端再也无法直接使用它
+            if (
+                client_history.get("symbol") == selected_stock
+                and client_history.get("version") == version
+                and client_history.get("output_size") in (output_size, "full")
+            ):
+                span.set_attribute("history_sent", False)
+                refreshed = Patch()
+                refreshed["fetched_at"] = fetched_at
+                refreshed["max_age"] = history_max_age
+                return view, refreshed
+
+            span.set_attribute("history_sent", True)
+
+            return view, dict(history, fetched_at=fetched_at, max_age=history_max_age)
+
+        except Exception as e:
+            logger.error(f"Failed to fetch stock data: {str(e)}")
+            return create_error_card(str(e)), dash.no_update
+
+    # 日期能由浏览器缓存的序列覆盖时直接在客户端渲染，否则发出服务器查询请求
+    app.clientside_callback(
+        ClientsideFunction(namespace="ifinance", function_name="resolveDate"),
+        [
+            Output("data-display", "children", allow_duplicate=True),
+            Output("fetch-request", "data"),
+        ],
+        [Input("fetch-data-button", "n_clicks"), Input("date-picker", "value")],
+        [State("stock-dropdown", "value"), State("history-store", "data")],
+        prevent_initial_call=True,
+    )
+
+    stock_data_outputs = [
+        Output("data-display", "children"),
+        Output("history-store", "data"),
+    ]
+    stock_data_inputs = [Input("fetch-request", "data")]
+    stock_data_states = [State("selected-stock-info", "data")]
+
+    if background_manager is not None:
+        # 在后台任务中执行：web worker只负责轮询任务状态，
+        # 用户在查询进行中切换股票时取消正在执行的任务
+        app.callback(
+            stock_data_outputs,
+            stock_data_inputs,
+            stock_data_states,
+            prevent_initial_call=True,
+            background=True,
+            manager=background_manager,
+            progress=[Output("fetch-progress", "children")],
+            progress_default=[None],
+            running=[
+                (
+                    Output("fetch-data-button", "children"),
+                    "查询中...",
+                    "查询OHLCV数据",
+                ),
+                (Output("fetch-running", "data"), True, False),
+            ],
+            cancel=[Input("fetch-cancel", "data")],
+            interval=500,
+        )(update_stock_data)
+    else:
+
+        @app.callback(
+            stock_data_outputs,
+            stock_data_inputs,
+            stock_data_states,
+            prevent_initial_call=True,
+        )
+        def update_stock_data_sync(*args):
+            """
+            同步执行的OHLCV数据查询（未启用后台回调时使用）
+            """
+            return update_stock_data(lambda progress: None, *args)
+
+    logger.info("Application callbacks registered successfully")
 
-                return html.Div(
+
+def create_progress_display(step: int, total: int, message: str) -> html.Div:
+    """
+    创建后台查询任务的进度显示
+
+    Args:
+        step: 当前步骤
+        total: 总步骤数
+        message: 进度说明
+
+    Returns:
+        html.Div: 进度显示组件
+    """
+    return html.Div(
+        [
+            html.Progress(value=str(step), max=str(total), style={"width": "100%"}),
+            html.P(
+                f"({step}/{total}) {message}",
+                style={"color": "#7f8c8d", "fontSize": "12px", "margin": "5px 0 0 0"},
+            ),
+        ]
+    )
+
+
+def normalize_date(selected_date: Optional[str]) -> Optional[str]:
+    """
+    将日期选择器的值规范化为 YYYY-MM-DD 格式
+
+    Args:
+        selected_date: 日期选择器的值（可能包含时间部分）
+
+    Returns:
+        Optional[str]: 规范化后的日期，未选择日期时为None
+    """
+    if not selected_date:
+        return None
+    return str(selected_date)[:10]
+
+
+def choose_output_size(selected_date: Optional[str]) -> str:
+    """
+    智能选择输出大小：根据选择的日期决定使用compact还是full
+
+    Args:
+        selected_date: 选择的日期
+
+    Returns:
+        str: 'compact' 或 'full'
+    """
+    target_date = normalize_date(selected_date)
+    if not target_date:
+        # 未选择日期时，默认使用compact模式
+        logger.info("未选择日期，使用compact模式获取近期数据")
+        return "compact"
+
+    # 计算选择日期距今的天数
+    days_diff = (datetime.now() - datetime.strptime(target_date, "%Y-%m-%d")).days
+
+    # 如果选择的日期超过80天前，使用full模式获取完整历史数据
+    if days_diff > 80:
+        logger.info("选择日期距今%d天，使用full模式获取完整历史数据", days_diff)
+        return "full"
+
+    logger.info("选择日期距今%d天，使用compact模式获取近期数据", days_diff)
+    return "compact"
+
+
+@tracer.traced("ui.create_stock_data_view")
+def create_stock_data_view(
+    symbol: str,
+    selected_date: Optional[str],
+    df: "pd.DataFrame",
+    currency_symbol: str = "$",
+) -> html.Div:
+    """
+    根据处理后的日线数据创建指定日期的展示内容
+
+    Args:
+        symbol: 股票代码
+        selected_date: 选择的日期，None表示显示最近交易日
+        df: 处理后的数据框（按日期降序）
+        currency_symbol: 货币符号
+
+    Returns:
+        html.Div: 数据展示组件
+    """
+    # 检查是否选择了日期
+    if selected_date is not None:
+        # 查找指定日期的数据
+        target_date = normalize_date(selected_date)
+        date_index = df.index.strftime("%Y-%m-%d")
+
+        if target_date in date_index:
+            # 找到指定日期的数据
+            day_data = df[date_index == target_date].iloc[0]
+
+            return create_ohlcv_display(symbol, target_date, day_data, currency_symbol)
+
+        # 没有找到指定日期的数据，显示最近的数据
+        latest_data = df.iloc[0]
+        latest_date = df.index[0].strftime("%Y-%m-%d")
+
+        return html.Div(
+            [
+                html.Div(
                     [
-                        html.Div(
-                            [
-                                html.H4(
-                                    "提示",
-                                    style={"color": "#3498db", "marginBottom": "15px"},
-                                ),
-                                html.P(
-                                    (
-                                        f"未选择日期，显示最近交易日 {latest_date} 的数据："
-                                    )
-                                ),
-                            ],
+                        html.H4(
+                            "提示",
                             style={
-                                "backgroundColor": "#e8f4fd",
-                                "padding": "15px",
-                                "borderRadius": "8px",
-                                "border": "1px solid #3498db",
-                                "marginBottom": "20px",
+                                "color": "#f39c12",
+                                "marginBottom": "15px",
                             },
                         ),
-                        create_ohlcv_display(
-                            selected_stock, latest_date, latest_data, currency_symbol
+                        html.P(
+                            (
+                                f"未找到 {target_date} 的数据，"
+                                f"显示最近交易日 {latest_date} 的数据："
+                            )
                         ),
-                    ]
-                )
+                    ],
+                    style={
+                        "backgroundColor": "#fef9e7",
+                        "padding": "15px",
+                        "borderRadius": "8px",
+                        "border": "1px solid #f1c40f",
+                        "marginBottom": "20px",
+                    },
+                ),
+                create_ohlcv_display(
+                    symbol,
+                    latest_date,
+                    latest_data,
+                    currency_symbol,
+                ),
+            ]
+        )
 
-        except Exception as e:
-            logger.error(f"Failed to fetch stock data: {str(e)}")
-            return create_error_card(str(e))
+    # 没有选择日期，显示最近的数据
+    latest_data = df.iloc[0]
+    latest_date = df.index[0].strftime("%Y-%m-%d")
 
-    logger.info("Application callbacks registered successfully")
+    return html.Div(
+        [
+            html.Div(
+                [
+                    html.H4(
+                        "提示",
+                        style={"color": "#3498db", "marginBottom": "15px"},
+                    ),
+                    html.P((f"未选择日期，显示最近交易日 {latest_date} 的数据：")),
+                ],
+                style={
+                    "backgroundColor": "#e8f4fd",
+                    "padding": "15px",
+                    "borderRadius": "8px",
+                    "border": "1px solid #3498db",
+                    "marginBottom": "20px",
+                },
+            ),
+            create_ohlcv_display(symbol, latest_date, latest_data, currency_symbol),
+        ]
+    )
 
 
+@tracer.traced("ui.create_ohlcv_display")
 def create_ohlcv_display(
-    symbol: str, date: str, data: pd.Series, currency_symbol: str = "$"
+    symbol: str, date: str, data: "pd.Series", currency_symbol: str = "$"
 ) -> html.Div:
     """
     创建OHLCV数据显示卡片
@@ -642,7 +1001,7 @@ def create_ohlcv_display(
                                 style={"color": "#34495e", "marginBottom": "10px"},
                             ),
                             html.H2(
-                                f"{data.get('volume', 0):,}",
+                                f"{int(data.get('volume', 0)):,}",
                                 style={"color": "#9b59b6", "margin": "0"},
                             ),
                         ],
@@ -815,139 +1174,6 @@ def create_ohlcv_display(
     )
 
 
-def create_stock_info_card(stock_info):
-    """
-    创建股票信息展示卡片
-
-    Args:
-        stock_info: 包含股票详细信息的字典
-
-    Returns:
-        html.Div: 股票信息展示组件
-    """
-    if not stock_info:
-        return html.Div()
-
-    # 获取市场状态颜色
-    status_colors = {
-        "open": "#27ae60",
-        "closed": "#e74c3c",
-        "pre_market": "#f39c12",
-        "after_hours": "#f39c12",
-        "unknown": "#95a5a6",
-    }
-    status_color = status_colors.get(
-        stock_info.get("market_status", {}).get("status", "unknown"), "#95a5a6"
-    )
-
-    return html.Div(
-        [
-            html.H3(
-                "📊 选中股票信息",
-                style={"color": "#2c3e50", "marginBottom": "15px", "fontSize": "18px"},
-            ),
-            html.Div(
-                [
-                    # 股票名称和基本信息
-                    html.Div(
-                        [
-                            html.H4(
-                                (
-                                    f"{stock_info.get('symbol', '')} - "
-                                    f"{stock_info.get('name', '')}"
-                                ),
-                                style={
-                                    "color": "#2c3e50",
-                                    "margin": "0 0 10px 0",
-                                    "fontSize": "16px",
-                                    "fontWeight": "bold",
-                                },
-                            ),
-                            html.Div(
-                                [
-                                    html.Span(
-                                        f"🌍 {stock_info.get('region', '')}",
-                                        style={
-                                            "backgroundColor": "#3498db",
-                                            "color": "white",
-                                            "padding": "4px 8px",
-                                            "borderRadius": "12px",
-                                            "fontSize": "12px",
-                                            "marginRight": "8px",
-                                        },
-                                    ),
-                                    html.Span(
-                                        f"📈 {stock_info.get('type', '')}",
-                                        style={
-                                            "backgroundColor": "#9b59b6",
-                                            "color": "white",
-                                            "padding": "4px 8px",
-                                            "borderRadius": "12px",
-                                            "fontSize": "12px",
-                                            "marginRight": "8px",
-                                        },
-                                    ),
-                                    html.Span(
-                                        f"{stock_info.get('currency_symbol', stock_info.get('currency', ''))} {stock_info.get('currency', '')}",
-                                        style={
-                                            "backgroundColor": "#f1c40f",
-                                            "color": "white",
-                                            "padding": "4px 8px",
-                                            "borderRadius": "12px",
-                                            "fontSize": "12px",
-                                            "marginRight": "8px",
-                                        },
-                                    ),
-                                ],
-                                style={"marginBottom": "10px"},
-                            ),
-                            # 交易时间信息
-                            html.P(
-                                (
-                                    f"🕐 交易时间: {stock_info.get('market_open', '')}-"
-                                    f"{stock_info.get('market_close', '')} "
-                                    f"({stock_info.get('timezone', '')})"
-                                ),
-                                style={
-                                    "margin": "5px 0",
-                                    "fontSize": "14px",
-                                    "color": "#7f8c8d",
-                                },
-                            ),
-                            # 市场状态
-                            html.Div(
-                                [
-                                    html.Span(
-                                        f"● {stock_info.get('market_status', {}).get('status_text', '状态未知')}",
-                                        style={
-                                            "color": status_color,
-                                            "fontWeight": "bold",
-                                            "marginRight": "10px",
-                                        },
-                                    ),
-                                    html.Span(
-                                        stock_info.get("market_status", {}).get(
-                                            "next_event", ""
-                                        ),
-                                        style={"color": "#7f8c8d", "fontSize": "12px"},
-                                    ),
-                                ]
-                            ),
-                        ]
-                    )
-                ],
-                style={
-                    "backgroundColor": "#f8f9fa",
-                    "padding": "15px",
-                    "borderRadius": "8px",
-                    "border": "1px solid #e9ecef",
-                    "marginBottom": "15px",
-                },
-            ),
-        ]
-    )
-
-
 def create_error_card(error_message: str) -> html.Div:
     """
     创建错误信息卡片
@@ -0,0 +1,436 @@
+// iFinance 客户端回调
+// 只依赖浏览器已有数据的回调在这里实现，避免一次服务器往返
+
+(function () {
+    "use strict";
+
+    // 构造 dash_html_components 组件（与服务端返回的组件JSON结构一致）
+    function h(type, props, children) {
+        var allProps = Object.assign({}, props || {});
+        if (children !== undefined) {
+            allProps.children = children;
+        }
+        return {type: type, namespace: "dash_html_components", props: allProps};
+    }
+
+    function emptyDiv() {
+        return h("Div", {});
+    }
+
+    // 市场状态颜色
+    var STATUS_COLORS = {
+        open: "#27ae60",
+        closed: "#e74c3c",
+        pre_market: "#f39c12",
+        after_hours: "#f39c12",
+        unknown: "#95a5a6"
+    };
+
+    function badge(text, color) {
+        return h("Span", {
+            style: {
+                backgroundColor: color,
+                color: "white",
+                padding: "4px 8px",
+                borderRadius: "12px",
+                fontSize: "12px",
+                marginRight: "8px"
+            }
+        }, text);
+    }
+
+    // 创建股票信息展示卡片
+    function createStockInfoCard(info) {
+        var status = info.market_status || {};
+        var statusColor = STATUS_COLORS[status.status || "unknown"] || "#95a5a6";
+        var currency = info.currency || "";
+        var currencySymbol = info.currency_symbol || currency;
+
+        return h("Div", {}, [
+            h("H3", {
+                style: {color: "#2c3e50", marginBottom: "15px", fontSize: "18px"}
+            }, "📊 选中股票信息"),
+            h("Div", {
+                style: {
+                    backgroundColor: "#f8f9fa",
+                    padding: "15px",
+                    borderRadius: "8px",
+                    border: "1px solid #e9ecef",
+                    marginBottom: "15px"
+                }
+            }, [
+                h("Div", {}, [
+                    // 股票名称和基本信息
+                    h("H4", {
+                        style: {
+                            color: "#2c3e50",
+                            margin: "0 0 10px 0",
+                            fontSize: "16px",
+                            fontWeight: "bold"
+                        }
+                    }, (info.symbol || "") + " - " + (info.name || "")),
+                    h("Div", {style: {marginBottom: "10px"}}, [
+                        badge("🌍 " + (info.region || ""), "#3498db"),
+                        badge("📈 " + (info.type || ""), "#9b59b6"),
+                        badge(currencySymbol + " " + currency, "#f1c40f")
+                    ]),
+                    // 交易时间信息
+                    h("P", {
+                        style: {margin: "5px 0", fontSize: "14px", color: "#7f8c8d"}
+                    },
+                    "🕐 交易时间: " + (info.market_open || "") + "-" +
+                        (info.market_close || "") + " (" + (info.timezone || "") + ")"),
+                    // 市场状态
+                    h("Div", {}, [
+                        h("Span", {
+                            style: {
+                                color: statusColor,
+                                fontWeight: "bold",
+                                marginRight: "10px"
+                            }
+                        }, "● " + (status.status_text || "状态未知")),
+                        h("Span", {
+                            style: {color: "#7f8c8d", fontSize: "12px"}
+                        }, status.next_event || "")
+                    ])
+                ])
+            ])
+        ]);
+    }
+
+    // 数值格式化（与服务端 f"{x:.2f}"、f"{x:+.2f}"、f"{x:,}" 一致）
+    function fixed2(value) {
+        return Number(value || 0).toFixed(2);
+    }
+
+    function signed2(value) {
+        return (value >= 0 ? "+" : "") + value.toFixed(2);
+    }
+
+    function thousands(value) {
+        return Math.round(value || 0).toLocaleString("en-US");
+    }
+
+    var CELL_STYLE = {
+        backgroundColor: "#ecf0f1",
+        padding: "20px",
+        borderRadius: "8px",
+        textAlign: "center",
+        width: "48%",
+        display: "inline-block"
+    };
+
+    function priceCell(title, text, color, withMargin) {
+        var style = Object.assign({}, CELL_STYLE);
+        if (withMargin) {
+            style.marginRight = "2%";
+        }
+        return h("Div", {style: style}, [
+            h("H4", {style: {color: "#34495e", marginBottom: "10px"}}, title),
+            h("H2", {style: {color: color, margin: "0"}}, text)
+        ]);
+    }
+
+    function changeCell(title, text, color, withMargin) {
+        var style = {width: "48%", display: "inline-block", textAlign: "center"};
+        if (withMargin) {
+            style.marginRight = "2%";
+        }
+        return h("Div", {style: style}, [
+            h("P", {
+                style: {fontSize: "14px", color: "#7f8c8d", margin: "0 0 5px 0"}
+            }, title),
+            h("P", {
+                style: {
+                    fontSize: "18px",
+                    color: color,
+                    margin: "0",
+                    fontWeight: "bold"
+                }
+            }, text)
+        ]);
+    }
+
+    // 创建OHLCV数据显示卡片（服务端 create_ohlcv_display 的客户端版本）
+    function createOhlcvDisplay(symbol, date, bar, currencySymbol) {
+        var intradayChange = bar.close - bar.open;
+        var intradayChangePercent = bar.open !== 0 ?
+            intradayChange / bar.open * 100 : 0;
+        var changeColor = intradayChange >= 0 ? "#e74c3c" : "#27ae60";  // 涨红跌绿
+
+        return h("Div", {
+            style: {
+                backgroundColor: "white",
+                padding: "30px",
+                borderRadius: "12px",
+                boxShadow: "0 4px 6px rgba(0,0,0,0.1)",
+                maxWidth: "800px",
+                margin: "0 auto"
+            }
+        }, [
+            h("H3", {
+                style: {color: "#2c3e50", marginBottom: "25px", textAlign: "center"}
+            }, symbol + " - " + date + " OHLCV数据"),
+            h("Div", {}, [
+                h("Div", {style: {marginBottom: "15px"}}, [
+                    priceCell("开盘价 (Open)", currencySymbol + fixed2(bar.open),
+                        "#3498db", true),
+                    priceCell("收盘价 (Close)", currencySymbol + fixed2(bar.close),
+                        changeColor, false)
+                ]),
+                h("Div", {style: {marginBottom: "15px"}}, [
+                    priceCell("最高价 (High)", currencySymbol + fixed2(bar.high),
+                        "#e74c3c", true),
+                    priceCell("最低价 (Low)", currencySymbol + fixed2(bar.low),
+                        "#27ae60", false)
+                ]),
+                h("Div", {
+                    style: {
+                        backgroundColor: "#ecf0f1",
+                        padding: "20px",
+                        borderRadius: "8px",
+                        textAlign: "center",
+                        marginBottom: "15px"
+                    }
+                }, [
+                    h("H4", {
+                        style: {color: "#34495e", marginBottom: "10px"}
+                    }, "成交量 (Volume)"),
+                    h("H2", {
+                        style: {color: "#9b59b6", margin: "0"}
+                    }, thousands(bar.volume))
+                ]),
+                h("Div", {
+                    style: {
+                        backgroundColor: "#ecf0f1",
+                        padding: "20px",
+                        borderRadius: "8px"
+                    }
+                }, [
+                    h("H4", {
+                        style: {
+                            color: "#34495e",
+                            marginBottom: "15px",
+                            textAlign: "center"
+                        }
+                    }, "日内涨跌信息"),
+                    h("Div", {}, [
+                        changeCell("涨跌额", signed2(intradayChange), changeColor, true),
+                        changeCell("涨跌幅", signed2(intradayChangePercent) + "%",
+                            changeColor, false)
+                    ])
+                ]),
+                h("Div", {
+                    style: {
+                        backgroundColor: "#f8f9fa",
+                        padding: "15px",
+                        borderRadius: "8px",
+                        border: "1px solid #dee2e6",
+                        marginTop: "15px"
+                    }
+                }, [
+                    h("H4", {
+                        style: {
+                            color: "#34495e",
+                            marginBottom: "15px",
+                            textAlign: "center"
+                        }
+                    }, "📋 数据源说明"),
+                    h("Div", {}, [
+                        h("P", {style: {margin: "8px 0", fontSize: "14px"}}, [
+                            "📊 数据来源: ",
+                            h("Strong", {style: {color: "#3498db"}}, "Alpha Vantage API"),
+                            " (免费版)"
+                        ]),
+                        h("P", {style: {margin: "8px 0 12px 0", fontSize: "14px"}}, [
+                            "💰 价格类型: ",
+                            h("Strong", {style: {color: "#e67e22"}}, "原始交易价格"),
+                            " (未调整)"
+                        ]),
+                        h("P", {
+                            style: {margin: "8px 0", fontSize: "12px", color: "#7f8c8d"}
+                        }, [
+                            "📖 了解更多关于数据差异的原因，请参考 ",
+                            h("A", {
+                                href: "https://www.alphavantage.co/documentation/",
+                                target: "_blank",
+                                style: {color: "#3498db", textDecoration: "underline"}
+                            }, "Alpha Vantage官方文档")
+                        ])
+                    ])
+                ])
+            ])
+        ]);
+    }
+
+    function notice(message, titleColor, borderColor, background) {
+        return h("Div", {
+            style: {
+                backgroundColor: background,
+                padding: "15px",
+                borderRadius: "8px",
+                border: "1px solid " + borderColor,
+                marginBottom: "20px"
+            }
+        }, [
+            h("H4", {style: {color: titleColor, marginBottom: "15px"}}, "提示"),
+            h("P", {}, message)
+        ]);
+    }
+
+    // 读取列式序列中第 i 个交易日的数据
+    function barAt(series, i) {
+        return {
+            open: series.open[i],
+            high: series.high[i],
+            low: series.low[i],
+            close: series.close[i],
+            volume: series.volume[i]
+        };
+    }
+
+    // 浏览器缓存的序列能否回答该日期的查询（日期为空表示最近交易日）
+    function historyCovers(history, symbol, date) {
+        if (!history || !history.series || history.symbol !== symbol) {
+            return false;
+        }
+        if (Date.now() - (history.fetched_at || 0) > (history.max_age || 0) * 1000) {
+            return false;
+        }
+        var dates = history.series.dates;
+        if (!dates || dates.length === 0) {
+            return false;
+        }
+        // 序列按日期降序排列
+        return !date || (date >= dates[dates.length - 1] && date <= dates[0]);
+    }
+
+    // 根据浏览器缓存的序列渲染指定日期（服务端 create_stock_data_view 的客户端版本）
+    function createStockDataView(history, date) {
+        var series = history.series;
+        var currencySymbol = history.currency_symbol || "$";
+        var latestDate = series.dates[0];
+
+        if (date) {
+            var index = series.dates.indexOf(date);
+            if (index >= 0) {
+                return createOhlcvDisplay(
+                    history.symbol, date, barAt(series, index), currencySymbol
+                );
+            }
+            return h("Div", {}, [
+                notice("未找到 " + date + " 的数据，显示最近交易日 " + latestDate +
+                    " 的数据：", "#f39c12", "#f1c40f", "#fef9e7"),
+                createOhlcvDisplay(
+                    history.symbol, latestDate, barAt(series, 0), currencySymbol
+                )
+            ]);
+        }
+
+        return h("Div", {}, [
+            notice("未选择日期，显示最近交易日 " + latestDate + " 的数据：",
+                "#3498db", "#3498db", "#e8f4fd"),
+            createOhlcvDisplay(
+                history.symbol, latestDate, barAt(series, 0), currencySymbol
+            )
+        ]);
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        ifinance: {
+            // 控制获取数据按钮的启用状态
+            toggleFetchButton: function (selectedStock) {
+                return selectedStock === null || selectedStock === undefined;
+            },
+
+            // 按地址显示对应页面（id 为 {type: "page", path: ...} 的组件），未知地址显示首页
+            showPage: function (pathname, ids, styles) {
+                var known = ids.some(function (id) {
+                    return id.path === pathname;
+                });
+                var current = known ? pathname : "/";
+                return ids.map(function (id, i) {
+                    return Object.assign({}, styles[i], {
+                        display: id.path === current ? "block" : "none"
+                    });
+                });
+            },
+
+            // 历史数据页面的导出链接（数据接口 /api/v1/export）
+            exportLinks: function (symbol, ids) {
+                var value = (symbol || "").trim().toUpperCase();
+                return ids.map(function (id) {
+                    if (!value) {
+                        return null;
+                    }
+                    return "/api/v1/export?symbols=" + encodeURIComponent(value) +
+                        "&format=" + id.format;
+                });
+            },
+
+            // 关注列表页面不可见时停止定时刷新
+            watchlistInactive: function (pathname) {
+                return pathname !== "/watchlist";
+            },
+
+            // 投资组合页面不可见时停止定时刷新
+            portfolioInactive: function (pathname) {
+                return pathname !== "/portfolio";
+            },
+
+            // 更新股票信息卡片显示
+            renderStockInfo: function (selectedStock, stockInfoData) {
+                if (!selectedStock || !stockInfoData) {
+                    return emptyDiv();
+                }
+                var info = stockInfoData[selectedStock];
+                if (!info) {
+                    return emptyDiv();
+                }
+                return createStockInfoCard(info);
+            },
+
+            // 后台查询进行中切换股票时发出取消信号
+            requestFetchCancel: function (selectedStock, fetchRunning) {
+                if (!fetchRunning) {
+                    return window.dash_clientside.no_update;
+                }
+                return Date.now();
+            },
+
+            // 解析查询日期：浏览器缓存覆盖时直接渲染，否则向服务器发出查询请求
+            resolveDate: function (nClicks, selectedDate, selectedStock, history) {
+                var noUpdate = window.dash_clientside.no_update;
+                var triggered = window.dash_clientside.callback_context.triggered;
+                var byClick = triggered.some(function (t) {
+                    return t.prop_id === "fetch-data-button.n_clicks";
+                });
+
+                if (!selectedStock || !nClicks) {
+                    return [noUpdate, noUpdate];
+                }
+
+                var date = selectedDate ? String(selectedDate).slice(0, 10) : null;
+                if (historyCovers(history, selectedStock, date)) {
+                    return [createStockDataView(history, date), noUpdate];
+                }
+
+                // 仅修改日期且缓存无法覆盖时不自动查询，等待用户点击
+                if (!byClick) {
+                    return [noUpdate, noUpdate];
+                }
+
+                return [noUpdate, {
+                    symbol: selectedStock,
+                    date: date,
+                    cached: history ? {
+                        symbol: history.symbol,
+                        output_size: history.output_size,
+                        version: history.version
+                    } : null,
+                    requested_at: Date.now()
+                }];
+            }
+        }
+    });
+})();
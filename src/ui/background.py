@@ -0,0 +1,74 @@
+# 后台回调管理模块
+# 为耗时的Dash回调提供基于本地磁盘的任务队列（无需外部消息代理）
+
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from ..utils.cache import ForkSafeCache
+from ..utils.config import config
+from ..utils.logger import get_logger
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+
+def create_background_manager() -> Optional[Any]:
+    """
+    创建Dash后台回调管理器
+
+    使用 dash.DiskcacheManager：任务在独立子进程中执行，任务状态和结果保存在
+    本地磁盘缓存中，因此多个gunicorn worker可以共享同一个任务队列目录。
+
+    配置项:
+        BACKGROUND_CALLBACKS_ENABLED: 是否启用后台回调（默认启用）
+        BACKGROUND_CACHE_DIR: 任务队列目录
+        BACKGROUND_RESULT_EXPIRE: 任务结果保留时间（秒）
+
+    Returns:
+        Optional[Any]: 后台回调管理器，禁用或依赖缺失时返回None（回退为同步回调）
+    """
+    if not config.get_bool("BACKGROUND_CALLBACKS_ENABLED", True):
+        logger.info("Background callbacks disabled, using synchronous callbacks")
+        return None
+
+    try:
+        import psutil
+        from dash import DiskcacheManager
+
+        if ForkSafeCache is None:
+            raise ImportError("No module named 'diskcache'")
+
+        class SafeDiskcacheManager(DiskcacheManager):
+            """
+            任务进程在结束后由启动它的worker回收；其他worker读取结果时进程可能
+            恰好退出，DiskcacheManager.terminate_job 会因此抛出 NoSuchProcess
+            """
+
+            def terminate_job(self, job):
+                try:
+                    super().terminate_job(job)
+                except psutil.NoSuchProcess:
+                    pass
+
+        directory = config.get(
+            "BACKGROUND_CACHE_DIR",
+            str(Path(tempfile.gettempdir()) / "ifinance_jobs"),
+        )
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+        # 任务进程从多线程的worker中fork，任务队列需使用fork安全的缓存
+        manager = SafeDiskcacheManager(
+            ForkSafeCache(directory),
+            expire=config.get_int("BACKGROUND_RESULT_EXPIRE", 600),
+        )
+    except ImportError as e:
+        # DiskcacheManager 依赖 diskcache、multiprocess 和 psutil
+        logger.warning(
+            f"Background callbacks unavailable ({str(e)}), "
+            "using synchronous callbacks"
+        )
+        return None
+
+    logger.info(f"Background callback manager initialized at {directory}")
+    return manager
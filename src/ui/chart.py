@@ -0,0 +1,271 @@
+# K线图页面
+# 服务器端降采样后再发送给浏览器：无论历史多长，每次只传输几百个点，缩放时按可见范围重新取数
+
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import dash
+from dash import Input, Output, dcc, html
+
+from ..utils.config import config
+from ..utils.exceptions import HistoryNotImportedError
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from ..utils.tracing import tracer
+from .history import load_history, not_imported_message
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+CHART_PATH = "/chart"
+
+_UP_COLOR = "#27ae60"
+_DOWN_COLOR = "#e74c3c"
+
+
+def create_chart_page() -> html.Div:
+    """
+    创建K线图页面
+
+    Returns:
+        html.Div: 页面组件（默认隐藏，访问 /chart 时显示）
+    """
+    watchlist = [s.strip().upper() for s in config.get("WATCHLIST", "").split(",")]
+    return html.Div(
+        [
+            html.Div(
+                [
+                    html.H3(
+                        "K线图",
+                        style={"color": "#34495e", "marginBottom": "15px"},
+                    ),
+                    html.Div(
+                        [
+                            dcc.Input(
+                                id="chart-symbol",
+                                type="text",
+                                value=next((s for s in watchlist if s), ""),
+                                placeholder="输入股票代码（如: AAPL）",
+                                debounce=True,
+                                style={
+                                    "flex": "1",
+                                    "padding": "10px",
+                                    "fontSize": "14px",
+                                    "border": "1px solid #bdc3c7",
+                                    "borderRadius": "4px",
+                                },
+                            ),
+                            dcc.RadioItems(
+                                id="chart-type",
+                                options=[
+                                    {"label": "K线", "value": "candlestick"},
+                                    {"label": "收盘价", "value": "line"},
+                                ],
+                                value="candlestick",
+                                inline=True,
+                                inputStyle={"marginRight": "5px"},
+                                labelStyle={"marginRight": "15px"},
+                            ),
+                        ],
+                        style={
+                            "display": "flex",
+                            "gap": "15px",
+                            "alignItems": "center",
+                        },
+                    ),
+                ],
+                style={
+                    "backgroundColor": "#ecf0f1",
+                    "padding": "30px",
+                    "borderRadius": "8px",
+                    "marginBottom": "20px",
+                },
+            ),
+            dcc.Loading(
+                dcc.Graph(
+                    id="chart-graph",
+                    config={"displaylogo": False, "scrollZoom": True},
+                    style={"height": "560px"},
+                ),
+                type="default",
+            ),
+            html.Div(
+                id="chart-status",
+                style={"color": "#7f8c8d", "fontSize": "12px", "marginTop": "8px"},
+            ),
+        ],
+        id={"type": "page", "path": CHART_PATH},
+        style={"maxWidth": "1000px", "margin": "0 auto", "display": "none"},
+    )
+
+
+def parse_relayout_range(
+    relayout: Optional[Dict[str, Any]],
+) -> Tuple[bool, Optional[Tuple[str, str]]]:
+    """
+    从图表的 relayoutData 中解析横轴范围
+
+    Args:
+        relayout: dcc.Graph 的 relayoutData
+
+    Returns:
+        Tuple[bool, Optional[Tuple[str, str]]]: (横轴是否变化, 新的范围)；
+            范围为None表示恢复完整历史
+    """
+    relayout = relayout or {}
+    if relayout.get("xaxis.autorange"):
+        return True, None
+    if "xaxis.range[0]" in relayout and "xaxis.range[1]" in relayout:
+        return True, (relayout["xaxis.range[0]"], relayout["xaxis.range[1]"])
+    if "xaxis.range" in relayout:
+        start, end = relayout["xaxis.range"][:2]
+        return True, (start, end)
+    return False, None
+
+
+def build_chart_figure(
+    symbol: str,
+    df: "pd.DataFrame",
+    chart_type: str,
+    max_points: int,
+    offset: int = 0,
+) -> Tuple[Dict[str, Any], int]:
+    """
+    把一段历史降采样并生成图表（plotly figure 字典，不导入plotly）
+
+    Args:
+        symbol: 股票代码（与图表类型一起用作 uirevision，切换时重置缩放）
+        df: 可见范围内的历史
+        chart_type: 'candlestick' 或 'line'
+        max_points: 最多的点数
+        offset: df 第一行在完整历史中的行号（用于对齐K线桶）
+
+    Returns:
+        Tuple[Dict[str, Any], int]: 图表和实际点数
+    """
+    from ..data.downsample import aggregate_ohlcv, downsample_close
+
+    if chart_type == "line":
+        sampled = downsample_close(df, max_points)
+        price = {
+            "type": "scatter",
+            "mode": "lines",
+            "name": "收盘价",
+            "x": sampled.index.strftime("%Y-%m-%d").tolist(),
+            "y": sampled["close"].tolist(),
+            "line": {"color": "#3498db", "width": 1.5},
+        }
+        volume_x, volume_y = None, None
+    else:
+        sampled, _ = aggregate_ohlcv(df, max_points, offset)
+        x = sampled.index.strftime("%Y-%m-%d").tolist()
+        price = {
+            "type": "candlestick",
+            "name": symbol,
+            "x": x,
+            "open": sampled["open"].tolist(),
+            "high": sampled["high"].tolist(),
+            "low": sampled["low"].tolist(),
+            "close": sampled["close"].tolist(),
+            "increasing": {"line": {"color": _UP_COLOR}},
+            "decreasing": {"line": {"color": _DOWN_COLOR}},
+        }
+        volume_x, volume_y = x, sampled["volume"].tolist()
+
+    data = [price]
+    if volume_x is not None:
+        data.append(
+            {
+                "type": "bar",
+                "name": "成交量",
+                "x": volume_x,
+                "y": volume_y,
+                "yaxis": "y2",
+                "marker": {"color": "#bdc3c7"},
+            }
+        )
+
+    layout = {
+        "uirevision": f"{symbol}:{chart_type}",
+        "showlegend": False,
+        "margin": {"l": 50, "r": 20, "t": 30, "b": 30},
+        "xaxis": {"type": "date", "rangeslider": {"visible": False}},
+        "yaxis": {"domain": [0.25, 1], "title": {"text": "价格"}},
+        "yaxis2": {"domain": [0, 0.2], "title": {"text": "成交量"}},
+        "bargap": 0,
+        "plot_bgcolor": "white",
+    }
+    return {"data": data, "layout": layout}, len(sampled)
+
+
+def register_chart_callbacks(app: dash.Dash) -> None:
+    """
+    注册K线图页面的回调
+
+    Args:
+        app: Dash应用实例
+    """
+    max_points = config.get_int("CHART_MAX_POINTS", 300)
+
+    @app.callback(
+        [Output("chart-graph", "figure"), Output("chart-status", "children")],
+        [
+            Input("chart-symbol", "value"),
+            Input("chart-type", "value"),
+            Input("chart-graph", "relayoutData"),
+            Input("url", "pathname"),
+        ],
+    )
+    @metrics.track("update_chart")
+    @tracer.traced("update_chart")
+    def update_chart(symbol, chart_type, relayout, pathname):
+        """
+        切换股票或图表类型时显示完整历史，缩放或平移时按可见范围重新降采样
+        """
+        if pathname != CHART_PATH:
+            # 页面不可见时不读取历史（包括首次加载其他页面时）
+            raise dash.exceptions.PreventUpdate
+
+        span = tracer.current_span()
+        symbol = (symbol or "").strip().upper()
+        if not symbol:
+            return {"data": [], "layout": {}}, ""
+
+        window = None
+        if dash.ctx.triggered_id == "chart-graph":
+            changed, window = parse_relayout_range(relayout)
+            if not changed:
+                # 自动调整尺寸等与横轴无关的变化
+                raise dash.exceptions.PreventUpdate
+
+        try:
+            df = load_history(symbol)
+        except HistoryNotImportedError as e:
+            return {"data": [], "layout": {}}, not_imported_message(e)
+        except Exception as e:
+            logger.error(f"Failed to load chart history for {symbol}: {e}")
+            return dash.no_update, html.Span(
+                f"无法获取 {symbol} 的历史数据：{e}", style={"color": "#e74c3c"}
+            )
+        if df.empty:
+            return {"data": [], "layout": {}}, f"{symbol} 没有历史数据"
+
+        offset = 0
+        if window is not None:
+            # 可见范围按行号切片（索引已排序），K线桶按完整历史中的行号对齐
+            offset = int(df.index.searchsorted(window[0][:10], side="left"))
+            stop = int(df.index.searchsorted(window[1][:10], side="right"))
+            df = df.iloc[offset:stop]
+            if df.empty:
+                raise dash.exceptions.PreventUpdate
+
+        figure, points = build_chart_figure(symbol, df, chart_type, max_points, offset)
+        span.set_attributes(symbol=symbol, rows=len(df), points=points)
+
+        start = df.index[0].strftime("%Y-%m-%d")
+        end = df.index[-1].strftime("%Y-%m-%d")
+        status = f"{symbol}：{start} 至 {end}，共 {len(df)} 个交易日"
+        if points < len(df):
+            status += f"，降采样为 {points} 个点（缩放可查看更多细节）"
+        return figure, status
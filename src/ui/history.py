@@ -0,0 +1,84 @@
+# 页面历史数据模块
+# 图表、表格等页面共用的完整历史读取：只读取本地历史数据存储，没有时加入后台导入队列
+
+from typing import TYPE_CHECKING, Optional
+
+from dash import html
+
+from ..services import get_history_store, get_import_queue
+from ..utils.exceptions import HistoryNotImportedError
+from ..utils.logger import get_logger
+from ..utils.tracing import tracer
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+
+def stored_history(symbol: str) -> Optional["pd.DataFrame"]:
+    """
+    读取本地历史数据存储中股票的完整日线历史
+
+    本地没有该股票时把它加入后台导入队列（导入完整历史）并返回None，页面请求不等待上游；
+    导入完成后的读取（包括其他页面和worker）都直接命中本地数据，每日更新由定时刷新负责
+
+    Args:
+        symbol: 股票代码
+
+    Returns:
+        Optional[pd.DataFrame]: 日期索引、按日期升序排列的数据框，尚未导入时为None
+    """
+    symbol = symbol.strip().upper()
+    store = get_history_store()
+    if store.exists(symbol):
+        return store.load(symbol)
+
+    logger.info("No stored history for %s, queueing a background import", symbol)
+    get_import_queue().request(symbol)
+    return None
+
+
+@tracer.traced("load_history")
+def load_history(symbol: str) -> "pd.DataFrame":
+    """
+    获取股票的完整日线历史（只读取本地历史数据存储）
+
+    Args:
+        symbol: 股票代码
+
+    Returns:
+        pd.DataFrame: 日期索引、按日期升序排列的数据框
+
+    Raises:
+        HistoryNotImportedError: 本地没有数据时（股票已加入后台导入队列）
+    """
+    symbol = symbol.strip().upper()
+    df = stored_history(symbol)
+    tracer.current_span().set_attribute(
+        "source", "store" if df is not None else "queued"
+    )
+    if df is None:
+        raise HistoryNotImportedError(symbol, get_import_queue().error(symbol))
+    return df
+
+
+def not_imported_message(error: HistoryNotImportedError) -> html.Span:
+    """
+    创建历史数据尚未导入的提示
+
+    Args:
+        error: load_history 抛出的异常
+
+    Returns:
+        html.Span: 提示组件
+    """
+    if error.error:
+        return html.Span(
+            f"{error.symbol} 的历史数据导入失败：{error.error}，稍后会自动重试",
+            style={"color": "#e74c3c"},
+        )
+    return html.Span(
+        f"{error.symbol} 的历史数据尚未导入，已在后台导入，请稍后再查看",
+        style={"color": "#7f8c8d"},
+    )
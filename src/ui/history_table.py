@@ -0,0 +1,243 @@
+# 历史数据表格页面
+# 分页、排序和过滤都在服务器端完成，每次只格式化并发送当前页
+
+import threading
+from typing import TYPE_CHECKING, Dict, Tuple
+
+import dash
+from dash import ALL, ClientsideFunction, Input, Output, State, dash_table, dcc, html
+
+from ..services import get_data_processor
+from ..utils.config import config
+from ..utils.exceptions import HistoryNotImportedError
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from ..utils.tracing import tracer
+from .history import load_history, not_imported_message
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+HISTORY_TABLE_PATH = "/history"
+
+HISTORY_TABLE_COLUMNS = [
+    {"name": "日期", "id": "date", "type": "datetime"},
+    {"name": "开盘", "id": "open", "type": "numeric"},
+    {"name": "最高", "id": "high", "type": "numeric"},
+    {"name": "最低", "id": "low", "type": "numeric"},
+    {"name": "收盘", "id": "close", "type": "numeric"},
+    {"name": "成交量", "id": "volume", "type": "numeric"},
+    {"name": "涨跌", "id": "change", "type": "numeric"},
+    {"name": "涨跌幅", "id": "change_percent", "type": "numeric"},
+]
+
+# 股票代码 -> (完整历史, 添加了日变化字段的历史)；完整历史由存储缓存，对象不变时直接复用
+_frames: Dict[str, Tuple["pd.DataFrame", "pd.DataFrame"]] = {}
+_frames_lock = threading.Lock()
+
+
+def load_table_frame(symbol: str) -> "pd.DataFrame":
+    """
+    获取表格使用的完整历史（含日变化字段，按日期升序）
+
+    Args:
+        symbol: 股票代码
+
+    Returns:
+        pd.DataFrame: 数据框
+
+    Raises:
+        HistoryNotImportedError: 本地没有数据时（股票已加入后台导入队列）
+    """
+    base = load_history(symbol)
+    with _frames_lock:
+        cached = _frames.get(symbol)
+        if cached is not None and cached[0] is base:
+            return cached[1]
+
+    frame = get_data_processor().add_change_fields(base)
+    with _frames_lock:
+        _frames[symbol] = (base, frame)
+        # 与存储的进程内缓存保持同样的规模
+        while len(_frames) > max(config.get_int("HISTORY_FRAME_CACHE_SIZE", 16), 1):
+            _frames.pop(next(iter(_frames)))
+    return frame
+
+
+def create_history_table_page() -> html.Div:
+    """
+    创建历史数据表格页面
+
+    Returns:
+        html.Div: 页面组件（默认隐藏，访问 /history 时显示）
+    """
+    return html.Div(
+        [
+            html.Div(
+                [
+                    html.H3(
+                        "历史数据",
+                        style={"color": "#34495e", "marginBottom": "15px"},
+                    ),
+                    dcc.Input(
+                        id="history-table-symbol",
+                        type="text",
+                        placeholder="输入股票代码（如: AAPL）",
+                        debounce=True,
+                        style={
+                            "width": "100%",
+                            "padding": "10px",
+                            "fontSize": "14px",
+                            "border": "1px solid #bdc3c7",
+                            "borderRadius": "4px",
+                            "boxSizing": "border-box",
+                        },
+                    ),
+                ],
+                style={
+                    "backgroundColor": "#ecf0f1",
+                    "padding": "30px",
+                    "borderRadius": "8px",
+                    "marginBottom": "20px",
+                },
+            ),
+            dash_table.DataTable(
+                id="history-table",
+                columns=HISTORY_TABLE_COLUMNS,
+                data=[],
+                page_current=0,
+                page_size=config.get_int("HISTORY_TABLE_PAGE_SIZE", 50),
+                page_count=0,
+                page_action="custom",
+                sort_action="custom",
+                sort_mode="single",
+                sort_by=[],
+                filter_action="custom",
+                filter_query="",
+                fixed_rows={"headers": True},
+                style_table={"maxHeight": "600px", "overflowY": "auto"},
+                style_cell={
+                    "fontFamily": "Arial, sans-serif",
+                    "fontSize": "14px",
+                    "padding": "6px 10px",
+                    "textAlign": "right",
+                },
+                style_header={"backgroundColor": "#f8f9fa", "fontWeight": "bold"},
+            ),
+            html.Div(
+                id="history-table-status",
+                style={"color": "#7f8c8d", "fontSize": "12px", "marginTop": "8px"},
+            ),
+            create_export_links(),
+        ],
+        id={"type": "page", "path": HISTORY_TABLE_PATH},
+        style={"maxWidth": "1000px", "margin": "0 auto", "display": "none"},
+    )
+
+
+def create_export_links() -> html.Div:
+    """
+    创建导出当前股票完整历史的下载链接（数据接口未启用时不显示）
+
+    Returns:
+        html.Div: 下载链接，地址由客户端回调根据股票代码生成
+    """
+    from ..server.export import EXPORT_FORMATS, export_available
+
+    if not config.get_bool("DATA_API_ENABLED", True):
+        return html.Div()
+
+    return html.Div(
+        ["导出："]
+        + [
+            html.A(
+                fmt.upper(),
+                id={"type": "history-export", "format": fmt},
+                download="",
+                style={"marginRight": "10px", "color": "#3498db"},
+            )
+            for fmt in EXPORT_FORMATS
+            if export_available(fmt)
+        ],
+        style={"fontSize": "12px", "color": "#7f8c8d", "marginTop": "8px"},
+    )
+
+
+def register_history_table_callbacks(app: dash.Dash) -> None:
+    """
+    注册历史数据表格页面的回调
+
+    Args:
+        app: Dash应用实例
+    """
+
+    # 下载链接只依赖股票代码，在客户端生成
+    app.clientside_callback(
+        ClientsideFunction(namespace="ifinance", function_name="exportLinks"),
+        Output({"type": "history-export", "format": ALL}, "href"),
+        [Input("history-table-symbol", "value")],
+        [State({"type": "history-export", "format": ALL}, "id")],
+    )
+
+    @app.callback(
+        [
+            Output("history-table", "data"),
+            Output("history-table", "page_count"),
+            Output("history-table", "page_current"),
+            Output("history-table-status", "children"),
+        ],
+        [
+            Input("history-table-symbol", "value"),
+            Input("history-table", "page_current"),
+            Input("history-table", "page_size"),
+            Input("history-table", "sort_by"),
+            Input("history-table", "filter_query"),
+        ],
+        prevent_initial_call=True,
+    )
+    @metrics.track("update_history_table")
+    @tracer.traced("update_history_table")
+    def update_history_table(symbol, page, page_size, sort_by, filter_query):
+        """
+        按当前页、排序和过滤条件取出一页数据；切换股票或修改排序、过滤条件时回到第一页
+        """
+        from ..data.paging import query_page
+
+        symbol = (symbol or "").strip().upper()
+        if not symbol:
+            return [], 0, 0, ""
+
+        if not any(
+            t["prop_id"] == "history-table.page_current" for t in dash.ctx.triggered
+        ):
+            page = 0
+
+        try:
+            frame = load_table_frame(symbol)
+        except HistoryNotImportedError as e:
+            return [], 0, 0, not_imported_message(e)
+        except Exception as e:
+            logger.error(f"Failed to load history table for {symbol}: {e}")
+            return (
+                [],
+                0,
+                0,
+                html.Span(
+                    f"无法获取 {symbol} 的历史数据：{e}", style={"color": "#e74c3c"}
+                ),
+            )
+
+        rows, total, page = query_page(frame, page, page_size, sort_by, filter_query)
+        data = get_data_processor().format_for_display(rows)
+        tracer.current_span().set_attributes(
+            symbol=symbol, rows=len(frame), matched=total, page=page
+        )
+
+        page_count = max(-(-total // page_size), 1)
+        status = f"{symbol}：共 {len(frame)} 个交易日"
+        if total != len(frame):
+            status += f"，满足条件 {total} 个"
+        status += f"，第 {page + 1} / {page_count} 页"
+        return data, page_count, page, status
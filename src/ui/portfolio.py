@@ -0,0 +1,493 @@
+# 投资组合页面
+# 按本地历史数据计算组合的市值、盈亏和权重；定时刷新时只用报价中心的缓存报价增量更新最后一个交易日
+
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import dash
+from dash import ClientsideFunction, Input, Output, Patch, State, dash_table, dcc, html
+
+from ..services import get_fx_converter, get_history_store, get_quote_hub
+from ..utils.config import config
+from ..utils.exceptions import iFinanceError
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from ..utils.tracing import tracer
+from .history import stored_history
+
+if TYPE_CHECKING:
+    from ..data.portfolio import Holding, PortfolioValuation, PortfolioValuer
+
+logger = get_logger(__name__)
+
+PORTFOLIO_PATH = "/portfolio"
+
+PORTFOLIO_CURRENCIES = ["USD", "EUR", "GBP", "CNY", "HKD", "JPY"]
+
+PORTFOLIO_COLUMNS = [
+    {"name": "代码", "id": "symbol"},
+    {"name": "货币", "id": "currency"},
+    {"name": "数量", "id": "quantity", "type": "numeric"},
+    {"name": "价格", "id": "price", "type": "numeric"},
+    {"name": "市值", "id": "value", "type": "numeric"},
+    {"name": "成本", "id": "cost", "type": "numeric"},
+    {"name": "盈亏", "id": "pnl", "type": "numeric"},
+    {"name": "盈亏率", "id": "pnl_percent", "type": "numeric"},
+    {"name": "权重", "id": "weight", "type": "numeric"},
+    {"name": "日变化", "id": "day_change", "type": "numeric"},
+]
+
+_UP_COLOR = "#27ae60"
+_DOWN_COLOR = "#e74c3c"
+
+_valuer: Optional["PortfolioValuer"] = None
+_valuer_lock = threading.Lock()
+
+
+def get_portfolio_valuer() -> "PortfolioValuer":
+    """
+    获取本进程的投资组合估值器（首次调用时创建）
+
+    Returns:
+        PortfolioValuer: 估值器，只读取本地历史数据（没有的股票通过 stored_history 加入后台导入队列）
+    """
+    global _valuer
+
+    if _valuer is None:
+        with _valuer_lock:
+            if _valuer is None:
+                from ..data.portfolio import PortfolioValuer
+
+                _valuer = PortfolioValuer(
+                    stored_history,
+                    get_fx_converter(),
+                    config.get_int("HISTORY_FRAME_CACHE_SIZE", 16),
+                )
+    return _valuer
+
+
+def create_portfolio_page() -> html.Div:
+    """
+    创建投资组合页面
+
+    Returns:
+        html.Div: 页面组件（默认隐藏，访问 /portfolio 时显示）
+    """
+    base_currency = config.get("PORTFOLIO_BASE_CURRENCY", "USD").upper()
+    return html.Div(
+        [
+            # 浏览器中已渲染的估值（完整计算时间、增量更新次数、最后一个日期）
+            dcc.Store(id="portfolio-state", data=None),
+            # 只在投资组合页面可见时启用
+            dcc.Interval(
+                id="portfolio-interval",
+                interval=config.get_int("PORTFOLIO_REFRESH_INTERVAL", 60) * 1000,
+                disabled=True,
+            ),
+            html.Div(
+                [
+                    html.H3(
+                        "投资组合",
+                        style={"color": "#34495e", "marginBottom": "15px"},
+                    ),
+                    dcc.Textarea(
+                        id="portfolio-holdings",
+                        value=config.get("PORTFOLIO_HOLDINGS", "").replace(";", "\n"),
+                        placeholder="每行一个持仓：代码 数量 单位成本 [货币]，如 AAPL 10 150",
+                        style={
+                            "width": "100%",
+                            "height": "120px",
+                            "padding": "10px",
+                            "fontSize": "14px",
+                            "fontFamily": "monospace",
+                            "border": "1px solid #bdc3c7",
+                            "borderRadius": "4px",
+                            "boxSizing": "border-box",
+                        },
+                    ),
+                    html.Div(
+                        [
+                            dcc.Dropdown(
+                                id="portfolio-currency",
+                                options=[
+                                    {"label": c, "value": c}
+                                    for c in dict.fromkeys(
+                                        PORTFOLIO_CURRENCIES + [base_currency]
+                                    )
+                                ],
+                                value=base_currency,
+                                clearable=False,
+                                style={"width": "120px"},
+                            ),
+                            html.Button(
+                                "计算",
+                                id="portfolio-apply",
+                                n_clicks=0,
+                                style={
+                                    "padding": "10px 20px",
+                                    "backgroundColor": "#3498db",
+                                    "color": "white",
+                                    "border": "none",
+                                    "borderRadius": "4px",
+                                    "fontSize": "14px",
+                                    "cursor": "pointer",
+                                },
+                            ),
+                        ],
+                        style={
+                            "display": "flex",
+                            "gap": "10px",
+                            "alignItems": "center",
+                            "marginTop": "10px",
+                        },
+                    ),
+                ],
+                style={
+                    "backgroundColor": "#ecf0f1",
+                    "padding": "30px",
+                    "borderRadius": "8px",
+                    "marginBottom": "20px",
+                },
+            ),
+            html.Div(id="portfolio-summary", style={"marginBottom": "15px"}),
+            dash_table.DataTable(
+                id="portfolio-positions",
+                columns=PORTFOLIO_COLUMNS,
+                data=[],
+                sort_action="native",
+                style_cell={
+                    "fontFamily": "Arial, sans-serif",
+                    "fontSize": "14px",
+                    "padding": "6px 10px",
+                    "textAlign": "right",
+                },
+                style_header={"backgroundColor": "#f8f9fa", "fontWeight": "bold"},
+                style_data_conditional=[
+                    {
+                        "if": {
+                            "filter_query": f"{{{column}}} < 0",
+                            "column_id": column,
+                        },
+                        "color": _DOWN_COLOR,
+                    }
+                    for column in ("pnl", "pnl_percent", "day_change")
+                ]
+                + [
+                    {
+                        "if": {
+                            "filter_query": f"{{{column}}} > 0",
+                            "column_id": column,
+                        },
+                        "color": _UP_COLOR,
+                    }
+                    for column in ("pnl", "pnl_percent", "day_change")
+                ],
+            ),
+            dcc.Graph(
+                id="portfolio-chart",
+                config={"displaylogo": False},
+                style={"height": "400px", "marginTop": "20px"},
+            ),
+        ],
+        id={"type": "page", "path": PORTFOLIO_PATH},
+        style={"maxWidth": "1000px", "margin": "0 auto", "display": "none"},
+    )
+
+
+def format_positions(valuation: "PortfolioValuation") -> List[Dict[str, Any]]:
+    """
+    把持仓明细格式化为表格行（数值保留两位小数，排序和颜色仍按数值）
+
+    Args:
+        valuation: 估值
+
+    Returns:
+        List[Dict[str, Any]]: 表格数据
+    """
+    positions = valuation.positions().round(2).reset_index()
+    positions = positions.astype(object).where(positions.notna(), None)
+    return positions.to_dict("records")
+
+
+def create_summary(valuation: "PortfolioValuation") -> html.Div:
+    """
+    创建组合汇总（总市值、盈亏和最近一日收益率）
+
+    Args:
+        valuation: 估值
+
+    Returns:
+        html.Div: 汇总组件
+    """
+    summary = valuation.summary()
+    missing = None
+    if valuation.missing:
+        missing = html.Div(
+            "以下持仓的历史数据尚未导入，未计入估值（已在后台导入）："
+            + ", ".join(valuation.missing),
+            style={"color": "#7f8c8d", "fontSize": "12px", "marginTop": "8px"},
+        )
+    if summary["date"] is None:
+        return html.Div(
+            [html.Div("没有可用的历史数据", style={"color": "#7f8c8d"}), missing]
+        )
+
+    def item(title: str, text: str, color: str = "#2c3e50") -> html.Div:
+        return html.Div(
+            [
+                html.Div(title, style={"fontSize": "12px", "color": "#7f8c8d"}),
+                html.Div(
+                    text,
+                    style={"fontSize": "20px", "fontWeight": "bold", "color": color},
+                ),
+            ],
+            style={"flex": "1"},
+        )
+
+    def color(value: Optional[float]) -> str:
+        if not value:
+            return "#2c3e50"
+        return _UP_COLOR if value > 0 else _DOWN_COLOR
+
+    currency = summary["currency"]
+    pnl_percent = summary["pnl_percent"]
+    day_return = summary["day_return"]
+    cards = html.Div(
+        [
+            item("日期", summary["date"]),
+            item("总市值", f"{summary['value']:,.2f} {currency}"),
+            item("总成本", f"{summary['cost']:,.2f} {currency}"),
+            item(
+                "盈亏",
+                f"{summary['pnl']:+,.2f}"
+                + (f"（{pnl_percent:+.2f}%）" if pnl_percent is not None else ""),
+                color(summary["pnl"]),
+            ),
+            item(
+                "日收益率",
+                f"{day_return:+.2f}%" if day_return is not None else "—",
+                color(day_return),
+            ),
+        ],
+        style={
+            "display": "flex",
+            "gap": "15px",
+            "backgroundColor": "white",
+            "padding": "15px",
+            "borderRadius": "8px",
+            "border": "1px solid #ecf0f1",
+        },
+    )
+    return html.Div([cards, missing]) if missing is not None else cards
+
+
+def build_value_figure(
+    valuation: "PortfolioValuation", max_points: int
+) -> Dict[str, Any]:
+    """
+    生成总市值曲线（LTTB降采样，首尾两点总是保留，增量更新时可以直接修改最后一个点）
+
+    Args:
+        valuation: 估值
+        max_points: 最多的点数
+
+    Returns:
+        Dict[str, Any]: plotly figure 字典
+    """
+    from ..data.downsample import lttb
+
+    totals = valuation.totals.dropna()
+    keep = lttb(totals.index.asi8, totals.to_numpy(), max_points)
+    sampled = totals.iloc[keep]
+    return {
+        "data": [
+            {
+                "type": "scatter",
+                "mode": "lines",
+                "name": "总市值",
+                "x": sampled.index.strftime("%Y-%m-%d").tolist(),
+                "y": sampled.round(2).tolist(),
+                "line": {"color": "#3498db", "width": 1.5},
+            }
+        ],
+        "layout": {
+            "uirevision": valuation.base_currency,
+            "showlegend": False,
+            "margin": {"l": 60, "r": 20, "t": 30, "b": 30},
+            "xaxis": {"type": "date"},
+            "yaxis": {"title": {"text": f"总市值（{valuation.base_currency}）"}},
+            "plot_bgcolor": "white",
+        },
+    }
+
+
+def _state(valuation: "PortfolioValuation") -> Dict[str, Any]:
+    return {
+        "built_at": valuation.built_at,
+        "revision": valuation.revision,
+        "last": valuation.last_date.strftime("%Y-%m-%d"),
+    }
+
+
+def _parse(
+    value: Optional[str], limit: int
+) -> Tuple[List["Holding"], Optional[html.Span]]:
+    from ..data.portfolio import parse_holdings
+
+    try:
+        return parse_holdings(value, limit), None
+    except iFinanceError as e:
+        return [], html.Span(f"持仓格式错误：{e}", style={"color": "#e74c3c"})
+
+
+def register_portfolio_callbacks(app: dash.Dash) -> None:
+    """
+    注册投资组合页面的回调
+
+    Args:
+        app: Dash应用实例
+    """
+    max_holdings = config.get_int("PORTFOLIO_MAX_HOLDINGS", 100)
+    max_points = config.get_int("CHART_MAX_POINTS", 300)
+    # 报价租约覆盖几次刷新，页面关闭或隐藏后报价中心随之停止轮询这些股票
+    lease = config.get_int("PORTFOLIO_REFRESH_INTERVAL", 60) * 3
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="ifinance", function_name="portfolioInactive"),
+        Output("portfolio-interval", "disabled"),
+        [Input("url", "pathname")],
+    )
+
+    @app.callback(
+        [
+            Output("portfolio-positions", "data"),
+            Output("portfolio-summary", "children"),
+            Output("portfolio-chart", "figure"),
+            Output("portfolio-state", "data"),
+        ],
+        [
+            Input("portfolio-apply", "n_clicks"),
+            Input("portfolio-currency", "value"),
+            Input("url", "pathname"),
+        ],
+        [State("portfolio-holdings", "value")],
+    )
+    @metrics.track("render_portfolio")
+    @tracer.traced("render_portfolio")
+    def render_portfolio(n_clicks, currency, pathname, value):
+        """
+        持仓或基准货币变化时完整计算估值（历史数据未变化时复用缓存的估值）
+        """
+        if pathname != PORTFOLIO_PATH:
+            # 页面不可见时不读取历史
+            raise dash.exceptions.PreventUpdate
+
+        holdings, error = _parse(value, max_holdings)
+        if error is not None or not holdings:
+            return [], error, {"data": [], "layout": {}}, None
+
+        try:
+            valuation = get_portfolio_valuer().value(holdings, currency)
+        except iFinanceError as e:
+            logger.error(f"Failed to value portfolio: {e}")
+            return (
+                [],
+                html.Span(f"无法计算投资组合：{e}", style={"color": "#e74c3c"}),
+                {"data": [], "layout": {}},
+                None,
+            )
+
+        get_quote_hub().watch([h.symbol for h in holdings], lease)
+        tracer.current_span().set_attributes(
+            holdings=len(holdings), rows=len(valuation.prices)
+        )
+        if valuation.last_date is None:
+            return [], create_summary(valuation), {"data": [], "layout": {}}, None
+        return (
+            format_positions(valuation),
+            create_summary(valuation),
+            build_value_figure(valuation, max_points),
+            _state(valuation),
+        )
+
+    @app.callback(
+        [
+            Output("portfolio-positions", "data", allow_duplicate=True),
+            Output("portfolio-summary", "children", allow_duplicate=True),
+            Output("portfolio-chart", "figure", allow_duplicate=True),
+            Output("portfolio-state", "data", allow_duplicate=True),
+        ],
+        [Input("portfolio-interval", "n_intervals")],
+        [
+            State("portfolio-holdings", "value"),
+            State("portfolio-currency", "value"),
+            State("portfolio-state", "data"),
+        ],
+        prevent_initial_call=True,
+    )
+    @metrics.track("refresh_portfolio")
+    @tracer.traced("refresh_portfolio")
+    def refresh_portfolio(n_intervals, value, currency, state):
+        """
+        定时刷新：用报价中心缓存的报价更新最后一个交易日，曲线只修改或追加最后一个点；
+        缺失的持仓导入完成后重新计算估值
+        """
+        holdings, error = _parse(value, max_holdings)
+        if error is not None or not holdings:
+            raise dash.exceptions.PreventUpdate
+
+        valuer = get_portfolio_valuer()
+        valuation = valuer.cached(holdings, currency)
+        if valuation is None:
+            raise dash.exceptions.PreventUpdate
+        store = get_history_store()
+        revalued = False
+        if any(store.exists(symbol) for symbol in valuation.missing):
+            # 缺失的持仓已在后台导入完成，只读取本地数据重新计算
+            try:
+                valuation = valuer.value(holdings, currency)
+            except iFinanceError as e:
+                logger.error(f"Failed to value portfolio: {e}")
+                raise dash.exceptions.PreventUpdate
+            revalued = True
+        if valuation.last_date is None or not (state or revalued):
+            raise dash.exceptions.PreventUpdate
+        state = state or {}
+
+        symbols = [h.symbol for h in holdings]
+        hub = get_quote_hub()
+        hub.watch(symbols, lease)
+        # 估值不会被其他请求修改，之后的格式化读取的都是同一个估值
+        valuation = (
+            valuer.apply_quotes(holdings, currency, hub.latest(symbols)) or valuation
+        )
+        tracer.current_span().set_attributes(
+            holdings=len(holdings), revision=valuation.revision
+        )
+
+        # 同一估值可能已被其他页面的刷新更新过，按版本判断浏览器中的内容是否需要更新
+        new_state = _state(valuation)
+        if new_state == state:
+            raise dash.exceptions.PreventUpdate
+
+        if new_state["built_at"] != state.get("built_at"):
+            # 其他请求重新计算了估值，图表与浏览器中的不再对应
+            figure = build_value_figure(valuation, max_points)
+        else:
+            figure = Patch()
+            total = round(float(valuation.totals.iloc[-1]), 2)
+            trace = figure["data"][0]
+            if new_state["last"] == state.get("last"):
+                trace["y"][-1] = total
+            else:
+                trace["x"].append(new_state["last"])
+                trace["y"].append(total)
+
+        return (
+            format_positions(valuation),
+            create_summary(valuation),
+            figure,
+            new_state,
+        )
+
+    logger.debug("Portfolio callbacks registered (refresh lease %ss)", lease)
@@ -0,0 +1,332 @@
+# 关注列表页面
+# 定时刷新多个股票的最新报价，每次只把发生变化的单元格发送给浏览器
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import dash
+from dash import ClientsideFunction, Input, Output, Patch, State, dcc, html
+
+from ..services import get_quote_hub
+from ..utils.config import config
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from ..utils.tracing import tracer
+
+logger = get_logger(__name__)
+
+WATCHLIST_PATH = "/watchlist"
+
+# (报价字段, 列标题)；第一列为股票代码
+WATCHLIST_COLUMNS = [
+    ("symbol", "代码"),
+    ("price", "最新价"),
+    ("change", "涨跌"),
+    ("change_percent", "涨跌幅"),
+    ("volume", "成交量"),
+    ("latest_trading_day", "交易日"),
+]
+
+# 涨跌颜色
+_UP_COLOR = "#27ae60"
+_DOWN_COLOR = "#e74c3c"
+_FLAT_COLOR = "#2c3e50"
+
+_CELL_STYLE = {"padding": "8px 12px", "borderBottom": "1px solid #ecf0f1"}
+_NUMERIC_CELL_STYLE = dict(_CELL_STYLE, textAlign="right")
+
+
+def parse_watchlist(value: Optional[str], limit: int) -> List[str]:
+    """
+    解析用户输入的关注列表（逗号或空白分隔）
+
+    Args:
+        value: 输入内容
+        limit: 最多保留的股票数量
+
+    Returns:
+        List[str]: 去重后的大写股票代码
+    """
+    symbols = [s.upper() for s in re.split(r"[,\s]+", value or "") if s]
+    return list(dict.fromkeys(symbols))[:limit]
+
+
+def format_quote(quote: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    把报价格式化为表格各列（股票代码除外）的文本
+
+    Args:
+        quote: 报价，None表示尚无报价
+
+    Returns:
+        List[str]: 各列文本
+    """
+    if quote is None:
+        return ["—"] * (len(WATCHLIST_COLUMNS) - 1)
+
+    percent = str(quote.get("change_percent", "")).rstrip("%")
+    try:
+        percent = f"{float(percent):+.2f}%"
+    except ValueError:
+        percent = "—"
+
+    return [
+        f"{quote.get('price', 0):,.2f}",
+        f"{quote.get('change', 0):+,.2f}",
+        percent,
+        f"{quote.get('volume', 0):,}",
+        quote.get("latest_trading_day") or "—",
+    ]
+
+
+def change_color(quote: Optional[Dict[str, Any]]) -> str:
+    change = (quote or {}).get("change", 0)
+    if change > 0:
+        return _UP_COLOR
+    if change < 0:
+        return _DOWN_COLOR
+    return _FLAT_COLOR
+
+
+def create_watchlist_row(symbol: str, quote: Optional[Dict[str, Any]]) -> html.Tr:
+    """
+    创建关注列表中一个股票的表格行
+
+    刷新回调按位置修改单元格（行 -> children[列] -> children），行结构需与此保持一致
+
+    Args:
+        symbol: 股票代码
+        quote: 报价，None表示尚无报价
+
+    Returns:
+        html.Tr: 表格行
+    """
+    color = change_color(quote)
+    cells = [html.Td(symbol, style=dict(_CELL_STYLE, fontWeight="bold"))]
+    for index, text in enumerate(format_quote(quote), start=1):
+        style = dict(_NUMERIC_CELL_STYLE)
+        if WATCHLIST_COLUMNS[index][0] in ("change", "change_percent"):
+            style["color"] = color
+        cells.append(html.Td(text, style=style))
+    return html.Tr(cells)
+
+
+def create_watchlist_page() -> html.Div:
+    """
+    创建关注列表页面
+
+    Returns:
+        html.Div: 页面组件（默认隐藏，访问 /watchlist 时显示）
+    """
+    return html.Div(
+        [
+            # 当前关注的股票和已渲染到的报价变化时间
+            dcc.Store(id="watchlist-symbols", data=[]),
+            dcc.Store(id="watchlist-since", data=0),
+            # 只在关注列表页面可见时启用
+            dcc.Interval(
+                id="watchlist-interval",
+                interval=config.get_int("WATCHLIST_REFRESH_INTERVAL", 5) * 1000,
+                disabled=True,
+            ),
+            html.Div(
+                [
+                    html.H3(
+                        "关注列表",
+                        style={"color": "#34495e", "marginBottom": "15px"},
+                    ),
+                    html.Div(
+                        [
+                            dcc.Input(
+                                id="watchlist-input",
+                                type="text",
+                                value=config.get("WATCHLIST", ""),
+                                placeholder="输入股票代码，以逗号分隔（如: AAPL, MSFT）",
+                                debounce=True,
+                                style={
+                                    "flex": "1",
+                                    "padding": "10px",
+                                    "fontSize": "14px",
+                                    "border": "1px solid #bdc3c7",
+                                    "borderRadius": "4px",
+                                },
+                            ),
+                            html.Button(
+                                "更新",
+                                id="watchlist-apply",
+                                n_clicks=0,
+                                style={
+                                    "padding": "10px 20px",
+                                    "backgroundColor": "#3498db",
+                                    "color": "white",
+                                    "border": "none",
+                                    "borderRadius": "4px",
+                                    "fontSize": "14px",
+                                    "cursor": "pointer",
+                                },
+                            ),
+                        ],
+                        style={"display": "flex", "gap": "10px"},
+                    ),
+                ],
+                style={
+                    "backgroundColor": "#ecf0f1",
+                    "padding": "30px",
+                    "borderRadius": "8px",
+                    "marginBottom": "20px",
+                },
+            ),
+            html.Table(
+                [
+                    html.Thead(
+                        html.Tr(
+                            [
+                                html.Th(
+                                    title,
+                                    style=dict(
+                                        (
+                                            _CELL_STYLE
+                                            if field == "symbol"
+                                            else _NUMERIC_CELL_STYLE
+                                        ),
+                                        color="#7f8c8d",
+                                    ),
+                                )
+                                for field, title in WATCHLIST_COLUMNS
+                            ]
+                        )
+                    ),
+                    html.Tbody(id="watchlist-body"),
+                ],
+                style={
+                    "width": "100%",
+                    "borderCollapse": "collapse",
+                    "backgroundColor": "white",
+                    "fontSize": "14px",
+                },
+            ),
+        ],
+        id={"type": "page", "path": WATCHLIST_PATH},
+        style={"maxWidth": "800px", "margin": "0 auto", "display": "none"},
+    )
+
+
+def changed_rows(
+    symbols: List[str], entries: Dict[str, Dict[str, Any]], since: float
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], float]:
+    """
+    找出报价在 since 之后发生变化的行
+
+    Args:
+        symbols: 表格中的股票代码（按行顺序）
+        entries: 报价中心返回的报价记录
+        since: 浏览器已渲染到的报价变化时间
+
+    Returns:
+        Tuple[List[Tuple[int, Dict[str, Any]]], float]: (行号, 报价) 列表和新的已渲染时间
+    """
+    rows = []
+    latest = since
+    for index, symbol in enumerate(symbols):
+        entry = entries.get(symbol)
+        if entry is None:
+            continue
+        changed_at = entry.get("changed_at", entry["fetched_at"])
+        if changed_at > since:
+            rows.append((index, entry["quote"]))
+            latest = max(latest, changed_at)
+    return rows, latest
+
+
+def register_watchlist_callbacks(app: dash.Dash) -> None:
+    """
+    注册关注列表页面的回调
+
+    Args:
+        app: Dash应用实例
+    """
+    max_symbols = config.get_int("WATCHLIST_MAX_SYMBOLS", 200)
+    # 报价租约覆盖几次刷新，页面关闭或隐藏后报价中心随之停止轮询这些股票
+    lease = config.get_int("WATCHLIST_REFRESH_INTERVAL", 5) * 3
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="ifinance", function_name="watchlistInactive"),
+        Output("watchlist-interval", "disabled"),
+        [Input("url", "pathname")],
+    )
+
+    @app.callback(
+        [
+            Output("watchlist-body", "children"),
+            Output("watchlist-symbols", "data"),
+            Output("watchlist-since", "data"),
+        ],
+        [
+            Input("watchlist-apply", "n_clicks"),
+            Input("watchlist-input", "value"),
+            Input("url", "pathname"),
+        ],
+    )
+    @metrics.track("render_watchlist")
+    @tracer.traced("render_watchlist")
+    def render_watchlist(n_clicks, value, pathname):
+        """
+        关注列表变化时重新渲染整个表格
+        """
+        if pathname != WATCHLIST_PATH:
+            # 页面不可见时不订阅报价（包括首次加载其他页面时）
+            raise dash.exceptions.PreventUpdate
+
+        symbols = parse_watchlist(value, max_symbols)
+        tracer.current_span().set_attribute("symbols", len(symbols))
+        if not symbols:
+            return [], [], 0
+
+        hub = get_quote_hub()
+        hub.watch(symbols, lease)
+        entries = hub.latest(symbols)
+        _, since = changed_rows(symbols, entries, 0)
+        rows = [
+            create_watchlist_row(
+                symbol, entries[symbol]["quote"] if symbol in entries else None
+            )
+            for symbol in symbols
+        ]
+        return rows, symbols, since
+
+    @app.callback(
+        [
+            Output("watchlist-body", "children", allow_duplicate=True),
+            Output("watchlist-since", "data", allow_duplicate=True),
+        ],
+        [Input("watchlist-interval", "n_intervals")],
+        [State("watchlist-symbols", "data"), State("watchlist-since", "data")],
+        prevent_initial_call=True,
+    )
+    @metrics.track("refresh_watchlist")
+    @tracer.traced("refresh_watchlist")
+    def refresh_watchlist(n_intervals, symbols, since):
+        """
+        定时刷新：只修改报价发生变化的行中的单元格，没有变化时不返回任何内容
+        """
+        if not symbols:
+            raise dash.exceptions.PreventUpdate
+
+        hub = get_quote_hub()
+        hub.watch(symbols, lease)
+        rows, latest = changed_rows(symbols, hub.latest(symbols), since or 0)
+        tracer.current_span().set_attributes(symbols=len(symbols), changed=len(rows))
+        if not rows:
+            raise dash.exceptions.PreventUpdate
+
+        body = Patch()
+        for index, quote in rows:
+            cells = body[index]["props"]["children"]
+            color = change_color(quote)
+            for column, text in enumerate(format_quote(quote), start=1):
+                cells[column]["props"]["children"] = text
+                if WATCHLIST_COLUMNS[column][0] in ("change", "change_percent"):
+                    cells[column]["props"]["style"]["color"] = color
+        return body, latest
+
+    logger.debug("Watchlist callbacks registered (refresh lease %ss)", lease)
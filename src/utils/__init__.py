@@ -10,6 +10,7 @@ from .exceptions import (
     ConfigurationError,
     DataProcessingError,
     DataValidationError,
+    HistoryNotImportedError,
     NetworkError,
     UIError,
     iFinanceError,
@@ -24,6 +25,7 @@ __all__ = [
     "APIError",
     "DataValidationError",
     "DataProcessingError",
+    "HistoryNotImportedError",
     "NetworkError",
     "APIRateLimitError",
     "APIAuthenticationError",
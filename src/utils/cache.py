@@ -0,0 +1,703 @@
+# 缓存工具模块
+# 提供有界的缓存后端（进程内LRU或跨进程共享的磁盘缓存）和记忆化装饰器
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+from .config import config
+from .exceptions import CacheError
+from .logger import LoggerMixin
+from .metrics import metrics
+
+# 缓存未命中时返回的哨兵对象（允许缓存None值）
+MISSING = object()
+
+# 按键的命名空间统计缓存命中情况
+CACHE_REQUESTS = metrics.counter(
+    "ifinance_cache_requests_total",
+    "Cache lookups by key namespace and result",
+    ["namespace", "result"],
+)
+
+
+def make_key(namespace: str, *parts: Any) -> str:
+    """
+    根据命名空间和若干组成部分生成缓存键
+
+    Args:
+        namespace: 键的命名空间（如 'daily', 'view'）
+        *parts: 键的组成部分，None会被编码为空字符串
+
+    Returns:
+        str: 形如 'namespace:part1:part2' 的缓存键
+    """
+    encoded = ["" if part is None else str(part) for part in parts]
+    key = ":".join([namespace] + encoded)
+
+    # 过长的键使用摘要，避免磁盘缓存索引膨胀
+    if len(key) > 200:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        key = f"{namespace}:{digest}"
+
+    return key
+
+
+class BaseCache(LoggerMixin, ABC):
+    """
+    缓存后端抽象基类
+
+    定义统一的get/set/delete接口，并统计命中率
+    """
+
+    def __init__(self, default_ttl: Optional[int] = None):
+        """
+        初始化缓存后端
+
+        Args:
+            default_ttl: 默认过期时间（秒），None表示不过期
+        """
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        获取缓存值
+
+        Args:
+            key: 缓存键
+            default: 未命中时返回的默认值
+
+        Returns:
+            Any: 缓存值或默认值
+        """
+        value = self._get(key)
+        namespace = key.split(":", 1)[0]
+        if value is MISSING:
+            self.misses += 1
+            CACHE_REQUESTS.inc(namespace=namespace, result="miss")
+            return default
+
+        self.hits += 1
+        CACHE_REQUESTS.inc(namespace=namespace, result="hit")
+        return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        批量获取缓存值
+
+        Args:
+            keys: 缓存键
+
+        Returns:
+            Dict[str, Any]: 缓存键 -> 缓存值，未命中的键不包含在内
+        """
+        values = {}
+        for key, value in self._get_many(list(keys)):
+            namespace = key.split(":", 1)[0]
+            if value is MISSING:
+                self.misses += 1
+                CACHE_REQUESTS.inc(namespace=namespace, result="miss")
+            else:
+                self.hits += 1
+                CACHE_REQUESTS.inc(namespace=namespace, result="hit")
+                values[key] = value
+        return values
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """
+        写入缓存值
+
+        Args:
+            key: 缓存键
+            value: 缓存值（必须可被pickle序列化）
+            ttl: 过期时间（秒），None表示使用默认过期时间
+        """
+        self._set(key, value, self.default_ttl if ttl is None else ttl)
+
+    @abstractmethod
+    def incr(self, key: str, delta: int = 1, ttl: Optional[int] = None) -> int:
+        """
+        原子地增加计数器的值，计数器不存在时从0开始
+
+        Args:
+            key: 缓存键
+            delta: 增量
+            ttl: 计数器创建时设置的过期时间（秒）
+
+        Returns:
+            int: 增加后的值
+        """
+        pass
+
+    @abstractmethod
+    def update(
+        self,
+        key: str,
+        func: Callable[[Any], Any],
+        default: Any = None,
+        ttl: Optional[int] = None,
+    ) -> Any:
+        """
+        原子地读取、修改并写回缓存值
+
+        Args:
+            key: 缓存键
+            func: 根据当前值计算新值的函数
+            default: 缓存值不存在时传给func的值
+            ttl: 过期时间（秒），None表示不过期
+
+        Returns:
+            Any: 写回的新值
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        删除缓存值
+
+        Args:
+            key: 缓存键
+        """
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        清空缓存
+        """
+        pass
+
+    @abstractmethod
+    def _get(self, key: str) -> Any:
+        pass
+
+    @abstractmethod
+    def _set(self, key: str, value: Any, ttl: Optional[int]) -> None:
+        pass
+
+    def _get_many(self, keys: List[str]) -> List[Tuple[str, Any]]:
+        return [(key, self._get(key)) for key in keys]
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        获取缓存命中率
+
+        Returns:
+            float: 命中率（0-1），无访问时为0
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class NullCache(BaseCache):
+    """
+    空缓存
+
+    当缓存被禁用时使用，所有读取均未命中
+    """
+
+    def _get(self, key: str) -> Any:
+        return MISSING
+
+    def _set(self, key: str, value: Any, ttl: Optional[int]) -> None:
+        pass
+
+    def incr(self, key: str, delta: int = 1, ttl: Optional[int] = None) -> int:
+        return delta
+
+    def update(
+        self,
+        key: str,
+        func: Callable[[Any], Any],
+        default: Any = None,
+        ttl: Optional[int] = None,
+    ) -> Any:
+        return func(default)
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class MemoryCache(BaseCache):
+    """
+    进程内LRU缓存
+
+    条目数有上限，超出时淘汰最久未使用的条目；仅在当前进程内共享
+    """
+
+    def __init__(self, max_entries: int = 1024, default_ttl: Optional[int] = None):
+        """
+        初始化内存缓存
+
+        Args:
+            max_entries: 最大条目数
+            default_ttl: 默认过期时间（秒）
+        """
+        super().__init__(default_ttl)
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return MISSING
+
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any, ttl: Optional[int]) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def incr(self, key: str, delta: int = 1, ttl: Optional[int] = None) -> int:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (entry[1] is not None and entry[1] < time.monotonic()):
+                entry = (0, time.monotonic() + ttl if ttl else None)
+
+            value = entry[0] + delta
+            self._data[key] = (value, entry[1])
+            self._data.move_to_end(key)
+            return value
+
+    def update(
+        self,
+        key: str,
+        func: Callable[[Any], Any],
+        default: Any = None,
+        ttl: Optional[int] = None,
+    ) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (entry[1] is not None and entry[1] < time.monotonic()):
+                current = default
+            else:
+                current = entry[0]
+
+            value = func(current)
+            self._data[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _ForkGuard:
+    """
+    SQLite操作的fork保护
+
+    SQLite的锁状态保存在进程级的全局结构中：若fork时另一个线程正处于写事务中，
+    子进程会一直认为该锁被本进程的其他连接持有，写入时反复返回SQLITE_BUSY直到超时。
+    多线程worker中fork后台任务进程时就会出现这种情况。
+
+    所有磁盘缓存操作在执行期间登记为活动操作，fork前等待活动操作全部结束，
+    并在fork完成前阻止新的操作开始。
+    """
+
+    def __init__(self, timeout: float = 5.0):
+        """
+        Args:
+            timeout: fork前等待活动操作结束的最长时间（秒），超时后照常fork
+        """
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._active = 0
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        with self._cond:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                if not self._active:
+                    self._cond.notify_all()
+
+    def before_fork(self) -> None:
+        self._cond.acquire()
+        self._cond.wait_for(lambda: not self._active, self.timeout)
+
+    def after_fork_in_parent(self) -> None:
+        self._cond.release()
+
+    def after_fork_in_child(self) -> None:
+        # 子进程中只有执行fork的线程，其他线程的活动操作不再存在
+        self._cond = threading.Condition()
+        self._active = 0
+
+
+_fork_guard = _ForkGuard()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_fork_guard.before_fork,
+        after_in_parent=_fork_guard.after_fork_in_parent,
+        after_in_child=_fork_guard.after_fork_in_child,
+    )
+
+
+def _fork_guarded(method: Callable) -> Callable:
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with _fork_guard.shared():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+if diskcache is not None:
+
+    class ForkSafeCache(diskcache.Cache):
+        """
+        可在多线程进程中安全fork的diskcache.Cache
+
+        数据缓存和后台回调任务队列都使用此类（见 _ForkGuard）
+        """
+
+        @contextmanager
+        def transact(self, retry: bool = False) -> Iterator[None]:
+            with _fork_guard.shared(), super().transact(retry):
+                yield
+
+    for _name in (
+        "add",
+        "clear",
+        "cull",
+        "decr",
+        "delete",
+        "evict",
+        "expire",
+        "get",
+        "incr",
+        "pop",
+        "set",
+        "touch",
+        "__contains__",
+        "__delitem__",
+        "__getitem__",
+        "__setitem__",
+    ):
+        setattr(ForkSafeCache, _name, _fork_guarded(getattr(diskcache.Cache, _name)))
+
+else:
+    ForkSafeCache = None
+
+
+class DiskCache(BaseCache):
+    """
+    基于diskcache的磁盘缓存
+
+    底层为SQLite + 文件，可在同一主机的多个进程（如多个gunicorn worker）之间共享，
+    总大小有上限，超出时按LRU策略淘汰（eviction_policy='none' 时只删除过期条目）
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        size_limit: int = 256 * 1024 * 1024,
+        default_ttl: Optional[int] = None,
+        eviction_policy: str = "least-recently-used",
+    ):
+        """
+        初始化磁盘缓存
+
+        Args:
+            directory: 缓存目录
+            size_limit: 缓存总大小上限（字节）
+            default_ttl: 默认过期时间（秒）
+            eviction_policy: diskcache的淘汰策略，'none' 表示从不淘汰未过期的条目
+
+        Raises:
+            CacheError: 当diskcache未安装或缓存目录不可用时
+        """
+        super().__init__(default_ttl)
+        if diskcache is None:
+            raise CacheError("diskcache is not installed, cannot use DiskCache")
+
+        try:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            self._cache = ForkSafeCache(
+                directory,
+                size_limit=size_limit,
+                eviction_policy=eviction_policy,
+            )
+        except Exception as e:
+            raise CacheError(f"Failed to open disk cache at {directory}: {str(e)}")
+
+        self.directory = directory
+
+    def _get(self, key: str) -> Any:
+        try:
+            return self._cache.get(key, default=MISSING)
+        except Exception as e:
+            # 缓存故障不应影响主流程，按未命中处理
+            self.logger.warning(f"Disk cache read failed for '{key}': {str(e)}")
+            return MISSING
+
+    def _get_many(self, keys: List[str]) -> List[Tuple[str, Any]]:
+        # 在一个事务中读取，多个键只获取一次数据库锁
+        try:
+            with self._cache.transact():
+                return [(key, self._cache.get(key, default=MISSING)) for key in keys]
+        except Exception as e:
+            self.logger.warning(f"Disk cache batch read failed: {str(e)}")
+            return [(key, MISSING) for key in keys]
+
+    def _set(self, key: str, value: Any, ttl: Optional[int]) -> None:
+        try:
+            self._cache.set(key, value, expire=ttl or None)
+        except Exception as e:
+            self.logger.warning(f"Disk cache write failed for '{key}': {str(e)}")
+
+    def incr(self, key: str, delta: int = 1, ttl: Optional[int] = None) -> int:
+        # 在事务中读取并写回，保证多进程并发时计数准确
+        try:
+            with self._cache.transact():
+                value = self._cache.get(key, default=None)
+                if value is None:
+                    value = delta
+                    self._cache.set(key, value, expire=ttl or None)
+                else:
+                    value = self._cache.incr(key, delta)
+            return value
+        except Exception as e:
+            # 与读写一样不影响主流程：按计数器不存在处理
+            self.logger.warning(f"Disk cache increment failed for '{key}': {str(e)}")
+            return delta
+
+    def update(
+        self,
+        key: str,
+        func: Callable[[Any], Any],
+        default: Any = None,
+        ttl: Optional[int] = None,
+    ) -> Any:
+        try:
+            with self._cache.transact():
+                value = func(self._cache.get(key, default=default))
+                self._cache.set(key, value, expire=ttl or None)
+            return value
+        except Exception as e:
+            self.logger.warning(f"Disk cache update failed for '{key}': {str(e)}")
+            return func(default)
+
+    def delete(self, key: str) -> None:
+        try:
+            self._cache.delete(key)
+        except Exception as e:
+            self.logger.warning(f"Disk cache delete failed for '{key}': {str(e)}")
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+_cache_instance: Optional[BaseCache] = None
+_cache_lock = threading.Lock()
+
+
+def create_cache() -> BaseCache:
+    """
+    根据配置创建缓存后端
+
+    配置项:
+        CACHE_ENABLED: 是否启用缓存（默认启用）
+        CACHE_BACKEND: 'disk' 或 'memory'（默认在diskcache可用时使用disk）
+        CACHE_TTL: 默认过期时间（秒）
+        CACHE_DIR: 磁盘缓存目录
+        CACHE_SIZE_LIMIT_MB: 磁盘缓存大小上限（MB）
+        CACHE_MAX_ENTRIES: 内存缓存最大条目数
+
+    Returns:
+        BaseCache: 缓存后端实例
+    """
+    default_ttl = config.get_int("CACHE_TTL", 300)
+
+    if not config.get_bool("CACHE_ENABLED", True):
+        return NullCache(default_ttl)
+
+    backend = config.get("CACHE_BACKEND", "disk" if diskcache else "memory").lower()
+
+    if backend == "disk":
+        directory = config.get(
+            "CACHE_DIR", str(Path(tempfile.gettempdir()) / "ifinance_cache")
+        )
+        size_limit = config.get_int("CACHE_SIZE_LIMIT_MB", 256) * 1024 * 1024
+        try:
+            return DiskCache(directory, size_limit=size_limit, default_ttl=default_ttl)
+        except CacheError as e:
+            # 磁盘缓存不可用时退化为进程内缓存
+            cache = MemoryCache(config.get_int("CACHE_MAX_ENTRIES", 1024), default_ttl)
+            cache.logger.warning(f"{str(e)}, falling back to memory cache")
+            return cache
+
+    return MemoryCache(config.get_int("CACHE_MAX_ENTRIES", 1024), default_ttl)
+
+
+def get_cache() -> BaseCache:
+    """
+    获取全局缓存实例（首次调用时按配置创建）
+
+    Returns:
+        BaseCache: 全局缓存实例
+    """
+    global _cache_instance
+
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = create_cache()
+    return _cache_instance
+
+
+_shared_store: Optional[BaseCache] = None
+_shared_store_lock = threading.Lock()
+
+
+def create_shared_store() -> BaseCache:
+    """
+    创建保存协调状态的缓存（限流计数、定时刷新认领、报价、指标、性能分析结果等）
+
+    这些条目很小但不能丢失，与数据缓存分开保存：全局缓存为磁盘缓存时使用同一目录下
+    从不淘汰的磁盘缓存（条目只在过期后删除），数据缓存写满时不会把计数器淘汰掉；
+    否则使用单独的进程内缓存，保证缓存被禁用时限流等仍然生效
+
+    Returns:
+        BaseCache: 缓存后端
+    """
+    cache = get_cache()
+    if isinstance(cache, DiskCache):
+        try:
+            return DiskCache(
+                str(Path(cache.directory) / "shared"), eviction_policy="none"
+            )
+        except CacheError as e:
+            cache.logger.warning(f"{str(e)}, using a memory store for shared state")
+    return MemoryCache(max_entries=65536)
+
+
+def get_shared_store() -> BaseCache:
+    """
+    获取保存协调状态的共享缓存（首次调用时创建，见 create_shared_store）
+
+    Returns:
+        BaseCache: 缓存后端
+    """
+    global _shared_store
+
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None:
+                _shared_store = create_shared_store()
+    return _shared_store
+
+
+def _cache_hit_ratio(samples: dict) -> list:
+    """
+    根据缓存访问计数计算各命名空间的命中率（导出指标时调用）
+
+    Args:
+        samples: 汇总后的指标样本
+
+    Returns:
+        list: 命中率指标
+    """
+    counts = {}
+    for (name, pairs), value in samples.items():
+        if name != CACHE_REQUESTS.name:
+            continue
+        labels = dict(pairs)
+        hits, total = counts.get(labels["namespace"], (0, 0))
+        if labels["result"] == "hit":
+            hits += value
+        counts[labels["namespace"]] = (hits, total + value)
+
+    values = [
+        ({"namespace": namespace}, hits / total if total else 0.0)
+        for namespace, (hits, total) in sorted(counts.items())
+    ]
+    return [
+        ("ifinance_cache_hit_ratio", "gauge", "Cache hit ratio by namespace", values)
+    ]
+
+
+metrics.register_collector(_cache_hit_ratio)
+
+
+def memoize(
+    namespace: str,
+    ttl: Optional[int] = None,
+    key_func: Optional[Callable[..., tuple]] = None,
+) -> Callable:
+    """
+    记忆化装饰器，使用全局缓存保存函数返回值
+
+    异常不会被缓存。
+
+    Args:
+        namespace: 缓存键命名空间
+        ttl: 过期时间（秒），None表示使用缓存默认过期时间
+        key_func: 根据函数参数生成键组成部分的函数，默认使用全部位置参数
+
+    Returns:
+        Callable: 装饰器
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            parts = key_func(*args, **kwargs) if key_func else args
+            key = make_key(namespace, *parts)
+
+            cache = get_cache()
+            value = cache.get(key, MISSING)
+            if value is not MISSING:
+                return value
+
+            value = func(*args, **kwargs)
+            cache.set(key, value, ttl)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -80,6 +80,22 @@ class DataProcessingError(iFinanceError):
     pass
 
 
+class HistoryNotImportedError(iFinanceError):
+    """
+    历史数据尚未导入异常
+
+    当页面需要的股票在本地历史数据存储中没有数据时抛出（股票已加入后台导入队列）
+    """
+
+    def __init__(self, symbol: str, error: str = None):
+        message = f"History for {symbol} has not been imported yet"
+        if error:
+            message += f" (last import failed: {error})"
+        super().__init__(message)
+        self.symbol = symbol
+        self.error = error
+
+
 class NetworkError(iFinanceError):
     """
     网络连接异常
@@ -1,13 +1,222 @@
 # 日志工具模块
 # 提供统一的日志记录功能
 
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 from .config import config
 
+# 异步日志模式下的共享队列和后台写入线程（首次使用时启动）
+_log_queue: "queue.Queue" = queue.Queue()
+_listener: Optional["_HandlerDispatcher"] = None
+_listener_lock = threading.Lock()
+
+
+class TextFormatter(logging.Formatter):
+    """
+    文本日志格式，附带被采样丢弃的消息数
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" (+{suppressed} similar messages suppressed)"
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    JSON日志格式，每条记录输出一行JSON对象
+    """
+
+    def __init__(self, caller_info: bool = True):
+        """
+        初始化JSON格式
+
+        Args:
+            caller_info: 是否输出调用位置（文件名和行号）
+        """
+        super().__init__()
+        self.caller_info = caller_info
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if self.caller_info:
+            entry["file"] = record.filename
+            entry["line"] = record.lineno
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    高频日志采样过滤器
+
+    对INFO及以下级别的记录，同一日志记录器的同一消息模板在每个周期内最多输出limit条，
+    其余记录被丢弃并计数，计数附加在该模板下一条被输出的记录上。
+    消息使用延迟格式化（logger.info("... %s", value)）时同一调用点共享一个模板。
+    """
+
+    def __init__(self, limit: int, period: float = 60.0, max_keys: int = 1024):
+        """
+        初始化采样过滤器
+
+        Args:
+            limit: 每个周期内每个消息模板最多输出的记录数
+            period: 采样周期（秒）
+            max_keys: 最多跟踪的消息模板数
+        """
+        super().__init__()
+        self.limit = limit
+        self.period = period
+        self.max_keys = max_keys
+        self._windows: Dict[Tuple[str, str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.period:
+                suppressed = int(window[2]) if window else 0
+                if len(self._windows) >= self.max_keys:
+                    self._prune(now)
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+
+            if window[1] < self.limit:
+                window[1] += 1
+                return True
+
+            window[2] += 1
+            return False
+
+    def _prune(self, now: float) -> None:
+        expired = [k for k, w in self._windows.items() if now - w[0] >= self.period]
+        for key in expired or list(self._windows)[: self.max_keys // 2]:
+            del self._windows[key]
+
+
+class AsyncHandler(logging.handlers.QueueHandler):
+    """
+    异步日志处理器
+
+    只把记录放入进程内队列，由后台线程调用实际的处理器（格式化和I/O都在后台线程完成）。
+    队列只在进程内使用，记录不需要序列化，因此不在调用线程中提前格式化消息，也不复制记录。
+    """
+
+    def __init__(self, handlers: List[logging.Handler]):
+        """
+        初始化异步日志处理器
+
+        Args:
+            handlers: 在后台线程中执行的实际处理器
+        """
+        super().__init__(_log_queue)
+        self.handlers = handlers
+
+    def prepare(self, record: logging.LogRecord) -> Tuple[logging.LogRecord, list]:
+        return record, self.handlers
+
+    def enqueue(self, item: Tuple[logging.LogRecord, list]) -> None:
+        _ensure_listener()
+        _log_queue.put_nowait(item)
+
+
+class _HandlerDispatcher(logging.handlers.QueueListener):
+    """
+    后台日志写入线程，把记录分发给入队时指定的处理器
+    """
+
+    def handle(self, item: Tuple[logging.LogRecord, list]) -> None:
+        record, handlers = item
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def _ensure_listener() -> None:
+    global _listener
+
+    if _listener is None:
+        with _listener_lock:
+            if _listener is None:
+                listener = _HandlerDispatcher(_log_queue)
+                listener.start()
+                _listener = listener
+
+
+def stop_log_listener() -> None:
+    """
+    停止后台日志线程，写出队列中剩余的记录
+    """
+    global _listener
+
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _reset_after_fork() -> None:
+    # 后台线程不会被fork复制：子进程使用新的队列，首次写日志时重新启动线程
+    global _log_queue, _listener, _listener_lock
+
+    _log_queue = queue.Queue()
+    _listener = None
+    _listener_lock = threading.Lock()
+
+
+atexit.register(stop_log_listener)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _create_sampling_filter() -> Optional[SamplingFilter]:
+    limit = config.get_int("LOG_SAMPLE_LIMIT", 0)
+    if limit <= 0:
+        return None
+    return SamplingFilter(limit, config.get_int("LOG_SAMPLE_PERIOD", 60))
+
+
+# 所有日志记录器共用的采样过滤器（LOG_SAMPLE_LIMIT为0时不采样）
+_sampling_filter = _create_sampling_filter()
+
+if not config.get_bool("LOG_CALLER_INFO", True):
+    # 不再为每条记录查找调用位置（logging 文档中的优化方式）
+    logging._srcfile = None
+
 
 def setup_logger(
     name: str,
@@ -18,6 +227,13 @@ def setup_logger(
     """
     设置并返回一个配置好的日志记录器
 
+    配置项:
+        LOG_MODE: 'sync'（默认，在调用线程中写日志）或 'queue'（由后台线程写日志）
+        LOG_FORMAT: 'text'（默认）或 'json'
+        LOG_CALLER_INFO: 是否记录调用位置（文件名和行号），关闭后不再为每条记录查找调用栈
+        LOG_SAMPLE_LIMIT: 同一消息模板每个周期内最多输出的INFO/DEBUG记录数（0表示不采样）
+        LOG_SAMPLE_PERIOD: 采样周期（秒）
+
     Args:
         name: 日志记录器名称
         level: 日志级别 (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -40,18 +256,21 @@ def setup_logger(
     logger.setLevel(getattr(logging, level.upper(), logging.INFO))
 
     # 设置日志格式
-    if format_string is None:
-        format_string = (
-            "%(asctime)s - %(name)s - %(levelname)s - "
-            "%(filename)s:%(lineno)d - %(message)s"
-        )
-
-    formatter = logging.Formatter(format_string)
+    caller_info = logging._srcfile is not None
+    if config.get("LOG_FORMAT", "text").lower() == "json":
+        formatter = JsonFormatter(caller_info)
+    else:
+        if format_string is None:
+            format_string = "%(asctime)s - %(name)s - %(levelname)s - "
+            if caller_info:
+                format_string += "%(filename)s:%(lineno)d - "
+            format_string += "%(message)s"
+        formatter = TextFormatter(format_string)
 
     # 控制台处理器
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers: List[logging.Handler] = [console_handler]
 
     # 文件处理器（如果指定了日志文件）
     if log_file:
@@ -60,7 +279,16 @@ def setup_logger(
 
         file_handler = logging.FileHandler(log_file, encoding="utf-8")
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    if config.get("LOG_MODE", "sync").lower() == "queue":
+        handlers = [AsyncHandler(handlers)]
+
+    for handler in handlers:
+        logger.addHandler(handler)
+
+    if _sampling_filter is not None:
+        logger.addFilter(_sampling_filter)
 
     return logger
 
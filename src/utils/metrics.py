@@ -0,0 +1,377 @@
+# 运行指标模块
+# 进程内记录计数器和直方图，定期合并到共享缓存，按Prometheus文本格式导出
+
+import atexit
+import os
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .config import config
+from .logger import LoggerMixin
+
+# 共享缓存中保存汇总指标的键
+SNAPSHOT_KEY = "metrics:snapshot"
+
+# 默认直方图分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 样本键: (样本名, ((标签名, 标签值), ...))
+SampleKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Counter:
+    """
+    单调递增的计数器
+    """
+
+    def __init__(
+        self, registry: "MetricsRegistry", name: str, labelnames: Sequence[str]
+    ):
+        self._registry = registry
+        self.name = name
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """
+        增加计数
+
+        Args:
+            amount: 增量
+            **labels: 标签值，必须与labelnames一致
+        """
+        key = (self.name, _label_pairs(self.labelnames, labels))
+        self._registry._add([(key, amount)])
+
+
+class Histogram:
+    """
+    累积分桶直方图
+    """
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float],
+    ):
+        self._registry = registry
+        self.name = name
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """
+        记录一个观测值
+
+        Args:
+            value: 观测值（如耗时秒数）
+            **labels: 标签值，必须与labelnames一致
+        """
+        pairs = _label_pairs(self.labelnames, labels)
+        updates = [
+            ((f"{self.name}_bucket", pairs + (("le", _format_value(bound)),)), 1)
+            for bound in self.buckets
+            if value <= bound
+        ]
+        updates.append(((f"{self.name}_bucket", pairs + (("le", "+Inf"),)), 1))
+        updates.append(((f"{self.name}_count", pairs), 1))
+        updates.append(((f"{self.name}_sum", pairs), value))
+        self._registry._add(updates)
+
+    def time(self, **labels: Any) -> "_Timer":
+        """
+        返回记录代码块耗时的上下文管理器
+
+        Args:
+            **labels: 标签值
+
+        Returns:
+            _Timer: 上下文管理器
+        """
+        return _Timer(self, labels)
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, Any]):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+
+
+class MetricsRegistry(LoggerMixin):
+    """
+    指标注册表
+
+    热路径上只在进程内累加增量；增量每隔flush_interval秒（以及导出时）合并到共享缓存，
+    因此多个gunicorn worker和后台回调子进程记录的指标会汇总到同一份快照中。
+    缓存被禁用时只统计当前进程。
+    """
+
+    def __init__(self, flush_interval: int = 5):
+        """
+        初始化指标注册表
+
+        Args:
+            flush_interval: 增量合并到共享缓存的最小间隔（秒）
+        """
+        self.flush_interval = flush_interval
+        self._families: Dict[str, Tuple[str, str]] = {}
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Callable[[Dict[SampleKey, float]], Iterable]] = []
+        self._pending: Dict[SampleKey, float] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """
+        获取或创建计数器
+
+        Args:
+            name: 指标名（以 _total 结尾）
+            documentation: 指标说明
+            labelnames: 标签名列表
+
+        Returns:
+            Counter: 计数器
+        """
+        with self._lock:
+            if name not in self._metrics:
+                self._families[name] = ("counter", documentation)
+                self._metrics[name] = Counter(self, name, labelnames)
+            return self._metrics[name]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """
+        获取或创建直方图
+
+        Args:
+            name: 指标名
+            documentation: 指标说明
+            labelnames: 标签名列表
+            buckets: 分桶上界
+
+        Returns:
+            Histogram: 直方图
+        """
+        with self._lock:
+            if name not in self._metrics:
+                self._families[name] = ("histogram", documentation)
+                self._metrics[name] = Histogram(self, name, labelnames, buckets)
+            return self._metrics[name]
+
+    def register_collector(
+        self, collector: Callable[[Dict[SampleKey, float]], Iterable]
+    ) -> None:
+        """
+        注册导出时计算的派生指标
+
+        Args:
+            collector: 接收汇总样本，返回 (指标名, 类型, 说明, [(标签字典, 值), ...]) 的函数
+        """
+        self._collectors.append(collector)
+
+    def _add(self, updates: List[Tuple[SampleKey, float]]) -> None:
+        with self._lock:
+            for key, amount in updates:
+                self._pending[key] = self._pending.get(key, 0) + amount
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def flush(self) -> Dict[str, Any]:
+        """
+        将进程内的增量合并到共享快照
+
+        Returns:
+            Dict[str, Any]: 合并后的快照 {'families': ..., 'samples': ...}
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            families = dict(self._families)
+            self._last_flush = time.monotonic()
+
+        def merge(snapshot: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            snapshot = snapshot or {"families": {}, "samples": {}}
+            snapshot["families"].update(families)
+            samples = snapshot["samples"]
+            for key, amount in pending.items():
+                samples[key] = samples.get(key, 0) + amount
+            return snapshot
+
+        try:
+            return self._get_store().update(SNAPSHOT_KEY, merge)
+        except Exception as e:
+            # 指标故障不应影响主流程，丢弃本次增量
+            self.logger.warning(f"Failed to flush metrics: {str(e)}")
+            return merge(None)
+
+    def _get_store(self):
+        from .cache import get_shared_store
+
+        return get_shared_store()
+
+    def render(self) -> str:
+        """
+        按Prometheus文本格式导出所有指标
+
+        Returns:
+            str: 文本格式的指标
+        """
+        snapshot = self.flush()
+        families = snapshot["families"]
+        samples = snapshot["samples"]
+
+        grouped: Dict[str, List[Tuple[SampleKey, float]]] = {}
+        for key, value in samples.items():
+            grouped.setdefault(_family_name(key[0], families), []).append((key, value))
+
+        lines = []
+        for name in sorted(grouped):
+            metric_type, documentation = families[name]
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (sample_name, pairs), value in sorted(
+                grouped[name], key=_sample_sort_key
+            ):
+                lines.append(_format_sample(sample_name, pairs, value))
+
+        for collector in self._collectors:
+            for name, metric_type, documentation, values in collector(samples):
+                if not values:
+                    continue
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in values:
+                    lines.append(_format_sample(name, tuple(labels.items()), value))
+
+        return "\n".join(lines) + "\n"
+
+    def _after_fork(self) -> None:
+        # 子进程（gunicorn worker或后台回调进程）不继承父进程未合并的增量，避免重复计数
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.monotonic()
+
+    def _flush_pending(self) -> None:
+        if self._pending:
+            self.flush()
+
+    def reset(self) -> None:
+        """
+        清空进程内增量和共享快照
+        """
+        with self._lock:
+            self._pending = {}
+        self._get_store().delete(SNAPSHOT_KEY)
+
+    def track(self, name: str, flush: bool = False) -> Callable:
+        """
+        记录回调执行耗时的装饰器
+
+        耗时记录在 ifinance_callback_duration_seconds 中，异常按类型计入
+        ifinance_callback_errors_total（异常照常抛出）。
+
+        Args:
+            name: 回调名称（作为callback标签）
+            flush: 执行结束后是否立即合并指标（用于在短生命周期子进程中执行的后台回调）
+
+        Returns:
+            Callable: 装饰器
+        """
+        durations = self.histogram(
+            "ifinance_callback_duration_seconds",
+            "Dash callback execution time in seconds",
+            ["callback"],
+        )
+        errors = self.counter(
+            "ifinance_callback_errors_total",
+            "Dash callback exceptions by type",
+            ["callback", "error"],
+        )
+
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    errors.inc(callback=name, error=type(e).__name__)
+                    raise
+                finally:
+                    durations.observe(time.perf_counter() - start, callback=name)
+                    if flush:
+                        self.flush()
+
+            return wrapper
+
+        return decorator
+
+
+def _label_pairs(
+    labelnames: Tuple[str, ...], labels: Dict[str, Any]
+) -> Tuple[Tuple[str, str], ...]:
+    if len(labels) != len(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple((name, str(labels[name])) for name in labelnames)
+
+
+def _family_name(sample_name: str, families: Dict[str, Tuple[str, str]]) -> str:
+    if sample_name in families:
+        return sample_name
+    for suffix in ("_bucket", "_count", "_sum"):
+        if sample_name.endswith(suffix):
+            return sample_name[: -len(suffix)]
+    return sample_name
+
+
+def _sample_sort_key(item: Tuple[SampleKey, float]) -> tuple:
+    (sample_name, pairs), _ = item
+    labels = [(name, value) for name, value in pairs if name != "le"]
+    bound = dict(pairs).get("le")
+    return (labels, sample_name, float(bound) if bound is not None else 0.0)
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+def _format_sample(name: str, pairs: Iterable[Tuple[str, str]], value: float) -> str:
+    labels = ",".join(f'{key}="{_escape(val)}"' for key, val in pairs)
+    if labels:
+        return f"{name}{{{labels}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# 全局指标注册表
+metrics = MetricsRegistry(flush_interval=config.get_int("METRICS_FLUSH_INTERVAL", 5))
+
+# 进程退出前合并未提交的增量
+atexit.register(metrics._flush_pending)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=metrics._after_fork)
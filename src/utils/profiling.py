@@ -0,0 +1,282 @@
+# 回调性能分析模块
+# 按配置或请求头对回调执行进行cProfile与采样分析，保存最近若干次的结果
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+from .cache import get_shared_store
+from .config import config
+from .logger import LoggerMixin
+
+# 共享缓存中保存最近分析结果的键
+PROFILES_KEY = "profiles:recent"
+
+
+class _StackSampler(threading.Thread):
+    """
+    调用栈采样线程
+
+    按固定间隔读取目标线程的调用栈（只保留root帧以下的部分），按折叠格式计数
+    """
+
+    def __init__(self, thread_id: int, root: Any, label: str, interval: float):
+        super().__init__(name=f"profiler-{label}", daemon=True)
+        self.thread_id = thread_id
+        self.root = root
+        self.label = label
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None and frame is not self.root:
+                module = frame.f_globals.get("__name__", "?")
+                names.append(f"{module}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if frame is None:
+                # 目标线程已离开被分析的代码
+                continue
+            names.append(self.label)
+            self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class CallbackProfiler(LoggerMixin):
+    """
+    回调性能分析器
+
+    被分析的回调同时使用cProfile（函数级累计耗时）和调用栈采样（可直接生成火焰图的
+    折叠栈）记录。分析结果保存在共享缓存中，后台回调子进程中的分析结果同样可以查看。
+
+    同一进程内同时只有一个回调使用cProfile（Python 3.12起cProfile为进程级），
+    其余并发请求只进行采样。
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        header: str = "X-Profile",
+        token: str = "",
+        allow_header: bool = False,
+        history: int = 20,
+        interval_ms: int = 5,
+        top_n: int = 40,
+    ):
+        """
+        初始化性能分析器
+
+        Args:
+            enabled: 是否分析所有回调
+            header: 触发分析的请求头
+            token: 请求头需要携带的令牌，为空时只在开发模式（Flask debug）下任意非空值均可
+            allow_header: 是否允许通过请求头触发分析
+            history: 保留的分析结果数量
+            interval_ms: 采样间隔（毫秒）
+            top_n: cProfile统计中保留的函数数量
+        """
+        self.enabled = enabled
+        self.header = header
+        self.token = token
+        self.allow_header = allow_header
+        self.history = history
+        self.interval = interval_ms / 1000
+        self.top_n = top_n
+        self._cprofile_lock = threading.Lock()
+
+    def is_requested(self) -> bool:
+        """
+        判断当前回调是否需要分析
+
+        Returns:
+            bool: 已全局启用，或请求头携带了有效的分析标记时为True
+        """
+        if self.enabled:
+            return True
+        if not self.allow_header:
+            return False
+
+        headers = {key.lower(): value for key, value in _request_headers().items()}
+        value = headers.get(self.header.lower())
+        if not value:
+            return False
+        if not self.token:
+            return _development_mode()
+        return value == self.token
+
+    def profile(self, name: str) -> Callable:
+        """
+        对回调进行性能分析的装饰器（未触发分析时几乎没有额外开销）
+
+        Args:
+            name: 回调名称
+
+        Returns:
+            Callable: 装饰器
+        """
+
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.is_requested():
+                    return func(*args, **kwargs)
+                return self._run(name, func, args, kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _run(self, name: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+        sampler = _StackSampler(
+            threading.get_ident(), sys._getframe(), name, self.interval
+        )
+        profiler = cProfile.Profile() if self._cprofile_lock.acquire(False) else None
+
+        started_at = datetime.now()
+        start = time.perf_counter()
+        error = None
+        sampler.start()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._cprofile_lock.release()
+            sampler.stop()
+            duration = time.perf_counter() - start
+            self._save(
+                {
+                    "id": uuid.uuid4().hex[:12],
+                    "callback": name,
+                    "started_at": started_at.isoformat(timespec="milliseconds"),
+                    "duration_ms": round(duration * 1000, 2),
+                    "pid": os.getpid(),
+                    "error": error,
+                    "interval_ms": self.interval * 1000,
+                    "stats": self._format_stats(profiler),
+                    "stacks": dict(sampler.stacks),
+                }
+            )
+
+    def _format_stats(self, profiler: Optional[cProfile.Profile]) -> str:
+        if profiler is None:
+            return "cProfile was busy with another request; only samples were taken\n"
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.strip_dirs().sort_stats("cumulative").print_stats(self.top_n)
+        return stream.getvalue()
+
+    def _save(self, record: Dict[str, Any]) -> None:
+        def append(profiles: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+            return ([record] + (profiles or []))[: self.history]
+
+        try:
+            get_shared_store().update(PROFILES_KEY, append)
+            self.logger.info(
+                f"Profiled {record['callback']} in {record['duration_ms']}ms "
+                f"(profile {record['id']})"
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to store profile: {str(e)}")
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """
+        获取最近的分析结果（按时间倒序）
+
+        Returns:
+            List[Dict[str, Any]]: 分析结果列表
+        """
+        # 只读：不经过 update()，查看时不占用写入分析结果的锁
+        return get_shared_store().get(PROFILES_KEY) or []
+
+    def get_profile(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取指定的分析结果
+
+        Args:
+            profile_id: 分析结果ID
+
+        Returns:
+            Optional[Dict[str, Any]]: 分析结果，不存在时为None
+        """
+        for record in self.list_profiles():
+            if record["id"] == profile_id:
+                return record
+        return None
+
+
+def format_collapsed(stacks: Dict[str, int]) -> str:
+    """
+    按折叠栈格式输出采样结果（可直接用于 flamegraph.pl、speedscope 等工具）
+
+    Args:
+        stacks: {折叠栈: 采样次数}
+
+    Returns:
+        str: 每行 'frame1;frame2;... count'
+    """
+    lines = [f"{stack} {count}" for stack, count in sorted(stacks.items())]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _request_headers() -> Dict[str, str]:
+    """
+    获取触发当前回调的请求头（后台回调中由Dash从原始请求复制）
+
+    Returns:
+        Dict[str, str]: 请求头，不在请求上下文中时为空
+    """
+    try:
+        import dash
+
+        headers = dash.callback_context.headers
+    except Exception:
+        headers = None
+
+    if headers is None:
+        from flask import has_request_context, request
+
+        headers = request.headers if has_request_context() else {}
+    return headers
+
+
+def _development_mode() -> bool:
+    """
+    是否在开发模式（python -m src.main --debug，即Flask debug）下运行
+    """
+    from flask import current_app, has_app_context
+
+    return has_app_context() and bool(current_app.debug)
+
+
+# 全局回调性能分析器
+profiler = CallbackProfiler(
+    enabled=config.get_bool("PROFILING_ENABLED", False),
+    header=config.get("PROFILING_HEADER", "X-Profile"),
+    token=config.get("DEBUG_TOKEN", ""),
+    allow_header=config.get_bool("DEBUG_ROUTES_ENABLED", False),
+    history=config.get_int("PROFILING_HISTORY", 20),
+    interval_ms=config.get_int("PROFILING_INTERVAL_MS", 5),
+    top_n=config.get_int("PROFILING_TOP", 40),
+)
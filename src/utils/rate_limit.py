@@ -0,0 +1,187 @@
+# 请求频率限制模块
+# 基于共享缓存的固定窗口计数，多个worker进程共用同一份配额
+
+import time
+from typing import Optional
+
+from .cache import BaseCache, get_shared_store, make_key
+from .config import config
+from .exceptions import APIRateLimitError
+from .logger import LoggerMixin
+from .metrics import metrics
+
+# 本地频率限制导致的等待与拒绝
+RATE_LIMIT_WAITS = metrics.counter(
+    "ifinance_rate_limit_waits_total",
+    "Requests delayed until the next per-minute window",
+    ["limiter"],
+)
+RATE_LIMIT_REJECTIONS = metrics.counter(
+    "ifinance_rate_limit_rejections_total",
+    "Requests rejected because the local quota was exhausted",
+    ["limiter", "window"],
+)
+
+
+class RateLimiter(LoggerMixin):
+    """
+    请求频率限制器
+
+    按分钟和按天两个固定窗口计数。计数保存在共享缓存中（磁盘缓存时跨进程共享），
+    因此无论运行多少个worker和线程，对上游API的总调用量都受同一配额约束。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        per_minute: int = 0,
+        per_day: int = 0,
+        max_wait: int = 60,
+        backend: Optional[BaseCache] = None,
+    ):
+        """
+        初始化频率限制器
+
+        Args:
+            name: 限制器名称（作为计数键的命名空间）
+            per_minute: 每分钟最大请求数，0表示不限制
+            per_day: 每天最大请求数，0表示不限制
+            max_wait: 分钟配额用尽时最长等待时间（秒）
+            backend: 计数使用的缓存后端，None表示使用全局缓存
+        """
+        self.name = name
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.max_wait = max_wait
+        self._backend = backend
+
+    @property
+    def backend(self) -> BaseCache:
+        """
+        获取计数使用的缓存后端
+
+        缓存被禁用时退化为进程内计数，保证限流仍然生效
+
+        Returns:
+            BaseCache: 缓存后端
+        """
+        if self._backend is None:
+            self._backend = get_shared_store()
+        return self._backend
+
+    def acquire(self) -> None:
+        """
+        获取一次请求配额，分钟配额用尽时等待下一个窗口
+
+        先取得分钟窗口中的名额，再计入当日配额；被拒绝的尝试会撤回自己的计数，
+        等待和超时都不消耗配额
+
+        Raises:
+            APIRateLimitError: 当日配额用尽，或等待时间超过max_wait时
+        """
+        if self.per_day and self.remaining_today() == 0:
+            self._reject_day()
+
+        minute_key = self._take_minute()
+
+        if self.per_day:
+            day = int(time.time() // 86400)
+            if not self._take(
+                make_key("ratelimit", self.name, "day", day), self.per_day, 86400
+            ):
+                if minute_key is not None:
+                    self.backend.incr(minute_key, -1, ttl=120)
+                self._reject_day()
+
+    def _take(self, key: str, limit: int, ttl: int) -> bool:
+        """
+        在计数窗口中占用一个名额，窗口已满时撤回本次计数
+
+        Returns:
+            bool: 是否占用成功
+        """
+        if self.backend.incr(key, ttl=ttl) <= limit:
+            return True
+        self.backend.incr(key, -1, ttl=ttl)
+        return False
+
+    def _take_minute(self) -> Optional[str]:
+        """
+        等待并占用分钟窗口中的名额
+
+        Returns:
+            Optional[str]: 占用的分钟计数键，未设置分钟限制时为None
+
+        Raises:
+            APIRateLimitError: 等待时间超过max_wait时
+        """
+        if not self.per_minute:
+            return None
+
+        deadline = time.time() + self.max_wait
+        while True:
+            now = time.time()
+            window = int(now // 60)
+            key = make_key("ratelimit", self.name, "minute", window)
+            if self._take(key, self.per_minute, 120):
+                return key
+
+            wait = (window + 1) * 60 - now
+            if now + wait > deadline:
+                RATE_LIMIT_REJECTIONS.inc(limiter=self.name, window="minute")
+                raise APIRateLimitError(
+                    f"Request rate limit reached for {self.name} "
+                    f"({self.per_minute} requests per minute)"
+                )
+
+            RATE_LIMIT_WAITS.inc(limiter=self.name)
+            self.logger.info(
+                f"Rate limit reached for {self.name}, waiting {wait:.1f}s "
+                f"for the next window"
+            )
+            time.sleep(wait)
+
+    def _reject_day(self) -> None:
+        RATE_LIMIT_REJECTIONS.inc(limiter=self.name, window="day")
+        raise APIRateLimitError(
+            f"Daily request quota exhausted for {self.name} "
+            f"({self.per_day} requests per day)"
+        )
+
+    def remaining_today(self) -> Optional[int]:
+        """
+        获取当日剩余配额
+
+        Returns:
+            Optional[int]: 剩余请求数，未设置每日限制时为None
+        """
+        if not self.per_day:
+            return None
+
+        day = int(time.time() // 86400)
+        used = self.backend.get(make_key("ratelimit", self.name, "day", day), 0)
+        return max(self.per_day - used, 0)
+
+
+def create_rate_limiter(name: str) -> RateLimiter:
+    """
+    根据配置创建指定上游的频率限制器
+
+    配置项（以 name='alpha_vantage' 为例）:
+        ALPHA_VANTAGE_RATE_LIMIT_PER_MINUTE: 每分钟最大请求数（默认5，0表示不限制）
+        ALPHA_VANTAGE_RATE_LIMIT_PER_DAY: 每天最大请求数（默认25，0表示不限制）
+        RATE_LIMIT_MAX_WAIT: 分钟配额用尽时最长等待时间（秒）
+
+    Args:
+        name: 上游名称
+
+    Returns:
+        RateLimiter: 频率限制器
+    """
+    prefix = name.upper()
+    return RateLimiter(
+        name,
+        per_minute=config.get_int(f"{prefix}_RATE_LIMIT_PER_MINUTE", 5),
+        per_day=config.get_int(f"{prefix}_RATE_LIMIT_PER_DAY", 25),
+        max_wait=config.get_int("RATE_LIMIT_MAX_WAIT", 60),
+    )
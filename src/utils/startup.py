@@ -0,0 +1,125 @@
+# 启动性能分析工具
+# 记录应用启动各阶段耗时，并分析模块导入耗时
+
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .logger import get_logger
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 项目根目录（导入分析子进程的工作目录）
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+class StartupTimer:
+    """
+    启动阶段计时器
+
+    按结束顺序记录各启动阶段的耗时（秒），阶段可以嵌套
+    """
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float, int]] = []
+        self._depth = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        记录一个启动阶段的耗时
+
+        Args:
+            name: 阶段名称
+        """
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            elapsed = time.perf_counter() - start
+            self.phases.append((name, elapsed, self._depth))
+            logger.debug(f"Startup phase '{name}' took {elapsed * 1000:.1f}ms")
+
+    @property
+    def total(self) -> float:
+        """
+        获取已记录的顶层阶段的总耗时
+
+        Returns:
+            float: 总耗时（秒）
+        """
+        return sum(elapsed for _, elapsed, depth in self.phases if depth == 0)
+
+
+# 全局启动计时器
+startup_timer = StartupTimer()
+
+
+def profile_imports(
+    module: str, env: Optional[Dict[str, str]] = None
+) -> List[Tuple[str, int, int]]:
+    """
+    在独立的Python进程中使用 -X importtime 分析模块导入耗时
+
+    Args:
+        module: 要导入的模块名（如 'src.main'）
+        env: 子进程的环境变量，None表示继承当前环境
+
+    Returns:
+        List[Tuple[str, int, int]]: (模块名, 自身耗时us, 累计耗时us)，按累计耗时降序
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(PROJECT_ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    entries = []
+    for line in result.stderr.splitlines():
+        # 格式: "import time:       688 |     765990 | dash"
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        entries.append((parts[2].strip(), int(parts[0].strip()), int(parts[1].strip())))
+
+    entries.sort(key=lambda entry: entry[2], reverse=True)
+    return entries
+
+
+def format_startup_report(
+    timer: StartupTimer, imports: List[Tuple[str, int, int]], top_n: int = 20
+) -> str:
+    """
+    生成启动性能报告
+
+    Args:
+        timer: 启动阶段计时器
+        imports: profile_imports 的分析结果
+        top_n: 显示累计耗时最高的模块数量
+
+    Returns:
+        str: 报告文本
+    """
+    lines = ["启动阶段耗时:"]
+    for name, elapsed, depth in timer.phases:
+        label = "  " * depth + name
+        lines.append(f"  {label:<30} {elapsed * 1000:>10.1f} ms")
+    lines.append(f"  {'合计':<30} {timer.total * 1000:>10.1f} ms")
+
+    lines.append("")
+    lines.append(f"模块导入耗时（累计耗时前{top_n}名）:")
+    lines.append(f"  {'累计(ms)':>10} {'自身(ms)':>10}  模块")
+    for name, self_us, cumulative_us in imports[:top_n]:
+        lines.append(f"  {cumulative_us / 1000:>10.1f} {self_us / 1000:>10.1f}  {name}")
+
+    return "\n".join(lines)
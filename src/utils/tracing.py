@@ -0,0 +1,345 @@
+# 请求追踪模块
+# 基于contextvars在调用链中传递span，记录一次请求在各环节的耗时和属性
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .cache import get_shared_store
+from .config import config
+from .logger import LoggerMixin
+
+# 共享缓存中保存最近追踪记录的键
+TRACES_KEY = "traces:recent"
+
+
+class Span:
+    """
+    追踪片段
+
+    记录一个环节的名称、耗时、属性以及父子关系；同一次追踪的所有span共享一个列表
+    """
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start = time.time()
+        self._start = time.perf_counter()
+        self.duration = 0.0
+
+        if parent is None:
+            self.trace_id = uuid.uuid4().hex
+            self.root = self
+            self.spans: List[Span] = []
+        else:
+            self.trace_id = parent.trace_id
+            self.root = parent.root
+        self.root.spans.append(self)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        设置span属性
+
+        Args:
+            key: 属性名
+            value: 属性值（需可JSON序列化，否则按字符串导出）
+        """
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        """
+        批量设置span属性
+
+        Args:
+            **attributes: 属性
+        """
+        self.attributes.update(attributes)
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._start
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为可导出的字典（时间相对于根span的开始时间）
+
+        Returns:
+            Dict[str, Any]: span数据
+        """
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "offset_ms": round((self._start - self.root._start) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """
+    追踪未启用或当前没有活动span时使用的空span
+    """
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+# 当前上下文中的活动span（线程和后台任务之间互不影响）
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class MemoryExporter:
+    """
+    环形缓冲导出器
+
+    最近的追踪记录保存在共享缓存中，多个worker和后台任务进程的记录都可以查看
+    """
+
+    def __init__(self, size: int = 100):
+        """
+        Args:
+            size: 保留的追踪记录数
+        """
+        self.size = size
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        get_shared_store().update(
+            TRACES_KEY, lambda traces: ([trace] + (traces or []))[: self.size]
+        )
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        return (get_shared_store().get(TRACES_KEY) or [])[:limit]
+
+
+class JsonLinesExporter:
+    """
+    JSON Lines文件导出器
+
+    每次追踪追加一行JSON，便于用jq等工具离线分析
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 输出文件路径
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        line = json.dumps(trace, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            lines = deque(f, maxlen=limit)
+        return [json.loads(line) for line in reversed(lines)]
+
+
+class Tracer(LoggerMixin):
+    """
+    轻量级追踪器
+
+    没有父span的span开始一次新的追踪；根span结束时整次追踪作为一条记录导出。
+    未启用时span()返回空span，几乎没有额外开销。
+    """
+
+    def __init__(self, enabled: bool = False, exporter: Any = None):
+        """
+        初始化追踪器
+
+        Args:
+            enabled: 是否启用追踪
+            exporter: 追踪记录导出器（MemoryExporter或JsonLinesExporter）
+        """
+        self.enabled = enabled and exporter is not None
+        self.exporter = exporter
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        """
+        记录一个环节的上下文管理器
+
+        Args:
+            name: span名称
+            **attributes: 初始属性
+
+        Yields:
+            Span: 当前span（未启用时为空span）
+        """
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        span = Span(name, parent, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.finish()
+            _current_span.reset(token)
+            if parent is None:
+                self._export(span)
+
+    def traced(self, name: str) -> Callable:
+        """
+        把函数执行记录为span的装饰器
+
+        Args:
+            name: span名称
+
+        Returns:
+            Callable: 装饰器
+        """
+
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def current_span(self) -> Any:
+        """
+        获取当前活动的span，用于在被追踪的函数内部设置属性
+
+        Returns:
+            Span: 当前span，没有活动span时为空span
+        """
+        return _current_span.get() or _NOOP_SPAN
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        获取最近的追踪记录（按时间倒序）
+
+        Args:
+            limit: 最多返回的记录数
+
+        Returns:
+            List[Dict[str, Any]]: 追踪记录
+        """
+        if self.exporter is None:
+            return []
+        return self.exporter.recent(limit)
+
+    def get_trace(self, trace_id: str, search: int = 1000) -> Optional[Dict[str, Any]]:
+        """
+        在最近的追踪记录中查找指定的追踪
+
+        Args:
+            trace_id: 追踪ID
+            search: 最多查找的记录数
+
+        Returns:
+            Optional[Dict[str, Any]]: 追踪记录，不存在时为None
+        """
+        for trace in self.recent(search):
+            if trace["trace_id"] == trace_id:
+                return trace
+        return None
+
+    def _export(self, root: Span) -> None:
+        trace = {
+            "trace_id": root.trace_id,
+            "name": root.name,
+            "start": datetime.fromtimestamp(root.start).isoformat(
+                timespec="milliseconds"
+            ),
+            "duration_ms": round(root.duration * 1000, 3),
+            "pid": os.getpid(),
+            "error": root.error,
+            "attributes": root.attributes,
+            "spans": [span.to_dict() for span in root.spans],
+        }
+        try:
+            self.exporter.export(trace)
+        except Exception as e:
+            # 追踪故障不应影响主流程
+            self.logger.warning(f"Failed to export trace: {str(e)}")
+
+
+def format_trace(trace: Dict[str, Any]) -> str:
+    """
+    把追踪记录格式化为按调用层级缩进的文本瀑布图
+
+    Args:
+        trace: 追踪记录
+
+    Returns:
+        str: 每行 '起始偏移  耗时  span名称  属性'
+    """
+    depths: Dict[Optional[str], int] = {None: -1}
+    lines = [
+        f"trace {trace['trace_id']}  {trace['name']}  {trace['duration_ms']:.1f}ms  "
+        f"pid={trace['pid']}  {trace['start']}"
+    ]
+    for span in trace["spans"]:
+        depth = depths.get(span["parent_id"], -1) + 1
+        depths[span["span_id"]] = depth
+        attributes = " ".join(f"{k}={v}" for k, v in span["attributes"].items())
+        error = f" !{span['error']}" if span["error"] else ""
+        lines.append(
+            f"  {span['offset_ms']:>9.1f}ms {span['duration_ms']:>9.1f}ms  "
+            f"{'  ' * depth}{span['name']}{error}  {attributes}".rstrip()
+        )
+    return "\n".join(lines) + "\n"
+
+
+def create_tracer() -> Tracer:
+    """
+    根据配置创建追踪器
+
+    配置项:
+        TRACING_ENABLED: 是否启用追踪（默认关闭）
+        TRACING_EXPORTER: 'memory'（共享缓存中的环形缓冲，默认）或 'jsonl'
+        TRACING_BUFFER_SIZE: 环形缓冲保留的追踪记录数
+        TRACING_FILE: jsonl导出器的输出文件
+
+    Returns:
+        Tracer: 追踪器
+    """
+    if not config.get_bool("TRACING_ENABLED", False):
+        return Tracer(enabled=False)
+
+    kind = config.get("TRACING_EXPORTER", "memory").lower()
+    if kind == "jsonl":
+        exporter = JsonLinesExporter(config.get("TRACING_FILE", "logs/traces.jsonl"))
+    else:
+        exporter = MemoryExporter(config.get_int("TRACING_BUFFER_SIZE", 100))
+    return Tracer(enabled=True, exporter=exporter)
+
+
+# 全局追踪器
+tracer = create_tracer()
@@ -0,0 +1,110 @@
+# 回测测试
+# 验证向量化的 evaluate_positions 与逐日计算的 equity_curve 结果一致
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.backtest import (
+    Backtester,
+    MACrossover,
+    evaluate_positions,
+    moving_averages,
+    parse_signal,
+    signal_positions,
+    sweep_signals,
+)
+
+
+@pytest.fixture
+def history():
+    rng = np.random.default_rng(7)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, 600)))
+    return pd.DataFrame(
+        {"close": close},
+        index=pd.bdate_range("2018-01-01", periods=len(close), name="date"),
+    )
+
+
+def test_parse_signal():
+    assert parse_signal("ma5>ma20").name == "ma5>ma20"
+    assert parse_signal("10/50").name == "ma10>ma50"
+    with pytest.raises(ValueError):
+        parse_signal("ma20>ma5")
+    with pytest.raises(ValueError):
+        parse_signal("golden cross")
+
+
+def test_sweep_signals_skips_invalid_pairs():
+    names = [s.name for s in sweep_signals([5, 20], [10, 20])]
+    assert names == ["ma5>ma10", "ma5>ma20"]
+
+
+def test_moving_averages_match_rolling_mean(history):
+    mas = moving_averages(history, [5, 20])
+    for window, ma in mas.items():
+        expected = history["close"].rolling(window).mean().to_numpy()
+        np.testing.assert_allclose(ma, expected, rtol=1e-10)
+
+
+def test_moving_averages_ignore_rounded_columns(history):
+    # DataProcessor 的 ma{n} 列保留两位小数，不应被使用
+    rounded = history.assign(ma5=history["close"].round(0))
+    np.testing.assert_array_equal(
+        moving_averages(rounded, [5])[5], moving_averages(history, [5])[5]
+    )
+
+
+def test_positions_are_flat_until_slow_average_forms(history):
+    positions = signal_positions(history, [MACrossover(5, 20)])
+    assert positions.shape == (1, len(history))
+    assert not positions[0, :19].any()
+
+
+@pytest.mark.parametrize("cost_bps", [0.0, 10.0])
+def test_evaluate_positions_matches_equity_curve(history, cost_bps):
+    backtester = Backtester(lambda symbol: history, cost_bps=cost_bps)
+    signals = [MACrossover(5, 20), MACrossover(10, 50), MACrossover(20, 100)]
+    results = backtester.run(history, signals, start="2018-06-01")
+
+    for signal in signals:
+        curve = backtester.equity_curve(history, signal, start="2018-06-01")
+        metrics = results.loc[signal.name]
+        assert metrics["total_return"] == pytest.approx(curve["equity"].iloc[-1] - 1)
+        assert metrics["max_drawdown"] == pytest.approx(curve["drawdown"].min())
+
+        # 最后一日收盘后的交易不在回测期内
+        changes = curve["position"].diff().abs()
+        changes.iloc[0] = curve["position"].iloc[0]
+        assert metrics["trades"] == changes.iloc[:-1].sum()
+        assert metrics["exposure"] == pytest.approx(curve["position"].iloc[:-1].mean())
+
+
+def test_evaluate_positions_known_values():
+    close = np.array([100.0, 110.0, 99.0, 99.0])
+    positions = np.array([[1, 1, 0, 0], [0, 0, 0, 0]])
+    metrics = evaluate_positions(close, positions)
+
+    # 持有第1、2日的收益：+10%，-10%
+    assert metrics["total_return"][0] == pytest.approx(1.1 * 0.9 - 1)
+    assert metrics["max_drawdown"][0] == pytest.approx(-0.1)
+    assert metrics["trades"][0] == 2
+    assert metrics["total_return"][1] == 0.0
+    assert metrics["buy_hold_return"][0] == pytest.approx(-0.01)
+
+
+def test_evaluate_positions_too_short():
+    metrics = evaluate_positions(np.array([1.0]), np.ones((2, 1)))
+    assert all(np.isnan(values).all() for values in metrics.values())
+
+
+def test_run_many_skips_missing_symbols(history):
+    frames = {"AAPL": history, "EMPTY": history.iloc[:0]}
+
+    def loader(symbol):
+        return frames[symbol]
+
+    results = Backtester(loader).run_many(
+        ["AAPL", "EMPTY", "MISSING"], [MACrossover(5, 20)]
+    )
+    assert list(results.index) == [("AAPL", "ma5>ma20")]
@@ -0,0 +1,91 @@
+# 降采样测试
+# 验证K线聚合的桶边界与极值，以及LTTB保留首尾和尖峰
+
+import numpy as np
+import pandas as pd
+
+from src.data.downsample import aggregate_ohlcv, bucket_size, downsample_close, lttb
+
+
+def ohlcv(rows: int) -> pd.DataFrame:
+    close = np.arange(rows, dtype=float) + 100
+    return pd.DataFrame(
+        {
+            "open": close - 0.5,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": np.full(rows, 10.0),
+        },
+        index=pd.bdate_range("2020-01-01", periods=rows, name="date"),
+    )
+
+
+def test_bucket_size():
+    assert bucket_size(100, 200) == 1
+    assert bucket_size(100, 0) == 1
+    assert bucket_size(1000, 100) == 10
+    assert bucket_size(1001, 100) == 11
+
+
+def test_aggregate_without_downsampling_returns_input():
+    df = ohlcv(50)
+    result, size = aggregate_ohlcv(df, 100)
+    assert size == 1
+    assert result is df
+
+
+def test_aggregate_buckets():
+    df = ohlcv(100)
+    df.iloc[13, df.columns.get_loc("high")] = 1000.0
+    df.iloc[27, df.columns.get_loc("low")] = 1.0
+
+    result, size = aggregate_ohlcv(df, 10)
+    assert size == 10
+    assert len(result) == 10
+    assert list(result.index) == list(df.index[::10])
+    assert list(result["open"]) == list(df["open"].iloc[::10])
+    assert list(result["close"]) == list(df["close"].iloc[9::10])
+    assert (result["volume"] == 100.0).all()
+    # 价格尖峰不会被降采样丢掉
+    assert result["high"].iloc[1] == 1000.0
+    assert result["low"].iloc[2] == 1.0
+
+
+def test_aggregate_aligns_buckets_to_full_history():
+    df = ohlcv(100)
+    full, size = aggregate_ohlcv(df, 10)
+
+    # 从第25行开始的视图：第一个桶不完整，之后的桶与完整历史相同
+    view, view_size = aggregate_ohlcv(df.iloc[25:], 8, offset=25)
+    assert view_size == size
+    assert view.index[0] == df.index[25]
+    assert view["close"].iloc[0] == df["close"].iloc[29]
+    pd.testing.assert_frame_equal(view.iloc[1:], full.iloc[3:])
+
+
+def test_lttb_keeps_ends_and_spikes():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    y[500] = 10.0
+    y[700] = -10.0
+
+    selected = lttb(x, y, 50)
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == 999
+    assert np.all(np.diff(selected) > 0)
+    assert 500 in selected and 700 in selected
+
+
+def test_lttb_short_input_is_unchanged():
+    assert list(lttb(np.arange(5), np.arange(5), 10)) == [0, 1, 2, 3, 4]
+    assert list(lttb(np.arange(5), np.arange(5), 2)) == [0, 1, 2, 3, 4]
+
+
+def test_downsample_close():
+    df = ohlcv(500)
+    result = downsample_close(df, 100)
+    assert len(result) == 100
+    assert result.index[0] == df.index[0]
+    assert result.index[-1] == df.index[-1]
+    assert downsample_close(df, 1000) is df
@@ -0,0 +1,140 @@
+# 汇率换算测试
+# 验证货币代码规范化、汇率按日期对齐，以及换算时的刷新与失败退避
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.fx import FXConverter, align_rates, normalize_currency
+from src.data.store import HistoryStore
+from src.utils.cache import MemoryCache
+from src.utils.exceptions import APIError
+
+
+class FakeClient:
+    def __init__(self, rates):
+        self.rates = rates
+        self.calls = []
+        self.fail = False
+
+    def get_fx_daily(self, from_currency, to_currency, output_size):
+        self.calls.append((from_currency, to_currency, output_size))
+        if self.fail:
+            raise APIError("upstream unavailable")
+        return {
+            "meta_data": {
+                "last_refreshed": max(self.rates),
+                "output_size": output_size,
+            },
+            "time_series": {
+                day: {"open": r, "high": r, "low": r, "close": r, "volume": 0}
+                for day, r in self.rates.items()
+            },
+        }
+
+
+@pytest.fixture
+def client():
+    return FakeClient({"2024-01-02": 1.25, "2024-01-03": 1.30, "2024-01-05": 1.20})
+
+
+@pytest.fixture
+def converter(tmp_path, client):
+    store = HistoryStore(str(tmp_path), "csv")
+    return FXConverter(client, store, max_age=3600, shared=MemoryCache())
+
+
+def prices(dates, close):
+    return pd.DataFrame(
+        {"close": close, "volume": np.full(len(dates), 100.0)},
+        index=pd.DatetimeIndex(dates, name="date"),
+    )
+
+
+def test_normalize_currency():
+    assert normalize_currency("usd") == ("USD", 1.0)
+    assert normalize_currency("GBX") == ("GBP", 0.01)
+    assert normalize_currency("GBp") == ("GBP", 0.01)
+    assert normalize_currency("GBP") == ("GBP", 1.0)
+    assert normalize_currency(" zac ") == ("ZAR", 0.01)
+    with pytest.raises(ValueError):
+        normalize_currency("")
+
+
+def test_align_rates_uses_previous_trading_day():
+    rates = pd.Series(
+        [1.0, 2.0, 3.0],
+        index=pd.DatetimeIndex(["2024-01-02", "2024-01-03", "2024-01-05"]),
+    )
+    index = pd.DatetimeIndex(
+        ["2024-01-01", "2024-01-02", "2024-01-04", "2024-01-05", "2024-01-08"]
+    )
+    aligned = align_rates(rates, index)
+    np.testing.assert_array_equal(aligned, [np.nan, 1.0, 2.0, 3.0, 3.0])
+    assert np.isnan(align_rates(pd.Series(dtype=float), index)).all()
+
+
+def test_convert_multiplies_price_columns(converter, client):
+    df = prices(["2024-01-02", "2024-01-04", "2024-01-08"], [10.0, 20.0, 30.0])
+    result = converter.convert(df, "GBP", "USD")
+
+    np.testing.assert_allclose(result["close"], [12.5, 26.0, 36.0])
+    # 成交量不换算，原数据框不被修改
+    pd.testing.assert_series_equal(result["volume"], df["volume"])
+    assert list(df["close"]) == [10.0, 20.0, 30.0]
+    assert client.calls == [("GBP", "USD", "full")]
+
+
+def test_convert_minor_units(converter, client):
+    df = prices(["2024-01-03"], [1000.0])
+    np.testing.assert_allclose(converter.convert(df, "GBX", "USD")["close"], [13.0])
+    np.testing.assert_allclose(converter.convert(df, "GBX", "GBP")["close"], [10.0])
+    # 相同主币只做比例换算
+    assert client.calls == [("GBP", "USD", "full")]
+
+
+def test_convert_before_first_rate_is_nan(converter):
+    df = prices(["2023-12-29", "2024-01-02"], [10.0, 10.0])
+    result = converter.convert(df, "GBP", "USD")
+    assert np.isnan(result["close"].iloc[0])
+    assert result["close"].iloc[1] == 12.5
+
+
+def test_rates_are_refreshed_once_while_fresh(converter, client):
+    df = prices(["2024-01-03"], [10.0])
+    for _ in range(5):
+        converter.convert(df, "GBP", "USD")
+    assert len(client.calls) == 1
+
+
+def test_stale_rates_refresh_with_compact_output(converter, client):
+    df = prices(["2024-01-03"], [10.0])
+    converter.convert(df, "GBP", "USD")
+    stale = time.time() - 7200
+    os.utime(converter.store.data_path("GBPUSD"), (stale, stale))
+
+    converter.convert(df, "GBP", "USD")
+    assert client.calls[-1] == ("GBP", "USD", "compact")
+
+
+def test_failed_refresh_backs_off(converter, client):
+    df = prices(["2024-01-03"], [10.0])
+    converter.convert(df, "GBP", "USD")
+    stale = time.time() - 7200
+    os.utime(converter.store.data_path("GBPUSD"), (stale, stale))
+    client.fail = True
+
+    for _ in range(3):
+        result = converter.convert(df, "GBP", "USD")
+        assert result["close"].iloc[0] == 13.0
+    # 失败后在等待时间内继续使用已保存的汇率，不再请求上游
+    assert len(client.calls) == 2
+
+
+def test_missing_rates_raise_when_upstream_fails(converter, client):
+    client.fail = True
+    with pytest.raises(APIError):
+        converter.convert(prices(["2024-01-03"], [10.0]), "GBP", "USD")
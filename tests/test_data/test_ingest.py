@@ -0,0 +1,154 @@
+# 导入测试
+# 验证批量导入的断点续传、配额用尽时停止、检查点的原子写入，以及后台导入队列
+
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from src.data import ingest
+from src.data.ingest import Checkpoint, ImportQueue, Ingestor
+from src.data.store import HistoryStore
+from src.utils.cache import MemoryCache
+from src.utils.exceptions import APIError, APIRateLimitError
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+        self.errors = {}
+
+    def get_daily_data(self, symbol, output_size):
+        self.calls.append((symbol, output_size))
+        if symbol in self.errors:
+            raise self.errors[symbol]
+        dates = pd.bdate_range("2024-01-01", periods=5).strftime("%Y-%m-%d")
+        return {
+            "meta_data": {"symbol": symbol, "last_refreshed": dates[-1]},
+            "time_series": {
+                day: {
+                    "open": 100.0 + i,
+                    "high": 101.0 + i,
+                    "low": 99.0 + i,
+                    "close": 100.0 + i,
+                    "volume": 1000 + i,
+                }
+                for i, day in enumerate(dates)
+            },
+        }
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path), "csv")
+
+
+def test_checkpoint_resumes_matching_output_size(tmp_path):
+    path = tmp_path / "symbols.checkpoint.json"
+    checkpoint = Checkpoint(str(path), "full")
+    checkpoint.mark_failed("MSFT", "boom")
+    checkpoint.mark_done("AAPL", 5)
+
+    resumed = Checkpoint(str(path), "full")
+    assert list(resumed.done) == ["AAPL"]
+    assert resumed.failed == {"MSFT": "boom"}
+    assert Checkpoint(str(path), "compact").done == {}
+    assert Checkpoint(str(path), "full", resume=False).done == {}
+
+
+def test_checkpoint_write_is_atomic(tmp_path, monkeypatch):
+    path = tmp_path / "symbols.checkpoint.json"
+    checkpoint = Checkpoint(str(path), "full")
+    checkpoint.mark_done("AAPL", 5)
+
+    def broken_dump(data, f, **kwargs):
+        f.write('{"output_size": "full", "do')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ingest.json, "dump", broken_dump)
+    with pytest.raises(OSError):
+        checkpoint.mark_done("MSFT", 5)
+    monkeypatch.undo()
+
+    # 写了一半的文件没有替换原检查点，也没有留下临时文件
+    assert list(json.loads(path.read_text())["done"]) == ["AAPL"]
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+
+def test_ingest_skips_completed_symbols(client, store, tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"), "full")
+    checkpoint.mark_done("AAPL", 5)
+    stats = Ingestor(client, store, checkpoint, output_size="full").run(
+        ["AAPL", "MSFT"]
+    )
+    assert client.calls == [("MSFT", "full")]
+    assert (stats["skipped"], stats["done"], stats["remaining"]) == (1, 1, 0)
+    assert stats["rows"] == 5
+    assert stats["stored_bytes"] == store.data_path("MSFT").stat().st_size
+
+
+def test_ingest_stops_when_quota_is_exhausted(client, store, tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    client.errors["MSFT"] = APIRateLimitError("daily quota exhausted")
+    stats = Ingestor(client, store, Checkpoint(path, "compact")).run(
+        ["AAPL", "MSFT", "GOOG"]
+    )
+    assert stats["stopped"] == "daily quota exhausted"
+    assert (stats["done"], stats["failed"], stats["remaining"]) == (1, 0, 2)
+    assert client.calls == [("AAPL", "compact"), ("MSFT", "compact")]
+    # 被限流的股票不记为失败，下次运行从中断处继续
+    checkpoint = Checkpoint(path, "compact")
+    assert list(checkpoint.done) == ["AAPL"]
+    assert checkpoint.failed == {}
+
+    del client.errors["MSFT"]
+    stats = Ingestor(client, store, checkpoint).run(["AAPL", "MSFT", "GOOG"])
+    assert (stats["skipped"], stats["done"], stats["stopped"]) == (1, 2, "")
+    assert client.calls[2:] == [("MSFT", "compact"), ("GOOG", "compact")]
+
+
+def test_import_queue_imports_in_background(client, store):
+    queue = ImportQueue(client, store, MemoryCache())
+    try:
+        assert queue.request("aapl")
+        for _ in range(500):
+            if store.exists("AAPL"):
+                break
+            time.sleep(0.01)
+    finally:
+        queue.close(5)
+    assert client.calls == [("AAPL", "full")]
+    assert len(store.load("AAPL")) == 5
+
+
+def test_import_queue_imports_once_across_processes(client, store, tmp_path):
+    shared = MemoryCache()
+    first = ImportQueue(client, store, shared)
+    second = ImportQueue(client, HistoryStore(str(tmp_path), "csv"), shared)
+
+    client.errors["AAPL"] = APIError("upstream failed")
+    first._import("AAPL")
+    second._import("AAPL")
+    # 失败后在 retry_interval 内不再请求上游，所有进程都能看到失败原因
+    assert client.calls == [("AAPL", "full")]
+    assert second.error("aapl") == "upstream failed"
+
+    first._import("MSFT")
+    second._import("MSFT")
+    assert client.calls == [("AAPL", "full"), ("MSFT", "full")]
+    assert second.error("MSFT") is None
+
+
+def test_import_queue_is_bounded(client, store):
+    queue = ImportQueue(client, store, MemoryCache(), max_pending=1)
+    # 不启动线程：队列中的股票不会被取走
+    queue._thread = type("Alive", (), {"is_alive": lambda self: True})()
+    assert queue.request("AAPL")
+    assert queue.request("AAPL")
+    assert not queue.request("MSFT")
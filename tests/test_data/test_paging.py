@@ -0,0 +1,92 @@
+# 分页查询测试
+# 验证 DataTable 过滤表达式的解析，以及过滤、排序和分页的结果
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.paging import filter_mask, parse_filter, query_page
+
+
+@pytest.fixture
+def history():
+    rows = 50
+    return pd.DataFrame(
+        {
+            "close": np.arange(rows, dtype=float) + 100,
+            "volume": (np.arange(rows) * 7) % 50,
+        },
+        index=pd.bdate_range("2020-01-01", periods=rows, name="date"),
+    )
+
+
+def test_parse_filter():
+    assert parse_filter(None) == []
+    assert parse_filter("{close} >= 100 && {date} datestartswith 2020-03") == [
+        ("close", "ge", "100"),
+        ("date", "datestartswith", "2020-03"),
+    ]
+    assert parse_filter("{close} s> 5") == [("close", "gt", "5")]
+    assert parse_filter('{symbol} icontains "abc"') == [("symbol", "contains", "abc")]
+    assert parse_filter("{close} eq 101") == [("close", "eq", "101")]
+
+
+def test_parse_filter_ignores_unsupported_conditions():
+    assert parse_filter("close > 100 && {close} < 110") == [("close", "lt", "110")]
+
+
+def test_filter_mask(history):
+    mask = filter_mask(history, parse_filter("{close} > 110 && {close} <= 120"))
+    assert list(history["close"][mask]) == [float(v) for v in range(111, 121)]
+
+    mask = filter_mask(history, parse_filter("{date} datestartswith 2020-02"))
+    assert (history.index[mask].month == 2).all()
+    assert mask.sum() == 20
+
+    # 无效的值不匹配任何行，未知的列被忽略
+    assert not filter_mask(history, parse_filter("{close} > abc")).any()
+    assert filter_mask(history, parse_filter("{missing} > 1")).all()
+
+
+def test_default_page_is_newest_first(history):
+    page, total, number = query_page(history, 0, 10)
+    assert (total, number) == (50, 0)
+    assert list(page.index) == list(history.index[::-1][:10])
+
+    page, _, _ = query_page(history, 4, 10)
+    assert list(page.index) == list(history.index[9::-1])
+
+
+def test_page_out_of_range_returns_last_page(history):
+    page, total, number = query_page(history, 99, 20)
+    assert (total, number) == (50, 2)
+    assert len(page) == 10
+
+
+def test_sort_by_column(history):
+    sort_by = [{"column_id": "volume", "direction": "asc"}]
+    page, total, _ = query_page(history, 0, 50, sort_by=sort_by)
+    assert total == 50
+    assert page["volume"].is_monotonic_increasing
+    # 排序是稳定的：相同值保持日期顺序
+    for _, group in page.groupby("volume"):
+        assert group.index.is_monotonic_increasing
+
+
+def test_filter_then_sort_and_page(history):
+    sort_by = [{"column_id": "close", "direction": "desc"}]
+    page, total, number = query_page(
+        history, 1, 5, sort_by=sort_by, filter_query="{close} < 120"
+    )
+    assert (total, number) == (20, 1)
+    assert list(page["close"]) == [114.0, 113.0, 112.0, 111.0, 110.0]
+
+
+def test_filter_with_date_order(history):
+    sort_by = [{"column_id": "date", "direction": "asc"}]
+    page, total, _ = query_page(
+        history, 0, 100, sort_by=sort_by, filter_query="{close} ge 140"
+    )
+    assert total == 10
+    assert page.index.is_monotonic_increasing
+    assert page["close"].iloc[0] == 140.0
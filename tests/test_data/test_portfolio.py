@@ -0,0 +1,183 @@
+# 投资组合估值测试
+# 验证持仓解析、增量更新与完整计算的结果一致（不修改原估值），以及未存储的持仓
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.portfolio import (
+    PortfolioValuation,
+    PortfolioValuer,
+    close_matrix,
+    parse_holdings,
+)
+from src.utils.exceptions import DataValidationError
+
+
+def test_parse_holdings():
+    holdings = parse_holdings(
+        "AAPL 10 150\n"
+        "tsco.lon, 100, 250  # 伦敦的股票以便士报价\n"
+        "SAP.DEX 5 120 EUR; aapl 30 170"
+    )
+    assert [h.key() for h in holdings] == [
+        ("AAPL", 40.0, 165.0, "USD"),
+        ("TSCO.LON", 100.0, 250.0, "GBX"),
+        ("SAP.DEX", 5.0, 120.0, "EUR"),
+    ]
+
+
+def test_parse_holdings_ignores_blank_lines_and_comments():
+    assert parse_holdings(None) == []
+    assert parse_holdings("\n# 注释\n\n") == []
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "AAPL 10",
+        "AAPL ten 150",
+        "AAPL 10 150 USD extra",
+        "AAPL 10 150 USD\nAAPL 5 120 EUR",
+    ],
+)
+def test_parse_holdings_rejects_invalid_lines(text):
+    with pytest.raises(DataValidationError):
+        parse_holdings(text)
+
+
+def test_parse_holdings_limit():
+    with pytest.raises(DataValidationError):
+        parse_holdings("A 1 1\nB 1 1\nC 1 1", limit=2)
+
+
+def make_prices():
+    index = pd.DatetimeIndex(["2024-01-02", "2024-01-03", "2024-01-04"], name="date")
+    return pd.DataFrame(
+        {"AAPL": [100.0, 110.0, 120.0], "MSFT": [np.nan, 200.0, 210.0]}, index=index
+    )
+
+
+def make_valuation(prices):
+    holdings = parse_holdings("AAPL 10 90\nMSFT 5 180")
+    fx_last = pd.Series({"AAPL": 1.0, "MSFT": 1.0})
+    return PortfolioValuation(holdings, "USD", prices, fx_last)
+
+
+def assert_same_valuation(updated, rebuilt):
+    pd.testing.assert_frame_equal(updated.prices, rebuilt.prices, check_freq=False)
+    pd.testing.assert_frame_equal(updated.values, rebuilt.values, check_freq=False)
+    pd.testing.assert_frame_equal(updated.weights, rebuilt.weights, check_freq=False)
+    pd.testing.assert_series_equal(updated.totals, rebuilt.totals, check_freq=False)
+    pd.testing.assert_series_equal(updated.returns, rebuilt.returns, check_freq=False)
+
+
+def test_valuation():
+    valuation = make_valuation(make_prices())
+    assert list(valuation.totals) == [1000.0, 2100.0, 2250.0]
+    # 新上市的股票不计入当日收益
+    assert np.isnan(valuation.returns.iloc[0])
+    assert valuation.returns.iloc[1] == pytest.approx(0.1)
+
+    summary = valuation.summary()
+    assert summary["value"] == 2250.0
+    assert summary["cost"] == 1800.0
+    assert summary["pnl"] == 450.0
+
+
+def test_with_last_same_day_matches_rebuild():
+    valuation = make_valuation(make_prices())
+    day = valuation.last_date
+    updated = valuation.with_last(pd.Series({"AAPL": 125.0}), day)
+    assert updated.revision == 1
+    assert updated.built_at == valuation.built_at
+
+    expected = make_prices()
+    expected.loc[day, "AAPL"] = 125.0
+    assert_same_valuation(updated, make_valuation(expected))
+    # 原估值不变，正在读取它的请求不受影响
+    assert_same_valuation(valuation, make_valuation(make_prices()))
+    assert valuation.revision == 0
+
+
+def test_with_last_new_day_appends_row():
+    valuation = make_valuation(make_prices())
+    day = pd.Timestamp("2024-01-05")
+    updated = valuation.with_last(pd.Series({"MSFT": 220.0}), day)
+    assert updated.last_date == day
+    assert len(valuation.prices) == len(valuation.totals) == 3
+
+    expected = make_prices()
+    expected.loc[day] = [120.0, 220.0]
+    assert_same_valuation(updated, make_valuation(expected))
+
+
+def test_with_last_ignores_unchanged_old_and_unknown_prices():
+    valuation = make_valuation(make_prices())
+    last = valuation.last_date
+    assert valuation.with_last(pd.Series({"AAPL": 120.0}), last) is None
+    assert (
+        valuation.with_last(pd.Series({"AAPL": 999.0}), pd.Timestamp("2024-01-03"))
+        is None
+    )
+    assert valuation.with_last(pd.Series({"GOOG": 999.0}), last) is None
+
+
+def test_apply_quotes_replaces_cached_valuation():
+    prices = make_prices()
+    frames = {s: prices[[s]].rename(columns={s: "close"}) for s in prices.columns}
+    valuer = PortfolioValuer(frames.get)
+    holdings = parse_holdings("AAPL 10 90\nMSFT 5 180")
+    assert valuer.apply_quotes(holdings, "USD", {}) is None
+
+    valuation = valuer.value(holdings, "USD")
+    quote = {"price": 125.0, "latest_trading_day": "2024-01-04"}
+    updated = valuer.apply_quotes(holdings, "USD", {"AAPL": {"quote": quote}})
+    assert updated is not valuation
+    assert updated.totals.iloc[-1] == 2300.0
+    assert valuation.totals.iloc[-1] == 2250.0
+    assert valuer.cached(holdings, "USD") is updated
+    # 历史数据没有变化时 value() 返回包含增量更新的估值
+    assert valuer.value(holdings, "USD") is updated
+    assert valuer.apply_quotes(holdings, "USD", {"AAPL": {"quote": quote}}) is updated
+
+
+def test_close_matrix_fills_market_holidays():
+    aapl = pd.DataFrame(
+        {"close": [1.0, 2.0, 3.0]},
+        index=pd.DatetimeIndex(["2024-01-02", "2024-01-03", "2024-01-04"]),
+    )
+    tsco = pd.DataFrame(
+        {"close": [10.0, 30.0]},
+        index=pd.DatetimeIndex(["2024-01-03", "2024-01-05"]),
+    )
+    matrix = close_matrix({"AAPL": aapl, "TSCO.LON": tsco})
+    assert list(matrix.columns) == ["AAPL", "TSCO.LON"]
+    assert list(matrix["AAPL"]) == [1.0, 2.0, 3.0, 3.0]
+    assert np.isnan(matrix["TSCO.LON"].iloc[0])
+    assert list(matrix["TSCO.LON"].iloc[1:]) == [10.0, 10.0, 30.0]
+
+
+def test_valuer_reports_unstored_holdings_as_missing():
+    frames = {"AAPL": make_prices()[["AAPL"]].rename(columns={"AAPL": "close"})}
+    calls = []
+
+    def loader(symbol):
+        calls.append(symbol)
+        return frames.get(symbol)
+
+    valuer = PortfolioValuer(loader)
+    holdings = parse_holdings("AAPL 10 90\nMSFT 5 180")
+    valuation = valuer.value(holdings, "USD")
+    assert valuation.missing == ["MSFT"]
+    assert list(valuation.prices.columns) == ["AAPL"]
+    assert valuation.summary()["cost"] == 900.0
+    assert valuer.value(holdings, "USD") is valuation
+
+    # 导入完成后重新计算
+    frames["MSFT"] = make_prices()[["MSFT"]].rename(columns={"MSFT": "close"})
+    rebuilt = valuer.value(holdings, "USD")
+    assert rebuilt is not valuation
+    assert rebuilt.missing == []
+    assert_same_valuation(rebuilt, make_valuation(make_prices()))
+    assert calls == ["AAPL", "MSFT"] * 3
@@ -0,0 +1,165 @@
+# 报价中心测试
+# 直接调用 _poll（不启动轮询线程），验证时间槽认领、变化字段的推送、报价配额和取消订阅
+
+import pytest
+
+from src.data import quotes
+from src.data.quotes import QuoteHub, Subscription
+from src.utils.cache import MemoryCache, make_key
+from src.utils.exceptions import APIRateLimitError
+from src.utils.rate_limit import RateLimiter
+
+
+class FakeClient:
+    def __init__(self):
+        self.prices = {}
+        self.calls = []
+
+    def get_quote(self, symbol):
+        self.calls.append(symbol)
+        return {"symbol": symbol, "price": self.prices.get(symbol, 1.0), "volume": 10}
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock(1_700_000_040.0)
+    monkeypatch.setattr(quotes, "time", fake)
+    return fake
+
+
+def make_hub(client, shared=None, limiter=None):
+    return QuoteHub(client, shared or MemoryCache(), interval=60, limiter=limiter)
+
+
+def subscribe(hub, symbols):
+    # 不经过 subscribe()，避免启动后台轮询线程
+    subscription = Subscription(symbols)
+    hub._subscriptions.add(subscription)
+    hub._symbols.update(subscription.symbols)
+    return subscription
+
+
+def drain(subscription):
+    events = []
+    while True:
+        event = subscription.get(timeout=0)
+        if event is None:
+            return events
+        events.append(event)
+
+
+def test_first_poll_publishes_full_quote(clock):
+    client = FakeClient()
+    hub = make_hub(client)
+    subscription = subscribe(hub, ["AAPL"])
+
+    hub._poll("AAPL")
+    assert client.calls == ["AAPL"]
+    assert drain(subscription) == [{"symbol": "AAPL", "price": 1.0, "volume": 10}]
+
+
+def test_only_changed_fields_are_published(clock):
+    client = FakeClient()
+    hub = make_hub(client)
+    subscription = subscribe(hub, ["AAPL"])
+    hub._poll("AAPL")
+    drain(subscription)
+
+    clock.now += 60
+    client.prices["AAPL"] = 2.0
+    hub._poll("AAPL")
+    assert drain(subscription) == [{"symbol": "AAPL", "price": 2.0}]
+
+
+def test_unchanged_quote_publishes_nothing(clock):
+    client = FakeClient()
+    shared = MemoryCache()
+    hub = make_hub(client, shared)
+    subscription = subscribe(hub, ["AAPL"])
+    hub._poll("AAPL")
+    drain(subscription)
+    first = shared.get(make_key("quote", "latest", "AAPL"))
+
+    clock.now += 60
+    hub._poll("AAPL")
+    assert len(client.calls) == 2
+    assert drain(subscription) == []
+    # 报价没有变化时保留原来的变化时间
+    latest = shared.get(make_key("quote", "latest", "AAPL"))
+    assert latest["fetched_at"] > first["fetched_at"]
+    assert latest["changed_at"] == first["changed_at"]
+
+
+def test_one_fetch_per_slot_across_hubs(clock):
+    client = FakeClient()
+    shared = MemoryCache()
+    first, second = make_hub(client, shared), make_hub(client, shared)
+    subscription = subscribe(second, ["AAPL"])
+
+    first._poll("AAPL")
+    second._poll("AAPL")
+    first._poll("AAPL")
+    assert client.calls == ["AAPL"]
+    # 没有请求上游的进程从共享缓存读取报价
+    assert drain(subscription) == [{"symbol": "AAPL", "price": 1.0, "volume": 10}]
+
+
+def test_exhausted_quota_throttles_until_next_minute(clock, monkeypatch):
+    from src.utils import rate_limit
+
+    monkeypatch.setattr(rate_limit, "time", clock)
+    client = FakeClient()
+    shared = MemoryCache()
+    limiter = RateLimiter("quotes", per_minute=1, max_wait=0, backend=MemoryCache())
+    hub = make_hub(client, shared, limiter)
+
+    hub._poll("AAPL")
+    hub._poll("MSFT")
+    assert client.calls == ["AAPL"]
+    # 被拒绝的时间槽已撤回，其他进程仍可认领
+    assert shared.get(make_key("quote", "poll", "MSFT", int(clock.now // 60))) == 0
+
+    clock.now += 30
+    hub._poll("MSFT")
+    assert client.calls == ["AAPL"]
+
+    clock.now += 30
+    hub._poll("MSFT")
+    assert client.calls == ["AAPL", "MSFT"]
+
+
+def test_unsubscribed_symbol_state_is_not_recreated(clock):
+    client = FakeClient()
+    hub = make_hub(client)
+    subscription = subscribe(hub, ["AAPL"])
+    hub._poll("AAPL")
+    hub.unsubscribe(subscription)
+
+    clock.now += 60
+    hub._poll("AAPL")
+    assert "AAPL" not in hub._seen
+    assert "AAPL" not in hub._last
+
+
+def test_unsubscribe_during_throttled_poll(clock):
+    client = FakeClient()
+
+    class UnsubscribingLimiter:
+        # 模拟轮询线程等待配额时，另一个线程关闭了最后一个订阅
+        def acquire(self):
+            hub.unsubscribe(subscription)
+            raise APIRateLimitError("quota exhausted")
+
+    hub = make_hub(client, limiter=UnsubscribingLimiter())
+    subscription = subscribe(hub, ["AAPL"])
+    hub._poll("AAPL")
+    assert client.calls == []
+    assert "AAPL" not in hub._polled
@@ -0,0 +1,176 @@
+# 定时刷新测试
+# 直接调用 _process（不启动刷新线程），验证跨进程认领、每日预算、重试和按节假日处理
+
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+import pytz
+
+from src.data import scheduler as scheduler_module
+from src.data.market_config import MarketConfig
+from src.data.scheduler import RefreshScheduler
+from src.data.store import HistoryStore
+from src.utils import cache as cache_module
+from src.utils.cache import MemoryCache
+
+# 2024-01-10（周三）美股收盘之后
+NOW = datetime(2024, 1, 10, 23, 0, tzinfo=pytz.UTC)
+SESSION = "2024-01-10"
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+        # 上游最新数据的日期
+        self.latest = SESSION
+
+    def get_daily_data(self, symbol, output_size):
+        self.calls.append(symbol)
+        dates = pd.bdate_range(end=self.latest, periods=5).strftime("%Y-%m-%d")
+        return {
+            "meta_data": {"symbol": symbol, "last_refreshed": self.latest},
+            "time_series": {
+                day: {"open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1}
+                for day in dates
+            },
+        }
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock(NOW.timestamp())
+
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromtimestamp(fake.now, tz)
+
+    monkeypatch.setattr(scheduler_module, "time", fake)
+    monkeypatch.setattr(scheduler_module, "datetime", FixedDatetime)
+    monkeypatch.setattr(cache_module, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path), "csv")
+
+
+def make_scheduler(client, store, shared=None, **kwargs):
+    kwargs.setdefault("retry_delay", 900)
+    kwargs.setdefault("max_attempts", 3)
+    return RefreshScheduler(
+        client, store, MemoryCache(), shared or MemoryCache(), lambda: [], **kwargs
+    )
+
+
+def test_session_helpers_skip_weekends():
+    saturday = datetime(2024, 1, 13, 12, 0, tzinfo=pytz.UTC)
+    assert MarketConfig.last_session_date("US", saturday) == date(2024, 1, 12)
+    close = MarketConfig.next_session_close("US", saturday)
+    assert close.date() == date(2024, 1, 15)
+    # 节假日不在市场配置中（1月15日是美国节假日），由定时刷新根据上游数据推断
+    assert close.astimezone(pytz.timezone("US/Eastern")).hour == 16
+
+
+def test_refresh_writes_store(clock, client, store):
+    scheduler = make_scheduler(client, store)
+    due, attempt = scheduler._process("AAPL", 0)
+    assert client.calls == ["AAPL"]
+    assert store.info("AAPL")["end"] == SESSION
+    assert attempt == 0
+    assert due == MarketConfig.next_session_close("US", NOW).timestamp() + 1800
+
+    # 本地已是最新时不再请求上游
+    scheduler._process("AAPL", 0)
+    assert client.calls == ["AAPL"]
+
+
+def test_claim_is_a_lease(clock, client, store):
+    shared = MemoryCache()
+    client.latest = "2024-01-09"
+    holder = make_scheduler(client, store, shared)
+    other = make_scheduler(client, store, shared)
+
+    due, attempt = holder._process("AAPL", 0)
+    assert (due, attempt) == (clock.now + 900, 1)
+
+    # 其他进程在认领到期后再检查
+    due, attempt = other._process("AAPL", 0)
+    assert due == clock.now + other.claim_ttl
+    assert client.calls == ["AAPL"]
+
+    # 持有者的重试不需要重新认领
+    clock.now += 900
+    holder._process("AAPL", 1)
+    assert client.calls == ["AAPL", "AAPL"]
+
+    # 持有者停止后，认领到期时由其他进程接手
+    clock.now += holder.claim_ttl + 1
+    other._process("AAPL", 0)
+    assert client.calls == ["AAPL", "AAPL", "AAPL"]
+
+
+def test_daily_budget_defers_to_next_day(clock, client, store):
+    shared = MemoryCache()
+    scheduler = make_scheduler(client, store, shared, per_day=2, quota_share=0.5)
+    assert scheduler.daily_budget == 1
+    # 不等待时间槽
+    scheduler.spacing = 0
+
+    scheduler._process("AAPL", 0)
+    due, attempt = scheduler._process("MSFT", 0)
+    assert client.calls == ["AAPL"]
+    assert due == (int(clock.now // 86400) + 1) * 86400
+    assert attempt == 0
+
+    # 预算在所有进程之间共享
+    make_scheduler(client, store, shared, per_day=2, quota_share=0.5)._process(
+        "GOOG", 0
+    )
+    assert client.calls == ["AAPL"]
+
+
+def test_stale_data_retries_then_marks_holiday(clock, client, store):
+    client.latest = "2024-01-09"
+    scheduler = make_scheduler(client, store, max_attempts=2)
+
+    due, attempt = scheduler._process("AAPL", 0)
+    assert (due, attempt) == (clock.now + 900, 1)
+    assert store.info("AAPL").get("checked_through") is None
+
+    clock.now += 900
+    due, attempt = scheduler._process("AAPL", 1)
+    assert attempt == 0
+    assert due > clock.now + 900
+    # 多次重试后上游仍没有该交易日的数据，按节假日处理
+    assert store.info("AAPL")["checked_through"] == SESSION
+    assert store.info("AAPL")["end"] == "2024-01-09"
+
+    scheduler._process("AAPL", 0)
+    assert client.calls == ["AAPL", "AAPL"]
+
+
+def test_failures_retry_then_give_up(clock, client, store):
+    scheduler = make_scheduler(client, store, max_attempts=2)
+    assert scheduler._retry_or_next("AAPL", 0) == (clock.now + 900, 1)
+    due, attempt = scheduler._retry_or_next("AAPL", 1)
+    assert attempt == 0
+    assert due == MarketConfig.next_session_close("US", NOW).timestamp() + 1800
@@ -0,0 +1,138 @@
+# 历史数据存储测试
+# 验证写入合并、分块读取、进程内缓存和节假日记录
+
+import pandas as pd
+import pytest
+
+from src.data.store import HistoryStore, covered_through
+from src.utils.exceptions import DataProcessingError
+
+
+def daily_data(dates, close=100.0, output_size="Compact", last_refreshed=None):
+    """
+    构造 AlphaVantageClient.get_daily_data 格式的数据
+    """
+    time_series = {
+        day: {
+            "open": close + i,
+            "high": close + i + 1,
+            "low": close + i - 1,
+            "close": close + i,
+            "volume": 1000 + i,
+        }
+        for i, day in enumerate(dates)
+    }
+    return {
+        "meta_data": {
+            "symbol": "TEST",
+            "last_refreshed": last_refreshed or max(dates),
+            "output_size": output_size,
+            "time_zone": "US/Eastern",
+        },
+        "time_series": time_series,
+    }
+
+
+def business_days(start, periods):
+    return [d.strftime("%Y-%m-%d") for d in pd.bdate_range(start, periods=periods)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path), "csv")
+
+
+def test_write_merges_with_existing_rows(store):
+    days = business_days("2024-01-01", 10)
+    store.write("aapl", daily_data(days[:6], output_size="Full size"))
+    meta = store.write("AAPL", daily_data(days[4:], close=200.0))
+
+    df = store.read("AAPL")
+    assert len(df) == 10
+    assert df.index.is_monotonic_increasing
+    # 重叠的日期以新数据为准
+    assert df.loc[days[4], "close"] == 200.0
+    assert df.loc[days[3], "close"] == 103.0
+    assert meta["rows"] == 10
+    assert (meta["start"], meta["end"]) == (days[0], days[-1])
+    # 导入过完整历史后，compact刷新不改变 output_size
+    assert meta["output_size"] == "full"
+
+
+def test_write_rejects_empty_data(store):
+    with pytest.raises(DataProcessingError):
+        store.write("AAPL", {"meta_data": {}, "time_series": {}})
+
+
+def test_read_missing_symbol_is_empty(store):
+    df = store.read("MISSING", columns=["close"])
+    assert df.empty
+    assert list(df.columns) == ["close"]
+
+
+def test_iter_chunks_matches_read(store):
+    days = business_days("2024-01-01", 25)
+    store.write("AAPL", daily_data(days))
+
+    chunks = list(store.iter_chunks("AAPL", chunk_rows=4))
+    assert [len(chunk) for chunk in chunks] == [4] * 6 + [1]
+    pd.testing.assert_frame_equal(pd.concat(chunks), store.read("AAPL"))
+
+
+def test_iter_chunks_filters_dates_and_columns(store):
+    days = business_days("2024-01-01", 25)
+    store.write("AAPL", daily_data(days))
+
+    chunks = list(
+        store.iter_chunks("AAPL", days[5], days[12], ["close", "volume"], chunk_rows=4)
+    )
+    assert all(not chunk.empty for chunk in chunks)
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks), store.read("AAPL", days[5], days[12], ["close", "volume"])
+    )
+
+
+def test_iter_chunks_missing_symbol_yields_nothing(store):
+    assert list(store.iter_chunks("MISSING")) == []
+
+
+def test_load_is_cached_until_file_changes(store):
+    days = business_days("2024-01-01", 10)
+    store.write("AAPL", daily_data(days[:5]))
+
+    first = store.load("aapl")
+    assert store.load("AAPL") is first
+
+    store.write("AAPL", daily_data(days[5:]))
+    reloaded = store.load("AAPL")
+    assert reloaded is not first
+    assert len(reloaded) == 10
+
+
+def test_load_cache_is_bounded(tmp_path):
+    store = HistoryStore(str(tmp_path), "csv", frame_cache_size=1)
+    days = business_days("2024-01-01", 5)
+    store.write("AAPL", daily_data(days))
+    store.write("MSFT", daily_data(days))
+
+    first = store.load("AAPL")
+    store.load("MSFT")
+    assert store.load("AAPL") is not first
+
+
+def test_mark_checked_extends_coverage(store):
+    days = business_days("2024-01-01", 5)
+    store.write("AAPL", daily_data(days))
+
+    store.mark_checked("AAPL", "2024-01-08")
+    assert covered_through(store.info("AAPL")) == "2024-01-08"
+
+    # 更早的日期不会缩短已确认的范围
+    store.mark_checked("AAPL", "2024-01-03")
+    assert covered_through(store.info("AAPL")) == "2024-01-08"
+
+    # 新数据超过已确认的日期后不再保留记录
+    store.write("AAPL", daily_data(business_days("2024-01-08", 3)))
+    meta = store.info("AAPL")
+    assert "checked_through" not in meta
+    assert covered_through(meta) == meta["end"]
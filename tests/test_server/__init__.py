@@ -0,0 +1 @@
+# 服务器模块测试
@@ -0,0 +1,253 @@
+# 数据接口测试
+# 验证ETag/Last-Modified条件请求返回304，以及分块输出的JSON/CSV与存储的数据一致
+
+import json
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+from src.data.quotes import QuoteHub
+from src.data.store import HistoryStore
+from src.server import data_api
+from src.server.data_api import conditional_response, make_etag, register_data_api
+from src.utils.cache import MemoryCache
+
+LAST_MODIFIED = 1_700_000_000.5
+
+
+def http_date(timestamp: float) -> str:
+    moment = datetime.fromtimestamp(int(timestamp), timezone.utc)
+    return moment.strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+
+@pytest.mark.parametrize(
+    "headers, not_modified",
+    [
+        ({}, False),
+        ({"If-None-Match": '"abc"'}, True),
+        ({"If-None-Match": '"other", "abc"'}, True),
+        ({"If-None-Match": "*"}, True),
+        ({"If-None-Match": '"other"'}, False),
+        ({"If-Modified-Since": http_date(LAST_MODIFIED)}, True),
+        ({"If-Modified-Since": http_date(LAST_MODIFIED - 1)}, False),
+        # If-None-Match 不匹配时忽略 If-Modified-Since
+        (
+            {
+                "If-None-Match": '"other"',
+                "If-Modified-Since": http_date(LAST_MODIFIED),
+            },
+            False,
+        ),
+    ],
+)
+def test_conditional_response(headers, not_modified):
+    app = Flask(__name__)
+    with app.test_request_context(headers=headers):
+        response = conditional_response("abc", LAST_MODIFIED)
+    if not not_modified:
+        assert response is None
+        return
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"abc"'
+    assert response.headers["Last-Modified"] == http_date(LAST_MODIFIED)
+    assert "no-cache" in response.headers["Cache-Control"]
+
+
+def test_make_etag_depends_on_every_part():
+    assert make_etag("AAPL", "2024-01-05", 10) == make_etag("AAPL", "2024-01-05", 10)
+    assert make_etag("AAPL", "2024-01-05", 10) != make_etag("AAPL", "2024-01-05", 11)
+    assert make_etag("A", "BC") != make_etag("AB", "C")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path), "csv")
+    days = pd.bdate_range("2024-01-01", periods=25).strftime("%Y-%m-%d")
+    store.write(
+        "AAPL",
+        {
+            "meta_data": {"last_refreshed": days[-1], "output_size": "Full size"},
+            "time_series": {
+                day: {
+                    "open": 100.0 + i,
+                    "high": 101.0 + i,
+                    "low": 99.0 + i,
+                    "close": 100.5 + i,
+                    "volume": 1000 + i,
+                }
+                for i, day in enumerate(days)
+            },
+        },
+    )
+    return store
+
+
+@pytest.fixture
+def client(monkeypatch, store):
+    monkeypatch.setenv("DATA_API_ENABLED", "true")
+    monkeypatch.setenv("DATA_API_TOKEN", "")
+    monkeypatch.setattr(data_api, "get_history_store", lambda: store)
+    # 小数据块，验证跨块输出
+    monkeypatch.setattr(data_api, "CHUNK_ROWS", 4)
+    app = Flask(__name__)
+    register_data_api(app)
+    return app.test_client()
+
+
+def test_ohlcv_json_streams_all_rows(client, store):
+    response = client.get("/api/v1/ohlcv/aapl?fields=close,volume&start=2024-01-03")
+    assert response.status_code == 200
+    body = json.loads(response.get_data(as_text=True))
+
+    expected = store.read("AAPL", start="2024-01-03")
+    assert body["symbol"] == "AAPL"
+    assert body["fields"] == ["close", "volume"]
+    assert body["rows"] == len(expected) == 23
+    assert body["data"][0] == {"date": "2024-01-03", "close": 102.5, "volume": 1002}
+    assert [row["date"] for row in body["data"]] == list(
+        expected.index.strftime("%Y-%m-%d")
+    )
+
+
+def test_ohlcv_csv(client, store):
+    response = client.get("/api/v1/ohlcv/AAPL?format=csv&end=2024-01-10")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/csv")
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == "date,open,high,low,close,volume"
+    assert len(lines) == 1 + len(store.read("AAPL", end="2024-01-10"))
+
+
+def test_ohlcv_revalidation(client, store):
+    first = client.get("/api/v1/ohlcv/AAPL?fields=close")
+    first.close()
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+
+    cached = client.get(
+        "/api/v1/ohlcv/AAPL?fields=close", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.get_data() == b""
+    assert cached.headers["ETag"] == etag
+
+    by_date = client.get(
+        "/api/v1/ohlcv/AAPL?fields=close",
+        headers={"If-Modified-Since": first.headers["Last-Modified"]},
+    )
+    assert by_date.status_code == 304
+
+    # 不同的查询参数有不同的ETag
+    other = client.get(
+        "/api/v1/ohlcv/AAPL?fields=open", headers={"If-None-Match": etag}
+    )
+    other.close()
+    assert other.status_code == 200
+    assert other.headers["ETag"] != etag
+
+
+def test_ohlcv_etag_changes_when_data_changes(client, store):
+    first = client.get("/api/v1/ohlcv/AAPL")
+    first.close()
+    etag = first.headers["ETag"]
+    store.write(
+        "AAPL",
+        {
+            "meta_data": {"last_refreshed": "2024-02-05"},
+            "time_series": {
+                "2024-02-05": {
+                    "open": 1.0,
+                    "high": 1.0,
+                    "low": 1.0,
+                    "close": 1.0,
+                    "volume": 1,
+                }
+            },
+        },
+    )
+    modified_since = http_date(datetime.now(timezone.utc).timestamp() - 3600)
+    response = client.get(
+        "/api/v1/ohlcv/AAPL",
+        headers={"If-None-Match": etag, "If-Modified-Since": modified_since},
+    )
+    response.close()
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_ohlcv_etag_changes_when_last_bar_is_corrected(client, store):
+    first = client.get("/api/v1/ohlcv/AAPL?fields=close")
+    first.close()
+    last = store.info("AAPL")["end"]
+    # 同一交易日的修正：last_refreshed、行数和日期范围都不变
+    store.write(
+        "AAPL",
+        {
+            "meta_data": {"last_refreshed": last},
+            "time_series": {
+                last: {
+                    "open": 1.0,
+                    "high": 1.0,
+                    "low": 1.0,
+                    "close": 1000.5,
+                    "volume": 1,
+                }
+            },
+        },
+    )
+    response = client.get(
+        "/api/v1/ohlcv/AAPL?fields=close",
+        headers={"If-None-Match": first.headers["ETag"]},
+    )
+    assert response.status_code == 200
+    assert response.get_json()["data"][-1]["close"] == 1000.5
+
+
+def test_ohlcv_errors(client):
+    assert client.get("/api/v1/ohlcv/MISSING").status_code == 404
+    assert client.get("/api/v1/ohlcv/AAPL?start=01/02/2024").status_code == 400
+    assert client.get("/api/v1/ohlcv/AAPL?fields=close,bid").status_code == 400
+    assert (
+        client.get("/api/v1/ohlcv/AAPL?start=2024-02-01&end=2024-01-01").status_code
+        == 400
+    )
+
+
+def test_api_token(client, monkeypatch):
+    monkeypatch.setenv("DATA_API_TOKEN", "secret")
+    app = Flask(__name__)
+    register_data_api(app)
+    guarded = app.test_client()
+    assert guarded.get("/api/v1/symbols").status_code == 403
+    assert guarded.get("/api/v1/symbols?token=secre").status_code == 403
+    response = guarded.get("/api/v1/symbols", headers={"X-Api-Token": "secret"})
+    assert response.status_code == 200
+
+
+def test_symbols_revalidation(client):
+    first = client.get("/api/v1/symbols")
+    assert [info["symbol"] for info in first.get_json()] == ["AAPL"]
+    cached = client.get(
+        "/api/v1/symbols", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert cached.status_code == 304
+
+
+def test_symbols_skips_removed_files(client, store, monkeypatch):
+    symbols = store.symbols
+    # 列出目录之后 MSFT 的文件被删除
+    monkeypatch.setattr(store, "symbols", lambda: symbols() + ["MSFT"])
+    response = client.get("/api/v1/symbols")
+    assert response.status_code == 200
+    assert [info["symbol"] for info in response.get_json()] == ["AAPL"]
+
+
+def test_quote_stream_rejects_when_subscribers_are_full(client, monkeypatch):
+    hub = QuoteHub(None, MemoryCache(), max_subscribers=0)
+    monkeypatch.setattr(data_api, "get_quote_hub", lambda: hub)
+    response = client.get("/api/v1/quotes/stream?symbols=AAPL")
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) > 0
+    assert hub.subscriber_count() == 0
@@ -0,0 +1,38 @@
+# 调试接口测试
+# 验证令牌校验，以及查看分析结果时只读取共享缓存
+
+import pytest
+from flask import Flask
+
+from src.server.debug import register_debug_routes
+from src.utils import profiling
+from src.utils.cache import MemoryCache
+
+
+class ReadOnlyStore(MemoryCache):
+    def update(self, key, func, default=None, ttl=None):
+        raise AssertionError("viewing profiles must not take the write lock")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    store = ReadOnlyStore()
+    store.set(profiling.PROFILES_KEY, [{"id": "p1", "callback": "cb", "stats": "x"}])
+    monkeypatch.setattr(profiling, "get_shared_store", lambda: store)
+    monkeypatch.setenv("DEBUG_ROUTES_ENABLED", "true")
+    monkeypatch.setenv("DEBUG_TOKEN", "secret")
+    app = Flask(__name__)
+    register_debug_routes(app)
+    return app.test_client()
+
+
+def test_debug_routes_require_token(client):
+    assert client.get("/debug/profiles").status_code == 403
+    assert client.get("/debug/profiles?token=secre").status_code == 403
+    assert client.get("/debug/profiles?token=secret!").status_code == 403
+
+
+def test_list_profiles_reads_shared_store(client):
+    response = client.get("/debug/profiles", headers={"X-Debug-Token": "secret"})
+    assert response.status_code == 200
+    assert response.get_json() == [{"id": "p1", "callback": "cb"}]
@@ -0,0 +1,62 @@
+# 数据导出测试
+# 验证各导出格式按固定的列类型逐块写入，缺失值导出为空
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.server.export import (
+    stream_export_csv,
+    stream_export_parquet,
+    stream_export_xlsx,
+)
+
+
+class FakeStore:
+    """
+    第一块的成交量为int64，第二块因缺失值为float64（复权后的成交量可能有小数）
+    """
+
+    def iter_chunks(self, symbol, start, end, fields, chunk_rows):
+        index = pd.DatetimeIndex(["2024-01-02", "2024-01-03"], name="date")
+        yield pd.DataFrame(
+            {"close": [1.5, 2.5], "volume": np.array([100, 200], dtype="int64")},
+            index=index,
+        )[fields]
+        index = pd.DatetimeIndex(["2024-01-04", "2024-01-05"], name="date")
+        yield pd.DataFrame(
+            {"close": [np.nan, 3.5], "volume": [np.nan, 300.4]}, index=index
+        )[fields]
+
+
+FIELDS = ["close", "volume"]
+
+
+def test_csv_export_writes_missing_values_as_empty():
+    text = "".join(stream_export_csv(FakeStore(), ["AAPL"], None, None, FIELDS))
+    lines = text.splitlines()
+    assert lines[0] == "symbol,date,close,volume"
+    assert lines[1] == "AAPL,2024-01-02,1.5,100"
+    assert lines[3] == "AAPL,2024-01-04,,"
+
+
+def test_parquet_export_casts_every_chunk():
+    pq = pytest.importorskip("pyarrow.parquet")
+    data = b"".join(stream_export_parquet(FakeStore(), ["AAPL"], None, None, FIELDS))
+    table = pq.read_table(io.BytesIO(data))
+    assert str(table.schema.field("volume").type) == "int64"
+    assert table.column("volume").to_pylist() == [100, 200, None, 300]
+    assert table.column("close").to_pylist() == [1.5, 2.5, None, 3.5]
+
+
+def test_xlsx_export_leaves_missing_cells_blank():
+    pytest.importorskip("xlsxwriter")
+    openpyxl = pytest.importorskip("openpyxl")
+    data = b"".join(stream_export_xlsx(FakeStore(), ["AAPL"], None, None, FIELDS))
+    rows = list(openpyxl.load_workbook(io.BytesIO(data))["AAPL"].values)
+    assert rows[0] == ("date", "close", "volume")
+    assert rows[1][1:] == (1.5, 100)
+    assert rows[3][1:] == (None, None)
+    assert rows[4][1:] == (3.5, 300.4)
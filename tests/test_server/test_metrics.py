@@ -0,0 +1,47 @@
+# 指标接口测试
+# 验证指标接口默认关闭，启用后需要令牌，未设置令牌时只在开发模式下可用
+
+import pytest
+from flask import Flask
+
+from src.server.metrics import register_metrics_route
+
+
+def make_client(debug=False):
+    app = Flask(__name__)
+    app.debug = debug
+    register_metrics_route(app)
+    return app.test_client()
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setenv("METRICS_ENABLED", "true")
+    monkeypatch.delenv("METRICS_TOKEN", raising=False)
+
+
+def test_metrics_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("METRICS_ENABLED", raising=False)
+    assert make_client(debug=True).get("/metrics").status_code == 404
+
+
+def test_metrics_without_token_only_in_debug_mode(enabled):
+    assert make_client().get("/metrics").status_code == 404
+    assert make_client(debug=True).get("/metrics").status_code == 200
+
+
+def test_metrics_require_token(enabled, monkeypatch):
+    monkeypatch.setenv("METRICS_TOKEN", "secret")
+    client = make_client()
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics?token=secre").status_code == 403
+    assert (
+        client.get("/metrics", headers={"Authorization": "secret"}).status_code == 403
+    )
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    assert (
+        client.get("/metrics", headers={"X-Metrics-Token": "secret"}).status_code == 200
+    )
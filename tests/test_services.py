@@ -0,0 +1,23 @@
+# 服务注册测试
+# 验证报价事件流的订阅者上限始终低于每个worker的线程数
+
+import pytest
+
+from src import services
+
+
+@pytest.mark.parametrize(
+    "threads, configured, expected",
+    [("4", None, 1), ("8", None, 2), ("8", "3", 3), ("8", "100", 7), ("1", None, 1)],
+)
+def test_quote_stream_subscribers_stay_below_threads(
+    monkeypatch, threads, configured, expected
+):
+    monkeypatch.setenv("GUNICORN_THREADS", threads)
+    if configured is None:
+        monkeypatch.delenv("QUOTE_STREAM_MAX_SUBSCRIBERS", raising=False)
+    else:
+        monkeypatch.setenv("QUOTE_STREAM_MAX_SUBSCRIBERS", configured)
+    monkeypatch.setattr(services, "_instances", {"api_client": object()})
+
+    assert services.get_quote_hub().max_subscribers == expected
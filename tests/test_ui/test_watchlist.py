@@ -0,0 +1,46 @@
+# 关注列表测试
+# 验证只有报价在浏览器已渲染之后发生变化的行被更新
+
+from src.ui.watchlist import changed_rows
+
+
+def entry(price, fetched_at, changed_at=None):
+    record = {"quote": {"price": price}, "fetched_at": fetched_at}
+    if changed_at is not None:
+        record["changed_at"] = changed_at
+    return record
+
+
+def test_changed_rows():
+    symbols = ["AAPL", "MSFT", "GOOG", "TSCO.LON"]
+    entries = {
+        "AAPL": entry(1.0, fetched_at=130.0, changed_at=120.0),
+        "MSFT": entry(2.0, fetched_at=130.0, changed_at=90.0),
+        "TSCO.LON": entry(3.0, fetched_at=110.0, changed_at=110.0),
+    }
+    rows, latest = changed_rows(symbols, entries, since=100.0)
+    assert rows == [(0, {"price": 1.0}), (3, {"price": 3.0})]
+    assert latest == 120.0
+
+
+def test_refetched_unchanged_quote_is_not_a_change():
+    entries = {"AAPL": entry(1.0, fetched_at=200.0, changed_at=100.0)}
+    assert changed_rows(["AAPL"], entries, since=100.0) == ([], 100.0)
+
+
+def test_entries_without_changed_at_use_fetched_at():
+    entries = {"AAPL": entry(1.0, fetched_at=150.0)}
+    assert changed_rows(["AAPL"], entries, since=100.0) == (
+        [(0, {"price": 1.0})],
+        150.0,
+    )
+
+
+def test_first_render_includes_all_quotes():
+    entries = {
+        "AAPL": entry(1.0, fetched_at=10.0, changed_at=5.0),
+        "MSFT": entry(2.0, fetched_at=10.0, changed_at=8.0),
+    }
+    rows, latest = changed_rows(["AAPL", "MSFT", "GOOG"], entries, since=0)
+    assert [index for index, _ in rows] == [0, 1]
+    assert latest == 8.0
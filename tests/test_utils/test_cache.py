@@ -0,0 +1,268 @@
+# 缓存测试
+# 验证缓存键、内存/磁盘缓存后端、计数器、fork保护、共享状态存储和记忆化装饰器
+
+import os
+import threading
+
+import pytest
+
+from src.utils import cache as cache_module
+from src.utils.cache import (
+    BaseCache,
+    DiskCache,
+    MemoryCache,
+    NullCache,
+    _ForkGuard,
+    create_shared_store,
+    make_key,
+    memoize,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def global_cache(monkeypatch):
+    cache = MemoryCache()
+    monkeypatch.setattr(cache_module, "_cache_instance", cache)
+    return cache
+
+
+def test_make_key():
+    assert make_key("daily", "AAPL", None, 5) == "daily:AAPL::5"
+    long_key = make_key("view", "x" * 300)
+    assert long_key.startswith("view:")
+    assert len(long_key) < 100
+    assert long_key == make_key("view", "x" * 300)
+    assert long_key != make_key("view", "y" * 300)
+
+
+def test_memory_cache_get_set_delete():
+    cache = MemoryCache()
+    assert cache.get("a") is None
+    assert cache.get("a", "default") == "default"
+
+    cache.set("a", None)
+    assert cache.get("a", "default") is None
+    cache.delete("a")
+    assert cache.get("a", "default") == "default"
+
+    cache.set("b", 1)
+    cache.clear()
+    assert cache.get("b") is None
+    assert cache.hits == 1 and cache.misses == 4
+    assert cache.hit_ratio == pytest.approx(0.2)
+
+
+def test_memory_cache_expires_entries(clock):
+    cache = MemoryCache(default_ttl=60)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=10)
+    cache.set("long", 3, ttl=600)
+
+    clock.now += 30
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    clock.now += 60
+    assert cache.get("default") is None
+    assert cache.get("long") == 3
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_null_cache_never_hits():
+    cache = NullCache()
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert cache.incr("n", 3) == 3
+    assert cache.update("u", lambda value: value + 1, default=1) == 2
+
+
+def test_disk_cache_is_shared_between_instances(tmp_path):
+    first = DiskCache(str(tmp_path))
+    second = DiskCache(str(tmp_path))
+    first.set("quote", {"price": 1.0})
+    assert second.get("quote") == {"price": 1.0}
+
+    second.delete("quote")
+    assert first.get("quote") is None
+
+
+def test_memoize_caches_results(global_cache):
+    calls = []
+
+    @memoize("square")
+    def square(value):
+        calls.append(value)
+        return value * value
+
+    assert square(3) == 9
+    assert square(3) == 9
+    assert square(4) == 16
+    assert calls == [3, 4]
+    assert global_cache.get(make_key("square", 3)) == 9
+
+
+def test_memoize_does_not_cache_exceptions(global_cache):
+    calls = []
+
+    @memoize("flaky", key_func=lambda symbol, retry=False: (symbol,))
+    def flaky(symbol, retry=False):
+        calls.append(retry)
+        if not retry:
+            raise ValueError("upstream failed")
+        return symbol
+
+    with pytest.raises(ValueError):
+        flaky("AAPL")
+    assert flaky("AAPL", retry=True) == "AAPL"
+    # key_func 忽略 retry，第三次调用命中缓存
+    assert flaky("AAPL") == "AAPL"
+    assert calls == [False, True]
+
+
+@pytest.mark.parametrize("backend", ["memory", "disk"])
+def test_incr_and_update(backend, tmp_path):
+    cache = MemoryCache() if backend == "memory" else DiskCache(str(tmp_path))
+    assert cache.incr("counter") == 1
+    assert cache.incr("counter", 5) == 6
+    assert cache.incr("counter", -2) == 4
+    assert cache.get("counter") == 4
+
+    append = lambda items: items + ["x"]  # noqa: E731
+    assert cache.update("list", append, default=[]) == ["x"]
+    assert cache.update("list", append, default=[]) == ["x", "x"]
+
+
+def test_memory_counter_restarts_after_ttl(clock):
+    cache = MemoryCache()
+    cache.incr("window", ttl=60)
+    cache.incr("window", ttl=60)
+    clock.now += 61
+    assert cache.incr("window", ttl=60) == 1
+
+
+def test_disk_counters_are_atomic_across_threads(tmp_path):
+    cache = DiskCache(str(tmp_path))
+
+    def worker():
+        for _ in range(50):
+            cache.incr("counter")
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.get("counter") == 200
+
+
+def test_fork_guard_waits_for_active_operations():
+    guard = _ForkGuard(timeout=5)
+    entered, release, forked = threading.Event(), threading.Event(), threading.Event()
+
+    def operation():
+        with guard.shared():
+            entered.set()
+            release.wait(5)
+
+    def fork():
+        guard.before_fork()
+        forked.set()
+        guard.after_fork_in_parent()
+
+    worker = threading.Thread(target=operation)
+    worker.start()
+    entered.wait(5)
+    forker = threading.Thread(target=fork)
+    forker.start()
+
+    assert not forked.wait(0.2)
+    release.set()
+    assert forked.wait(5)
+    worker.join()
+    forker.join()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_disk_cache_is_usable_in_forked_child(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    cache.set("parent", 1)
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            cache.set("child", cache.get("parent") + 1)
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    assert cache.get("child") == 2
+
+
+def test_base_cache_is_abstract():
+    with pytest.raises(TypeError):
+        BaseCache()
+
+
+@pytest.mark.parametrize("backend", ["memory", "disk"])
+def test_get_many(backend, tmp_path):
+    cache = MemoryCache() if backend == "memory" else DiskCache(str(tmp_path))
+    cache.set("a", 1)
+    cache.set("b", None)
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "b": None}
+    assert cache.misses == 1
+
+
+def test_shared_store_is_separate_from_data_cache(monkeypatch):
+    data = MemoryCache(max_entries=2)
+    monkeypatch.setattr(cache_module, "_cache_instance", data)
+    shared = create_shared_store()
+    assert isinstance(shared, MemoryCache)
+    assert shared is not data
+
+    shared.incr("ratelimit:av:day:1")
+    for i in range(10):
+        data.set(f"view:{i}", i)
+    assert shared.get("ratelimit:av:day:1") == 1
+
+    monkeypatch.setattr(cache_module, "_cache_instance", NullCache())
+    assert isinstance(create_shared_store(), MemoryCache)
+
+
+def test_shared_disk_store_never_evicts_counters(monkeypatch, tmp_path):
+    data = DiskCache(str(tmp_path), size_limit=64 * 1024)
+    monkeypatch.setattr(cache_module, "_cache_instance", data)
+    shared = create_shared_store()
+    assert isinstance(shared, DiskCache)
+    assert shared.directory == str(tmp_path / "shared")
+
+    shared.incr("ratelimit:av:day:1")
+    payload = b"x" * 16 * 1024
+    for i in range(50):
+        data.set(f"view:{i}", payload)
+        data._cache.cull()
+    assert data.get("view:0") is None
+    assert shared.get("ratelimit:av:day:1") == 1
@@ -0,0 +1,72 @@
+# 日志采样测试
+# 验证 SamplingFilter 按日志记录器和消息模板限流，并在下一个周期报告被丢弃的数量
+
+import logging
+
+import pytest
+
+from src.utils import logger as logger_module
+from src.utils.logger import SamplingFilter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(logger_module, "time", fake)
+    return fake
+
+
+def make_record(
+    msg: str = "Fetched %s", name: str = "src.test", level: int = logging.INFO
+) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, ("AAPL",), None)
+
+
+def test_limits_records_per_template(clock):
+    sampler = SamplingFilter(limit=3, period=60)
+    passed = [sampler.filter(make_record()) for _ in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+
+
+def test_reports_suppressed_count_in_next_window(clock):
+    sampler = SamplingFilter(limit=2, period=60)
+    for _ in range(5):
+        sampler.filter(make_record())
+
+    clock.now += 60
+    record = make_record()
+    assert sampler.filter(record)
+    assert record.suppressed == 3
+
+    following = make_record()
+    assert sampler.filter(following)
+    assert not hasattr(following, "suppressed")
+
+
+def test_templates_and_loggers_are_sampled_separately(clock):
+    sampler = SamplingFilter(limit=1, period=60)
+    assert sampler.filter(make_record("Fetched %s"))
+    assert sampler.filter(make_record("Stored %s"))
+    assert sampler.filter(make_record("Fetched %s", name="src.other"))
+    assert not sampler.filter(make_record("Fetched %s"))
+
+
+def test_warnings_are_never_sampled(clock):
+    sampler = SamplingFilter(limit=1, period=60)
+    for _ in range(5):
+        assert sampler.filter(make_record(level=logging.WARNING))
+
+
+def test_tracked_templates_are_bounded(clock):
+    sampler = SamplingFilter(limit=1, period=60, max_keys=4)
+    for i in range(20):
+        assert sampler.filter(make_record(f"message {i}"))
+    assert len(sampler._windows) <= 4
@@ -0,0 +1,112 @@
+# 频率限制测试
+# 使用内存缓存和假时钟验证分钟/每日窗口的计数、等待和拒绝
+
+import pytest
+
+from src.utils import rate_limit
+from src.utils.cache import MemoryCache
+from src.utils.exceptions import APIRateLimitError
+from src.utils.rate_limit import RateLimiter
+
+
+class FakeClock:
+    """
+    替代 time 模块：sleep 直接推进时间
+    """
+
+    def __init__(self, now: float):
+        self.now = now
+        self.slept = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # 从某个分钟窗口的第10秒开始
+    fake = FakeClock(1_700_000_040.0 + 10)
+    monkeypatch.setattr(rate_limit, "time", fake)
+    return fake
+
+
+def test_unlimited_limiter_never_blocks(clock):
+    limiter = RateLimiter("test", backend=MemoryCache())
+    for _ in range(100):
+        limiter.acquire()
+    assert limiter.remaining_today() is None
+    assert clock.slept == []
+
+
+def test_minute_limit_waits_for_next_window(clock):
+    limiter = RateLimiter("test", per_minute=2, max_wait=60, backend=MemoryCache())
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.slept == []
+
+    limiter.acquire()
+    assert clock.slept == [pytest.approx(50.0)]
+
+
+def test_minute_limit_rejects_when_wait_exceeds_max_wait(clock):
+    limiter = RateLimiter("test", per_minute=1, max_wait=0, backend=MemoryCache())
+    limiter.acquire()
+    with pytest.raises(APIRateLimitError):
+        limiter.acquire()
+    assert clock.slept == []
+
+
+def test_daily_quota_is_exhausted(clock):
+    limiter = RateLimiter("test", per_day=3, backend=MemoryCache())
+    for remaining in (2, 1, 0):
+        limiter.acquire()
+        assert limiter.remaining_today() == remaining
+
+    with pytest.raises(APIRateLimitError):
+        limiter.acquire()
+    assert limiter.remaining_today() == 0
+
+
+def test_rejections_do_not_consume_quota(clock):
+    backend = MemoryCache()
+    limiter = RateLimiter("test", per_minute=2, per_day=10, max_wait=0, backend=backend)
+    limiter.acquire()
+    limiter.acquire()
+    for _ in range(5):
+        with pytest.raises(APIRateLimitError):
+            limiter.acquire()
+    assert limiter.remaining_today() == 8
+
+    # 下一个分钟窗口恢复
+    clock.now += 60
+    limiter.acquire()
+    assert limiter.remaining_today() == 7
+
+
+def test_day_rejection_releases_minute_slot(clock):
+    backend = MemoryCache()
+    limiter = RateLimiter("test", per_minute=5, per_day=1, max_wait=0, backend=backend)
+    limiter.acquire()
+    with pytest.raises(APIRateLimitError):
+        limiter.acquire()
+
+    # 分钟窗口中只保留成功的一次
+    other = RateLimiter("test", per_minute=5, max_wait=0, backend=backend)
+    for _ in range(4):
+        other.acquire()
+    with pytest.raises(APIRateLimitError):
+        other.acquire()
+
+
+def test_limiters_share_counts_through_backend(clock):
+    backend = MemoryCache()
+    first = RateLimiter("shared", per_day=2, backend=backend)
+    second = RateLimiter("shared", per_day=2, backend=backend)
+    first.acquire()
+    second.acquire()
+    with pytest.raises(APIRateLimitError):
+        first.acquire()